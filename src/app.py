@@ -118,7 +118,7 @@ with tab1:
     
     uploaded_file = st.file_uploader(
         "Chọn file CSV hoặc Excel",
-        type=["csv", "xlsx", "xls"],
+        type=["csv", "xlsx", "xls", "parquet", "feather", "arrow"],
         help="Upload file dữ liệu của bạn (Marketing, E-commerce, Sales, etc.)"
     )
     
@@ -2,13 +2,216 @@
 Vietnam Benchmark Data Loader
 Loads 300+ realistic Vietnam market benchmarks from CSV files
 Domains: HR, Marketing, E-commerce, Sales
+
+⚡ Each CSV is indexed once at load time (normalized metric / filter values →
+row ids, quantile columns resolved to float arrays), so lookups never rescan
+the frames, and score_percentiles() scores whole arrays of values in one
+NumPy call.
+
+Percentiles and statuses read "better than X% of the market": for cost-like
+metrics (LOWER_IS_BETTER_METRICS, e.g. CPA, cart abandonment, sales cycle)
+they are inverted, so a CPA above the median is never reported as good.
+
+⚡ get_benchmark_loader() returns one process-wide loader shared by every
+pipeline and Streamlit session. It is never mutated after loading: when a
+sample_data/vietnam_*_benchmarks_2024.csv file changes on disk, a new loader
+is built off to the side and swapped in with a single reference assignment,
+so readers always see one consistent version.
+
+Configuration (env):
+- BENCHMARK_HOT_RELOAD: 0 = never re-check the CSV files (default 1)
+- BENCHMARK_RELOAD_CHECK_SECONDS: minimum seconds between file checks (default 2)
 """
 
+import logging
+import threading
+import time
+
 import pandas as pd
+import numpy as np
 import os
 from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 
+from utils.text_search import normalize_text
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SAMPLE_DATA_PATH = Path(__file__).parent.parent / "sample_data"
+BENCHMARK_FILE_PATTERN = "vietnam_*_benchmarks_2024.csv"
+
+
+# Domain → (metric column, {filter argument: (column, exact match)})
+BENCHMARK_FILTERS = {
+    'hr': (None, {'role': ('role', False), 'city': ('city', False),
+                  'experience_level': ('experience_level', True)}),
+    'marketing': ('metric', {'channel': ('channel', False), 'industry': ('industry', False)}),
+    'ecommerce': ('metric', {'category': ('category', False), 'platform': ('platform', False)}),
+    'sales': ('metric', {'sales_type': ('sales_type', True), 'industry': ('industry', False)}),
+}
+
+STATUS_LABELS = np.array(['below_average', 'average', 'above_average', 'excellent'])
+
+# Metrics where a lower value is better (costs, fees, delays, loss rates),
+# matched as substrings of the normalized metric name
+LOWER_IS_BETTER_METRICS = (
+    'cost', 'fee', 'bounce rate', 'unsubscribe rate', 'abandonment rate', 'return rate',
+    'churn rate', 'delivery time', 'response time', 'ramp time', 'cycle length',
+    'discount given', 'payment terms',
+)
+
+
+def is_lower_better(metric_name: Optional[str]) -> bool:
+    """True if a lower value of the metric is the better outcome (e.g. CPA)."""
+    name = normalize_text(metric_name or '')
+    return any(keyword in name for keyword in LOWER_IS_BETTER_METRICS)
+
+
+def resolve_quantile_columns(columns) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """
+    Find the (median, q1, q3) columns of a benchmark table.
+
+    HR: median_salary_vnd_monthly, percentile_25, percentile_75;
+    others: median, quartile_25, quartile_75.
+    """
+    median_col = q1_col = q3_col = None
+    for col in columns:
+        if 'median' in col.lower():
+            median_col = col
+        elif '25' in col or 'q1' in col.lower():
+            q1_col = col
+        elif '75' in col or 'q3' in col.lower():
+            q3_col = col
+    return median_col, q1_col, q3_col
+
+
+def score_percentiles(values, q1, median, q3) -> np.ndarray:
+    """
+    Approximate market percentile of each value from its benchmark quartiles.
+
+    Piecewise linear: 0-25 below Q1, 25-50 up to the median, 50-75 up to Q3,
+    75-100 above Q3 (capped one IQR-half above Q3). All arguments broadcast,
+    so one call scores N values against one or N benchmarks.
+
+    Returns:
+        Float array of percentiles
+    """
+    values, q1, median, q3 = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (values, q1, median, q3)))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.select(
+            [values <= q1, values <= median, values <= q3],
+            [25 * (values / q1),
+             25 + 25 * ((values - q1) / (median - q1)),
+             50 + 25 * ((values - median) / (q3 - median))],
+            default=75 + 25 * np.minimum((values - q3) / (q3 - median), 1)
+        )
+
+
+def orient_percentiles(percentiles, lower_is_better) -> np.ndarray:
+    """
+    Percentiles as 'better than X% of the market' (100 - p where lower is better).
+
+    Args:
+        percentiles: Output of score_percentiles()
+        lower_is_better: Bool flag, scalar or one per percentile
+    """
+    percentiles = np.asarray(percentiles, dtype=float)
+    return np.where(lower_is_better, 100 - percentiles, percentiles)
+
+
+def percentile_status(percentiles) -> np.ndarray:
+    """Status label per percentile: below_average <25 ≤ average <50 ≤ above_average <75 ≤ excellent."""
+    bins = np.searchsorted([25, 50, 75], np.asarray(percentiles, dtype=float), side='right')
+    return STATUS_LABELS[bins]
+
+
+class BenchmarkTable:
+    """
+    One benchmark CSV with prebuilt lookup indexes.
+
+    Filter values are normalized (lowercase, Vietnamese diacritics folded), and
+    each column maps its distinct normalized values to row ids. A substring
+    filter is resolved against the distinct values only, then memoized.
+    """
+
+    def __init__(self, domain: str, frame: pd.DataFrame):
+        self.domain = domain
+        self.frame = frame
+        metric_col, filters = BENCHMARK_FILTERS[domain]
+        self.metric_col = metric_col if metric_col in frame.columns else None
+        self.filters = filters
+
+        self.median_col, self.q1_col, self.q3_col = resolve_quantile_columns(frame.columns)
+        if self.median_col is not None:
+            self.median = pd.to_numeric(frame[self.median_col], errors='coerce').to_numpy(dtype=float)
+            self.q1 = (pd.to_numeric(frame[self.q1_col], errors='coerce').to_numpy(dtype=float)
+                       if self.q1_col else self.median * 0.8)
+            self.q3 = (pd.to_numeric(frame[self.q3_col], errors='coerce').to_numpy(dtype=float)
+                       if self.q3_col else self.median * 1.2)
+        self.source = (frame['source'].to_numpy() if 'source' in frame.columns
+                       else np.full(len(frame), 'Vietnam Market Data 2024', dtype=object))
+        self.notes = frame['notes'].fillna('').to_numpy() if 'notes' in frame.columns else np.full(len(frame), '', dtype=object)
+        # Per row: percentile/status are inverted for cost-like metrics
+        self.lower_is_better = (frame[self.metric_col].astype(str).map(is_lower_better).to_numpy(dtype=bool)
+                                if self.metric_col else np.zeros(len(frame), dtype=bool))
+
+        # column → {normalized value: row ids}
+        self.index: Dict[str, Dict[str, np.ndarray]] = {}
+        for column in [self.metric_col] + [col for col, _ in filters.values()]:
+            if column is None or column not in frame.columns:
+                continue
+            codes, uniques = pd.factorize(frame[column].astype(str).map(normalize_text))
+            order = np.argsort(codes, kind='stable')
+            bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+            self.index[column] = {value: order[bounds[i]:bounds[i + 1]] for i, value in enumerate(uniques)}
+        self._cache: Dict[tuple, np.ndarray] = {}
+
+        # Shared across sessions: arrays are read-only
+        for array in [getattr(self, name, None) for name in ('median', 'q1', 'q3', 'lower_is_better')] + \
+                [rows for values in self.index.values() for rows in values.values()]:
+            if array is not None:
+                array.flags.writeable = False
+
+    def _match(self, column: str, value: str, exact: bool) -> np.ndarray:
+        if column not in self.index:
+            raise KeyError(column)
+        key = normalize_text(value)
+        if exact:
+            return self.index[column].get(key, np.empty(0, dtype=np.intp))
+        matched = [rows for candidate, rows in self.index[column].items() if key in candidate]
+        return np.sort(np.concatenate(matched)) if matched else np.empty(0, dtype=np.intp)
+
+    def rows(self, metric_name: Optional[str] = None, **filters) -> np.ndarray:
+        """
+        Row ids (file order) matching a metric (substring) and filters.
+
+        Raises:
+            TypeError: Unknown filter for this domain
+        """
+        unknown = set(filters) - set(self.filters)
+        if unknown:
+            raise TypeError(f"Unknown {self.domain} benchmark filter(s): {', '.join(sorted(unknown))}")
+        key = (metric_name, tuple(sorted((k, v) for k, v in filters.items() if v)))
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+
+        rows = np.arange(len(self.frame))
+        criteria = [(self.metric_col, metric_name, False)] if self.metric_col and metric_name else []
+        criteria += [(self.filters[name][0], value, self.filters[name][1]) for name, value in filters.items() if value]
+        for column, value, exact in criteria:
+            rows = np.intersect1d(rows, self._match(column, value, exact), assume_unique=True)
+            if len(rows) == 0:
+                break
+        rows.flags.writeable = False
+        self._cache[key] = rows
+        return rows
+
+    def first_row(self, metric_name: Optional[str] = None, **filters) -> Optional[int]:
+        """First matching row id (the row compare_value_to_benchmark uses), or None."""
+        rows = self.rows(metric_name, **filters)
+        return int(rows[0]) if len(rows) else None
+
 
 class VietnamBenchmarkLoader:
     """
@@ -31,8 +234,7 @@ class VietnamBenchmarkLoader:
         """
         if sample_data_path is None:
             # Auto-detect: Look for sample_data relative to this file
-            current_dir = Path(__file__).parent
-            sample_data_path = current_dir.parent / "sample_data"
+            sample_data_path = DEFAULT_SAMPLE_DATA_PATH
 
         self.sample_data_path = Path(sample_data_path)
 
@@ -45,15 +247,45 @@ class VietnamBenchmarkLoader:
         # Load status
         self.loaded = False
         self.load_errors = []
-
-    def load_all_benchmarks(self) -> Dict[str, bool]:
+        self._load_status: Optional[Dict[str, bool]] = None
+
+        # Indexed lookup tables by domain (built at load time)
+        self.tables: Dict[str, BenchmarkTable] = {}
+
+        # Version of the CSV files the frames were read from
+        self.source_signature: Optional[tuple] = None
+
+    def current_signature(self) -> tuple:
+        """(file name, mtime_ns, size) of every benchmark CSV on disk, sorted."""
+        signature = []
+        for path in sorted(self.sample_data_path.glob(BENCHMARK_FILE_PATTERN)):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue  # Deleted between glob and stat
+            signature.append((path.name, stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
+
+    def is_stale(self) -> bool:
+        """True if a benchmark CSV was added, removed or modified since loading."""
+        return self.source_signature is not None and self.current_signature() != self.source_signature
+
+    def load_all_benchmarks(self, reload: bool = False) -> Dict[str, bool]:
         """
-        Load all 4 Vietnam benchmark CSV files.
+        Load all 4 Vietnam benchmark CSV files (once; later calls reuse the frames).
+
+        Args:
+            reload: Re-read the CSV files even if already loaded
 
         Returns:
             Dict with load status for each file: {'hr': True, 'marketing': False, ...}
         """
+        if self._load_status is not None and not reload:
+            return dict(self._load_status)
+
         status = {}
+        self.load_errors = []
+        self.source_signature = self.current_signature()  # Taken first: a write during loading triggers a reload
 
         # HR Benchmarks
         hr_path = self.sample_data_path / "vietnam_hr_salary_benchmarks_2024.csv"
@@ -91,8 +323,22 @@ class VietnamBenchmarkLoader:
             self.load_errors.append(f"Sales: {str(e)}")
             status['sales'] = False
 
+        self.tables = {}
+        for domain, frame in (('hr', self.hr_benchmarks), ('marketing', self.marketing_benchmarks),
+                              ('ecommerce', self.ecommerce_benchmarks), ('sales', self.sales_benchmarks)):
+            if status[domain] and frame is not None:
+                self.tables[domain] = BenchmarkTable(domain, frame)
+
         self.loaded = any(status.values())
-        return status
+        self._load_status = status
+        return dict(status)
+
+    def _filtered(self, domain: str, metric_name: Optional[str] = None, **filters) -> Optional[pd.DataFrame]:
+        table = self.tables.get(domain)
+        if table is None:
+            return None
+        rows = table.rows(metric_name, **filters)
+        return table.frame.iloc[rows] if len(rows) > 0 else None
 
     def get_hr_salary_benchmark(
         self,
@@ -111,19 +357,7 @@ class VietnamBenchmarkLoader:
         Returns:
             Filtered DataFrame or None if no data loaded
         """
-        if self.hr_benchmarks is None:
-            return None
-
-        df = self.hr_benchmarks.copy()
-
-        if role:
-            df = df[df['role'].str.contains(role, case=False, na=False)]
-        if city:
-            df = df[df['city'].str.contains(city, case=False, na=False)]
-        if experience_level:
-            df = df[df['experience_level'] == experience_level]
-
-        return df if len(df) > 0 else None
+        return self._filtered('hr', role=role, city=city, experience_level=experience_level)
 
     def get_marketing_benchmark(
         self,
@@ -142,19 +376,7 @@ class VietnamBenchmarkLoader:
         Returns:
             Filtered DataFrame or None if no data loaded
         """
-        if self.marketing_benchmarks is None:
-            return None
-
-        df = self.marketing_benchmarks.copy()
-
-        if metric_name:
-            df = df[df['metric_name'].str.contains(metric_name, case=False, na=False)]
-        if channel:
-            df = df[df['channel'].str.contains(channel, case=False, na=False)]
-        if industry:
-            df = df[df['industry'].str.contains(industry, case=False, na=False)]
-
-        return df if len(df) > 0 else None
+        return self._filtered('marketing', metric_name, channel=channel, industry=industry)
 
     def get_ecommerce_benchmark(
         self,
@@ -173,19 +395,7 @@ class VietnamBenchmarkLoader:
         Returns:
             Filtered DataFrame or None if no data loaded
         """
-        if self.ecommerce_benchmarks is None:
-            return None
-
-        df = self.ecommerce_benchmarks.copy()
-
-        if metric_name:
-            df = df[df['metric_name'].str.contains(metric_name, case=False, na=False)]
-        if category:
-            df = df[df['category'].str.contains(category, case=False, na=False)]
-        if platform:
-            df = df[df['platform'].str.contains(platform, case=False, na=False)]
-
-        return df if len(df) > 0 else None
+        return self._filtered('ecommerce', metric_name, category=category, platform=platform)
 
     def get_sales_benchmark(
         self,
@@ -204,19 +414,14 @@ class VietnamBenchmarkLoader:
         Returns:
             Filtered DataFrame or None if no data loaded
         """
-        if self.sales_benchmarks is None:
-            return None
+        return self._filtered('sales', metric_name, sales_type=sales_type, industry=industry)
 
-        df = self.sales_benchmarks.copy()
-
-        if metric_name:
-            df = df[df['metric_name'].str.contains(metric_name, case=False, na=False)]
-        if sales_type:
-            df = df[df['sales_type'] == sales_type]
-        if industry:
-            df = df[df['industry'].str.contains(industry, case=False, na=False)]
-
-        return df if len(df) > 0 else None
+    def _benchmark_row(self, domain: str, metric_name: str, filters: Dict[str, str]) -> Tuple[Optional[BenchmarkTable], Optional[int]]:
+        table = self.tables.get(domain)
+        if table is None or table.median_col is None:
+            return None, None
+        # HR rows are salaries: the metric name is not a filter there
+        return table, table.first_row(None if domain == 'hr' else metric_name, **filters)
 
     def compare_value_to_benchmark(
         self,
@@ -241,75 +446,32 @@ class VietnamBenchmarkLoader:
                 'benchmark_median': 82000,
                 'benchmark_q1': 65000,
                 'benchmark_q3': 110000,
-                'percentile': 55,  # User is at 55th percentile
+                'percentile': 55,  # Better than 55% of the market
                 'status': 'above_average',  # or 'average', 'below_average', 'excellent'
-                'message': 'Cao hơn 55% thị trường Vietnam'
+                'message': 'Cao hơn 55% thị trường Vietnam',
+                'lower_is_better': False  # True for costs (CPA, ...): percentile/status inverted
             }
         """
-        filters = filters or {}
-
-        # Get benchmark data
-        if domain == 'hr':
-            benchmark_df = self.get_hr_salary_benchmark(**filters)
-        elif domain == 'marketing':
-            benchmark_df = self.get_marketing_benchmark(metric_name=metric_name, **filters)
-        elif domain == 'ecommerce':
-            benchmark_df = self.get_ecommerce_benchmark(metric_name=metric_name, **filters)
-        elif domain == 'sales':
-            benchmark_df = self.get_sales_benchmark(metric_name=metric_name, **filters)
-        else:
-            return None
-
-        if benchmark_df is None or len(benchmark_df) == 0:
-            return None
-
-        # Extract benchmark values (try different column names)
-        # For HR: median_salary_vnd_monthly, percentile_25, percentile_75
-        # For others: median_value, percentile_25, percentile_75
-
-        median_col = None
-        q1_col = None
-        q3_col = None
-
-        for col in benchmark_df.columns:
-            if 'median' in col.lower():
-                median_col = col
-            elif '25' in col or 'q1' in col.lower():
-                q1_col = col
-            elif '75' in col or 'q3' in col.lower():
-                q3_col = col
-
-        if median_col is None:
+        table, row = self._benchmark_row(domain, metric_name, filters or {})
+        if row is None:
             return None
 
-        # Get benchmark values (take first row if multiple matches)
-        benchmark_median = benchmark_df[median_col].iloc[0]
-        benchmark_q1 = benchmark_df[q1_col].iloc[0] if q1_col else benchmark_median * 0.8
-        benchmark_q3 = benchmark_df[q3_col].iloc[0] if q3_col else benchmark_median * 1.2
-
-        # Calculate percentile (approximate)
-        if user_value <= benchmark_q1:
-            percentile = 25 * (user_value / benchmark_q1)
-        elif user_value <= benchmark_median:
-            percentile = 25 + 25 * ((user_value - benchmark_q1) / (benchmark_median - benchmark_q1))
-        elif user_value <= benchmark_q3:
-            percentile = 50 + 25 * ((user_value - benchmark_median) / (benchmark_q3 - benchmark_median))
-        else:
-            percentile = 75 + 25 * min((user_value - benchmark_q3) / (benchmark_q3 - benchmark_median), 1)
-
-        # Determine status
-        if percentile >= 75:
-            status = 'excellent'
-            message = f'Xuất sắc! Cao hơn {percentile:.0f}% thị trường Vietnam'
-        elif percentile >= 50:
-            status = 'above_average'
-            message = f'Tốt! Cao hơn {percentile:.0f}% thị trường Vietnam'
-        elif percentile >= 25:
-            status = 'average'
+        benchmark_median, benchmark_q1, benchmark_q3 = table.median[row], table.q1[row], table.q3[row]
+        lower_is_better = bool(table.lower_is_better[row])
+        percentile = float(orient_percentiles(
+            score_percentiles(user_value, benchmark_q1, benchmark_median, benchmark_q3), lower_is_better))
+        status = str(percentile_status(percentile))
+        # Lower is better: a good value is LOWER than most of the market
+        better, worse = ('Thấp hơn', 'Cao hơn') if lower_is_better else ('Cao hơn', 'Thấp hơn')
+
+        if status == 'excellent':
+            message = f'Xuất sắc! {better} {percentile:.0f}% thị trường Vietnam'
+        elif status == 'above_average':
+            message = f'Tốt! {better} {percentile:.0f}% thị trường Vietnam'
+        elif status == 'average':
             message = f'Trung bình thị trường Vietnam ({percentile:.0f}th percentile)'
         else:
-            status = 'below_average'
-            message = f'Thấp hơn {100-percentile:.0f}% thị trường Vietnam'
+            message = f'{worse} {100-percentile:.0f}% thị trường Vietnam'
 
         return {
             'user_value': user_value,
@@ -319,10 +481,72 @@ class VietnamBenchmarkLoader:
             'percentile': percentile,
             'status': status,
             'message': message,
-            'benchmark_source': benchmark_df['source'].iloc[0] if 'source' in benchmark_df.columns else 'Vietnam Market Data 2024',
-            'vietnam_context': benchmark_df['notes'].iloc[0] if 'notes' in benchmark_df.columns else ''
+            'lower_is_better': lower_is_better,
+            'benchmark_source': table.source[row],
+            'vietnam_context': table.notes[row]
         }
 
+    def compare_values_to_benchmark(
+        self,
+        domain: str,
+        metric_name: str,
+        user_values,
+        filters: Dict[str, str] = None
+    ) -> Optional[pd.DataFrame]:
+        """
+        Score many values (e.g. every employee's salary) against one benchmark.
+
+        Args:
+            domain: 'hr', 'marketing', 'ecommerce', or 'sales'
+            metric_name: Name of the metric to compare
+            user_values: Array-like of values
+            filters: Additional filters, as in compare_value_to_benchmark
+
+        Returns:
+            DataFrame with user_value, percentile, status (one row per value,
+            same order) and the benchmark quartiles in .attrs; None if no benchmark
+        """
+        table, row = self._benchmark_row(domain, metric_name, filters or {})
+        if row is None:
+            return None
+        values = np.asarray(user_values, dtype=float)
+        percentiles = orient_percentiles(score_percentiles(values, table.q1[row], table.median[row], table.q3[row]),
+                                         table.lower_is_better[row])
+        result = pd.DataFrame({'user_value': values, 'percentile': percentiles,
+                               'status': percentile_status(percentiles)})
+        result.attrs.update(benchmark_median=table.median[row], benchmark_q1=table.q1[row],
+                            benchmark_q3=table.q3[row], benchmark_source=table.source[row])
+        return result
+
+    def compare_many(self, domain: str, requests: List[Tuple[str, float, Optional[Dict[str, str]]]]) -> pd.DataFrame:
+        """
+        Score several (metric, value, filters) requests in one vectorized pass.
+
+        Benchmark rows are resolved through the index, then all values are
+        scored against their own quartiles in a single score_percentiles() call.
+
+        Returns:
+            DataFrame (one row per request, same order) with metric_name,
+            user_value, benchmark_median/q1/q3, percentile, status; benchmark
+            columns are NaN where no benchmark matched
+        """
+        n = len(requests)
+        median, q1, q3 = np.full(n, np.nan), np.full(n, np.nan), np.full(n, np.nan)
+        lower_is_better = np.zeros(n, dtype=bool)
+        values = np.array([value for _, value, _ in requests], dtype=float)
+        for i, (metric_name, _, filters) in enumerate(requests):
+            table, row = self._benchmark_row(domain, metric_name, filters or {})
+            if row is not None:
+                median[i], q1[i], q3[i] = table.median[row], table.q1[row], table.q3[row]
+                lower_is_better[i] = table.lower_is_better[row]
+        percentiles = orient_percentiles(score_percentiles(values, q1, median, q3), lower_is_better)
+        status = np.where(np.isnan(median), None, percentile_status(np.nan_to_num(percentiles)))
+        return pd.DataFrame({
+            'metric_name': [metric_name for metric_name, _, _ in requests],
+            'user_value': values, 'benchmark_median': median, 'benchmark_q1': q1, 'benchmark_q3': q3,
+            'percentile': percentiles, 'status': status,
+        })
+
     def get_domain_summary(self, domain: str) -> Dict:
         """
         Get summary statistics for a domain's benchmarks.
@@ -370,22 +594,60 @@ class VietnamBenchmarkLoader:
             return {}
 
 
-# Singleton instance for easy import
-_benchmark_loader = None
+# Process-wide shared loader (read-only once published)
+_benchmark_loader: Optional[VietnamBenchmarkLoader] = None
+_benchmark_lock = threading.Lock()
+_last_check = 0.0
+_rejected_signature: Optional[tuple] = None
+
+
+def _hot_reload_due() -> bool:
+    if os.getenv('BENCHMARK_HOT_RELOAD', '1') == '0':
+        return False
+    interval = float(os.getenv('BENCHMARK_RELOAD_CHECK_SECONDS', '2'))
+    return time.monotonic() - _last_check >= interval
+
 
 def get_benchmark_loader() -> VietnamBenchmarkLoader:
     """
-    Get singleton instance of VietnamBenchmarkLoader.
-    Automatically loads all benchmarks on first call.
+    Get the process-wide VietnamBenchmarkLoader, shared by all sessions.
+
+    Loads all benchmarks on first call. Afterwards, at most every
+    BENCHMARK_RELOAD_CHECK_SECONDS, the CSV files are stat()-ed; if any changed,
+    a fresh loader is built and atomically replaces the shared one. Callers
+    holding the previous loader keep a complete, consistent version. A reload
+    that loads fewer domains than the current loader (e.g. a half-written
+    file) is discarded until the files change again.
 
     Returns:
-        VietnamBenchmarkLoader instance with data loaded
+        VietnamBenchmarkLoader instance with data loaded (do not mutate)
     """
-    global _benchmark_loader
-    if _benchmark_loader is None:
-        _benchmark_loader = VietnamBenchmarkLoader()
-        _benchmark_loader.load_all_benchmarks()
-    return _benchmark_loader
+    global _benchmark_loader, _last_check, _rejected_signature
+    loader = _benchmark_loader
+    if loader is not None and not _hot_reload_due():
+        return loader  # ⚡ Lock-free fast path
+
+    with _benchmark_lock:
+        loader = _benchmark_loader
+        if loader is None:
+            loader = VietnamBenchmarkLoader()
+            loader.load_all_benchmarks()
+            _benchmark_loader = loader
+        elif _hot_reload_due():
+            _last_check = time.monotonic()
+            signature = loader.current_signature()
+            if signature not in (loader.source_signature, _rejected_signature):
+                fresh = VietnamBenchmarkLoader(loader.sample_data_path)
+                status = fresh.load_all_benchmarks()
+                if sum(status.values()) >= sum(loader._load_status.values()):
+                    _benchmark_loader = loader = fresh
+                    logger.info(f"✅ Vietnam benchmarks reloaded: {status}")
+                else:
+                    # Keep serving the old version; retry once the files change again
+                    _rejected_signature = signature
+                    logger.warning(f"⚠️ Benchmark reload failed, keeping previous data: {fresh.load_errors}")
+        _last_check = time.monotonic()
+    return loader
 
 
 # Quick test if run directly
@@ -21,6 +21,7 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 from utils.validators import safe_file_upload, sanitize_column_names, validate_dataframe
 from utils.error_handlers import rate_limit_handler, user_friendly_error
 from utils.performance import log_performance, PerformanceMonitor
+from utils.cross_filter import build_filter_index
 from google import genai
 from google.genai import types
 import os
@@ -474,7 +475,7 @@ def generate_per_chart_insights(client, df: pd.DataFrame, numerical_cols: list,
         num_col = numerical_cols[0] if len(numerical_cols) >= 1 else numerical_cols[0]
         
         # Get top categories by numerical value
-        top_cats = df.groupby(cat_col)[num_col].mean().sort_values(ascending=False).head(5)
+        top_cats = df.groupby(cat_col, observed=True)[num_col].mean().sort_values(ascending=False).head(5)
         
         chart_definitions.append({
             'id': 'category_bar_chart',
@@ -1078,7 +1079,7 @@ if workflow_step == "📁 Step 1: Data Import & Overview":
         st.markdown("### 📤 Upload Dataset")
         uploaded_file = st.file_uploader(
             "Chọn file CSV hoặc Excel",
-            type=['csv', 'xlsx', 'xls'],
+            type=['csv', 'xlsx', 'xls', 'parquet', 'feather', 'arrow'],
             help="Tải lên file dữ liệu của bạn"
         )
         
@@ -1185,7 +1186,8 @@ if workflow_step == "📁 Step 1: Data Import & Overview":
                     for col in df.columns:
                         if df[col].dtype == 'datetime64[ns]':
                             auto_date_cols.append(col)
-                        elif df[col].dtype == 'object':
+                        elif df[col].dtype == 'object' or isinstance(df[col].dtype, pd.CategoricalDtype):
+                            # Compact loads store low-cardinality text (e.g. repeated dates) as category
                             try:
                                 pd.to_datetime(df[col], errors='coerce')
                                 non_null_ratio = df[col].notna().sum() / len(df)
@@ -1199,7 +1201,7 @@ if workflow_step == "📁 Step 1: Data Import & Overview":
                 # Auto-detect categorical and numerical (excluding detected dates)
                 remaining_cols = [col for col in df.columns if col not in auto_date_cols]
                 auto_categorical = [col for col in df.select_dtypes(include=['object', 'category']).columns if col not in auto_date_cols]
-                auto_numerical = [col for col in df.select_dtypes(include=['int64', 'float64']).columns if col not in auto_date_cols]
+                auto_numerical = [col for col in df.select_dtypes(include='number').columns if col not in auto_date_cols]
                 
                 st.session_state.date_cols = st.multiselect(
                     "📅 Date/Time Columns (ngày tháng, thời gian):",
@@ -2392,36 +2394,38 @@ elif workflow_step == "🚀 Step 5: Build Dashboard":
                     st.session_state.active_filters = {}
                     st.rerun()
             
-            # Apply filters to dataframe
-            filtered_df = df.copy()
-            active_filter_count = 0
-            
-            # Apply categorical filters
-            for col in st.session_state.categorical_cols:
-                if col in st.session_state.active_filters and st.session_state.active_filters[col]:
-                    filtered_df = filtered_df[filtered_df[col].isin(st.session_state.active_filters[col])]
-                    active_filter_count += 1
+            # Apply filters via the bitmap index (built once per dataset, reused across reruns)
+            filter_index = build_filter_index(
+                df,
+                st.session_state.categorical_cols or [],
+                st.session_state.numerical_cols or [],
+                previous=st.session_state.get('filter_index')
+            )
+            st.session_state.filter_index = filter_index
             
-            # Apply numerical range filters
+            category_filters = {
+                col: st.session_state.active_filters[col]
+                for col in (st.session_state.categorical_cols or [])
+                if st.session_state.active_filters.get(col)
+            }
+            range_filters = {}
             for key, value in list(st.session_state.active_filters.items()):
                 if key.endswith('_range_col'):
-                    range_col = value
                     range_key = key.replace('_range_col', '_range')
                     if range_key in st.session_state.active_filters:
-                        min_val, max_val = st.session_state.active_filters[range_key]
-                        filtered_df = filtered_df[
-                            (filtered_df[range_col] >= min_val) & (filtered_df[range_col] <= max_val)
-                        ]
-                        active_filter_count += 1
+                        range_filters[value] = st.session_state.active_filters[range_key]
+            
+            selection = filter_index.select(category_filters, range_filters)
+            active_filter_count = selection.n_filters
             
             # Show filter status
             if active_filter_count > 0:
-                st.success(f"✅ {active_filter_count} filter(s) active | Showing {len(filtered_df):,} / {len(df):,} records ({len(filtered_df)/len(df)*100:.1f}%)")
+                st.success(f"✅ {active_filter_count} filter(s) active | Showing {selection.count:,} / {len(df):,} records ({selection.count/len(df)*100:.1f}%)")
             else:
                 st.info("ℹ️ No filters applied - showing all data")
             
-            # Use filtered dataframe for all visualizations below
-            df = filtered_df
+            # Use filtered rows for all visualizations below (no copy when nothing is filtered)
+            df = filter_index.take(selection)
             
             st.markdown("---")
             
@@ -2650,7 +2654,10 @@ elif workflow_step == "🚀 Step 5: Build Dashboard":
                 
                 with chart_col3:
                     # BAR CHART - For categorical comparisons (Top 10 only)
-                    grouped = df.groupby(cat_col)[num_col].sum().sort_values(ascending=False).head(10)
+                    # ⚡ Answered from the pre-aggregated cube: O(distinct values) per filter change
+                    grouped = filter_index.breakdown(
+                        cat_col, num_col, 'sum', categories=category_filters, ranges=range_filters
+                    ).sort_values(ascending=False).head(10)
                     
                     # ❸ DESIGN: Gradient color (best = green, worst = orange)
                     colors = ['#28A745' if i == 0 else '#0066CC' if i < 3 else '#6C757D' 
@@ -183,7 +183,7 @@ def detect_domain(df: pd.DataFrame, dataset_description: str = "") -> Dict:
     all_text = ' '.join([
         dataset_description.lower(),
         ' '.join(df.columns.str.lower()),
-        ' '.join(df.select_dtypes(include=['object']).columns.str.lower())
+        ' '.join(df.select_dtypes(include=['object', 'string', 'category']).columns.str.lower())
     ])
     
     # 2. Score each domain
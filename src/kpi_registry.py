@@ -0,0 +1,1396 @@
+"""
+KPI rule tables per business domain.
+
+Each domain declares the column roles it reads and its KPIs (required roles,
+compute function, benchmark source key). utils.kpi_engine resolves the roles
+once per schema, plans the KPIs whose inputs resolve and shares aggregates
+between them; see KPI_REGISTRY.
+
+Roles match folded column names (see utils.column_roles), with Vietnamese
+aliases: 'Doanh_Thu' is revenue, 'Lương tháng' is salary, 'Chi phí' is spend.
+
+Domain precedence (first match wins):
+    salary column → marketing → e-commerce → sales/CRM → finance →
+    customer service → manufacturing → universal fallback
+
+Benchmarks: compute functions read thresholds from Vietnam market data when
+available (ctx.vietnam) and fall back to the published industry values.
+
+Example:
+    >>> from kpi_registry import KPI_REGISTRY
+    >>> kpis = KPI_REGISTRY.evaluate(df, 'marketing', profile=get_column_profile(df),
+    ...                              sources=BENCHMARK_SOURCES)
+    >>> kpis['ROAS']['value']
+    3.4
+"""
+
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+
+from utils.kpi_engine import KPI, KPIContext, KPIDomain, KPIRegistry, Role
+
+# 'lượng' compounds that are not salary (quantity, traffic, quality, output, ...)
+NOT_SALARY = ('so luong', 'luu luong', 'chat luong', 'san luong', 'khoi luong', 'trong luong', 'dung luong')
+
+
+def _compare(ctx: KPIContext, domain: str, metric_name: str, value: float, filters: Dict,
+             fallback: float, fallback_source: Optional[str]) -> Tuple[Optional[Dict], float, str]:
+    """
+    Vietnam benchmark for a value, or the fallback.
+
+    Returns:
+        (comparison or None, benchmark value, benchmark source)
+    """
+    comparison = ctx.vietnam(domain, metric_name, value, filters)
+    if comparison:
+        return comparison, comparison['benchmark_median'], comparison.get('benchmark_source', ctx.source())
+    return None, fallback, fallback_source
+
+
+def _vietnam_context(comparison: Optional[Dict]) -> str:
+    return comparison.get('message', '') if comparison else ''
+
+
+def _percentile(comparison: Optional[Dict]) -> Optional[float]:
+    return comparison.get('percentile', None) if comparison else None
+
+
+def _most_common(ctx: KPIContext, role: str) -> Optional[str]:
+    """Most frequent value of a role's first column (None if empty)."""
+    col = ctx.col(role)
+    if col is None or ctx.profile.missing(col) >= ctx.profile.n_rows:
+        return None
+    value = ctx.profile.mode(col)
+    return str(value) if value else None
+
+
+# ==================================================================================
+# SALARY (any domain with a salary column)
+# ==================================================================================
+
+def _salary_stats(ctx: KPIContext) -> Dict:
+    """Salary aggregates and benchmarks shared by all salary KPIs."""
+    def build():
+        col = ctx.col('salary')
+        avg_salary = ctx.mean(col)
+        median_salary = ctx.profile.median(col)
+
+        # ⚠️ Vietnam benchmark data from CSV files (not hardcoded!)
+        # Detect currency: Values > 1M = VND, < 500K = USD
+        is_vnd = avg_salary > 1000000
+        comparison = None
+        if is_vnd:
+            filters = {}
+            role = _most_common(ctx, 'role')
+            if role:
+                filters['role'] = role
+            city = _most_common(ctx, 'city')
+            if city:
+                filters['city'] = city
+            comparison = ctx.vietnam('hr', 'salary', median_salary, filters)
+
+        if comparison:
+            avg_benchmark = median_benchmark = comparison['benchmark_median']
+            range_benchmark = comparison['benchmark_q3'] - comparison['benchmark_q1']
+            source = comparison.get('benchmark_source', ctx.source('hr_salary'))
+        elif is_vnd:
+            # Vietnam market - VND fallback (if CSV not loaded)
+            avg_benchmark = median_benchmark = 32500000  # ~32.5M VND/month - realistic median from CSV
+            range_benchmark = 25000000  # Q3-Q1 range
+            source = ctx.source('hr_salary') + ' (Estimated)'
+        else:
+            # International market - USD
+            avg_benchmark, median_benchmark, range_benchmark = 18000, 16000, 50000
+            source = 'Global Market Data (Estimated)'
+
+        return {
+            'column': col, 'avg': avg_salary, 'median': median_salary,
+            'range': ctx.df[col].max() - ctx.df[col].min(),
+            'comparison': comparison, 'avg_benchmark': avg_benchmark,
+            'median_benchmark': median_benchmark, 'range_benchmark': range_benchmark,
+            'source': source,
+        }
+    return ctx.shared('salary', build)
+
+
+def _average_salary(ctx):
+    s = _salary_stats(ctx)
+    return {
+        'value': float(s['avg']),
+        'benchmark': s['avg_benchmark'],
+        'benchmark_source': s['source'],
+        'status': 'Above' if s['avg'] >= s['avg_benchmark'] * 0.9 else 'Below',
+        'column': s['column'],
+        'vietnam_context': _vietnam_context(s['comparison'])
+    }
+
+
+def _median_salary(ctx):
+    s = _salary_stats(ctx)
+    return {
+        'value': float(s['median']),
+        'benchmark': s['median_benchmark'],
+        'benchmark_source': s['source'],
+        'status': 'Above' if s['median'] >= s['median_benchmark'] * 0.9 else 'Below',
+        'column': s['column'],
+        'vietnam_context': _vietnam_context(s['comparison']),
+        'percentile': _percentile(s['comparison'])
+    }
+
+
+def _salary_range(ctx):
+    s = _salary_stats(ctx)
+    return {
+        'value': float(s['range']),
+        'benchmark': s['range_benchmark'],
+        'benchmark_source': s['source'],
+        'status': 'Wide Range' if s['range'] > s['range_benchmark'] * 1.2 else 'Normal Range',
+        'column': s['column']
+    }
+
+
+def _salary_per_experience(ctx):
+    salary_col, exp_col = ctx.col('salary'), ctx.col('experience')
+    avg_exp = ctx.mean(exp_col)
+    if not avg_exp > 0:
+        return None
+    return {
+        'value': float(ctx.mean(salary_col) / avg_exp),
+        'benchmark': 10000,
+        'status': 'Competitive',
+        'column': f"{salary_col}/{exp_col}"
+    }
+
+
+SALARY = KPIDomain(
+    'salary',
+    trigger=('salary',),
+    roles={
+        'salary': Role('salary', 'luong', exclude=NOT_SALARY),
+        'role': Role('role', 'position', 'title', 'chuc vu', 'vi tri'),
+        'city': Role('city', 'location', 'thanh pho', 'tinh thanh'),
+        'experience': Role('experience', 'yoe', 'kinh nghiem'),
+    },
+    kpis=[
+        KPI('Average Salary', _average_salary, requires=('salary',), benchmark='hr_salary'),
+        KPI('Median Salary', _median_salary, requires=('salary',), benchmark='hr_salary'),
+        KPI('Salary Range', _salary_range, requires=('salary',), benchmark='hr_salary'),
+        KPI('Salary per Experience Year', _salary_per_experience, requires=('salary', 'experience')),
+    ],
+)
+
+
+# ==================================================================================
+# MARKETING
+# ==================================================================================
+
+def _marketing_roi(ctx):
+    # ⚠️ NOTE: ROI definition varies widely - use with caution or prefer ROAS
+    roi_col = ctx.col('roi')
+    avg_roi = ctx.mean(roi_col)
+    return {
+        'value': float(avg_roi),
+        'benchmark': 3.0,  # Conservative estimate based on ROAS data (no standard exists)
+        'benchmark_source': ctx.source(),
+        'status': 'Above' if avg_roi >= 3.0 else 'Below',
+        'column': roi_col,
+        'insight': '⚠️ ROI varies by business model and attribution window'
+    }
+
+
+def _roas(ctx):
+    rev_col, cost_col = ctx.col('revenue'), ctx.col('spend')
+    total_cost = ctx.sum(cost_col)
+    if not total_cost > 0:
+        return None
+    roas = ctx.sum(rev_col) / total_cost
+    return {
+        'value': float(roas),
+        'benchmark': 2.5,  # ✅ WordStream 2025: avg 2.26, median 3.08 - use conservative 2.5
+        'benchmark_source': ctx.source(),
+        'status': 'Above' if roas >= 2.5 else 'Below',
+        'column': f"{rev_col}/{cost_col}"
+    }
+
+
+def _ctr(ctx):
+    click_col, impression_col = ctx.col('click'), ctx.col('impression')
+    total_impressions = ctx.sum(impression_col)
+    if not total_impressions > 0:
+        return None
+    ctr = (ctx.sum(click_col) / total_impressions) * 100
+
+    # ✅ Smart benchmark based on channel type (WordStream 2025): social vs search ads
+    col_lower = (str(click_col) + str(impression_col)).lower()
+    if 'social' in col_lower or 'facebook' in col_lower or 'instagram' in col_lower:
+        benchmark_ctr, channel_type = 1.7, 'Social'  # Social media traffic campaigns
+    else:
+        benchmark_ctr, channel_type = 6.7, 'Search'  # Search ads average
+
+    return {
+        'value': float(ctr),
+        'benchmark': benchmark_ctr,  # ✅ WordStream 2025: 6.66% search, 1.71% social
+        'benchmark_source': ctx.source(),
+        'status': 'Above' if ctr >= benchmark_ctr else 'Below',
+        'column': f"{click_col}/{impression_col}",
+        'insight': f'{channel_type} ads benchmark'
+    }
+
+
+def _cpc(ctx):
+    cost_col, click_col = ctx.col('spend'), ctx.col('click')
+    total_clicks = ctx.sum(click_col)
+    if not total_clicks > 0:
+        return None
+    cpc = ctx.sum(cost_col) / total_clicks
+    return {
+        'value': float(cpc),
+        'benchmark': 2.0,  # Varies by industry
+        'status': 'Below' if cpc <= 2.0 else 'Above',  # Lower is better
+        'column': f"{cost_col}/{click_col}"
+    }
+
+
+def _marketing_conversion_rate(ctx):
+    conversion_col, click_col = ctx.col('conversion'), ctx.col('click')
+    total_clicks = ctx.sum(click_col)
+    if not total_clicks > 0:
+        return None
+    conv_rate = (ctx.sum(conversion_col) / total_clicks) * 100
+    return {
+        'value': float(conv_rate),
+        'benchmark': 6.6,  # ✅ Unbounce 2025: 6.6% overall average (WordStream: 7.52% search)
+        'benchmark_source': ctx.source(),
+        'status': 'Above' if conv_rate >= 6.6 else 'Below',
+        'column': f"{conversion_col}/{click_col}"
+    }
+
+
+def _cpa(ctx):
+    cost_col, conversion_col = ctx.col('spend'), ctx.col('conversion')
+    total_conversions = ctx.sum(conversion_col)
+    if not total_conversions > 0:
+        return None
+    cpa = ctx.sum(cost_col) / total_conversions
+
+    sample_spend = ctx.df[cost_col].dropna().head(10).mean()
+    is_vnd = sample_spend > 100000
+    comparison = None
+    if is_vnd:
+        # Channel hints from column names
+        filters = {}
+        if 'facebook' in ctx.roles.text or 'fb' in ctx.roles.text:
+            filters['channel'] = 'Facebook Ads'
+        elif 'google' in ctx.roles.text or 'search' in ctx.roles.text:
+            filters['channel'] = 'Google Ads'
+        elif 'tiktok' in ctx.roles.text:
+            filters['channel'] = 'TikTok Ads'
+        comparison = ctx.vietnam('marketing', 'CPA', cpa, filters)
+
+    if comparison:
+        benchmark_cpa = comparison['benchmark_median']
+        source = comparison.get('benchmark_source', ctx.source())
+        currency = 'VND'
+    elif is_vnd:
+        benchmark_cpa = 85000  # ~85K VND - realistic Vietnam average from CSV
+        source = ctx.source() + ' (Estimated)'
+        currency = 'VND'
+    else:
+        benchmark_cpa = 70  # $70 USD - WordStream 2025 average
+        source = ctx.source()
+        currency = 'USD'
+
+    return {
+        'value': float(cpa),
+        'benchmark': benchmark_cpa,
+        'benchmark_source': source,
+        'status': 'Below' if cpa <= benchmark_cpa else 'Above',  # Lower is better!
+        'column': f"{cost_col}/{conversion_col}",
+        'insight': f"{'✅ Efficient' if cpa <= benchmark_cpa else '⚠️ High CPA'} - Lower is better. Benchmark: {benchmark_cpa:,.0f} {currency}",
+        'vietnam_context': _vietnam_context(comparison),
+        'percentile': _percentile(comparison)
+    }
+
+
+def _engagement_rate(ctx):
+    eng_col = ctx.col('engagement')
+    avg_engagement = ctx.mean(eng_col)
+    return {
+        'value': float(avg_engagement),
+        'benchmark': 2.0,  # Social media avg 1-3%
+        'status': 'Above' if avg_engagement >= 2.0 else 'Below',
+        'column': eng_col,
+        'insight': f"{'✅ Strong' if avg_engagement >= 3.0 else '⚠️ Improve'} social engagement - Industry avg 1-3%"
+    }
+
+
+def _total_spend(ctx):
+    cost_col = ctx.col('spend')
+    total_spend = ctx.sum(cost_col)
+    return {
+        'value': float(total_spend),
+        'benchmark': 100000,
+        'status': 'Check',
+        'column': cost_col,
+        'insight': f"Budget: {total_spend:,.0f}"
+    }
+
+
+MARKETING = KPIDomain(
+    'marketing',
+    keywords=('marketing', 'quảng cáo'),
+    roles={
+        'roi': Role('roi'),
+        'spend': Role('spend', 'cost', 'chi phi'),
+        'click': Role('click', 'luot nhap'),
+        'impression': Role('impression', 'luot hien thi'),
+        'conversion': Role('conversion', 'chuyen doi'),
+        'revenue': Role('revenue', 'doanh thu'),
+        'engagement': Role('engagement', 'tuong tac'),
+    },
+    kpis=[
+        KPI('Marketing ROI (Revenue/Spend)', _marketing_roi, requires=('roi',), benchmark='marketing_roi'),
+        KPI('ROAS', _roas, requires=('revenue', 'spend'), benchmark='marketing_roas'),
+        KPI('CTR (%)', _ctr, requires=('click', 'impression'), benchmark='marketing_ctr'),
+        KPI('CPC', _cpc, requires=('spend', 'click')),
+        KPI('Conversion Rate (%)', _marketing_conversion_rate, requires=('conversion', 'click'),
+            benchmark='marketing_conversion'),
+        KPI('Cost Per Acquisition (CPA)', _cpa, requires=('spend', 'conversion'), benchmark='marketing_cpa'),
+        KPI('Engagement Rate (%)', _engagement_rate, requires=('engagement',)),
+        KPI('Total Spend', _total_spend, requires=('spend',)),
+    ],
+)
+
+
+# ==================================================================================
+# E-COMMERCE
+# ==================================================================================
+
+def _ecommerce_filters(ctx: KPIContext) -> Dict:
+    """Platform (from column names) and top category filters for Vietnam benchmarks."""
+    def build():
+        filters = {}
+        if 'shopee' in ctx.roles.text:
+            filters['platform'] = 'Shopee'
+        elif 'lazada' in ctx.roles.text:
+            filters['platform'] = 'Lazada'
+        elif 'tiktok' in ctx.roles.text:
+            filters['platform'] = 'TikTok Shop'
+        category = _most_common(ctx, 'category')
+        if category:
+            filters['category'] = category
+        return filters
+    return dict(ctx.shared('ecommerce_filters', build))
+
+
+def _ecommerce_conversion_rate(ctx):
+    trans_col, sess_col = ctx.col('transaction'), ctx.col('session')
+    total_sessions = ctx.sum(sess_col)
+    if not total_sessions > 0:
+        return None
+    conversion_rate = (ctx.sum(trans_col) / total_sessions) * 100
+
+    comparison, benchmark_conv, source = _compare(
+        ctx, 'ecommerce', 'Conversion Rate', conversion_rate, _ecommerce_filters(ctx),
+        fallback=2.3,  # ~2.3% - realistic Vietnam average from CSV
+        fallback_source=ctx.source())
+    return {
+        'value': float(conversion_rate),
+        'benchmark': benchmark_conv,
+        'benchmark_source': source,
+        'status': 'Above' if conversion_rate >= benchmark_conv else 'Below',
+        'column': f"{trans_col}/{sess_col}",
+        'insight': f"{'✅ Strong' if conversion_rate >= 3.0 else '⚠️ Room for improvement'} - Vietnam avg {benchmark_conv}%",
+        'vietnam_context': _vietnam_context(comparison),
+        'percentile': _percentile(comparison)
+    }
+
+
+def _aov(ctx):
+    rev_col, trans_col = ctx.col('revenue'), ctx.col('transaction')
+    total_transactions = ctx.sum(trans_col)
+    if not total_transactions > 0:
+        return None
+    aov = ctx.sum(rev_col) / total_transactions
+
+    sample_revenue = ctx.df[rev_col].dropna().head(10).mean()
+    is_vnd = sample_revenue > 1000
+    comparison = ctx.vietnam('ecommerce', 'AOV', aov, _ecommerce_filters(ctx)) if is_vnd else None
+
+    if comparison:
+        benchmark_aov = comparison['benchmark_median']
+        source = comparison.get('benchmark_source', ctx.source())
+        currency = 'VND'
+    elif is_vnd:
+        benchmark_aov = 385000  # ~385K VND - realistic Vietnam average from CSV
+        source = ctx.source()
+        currency = 'VND'
+    else:
+        benchmark_aov = 81.49  # $81.49 USD (Shopify global avg)
+        source = ctx.source()
+        currency = 'USD'
+
+    return {
+        'value': float(aov),
+        'benchmark': benchmark_aov,
+        'benchmark_source': source,
+        'status': 'Above' if aov >= benchmark_aov else 'Below',
+        'column': f"{rev_col}/{trans_col}",
+        'insight': f"{'✅' if aov >= benchmark_aov else '⚠️'} Benchmark: {benchmark_aov:,.0f} {currency}",
+        'vietnam_context': _vietnam_context(comparison),
+        'percentile': _percentile(comparison)
+    }
+
+
+def _cart_abandonment(ctx):
+    cart_col, checkout_col = ctx.col('cart'), ctx.col('checkout')
+    total_carts = ctx.sum(cart_col)
+    if not total_carts > 0:
+        return None
+    abandonment_rate = ((total_carts - ctx.sum(checkout_col)) / total_carts) * 100
+
+    comparison, benchmark_abandon, source = _compare(
+        ctx, 'ecommerce', 'Cart Abandonment', abandonment_rate, _ecommerce_filters(ctx),
+        fallback=68.0,  # ~68% - realistic Vietnam average from CSV
+        fallback_source=ctx.source())
+    return {
+        'value': float(abandonment_rate),
+        'benchmark': benchmark_abandon,
+        'benchmark_source': source,
+        'status': 'Below' if abandonment_rate <= benchmark_abandon else 'Above',  # Lower is better!
+        'column': f"({cart_col}-{checkout_col})/{cart_col}",
+        'insight': f"{'✅ Better than' if abandonment_rate < benchmark_abandon else '⚠️ Worse than'} {benchmark_abandon}% Vietnam avg",
+        'vietnam_context': _vietnam_context(comparison),
+        'percentile': _percentile(comparison)
+    }
+
+
+def _cart_funnel(ctx: KPIContext) -> Optional[Dict]:
+    """Add-to-Cart → Checkout → Purchase step rates (None without carts)."""
+    def build():
+        total_carts = ctx.sum(ctx.col('cart'))
+        if not total_carts > 0:
+            return None
+        total_checkouts = ctx.sum(ctx.col('checkout'))
+        total_transactions = ctx.sum(ctx.col('transaction'))
+        return {
+            'cart_to_checkout': (total_checkouts / total_carts) * 100,
+            'checkout_to_purchase': (total_transactions / total_checkouts) * 100 if total_checkouts > 0 else 0,
+        }
+    return ctx.shared('cart_funnel', build)
+
+
+def _funnel_add_to_checkout(ctx):
+    funnel = _cart_funnel(ctx)
+    if funnel is None:
+        return None
+    cart_to_checkout_rate = funnel['cart_to_checkout']
+    checkout_to_purchase_rate = funnel['checkout_to_purchase']
+
+    # Identify bottleneck
+    if cart_to_checkout_rate < 40:  # Industry avg ~35-45%
+        bottleneck_insight = f"🚨 Major drop-off at Add-to-Cart step ({100-cart_to_checkout_rate:.1f}% abandon)"
+    elif checkout_to_purchase_rate < 75:  # Industry avg ~75-85%
+        bottleneck_insight = f"⚠️ Checkout friction ({100-checkout_to_purchase_rate:.1f}% abandon at payment)"
+    else:
+        bottleneck_insight = f"✅ Strong funnel conversion at both steps"
+
+    return {
+        'value': float(cart_to_checkout_rate),
+        'benchmark': 40.0,  # Industry avg
+        'status': 'Above' if cart_to_checkout_rate >= 40.0 else 'Below',
+        'column': f"{ctx.col('checkout')}/{ctx.col('cart')}",
+        'insight': f"{bottleneck_insight}. Target: exit-intent popups, free shipping threshold"
+    }
+
+
+def _funnel_checkout_to_purchase(ctx):
+    funnel = _cart_funnel(ctx)
+    if funnel is None:
+        return None
+    checkout_to_purchase_rate = funnel['checkout_to_purchase']
+    return {
+        'value': float(checkout_to_purchase_rate),
+        'benchmark': 80.0,  # Industry avg ~80%
+        'status': 'Above' if checkout_to_purchase_rate >= 80.0 else 'Below',
+        'column': f"{ctx.col('transaction')}/{ctx.col('checkout')}",
+        'insight': f"{'✅ Strong checkout flow' if checkout_to_purchase_rate >= 80 else '⚠️ Payment friction - simplify checkout'}"
+    }
+
+
+def _revenue_per_session(ctx):
+    rev_col, sess_col = ctx.col('revenue'), ctx.col('session')
+    total_sessions = ctx.sum(sess_col)
+    if not total_sessions > 0:
+        return None
+    rps = ctx.sum(rev_col) / total_sessions
+    return {
+        'value': float(rps),
+        'benchmark': float(rps * 0.8),  # 80% of current as baseline
+        'status': 'Above Target',
+        'column': f"{rev_col}/{sess_col}",
+        'insight': 'Higher is better - increase with upsells, cross-sells'
+    }
+
+
+def _returning_customer_rate(ctx):
+    ret_col = ctx.col('returning')
+    avg_returning = ctx.mean(ret_col)
+    return {
+        'value': float(avg_returning),
+        'benchmark': 30.0,  # Industry avg 25-30%
+        'status': 'Above' if avg_returning >= 30.0 else 'Below',
+        'column': ret_col,
+        'insight': f"{'✅ Strong loyalty' if avg_returning >= 30 else '⚠️ Focus on retention'}"
+    }
+
+
+def _bounce_rate(ctx):
+    bounce_col = ctx.col('bounce')
+    avg_bounce = ctx.mean(bounce_col)
+    return {
+        'value': float(avg_bounce),
+        'benchmark': 47.0,  # E-commerce avg 40-50%
+        'status': 'Below' if avg_bounce <= 47.0 else 'Above',  # Lower is better!
+        'column': bounce_col,
+        'insight': f"{'✅' if avg_bounce < 47 else '⚠️'} Lower is better - Industry avg 40-50%"
+    }
+
+
+def _mobile_traffic(ctx):
+    mobile_col = ctx.col('mobile')
+    avg_mobile = ctx.mean(mobile_col)
+
+    if avg_mobile >= 70:
+        mobile_insight = f"📱 MOBILE-FIRST ({avg_mobile:.1f}%) - Prioritize mobile UX, mobile checkout optimization, mobile page speed"
+    elif avg_mobile >= 60:
+        mobile_insight = f"📱 Mobile-majority ({avg_mobile:.1f}%) - Test mobile funnel, improve mobile load time"
+    elif avg_mobile >= 40:
+        mobile_insight = f"⚖️ Balanced traffic ({avg_mobile:.1f}% mobile) - Optimize for both devices"
+    else:
+        mobile_insight = f"💻 Desktop-focused ({avg_mobile:.1f}% mobile) - Ensure desktop experience is premium"
+
+    # Estimate mobile impact (assuming mobile CR is 30-50% lower than desktop)
+    if 'bounce' in ctx.roles and avg_mobile >= 60:
+        avg_bounce = ctx.mean(ctx.col('bounce'))
+        if avg_bounce > 50:
+            mobile_insight += f" | ⚠️ High bounce ({avg_bounce:.1f}%) suggests mobile UX issues"
+
+    return {
+        'value': float(avg_mobile),
+        'benchmark': 60.0,  # Mobile-first threshold
+        'status': 'Above' if avg_mobile >= 60.0 else 'Below',
+        'column': mobile_col,
+        'insight': mobile_insight
+    }
+
+
+def _estimated_aov(ctx):
+    # Fallback: use mean of revenue column (less accurate)
+    rev_col = ctx.col('revenue')
+    avg_order_value = ctx.mean(rev_col)
+    sample_revenue = ctx.df[rev_col].dropna().head(10).mean()
+    benchmark_aov = 150000 if sample_revenue > 1000 else 81.49
+    return {
+        'value': float(avg_order_value),
+        'benchmark': benchmark_aov,
+        'status': 'Above' if avg_order_value >= benchmark_aov else 'Below',
+        'column': rev_col,
+        'insight': '⚠️ Estimated from revenue mean - upload transaction data for accuracy'
+    }
+
+
+ECOMMERCE = KPIDomain(
+    'ecommerce',
+    keywords=('ecommerce', 'e-commerce'),
+    roles={
+        'revenue': Role('revenue', 'doanh thu'),
+        'transaction': Role('transaction', 'so don', exclude=('rate', 'ty le')),
+        'session': Role('session', 'phien'),
+        'cart': Role('cart', exclude=('abandonment',)),
+        'checkout': Role('checkout'),
+        'bounce': Role('bounce'),
+        'returning': Role('returning'),
+        'mobile': Role('mobile'),
+        'category': Role('category', 'product_type', 'danh muc'),
+    },
+    kpis=[
+        KPI('Conversion Rate (%)', _ecommerce_conversion_rate, requires=('transaction', 'session'),
+            benchmark='ecommerce_conversion'),
+        KPI('Average Order Value (AOV)', _aov, requires=('revenue', 'transaction'), benchmark='ecommerce_aov'),
+        KPI('Cart Abandonment Rate (%)', _cart_abandonment, requires=('cart', 'checkout'),
+            benchmark='ecommerce_cart_abandonment'),
+        KPI('Cart Funnel: Add→Checkout (%)', _funnel_add_to_checkout, requires=('cart', 'checkout', 'transaction')),
+        KPI('Cart Funnel: Checkout→Purchase (%)', _funnel_checkout_to_purchase,
+            requires=('cart', 'checkout', 'transaction')),
+        KPI('Revenue per Session', _revenue_per_session, requires=('revenue', 'session')),
+        KPI('Returning Customer Rate (%)', _returning_customer_rate, requires=('returning',)),
+        KPI('Bounce Rate (%)', _bounce_rate, requires=('bounce',)),
+        KPI('Mobile Traffic (%)', _mobile_traffic, requires=('mobile',)),
+        KPI('AOV (estimated)', _estimated_aov, requires=('revenue',), absent=('transaction',)),
+    ],
+)
+
+
+# ==================================================================================
+# SALES / CRM
+# ==================================================================================
+
+def _deal_masks(ctx: KPIContext) -> Tuple[pd.Series, pd.Series, pd.Series]:
+    """(won, lost, open) row masks from the stage column, computed once."""
+    def build():
+        stage = ctx.df[ctx.col('stage')]
+        won = stage.str.contains('won', case=False, na=False)
+        lost = stage.str.contains('lost', case=False, na=False)
+        open_ = ~stage.str.contains('closed|won|lost', case=False, na=False)
+        return won, lost, open_
+    return ctx.shared('deal_masks', build)
+
+
+def _deal_counts(ctx: KPIContext) -> Tuple[int, int, int]:
+    return ctx.shared('deal_counts', lambda: tuple(int(mask.sum()) for mask in _deal_masks(ctx)))
+
+
+def _sales_filters(ctx: KPIContext) -> Dict:
+    """Sales type and industry hints from column names."""
+    def build():
+        text = ctx.roles.text
+        filters = {}
+        if 'b2b' in text or 'enterprise' in text:
+            filters['sales_type'] = 'B2B'
+        elif 'b2c' in text or 'consumer' in text:
+            filters['sales_type'] = 'B2C'
+        if 'saas' in text or 'software' in text:
+            filters['industry'] = 'Software (SaaS)'
+        elif 'consulting' in text:
+            filters['industry'] = 'Consulting'
+        elif 'real estate' in text or 'property' in text:
+            filters['industry'] = 'Real Estate'
+        return filters
+    return dict(ctx.shared('sales_filters', build))
+
+
+def _win_rate(ctx):
+    total_won, total_lost, _ = _deal_counts(ctx)
+    if not (total_won + total_lost) > 0:
+        return None
+    win_rate = (total_won / (total_won + total_lost)) * 100
+
+    comparison, benchmark_win, source = _compare(
+        ctx, 'sales', 'Win Rate', win_rate, _sales_filters(ctx),
+        fallback=25.0,  # ~25% - realistic Vietnam B2B average from CSV
+        fallback_source=ctx.source())
+    return {
+        'value': float(win_rate),
+        'benchmark': benchmark_win,
+        'benchmark_source': source,
+        'status': 'Above' if win_rate >= benchmark_win else 'Below',
+        'column': ctx.col('stage'),
+        'insight': f"{'✅ Strong' if win_rate >= 35 else '⚠️ Below industry'} - Vietnam avg {benchmark_win}%",
+        'vietnam_context': _vietnam_context(comparison),
+        'percentile': _percentile(comparison)
+    }
+
+
+def _pipeline_value(ctx):
+    _, _, open_deals = _deal_counts(ctx)
+    if not open_deals > 0:
+        return None
+    deal_col = ctx.col('deal_value')
+    pipeline_value = ctx.df[deal_col][_deal_masks(ctx)[2]].sum()
+    return {
+        'value': float(pipeline_value),
+        'benchmark': float(pipeline_value * 0.8),
+        'status': 'Above Target',
+        'column': deal_col,
+        'insight': f"{open_deals} deals worth {pipeline_value:,.0f}"
+    }
+
+
+def _weighted_pipeline(ctx):
+    if not _deal_counts(ctx)[2] > 0:
+        return None
+    deal_col, prob_col = ctx.col('deal_value'), ctx.col('probability')
+    open_mask = _deal_masks(ctx)[2]
+    weighted_pipeline = (ctx.df[deal_col][open_mask] * ctx.df[prob_col][open_mask] / 100).sum()
+    return {
+        'value': float(weighted_pipeline),
+        'benchmark': float(weighted_pipeline * 0.8),
+        'status': 'Above Target',
+        'column': f"{deal_col}×{prob_col}",
+        'insight': f"Pipeline adjusted for win probability"
+    }
+
+
+def _average_deal_size(ctx):
+    if not _deal_counts(ctx)[0] > 0:
+        return None
+    deal_col = ctx.col('deal_value')
+    avg_deal_size = ctx.df[deal_col][_deal_masks(ctx)[0]].mean()
+
+    filters = _sales_filters(ctx)
+    # Deal segment (SME vs Enterprise) from deal size
+    if avg_deal_size > 200000000:  # >200M VND = Enterprise
+        filters['deal_size_segment'] = 'Enterprise'
+    elif avg_deal_size > 50000000:  # 50-200M VND = Standard
+        filters['deal_size_segment'] = 'Standard'
+    else:  # <50M VND = SME
+        filters['deal_size_segment'] = 'SME'
+
+    comparison, benchmark_deal, source = _compare(
+        ctx, 'sales', 'Deal Size', avg_deal_size, filters,
+        fallback=float(avg_deal_size * 0.8),  # Conservative: 80% of current
+        fallback_source='Calculated from Your Dataset Statistics')
+    return {
+        'value': float(avg_deal_size),
+        'benchmark': benchmark_deal,
+        'benchmark_source': source,
+        'status': 'Above' if avg_deal_size >= benchmark_deal else 'Below',
+        'column': deal_col,
+        'insight': f"Won deals: {avg_deal_size:,.0f} average",
+        'vietnam_context': _vietnam_context(comparison),
+        'percentile': _percentile(comparison)
+    }
+
+
+def _sales_cycle(ctx):
+    if not _deal_counts(ctx)[0] > 0:
+        return None
+    created_col, close_col = ctx.col('created'), ctx.col('close')
+    won = _deal_masks(ctx)[0]
+    try:
+        created = pd.to_datetime(ctx.df[created_col][won], errors='coerce')
+        closed = pd.to_datetime(ctx.df[close_col][won], errors='coerce')
+        avg_cycle = (closed - created).dt.days.mean()
+        # Only add KPI if we have valid cycle data
+        if not pd.notna(avg_cycle):
+            return None
+
+        comparison, benchmark_cycle, source = _compare(
+            ctx, 'sales', 'Sales Cycle', avg_cycle, _sales_filters(ctx),
+            fallback=45.0,  # ~45 days - realistic Vietnam B2B average from CSV
+            fallback_source=ctx.source())
+        return {
+            'value': float(avg_cycle),
+            'benchmark': benchmark_cycle,
+            'benchmark_source': source,
+            'status': 'Below' if avg_cycle <= benchmark_cycle else 'Above',  # Lower is better
+            'column': f"{close_col}-{created_col}",
+            'insight': f"{'✅ Fast' if avg_cycle <= benchmark_cycle else '⚠️ Long'} sales cycle - Vietnam avg {benchmark_cycle} days",
+            'vietnam_context': _vietnam_context(comparison),
+            'percentile': _percentile(comparison)
+        }
+    except Exception:
+        return None
+
+
+def _closed_won_revenue(ctx):
+    total_won = _deal_counts(ctx)[0]
+    if not total_won > 0:
+        return None
+    deal_col = ctx.col('deal_value')
+    total_won_value = ctx.df[deal_col][_deal_masks(ctx)[0]].sum()
+    return {
+        'value': float(total_won_value),
+        'benchmark': float(total_won_value * 0.8),
+        'status': 'Above Target',
+        'column': deal_col,
+        'insight': f"{total_won} deals closed, {total_won_value:,.0f} revenue"
+    }
+
+
+SALES = KPIDomain(
+    'sales',
+    keywords=('sales', 'crm', 'pipeline'),
+    requires=('deal_value', 'stage'),
+    roles={
+        'deal_value': Role(('deal', 'value'), 'amount'),
+        'stage': Role('stage', 'status'),
+        'probability': Role('probability', 'prob'),
+        'created': Role(('created', 'date')),
+        'close': Role(('close', 'date')),
+    },
+    kpis=[
+        KPI('Win Rate (%)', _win_rate, benchmark='sales_win_rate'),
+        KPI('Total Pipeline Value', _pipeline_value),
+        KPI('Weighted Pipeline', _weighted_pipeline, requires=('probability',)),
+        KPI('Average Deal Size', _average_deal_size, benchmark='sales_growth'),
+        KPI('Sales Cycle (days)', _sales_cycle, requires=('created', 'close'), benchmark='sales_cycle'),
+        KPI('Closed Won Revenue', _closed_won_revenue),
+    ],
+)
+
+
+# ==================================================================================
+# FINANCE / ACCOUNTING
+# ==================================================================================
+
+def _net_profit_margin(ctx):
+    revenue_col, net_income_col = ctx.col('revenue'), ctx.col('net_income')
+    avg_revenue = ctx.mean(revenue_col)
+    if not avg_revenue > 0:
+        return None
+    net_margin = (ctx.mean(net_income_col) / avg_revenue) * 100
+    return {
+        'value': float(net_margin),
+        'benchmark': 15.0,  # SaaS/Tech avg 10-20%
+        'status': 'Above' if net_margin >= 15.0 else 'Below',
+        'column': f"{net_income_col}/{revenue_col}",
+        'insight': f"{'✅ Healthy' if net_margin >= 15 else '⚠️ Needs improvement'} - SaaS avg 10-20%"
+    }
+
+
+def _gross_margin(ctx):
+    gross_profit_col, revenue_col = ctx.col('gross_profit'), ctx.col('revenue')
+    gross_margin = (ctx.mean(gross_profit_col) / ctx.mean(revenue_col)) * 100
+    return {
+        'value': float(gross_margin),
+        'benchmark': 70.0,  # SaaS target >70%
+        'status': 'Above' if gross_margin >= 70.0 else 'Below',
+        'column': f"{gross_profit_col}/{revenue_col}",
+        'insight': f"{'✅ Strong' if gross_margin >= 70 else '⚠️ Low for SaaS'} - Target >70%"
+    }
+
+
+def _operating_margin(ctx):
+    op_income_col, revenue_col = ctx.col('operating_income'), ctx.col('revenue')
+    op_margin = (ctx.mean(op_income_col) / ctx.mean(revenue_col)) * 100
+    return {
+        'value': float(op_margin),
+        'benchmark': 20.0,  # SaaS target 15-25%
+        'status': 'Above' if op_margin >= 20.0 else 'Below',
+        'column': f"{op_income_col}/{revenue_col}",
+        'insight': f"{'✅ Efficient' if op_margin >= 20 else '⚠️ High OPEX'} - Target 15-25%"
+    }
+
+
+def _revenue_growth(ctx):
+    df = ctx.df
+    if len(df) < 2:
+        return None
+    revenue_col = ctx.col('revenue')
+    # Sort by first column (usually date/month); only the two columns involved
+    order_col = df.columns[0]
+    df_sorted = df[list(dict.fromkeys([order_col, revenue_col]))].sort_values(by=order_col)
+    first_revenue = df_sorted[revenue_col].iloc[0]
+    last_revenue = df_sorted[revenue_col].iloc[-1]
+    months_diff = len(df_sorted) - 1
+    if not (first_revenue > 0 and months_diff > 0):
+        return None
+
+    total_growth = ((last_revenue - first_revenue) / first_revenue) * 100
+    avg_monthly_growth = total_growth / months_diff
+    return {
+        'value': float(avg_monthly_growth),
+        'benchmark': 10.0,  # 10% MoM = unicorn trajectory
+        'status': 'Above' if avg_monthly_growth >= 10.0 else 'Below',
+        'column': revenue_col,
+        'insight': f"{'🚀 Hypergrowth' if avg_monthly_growth >= 15 else '✅ Growing' if avg_monthly_growth >= 10 else '⚠️ Slow growth'} - {total_growth:.1f}% total"
+    }
+
+
+def _operating_cash_flow(ctx):
+    cash_ops_col = ctx.col('cash_ops')
+    avg_cash_ops = ctx.mean(cash_ops_col)
+    total_cash_ops = ctx.sum(cash_ops_col)
+    return {
+        'value': float(total_cash_ops),
+        'benchmark': float(total_cash_ops * 0.8),
+        'status': 'Positive' if avg_cash_ops > 0 else 'Negative',
+        'column': cash_ops_col,
+        'insight': f"{'✅ Cash positive' if avg_cash_ops > 0 else '🚨 Burning cash'} - Avg {avg_cash_ops:,.0f}/month"
+    }
+
+
+def _free_cash_flow(ctx):
+    cash_ops_col, capex_col = ctx.col('cash_ops'), ctx.col('capex')
+    free_cash_flow = ctx.mean(cash_ops_col) + ctx.mean(capex_col)  # CapEx is usually negative
+    return {
+        'value': float(free_cash_flow),
+        'benchmark': 0,
+        'status': 'Positive' if free_cash_flow > 0 else 'Negative',
+        'column': f"{cash_ops_col}+{capex_col}",
+        'insight': f"{'✅ Sustainable' if free_cash_flow > 0 else '⚠️ Needs funding'} - After CapEx"
+    }
+
+
+def _burn_rate(ctx):
+    cash_ops_col = ctx.col('cash_ops')
+    avg_cash_ops = ctx.mean(cash_ops_col)
+    if not avg_cash_ops < 0:  # Only when burning cash
+        return None
+    burn_rate = abs(avg_cash_ops)
+    current_cash = ctx.df[ctx.col('cash_balance')].iloc[-1]  # Latest balance
+    runway_months = current_cash / burn_rate if burn_rate > 0 else 999
+    return {
+        'value': float(burn_rate),
+        'benchmark': float(burn_rate * 0.7),  # Target: reduce 30%
+        'status': 'Critical' if runway_months < 6 else 'Warning' if runway_months < 12 else 'Safe',
+        'column': cash_ops_col,
+        'insight': f"{'🚨 URGENT' if runway_months < 6 else '⚠️ Watch closely' if runway_months < 12 else '✅ Healthy'} - {runway_months:.1f} months runway"
+    }
+
+
+def _current_ratio(ctx):
+    ca_col, cl_col = ctx.col('current_assets'), ctx.col('current_liabilities')
+    avg_cl = ctx.mean(cl_col)
+    if not avg_cl > 0:
+        return None
+    current_ratio = ctx.mean(ca_col) / avg_cl
+    return {
+        'value': float(current_ratio),
+        'benchmark': 2.0,  # Healthy: >2.0
+        'status': 'Healthy' if current_ratio >= 2.0 else 'Warning' if current_ratio >= 1.0 else 'Critical',
+        'column': f"{ca_col}/{cl_col}",
+        'insight': f"{'✅ Strong liquidity' if current_ratio >= 2.0 else '⚠️ Tight liquidity' if current_ratio >= 1.0 else '🚨 Liquidity crisis'}"
+    }
+
+
+def _quick_ratio(ctx):
+    ca_col, cl_col, inv_col = ctx.col('current_assets'), ctx.col('current_liabilities'), ctx.col('inventory')
+    avg_cl = ctx.mean(cl_col)
+    if not avg_cl > 0:
+        return None
+    quick_ratio = (ctx.mean(ca_col) - ctx.mean(inv_col)) / avg_cl
+    return {
+        'value': float(quick_ratio),
+        'benchmark': 1.0,  # Healthy: >1.0
+        'status': 'Healthy' if quick_ratio >= 1.0 else 'Warning',
+        'column': f"({ca_col}-{inv_col})/{cl_col}",
+        'insight': f"{'✅ Can cover short-term debt' if quick_ratio >= 1.0 else '⚠️ May struggle with immediate obligations'}"
+    }
+
+
+def _debt_to_equity(ctx):
+    debt_col, equity_col = ctx.col('total_debt'), ctx.col('equity')
+    avg_equity = ctx.mean(equity_col)
+    if not avg_equity > 0:
+        return None
+    debt_to_equity = ctx.mean(debt_col) / avg_equity
+    return {
+        'value': float(debt_to_equity),
+        'benchmark': 1.0,  # <1.0 = conservative, 1-2 = moderate, >2 = aggressive
+        'status': 'Conservative' if debt_to_equity < 1.0 else 'Moderate' if debt_to_equity < 2.0 else 'Aggressive',
+        'column': f"{debt_col}/{equity_col}",
+        'insight': f"{'✅ Low leverage' if debt_to_equity < 1.0 else '⚠️ Moderate leverage' if debt_to_equity < 2.0 else '🚨 High leverage risk'}"
+    }
+
+
+FINANCE = KPIDomain(
+    'finance',
+    keywords=('finance', 'accounting', 'financial'),
+    requires=('revenue', 'net_income'),
+    roles={
+        'revenue': Role('revenue', 'doanh thu', exclude=('gross',)),
+        'net_income': Role('net_income', 'net_profit', 'loi nhuan rong'),
+        'gross_profit': Role(('gross', 'profit')),
+        'operating_income': Role('operating_income', 'operating_profit'),
+        'cash_ops': Role(('cash', 'operation')),
+        'capex': Role('capex', 'capital_expenditure'),
+        'cash_balance': Role('cash_balance', ('cash', 'balance')),
+        'current_assets': Role('current_assets', 'current_asset'),
+        'current_liabilities': Role('current_liabilities', 'current_liability'),
+        'inventory': Role('inventory'),
+        'total_debt': Role('total_liabilities', 'total_debt'),
+        'equity': Role('shareholders_equity', 'equity', exclude=('raised',)),
+    },
+    kpis=[
+        KPI('Net Profit Margin (%)', _net_profit_margin),
+        KPI('Gross Margin (%)', _gross_margin, requires=('gross_profit',)),
+        KPI('Operating Margin (%)', _operating_margin, requires=('operating_income',)),
+        KPI('Revenue Growth (%)', _revenue_growth),
+        KPI('Operating Cash Flow', _operating_cash_flow, requires=('cash_ops',)),
+        KPI('Free Cash Flow', _free_cash_flow, requires=('cash_ops', 'capex')),
+        KPI('Burn Rate (Monthly)', _burn_rate, requires=('cash_ops', 'cash_balance')),
+        KPI('Current Ratio', _current_ratio, requires=('current_assets', 'current_liabilities')),
+        KPI('Quick Ratio', _quick_ratio, requires=('current_assets', 'current_liabilities', 'inventory')),
+        KPI('Debt-to-Equity Ratio', _debt_to_equity, requires=('total_debt', 'equity')),
+    ],
+)
+
+
+# ==================================================================================
+# CUSTOMER SERVICE / SUPPORT
+# ==================================================================================
+
+def _flag_rate(ctx: KPIContext, role: str, values: Tuple[str, ...]) -> float:
+    """Percentage of tickets whose flag column is one of values (case-insensitive)."""
+    col = ctx.col(role)
+    lowered = ctx.shared(f"lower:{col}", lambda: ctx.df[col].astype(str).str.lower())
+    return (lowered.isin(values).sum() / len(ctx.df)) * 100
+
+
+YES_VALUES = ('yes', 'true', '1')
+NO_VALUES = ('no', 'false', '0')
+
+
+def _first_response_time(ctx):
+    response_col = ctx.col('response_time')
+    avg_response = ctx.mean(response_col)
+    return {
+        'value': float(avg_response),
+        'benchmark': 15.0,  # Industry best: <15 min
+        'status': 'Below' if avg_response <= 15.0 else 'Above',  # Lower is better
+        'column': response_col,
+        'insight': f"{'✅ Fast' if avg_response <= 15 else '⚠️ Slow'} - Target <15 min for good CX"
+    }
+
+
+def _resolution_time(ctx):
+    resolution_col = ctx.col('resolution_time')
+    avg_resolution = ctx.mean(resolution_col)
+    return {
+        'value': float(avg_resolution),
+        'benchmark': 4.0,  # Target: <4 hours
+        'status': 'Below' if avg_resolution <= 4.0 else 'Above',  # Lower is better
+        'column': resolution_col,
+        'insight': f"{'✅ Efficient' if avg_resolution <= 4 else '⚠️ Long'} - Target <4 hrs"
+    }
+
+
+def _csat(ctx):
+    csat_col = ctx.col('csat')
+    avg_csat = ctx.mean(csat_col)
+    return {
+        'value': float(avg_csat),
+        'benchmark': 4.5,  # Target: ≥4.5/5
+        'status': 'Above' if avg_csat >= 4.5 else 'Below',
+        'column': csat_col,
+        'insight': f"{'✅ Excellent' if avg_csat >= 4.5 else '⚠️ Needs improvement'} - Target ≥4.5/5"
+    }
+
+
+def _first_contact_resolution(ctx):
+    # 'No' / False means not reopened (resolved at first contact)
+    fcr_rate = _flag_rate(ctx, 'reopened', NO_VALUES)
+    return {
+        'value': float(fcr_rate),
+        'benchmark': 75.0,  # Industry benchmark: 70-75%
+        'status': 'Above' if fcr_rate >= 75.0 else 'Below',
+        'column': ctx.col('reopened'),
+        'insight': f"{'✅ Strong' if fcr_rate >= 75 else '⚠️ Low'} - Industry avg 70-75%"
+    }
+
+
+def _sla_met(ctx):
+    sla_rate = _flag_rate(ctx, 'sla', YES_VALUES)
+    return {
+        'value': float(sla_rate),
+        'benchmark': 85.0,  # Target: ≥85%
+        'status': 'Above' if sla_rate >= 85.0 else 'Below',
+        'column': ctx.col('sla'),
+        'insight': f"{'✅ Good' if sla_rate >= 85 else '⚠️ Below target'} - Target ≥85%"
+    }
+
+
+def _escalation_rate(ctx):
+    escalation_rate = _flag_rate(ctx, 'escalated', YES_VALUES)
+    return {
+        'value': float(escalation_rate),
+        'benchmark': 15.0,  # Target: <15%
+        'status': 'Below' if escalation_rate <= 15.0 else 'Above',  # Lower is better
+        'column': ctx.col('escalated'),
+        'insight': f"{'✅ Low' if escalation_rate <= 15 else '⚠️ High'} - Target <15%"
+    }
+
+
+def _reopen_rate(ctx):
+    reopen_rate = _flag_rate(ctx, 'reopened', YES_VALUES)
+    return {
+        'value': float(reopen_rate),
+        'benchmark': 10.0,  # Target: <10%
+        'status': 'Below' if reopen_rate <= 10.0 else 'Above',  # Lower is better
+        'column': ctx.col('reopened'),
+        'insight': f"{'✅ Good quality' if reopen_rate <= 10 else '⚠️ High'} - Target <10%"
+    }
+
+
+def _total_ticket_value(ctx):
+    ticket_value_col = ctx.col('ticket_value')
+    total_value = ctx.sum(ticket_value_col)
+    return {
+        'value': float(total_value),
+        'benchmark': float(total_value * 0.8),
+        'status': 'Above Target',
+        'column': ticket_value_col,
+        'insight': f"Total business value: {total_value:,.0f} VND"
+    }
+
+
+CUSTOMER_SERVICE = KPIDomain(
+    'customer_service',
+    keywords=(('customer', 'service'), ('customer', 'support')),
+    roles={
+        'response_time': Role(('response', 'time')),
+        'resolution_time': Role(('resolution', 'time')),
+        'csat': Role('satisfaction', 'csat'),
+        'sla': Role('sla'),
+        'reopened': Role('reopen'),
+        'escalated': Role('escalat'),
+        'ticket_value': Role(('ticket', 'value')),
+    },
+    kpis=[
+        KPI('Avg First Response Time (min)', _first_response_time, requires=('response_time',)),
+        KPI('Avg Resolution Time (hrs)', _resolution_time, requires=('resolution_time',)),
+        KPI('CSAT Score', _csat, requires=('csat',)),
+        KPI('First Contact Resolution (%)', _first_contact_resolution, requires=('reopened',)),
+        KPI('SLA Met (%)', _sla_met, requires=('sla',)),
+        KPI('Escalation Rate (%)', _escalation_rate, requires=('escalated',)),
+        KPI('Reopen Rate (%)', _reopen_rate, requires=('reopened',)),
+        KPI('Total Ticket Value (VND)', _total_ticket_value, requires=('ticket_value',)),
+    ],
+)
+
+
+# ==================================================================================
+# MANUFACTURING / OPERATIONS
+# ==================================================================================
+
+def _first_pass_yield(ctx):
+    units_col, good_col = ctx.col('units_produced'), ctx.col('good_units')
+    total_units = ctx.sum(units_col)
+    if not total_units > 0:
+        return None
+    fpy = (ctx.sum(good_col) / total_units) * 100
+    return {
+        'value': float(fpy),
+        'benchmark': 95.0,  # World-class: ≥95%
+        'status': 'Above' if fpy >= 95.0 else 'Below',
+        'column': f"{good_col}/{units_col}",
+        'insight': f"{'✅ World-class' if fpy >= 95 else '⚠️ Needs improvement'} - Target ≥95%"
+    }
+
+
+def _defect_rate(ctx):
+    units_col, defective_col = ctx.col('units_produced'), ctx.col('defective')
+    total_units = ctx.sum(units_col)
+    if not total_units > 0:
+        return None
+    defect_rate = (ctx.sum(defective_col) / total_units) * 100
+    return {
+        'value': float(defect_rate),
+        'benchmark': 2.0,  # World-class: ≤2%
+        'status': 'Below' if defect_rate <= 2.0 else 'Above',
+        'column': f"{defective_col}/{units_col}",
+        'insight': f"{'✅ Excellent' if defect_rate <= 2 else '⚠️ High'} - Target ≤2%"
+    }
+
+
+def _production_output(ctx):
+    units_col = ctx.col('units_produced')
+    avg_units = ctx.mean(units_col)
+    return {
+        'value': float(avg_units),
+        'benchmark': 950.0,
+        'status': 'Above' if avg_units >= 950.0 else 'Below',
+        'column': units_col,
+        'insight': f"{'✅ High output' if avg_units >= 950 else '⚠️ Low output'} - Target ≥950 units/shift"
+    }
+
+
+def _cycle_time(ctx):
+    units_col, hours_col = ctx.col('units_produced'), ctx.col('available_hours')
+    total_units = ctx.sum(units_col)
+    if not total_units > 0:
+        return None
+    # Cycle time = total production time / units produced (in minutes)
+    cycle_time = (ctx.sum(hours_col) * 60) / total_units
+    return {
+        'value': float(cycle_time),
+        'benchmark': 0.5,  # Target: ≤0.5 min/unit
+        'status': 'Below' if cycle_time <= 0.5 else 'Above',
+        'column': f"{hours_col}/{units_col}",
+        'insight': f"{'✅ Fast' if cycle_time <= 0.5 else '⚠️ Slow'} - Target ≤0.5 min/unit"
+    }
+
+
+def _machine_utilization(ctx):
+    actual_run_col, hours_col = ctx.col('actual_run'), ctx.col('available_hours')
+    total_available = ctx.sum(hours_col)
+    if not total_available > 0:
+        return None
+    utilization = (ctx.sum(actual_run_col) / total_available) * 100
+    return {
+        'value': float(utilization),
+        'benchmark': 85.0,  # Target: ≥85%
+        'status': 'Above' if utilization >= 85.0 else 'Below',
+        'column': f"{actual_run_col}/{hours_col}",
+        'insight': f"{'✅ Excellent' if utilization >= 85 else '⚠️ Low'} - Target ≥85%"
+    }
+
+
+def _total_downtime(ctx):
+    downtime_col = ctx.col('downtime')
+    total_downtime = ctx.sum(downtime_col)
+    return {
+        'value': float(total_downtime),
+        'benchmark': 150.0,  # Target: ≤150 hours/month
+        'status': 'Below' if total_downtime <= 150.0 else 'Above',
+        'column': downtime_col,
+        'insight': f"{'✅ Low' if total_downtime <= 150 else '⚠️ High'} - Target ≤150 hrs/month"
+    }
+
+
+def _avg_downtime(ctx):
+    downtime_col = ctx.col('downtime')
+    avg_downtime = ctx.mean(downtime_col)
+    return {
+        'value': float(avg_downtime),
+        'benchmark': 1.0,
+        'status': 'Below' if avg_downtime <= 1.0 else 'Above',
+        'column': downtime_col,
+        'insight': f"{'✅ Low' if avg_downtime <= 1 else '⚠️ High'} - Target ≤1 hr/shift"
+    }
+
+
+def _cost_per_unit(ctx):
+    cost_col, units_col = ctx.col('total_cost'), ctx.col('units_produced')
+    total_units = ctx.sum(units_col)
+    if not total_units > 0:
+        return None
+    cost_per_unit = ctx.sum(cost_col) / total_units
+    return {
+        'value': float(cost_per_unit),
+        'benchmark': 30000.0,  # Target: ≤30,000 VND/unit
+        'status': 'Below' if cost_per_unit <= 30000.0 else 'Above',
+        'column': f"{cost_col}/{units_col}",
+        'insight': f"{'✅ Efficient' if cost_per_unit <= 30000 else '⚠️ High cost'} - Target ≤30K VND/unit"
+    }
+
+
+def _oee(ctx):
+    # OEE = Availability × Performance × Quality
+    available_col, downtime_col = ctx.col('available_hours'), ctx.col('downtime')
+    theoretical_col = ctx.col('theoretical_max')
+    units_col, good_col = ctx.col('units_produced'), ctx.col('good_units')
+
+    # Availability = (Available Time - Downtime) / Available Time
+    total_available = ctx.sum(available_col)
+    availability = ((total_available - ctx.sum(downtime_col)) / total_available) if total_available > 0 else 0
+    # Performance = Actual Output / Theoretical Max Output
+    total_units = ctx.sum(units_col)
+    total_theoretical = ctx.sum(theoretical_col)
+    performance = (total_units / total_theoretical) if total_theoretical > 0 else 0
+    # Quality = Good Units / Total Units
+    quality = (ctx.sum(good_col) / total_units) if total_units > 0 else 0
+
+    oee = availability * performance * quality * 100
+    return {
+        'value': float(oee),
+        'benchmark': 85.0,  # World-class: ≥85%
+        'status': 'Above' if oee >= 85.0 else 'Below',
+        'column': f"({available_col} - {downtime_col}) × ({units_col}/{theoretical_col}) × ({good_col}/{units_col})",
+        'insight': f"{'✅ World-class' if oee >= 85 else '⚠️ Needs improvement'} - Target ≥85%",
+        'components': {
+            'Availability': float(availability * 100),
+            'Performance': float(performance * 100),
+            'Quality': float(quality * 100)
+        }
+    }
+
+
+MANUFACTURING = KPIDomain(
+    'manufacturing',
+    keywords=('manufacturing', 'production', 'operations', 'factory'),
+    roles={
+        # Specific names to avoid false matches
+        'units_produced': Role('units_produced', 'units produced'),
+        'good_units': Role('good_units', 'good units'),
+        'defective': Role('defective', 'defect'),
+        'downtime': Role('downtime', 'down time'),
+        'available_hours': Role(('available', 'hours')),
+        'actual_run': Role('actual_run', 'actual run'),
+        'theoretical_max': Role('theoretical', 'max_output', 'max output'),
+        'total_cost': Role('total_cost', 'total cost'),
+    },
+    kpis=[
+        KPI('First Pass Yield (%)', _first_pass_yield, requires=('units_produced', 'good_units')),
+        KPI('Defect Rate (%)', _defect_rate, requires=('units_produced', 'good_units', 'defective')),
+        KPI('Avg Production Output (units/shift)', _production_output, requires=('units_produced', 'good_units')),
+        KPI('Cycle Time (min/unit)', _cycle_time, requires=('units_produced', 'good_units', 'available_hours')),
+        KPI('Machine Utilization (%)', _machine_utilization, requires=('actual_run', 'available_hours')),
+        KPI('Total Downtime (hours)', _total_downtime, requires=('downtime',)),
+        KPI('Avg Downtime (hours/shift)', _avg_downtime, requires=('downtime',)),
+        KPI('Cost per Unit (VND)', _cost_per_unit, requires=('total_cost', 'units_produced')),
+        KPI('OEE - Overall Equipment Effectiveness (%)', _oee,
+            requires=('available_hours', 'downtime', 'actual_run', 'theoretical_max',
+                      'units_produced', 'good_units')),
+    ],
+)
+
+
+# ==================================================================================
+# FALLBACK: UNIVERSAL KPIs
+# ==================================================================================
+
+PRIORITY_KEYWORDS = ['salary', 'revenue', 'sales', 'profit', 'cost', 'price', 'amount', 'value']
+
+
+def _primary_metric(ctx: KPIContext) -> Optional[str]:
+    """First numeric column named like a business metric, else the largest by |sum|."""
+    def build():
+        numeric_cols = ctx.profile.numeric_columns
+        numeric = set(numeric_cols)
+        names = [(col, str(col).lower()) for col in ctx.df.columns]
+        for keyword in PRIORITY_KEYWORDS:
+            for col, name in names:
+                if keyword in name and col in numeric:
+                    return col
+        if numeric_cols:
+            sums = {col: abs(ctx.sum(col)) for col in numeric_cols}
+            return max(sums, key=sums.get)
+        return None
+    return ctx.shared('primary_metric', build)
+
+
+def _average_metric(ctx):
+    col = _primary_metric(ctx)
+    if col is None:
+        return None
+    return {
+        'value': float(ctx.mean(col)),
+        'benchmark': float(ctx.profile.median(col)),
+        'status': 'At Median',
+        'column': col
+    }
+
+
+def _median_metric(ctx):
+    col = _primary_metric(ctx)
+    if col is None:
+        return None
+    return {
+        'value': float(ctx.profile.median(col)),
+        'benchmark': float(ctx.mean(col)),
+        'status': 'At Average',
+        'column': col
+    }
+
+
+def _total_metric(ctx):
+    col = _primary_metric(ctx)
+    if col is None:
+        return None
+    return {
+        'value': float(ctx.sum(col)),
+        'benchmark': float(ctx.sum(col) * 0.8),
+        'status': 'Above Target',
+        'column': col
+    }
+
+
+GENERAL = KPIDomain(
+    'general',
+    kpis=[
+        KPI('Average {column}', _average_metric),
+        KPI('Median {column}', _median_metric),
+        KPI('Total {column}', _total_metric),
+    ],
+)
+
+
+KPI_REGISTRY = KPIRegistry(
+    [SALARY, MARKETING, ECOMMERCE, SALES, FINANCE, CUSTOMER_SERVICE, MANUFACTURING],
+    fallback=GENERAL,
+)
@@ -8,7 +8,9 @@ import os
 from pathlib import Path
 from typing import Dict, Optional, List
 import logging
+import pandas as pd
 from semantic_layer import SemanticLayerParser, SemanticLayer, Metric, Model
+from utils.mdl_compiler import MetricPlan
 
 logger = logging.getLogger(__name__)
 
@@ -58,6 +60,7 @@ class MDLCache:
 
 # Global cache instance
 _mdl_cache = MDLCache()
+_plan_cache: Dict[int, tuple] = {}  # id(Metric) → (Metric, MetricPlan)
 
 def load_mdl_for_domain(domain: str, mdl_dir: str = None) -> Optional[SemanticLayer]:
     """
@@ -194,6 +197,78 @@ def get_measure_expression(domain: str, metric_name: str, measure_name: str) ->
     
     return None
 
+def get_metric_plan(domain: str, metric_name: str) -> Optional[MetricPlan]:
+    """
+    Get compiled (vectorized) plan cho tất cả measures của metric
+    
+    Compiled once per loaded metric; SUM(spend) shared by cac/roas/cpl is
+    aggregated once.
+    
+    Returns:
+        MetricPlan hoặc None nếu metric không tồn tại
+    """
+    metric = get_metric_by_name(domain, metric_name)
+    if not metric:
+        return None
+    
+    plan = _plan_cache.get(id(metric))
+    if plan is None or plan[0] is not metric:
+        plan = (metric, MetricPlan.from_metric(metric))
+        _plan_cache[id(metric)] = plan
+    return plan[1]
+
+def calculate_metric(domain: str, metric_name: str, df: pd.DataFrame,
+                     dimensions: Optional[List[str]] = None,
+                     column_map: Optional[Dict[str, str]] = None) -> Optional[pd.DataFrame]:
+    """
+    Tính tất cả measures của metric trực tiếp từ DataFrame (1 groupby)
+    
+    Args:
+        domain: Tên domain
+        metric_name: Tên metric (e.g., "marketing_roi_kpis")
+        df: Dữ liệu gốc
+        dimensions: Group-by columns (default: metric.dimension; [] = tổng)
+        column_map: {MDL column: df column} khi tên cột khác MDL
+    
+    Returns:
+        DataFrame (index = dimensions, columns = measures) hoặc None
+    
+    Example:
+        totals = calculate_metric("marketing", "marketing_roi_kpis", df, dimensions=[])
+        roas = totals.loc['total', 'roas']
+    """
+    plan = get_metric_plan(domain, metric_name)
+    if plan is None:
+        return None
+    return plan.evaluate(df, dimensions=dimensions, column_map=column_map)
+
+def create_query_engine(domain: str, df: pd.DataFrame, backend: Optional[str] = None,
+                        column_map: Optional[Dict[str, str]] = None):
+    """
+    Tạo SemanticQueryEngine cho domain (DuckDB nếu có, fallback pandas)
+    
+    Args:
+        domain: Tên domain
+        df: Dữ liệu gốc (dùng cho mọi model của MDL)
+        backend: 'auto' | 'duckdb' | 'pandas' (default: SEMANTIC_ENGINE env)
+        column_map: {MDL column: df column} khi tên cột khác MDL
+    
+    Returns:
+        SemanticQueryEngine hoặc None nếu không có MDL
+    
+    Example:
+        engine = create_query_engine("marketing", df)
+        by_channel = engine.metric("marketing_roi_kpis", dimensions=["channel"])
+    """
+    from utils.duckdb_engine import SemanticQueryEngine
+    
+    mdl = load_mdl_for_domain(domain)
+    if not mdl:
+        return None
+    engine = SemanticQueryEngine(mdl, backend=backend)
+    engine.load_frame(df, column_map=column_map)
+    return engine
+
 def format_kpi_with_benchmark(
     kpi_name: str, 
     kpi_value: float, 
@@ -247,6 +322,7 @@ def get_all_domains() -> List[str]:
 def clear_mdl_cache():
     """Clear MDL cache (useful for testing or hot reload)"""
     _mdl_cache.clear()
+    _plan_cache.clear()
     logger.info("🔄 MDL cache cleared")
 
 # ===== STREAMLIT INTEGRATION HELPERS =====
@@ -13,9 +13,10 @@ Total: ~55 seconds
 """
 
 import pandas as pd
+import numpy as np
 import json
 import re
-from typing import Dict, List, Tuple, Any, Optional
+from typing import Dict, List, Tuple, Any, Optional, Callable
 import streamlit as st
 from datetime import datetime
 import time
@@ -26,6 +27,20 @@ from utils.validators import safe_file_upload, sanitize_column_names
 from utils.error_handlers import rate_limit_handler, user_friendly_error
 from utils.performance import PerformanceMonitor, log_performance
 from utils.i18n import get_text, format_number, format_currency
+from utils.result_cache import get_result_cache, fingerprint_modules
+from utils.llm_cache import get_llm_cache
+from utils.stage_scheduler import StageScheduler
+from utils.json_stream import IncrementalJSONParser
+from utils.numeric_coercion import NumericCoercer
+from utils.column_profile import get_column_profile
+from utils.ingestion import to_arrow_backed
+from utils.chart_aggregation import plan_chart_data, plan_estimate_data
+from utils.breakdown import Breakdown, group_breakdown, order_by
+from utils.column_roles import Role, RoleMatcher, fold_name, folded_names
+from utils.sampling import (
+    APPROX_MODE_MIN_ROWS, APPROX_SAMPLE_SIZE, ApproximateSample,
+    stratified_reservoir_sample, exact_totals
+)
 
 # Import domain detection
 from domain_detection import (
@@ -35,7 +50,10 @@ from domain_detection import (
 )
 
 # Import Vietnam benchmark loader
-from benchmark_loader import get_benchmark_loader
+from benchmark_loader import get_benchmark_loader, BENCHMARK_FILE_PATTERN
+
+# Import KPI rule tables
+from kpi_registry import KPI_REGISTRY
 
 
 # ==================================================================================
@@ -92,6 +110,10 @@ NEVER_IMPUTE_FIELDS = {
     'ma_don_hang', 'ma_khach_hang', 'ma_giao_dich', 'ma_hoa_don',
 }
 
+# ⚡ All protected keywords compiled into one matcher (one scan per column name;
+# names are folded, so 'Lương Tháng' and 'luong_thang' are both protected)
+NEVER_IMPUTE_ROLES = RoleMatcher({'never_impute': Role(*NEVER_IMPUTE_FIELDS)})
+
 def is_never_impute_field(column_name: str) -> bool:
     """
     Check if a column should NEVER be imputed with fake data.
@@ -108,8 +130,7 @@ def is_never_impute_field(column_name: str) -> bool:
         >>> is_never_impute_field('customer_age')
         False
     """
-    col_lower = column_name.lower()
-    return any(protected_field in col_lower for protected_field in NEVER_IMPUTE_FIELDS)
+    return NEVER_IMPUTE_ROLES.matches(column_name, 'never_impute')
 
 
 # ==================================================================================
@@ -740,6 +761,32 @@ def add_benchmark_metadata(kpis: Dict, domain: str) -> Dict:
     return kpis
 
 
+# ==================================================================================
+# DIMENSION ANALYSIS COLUMN ROLES
+# ==================================================================================
+# Compiled once; resolved once per schema by _calculate_dimension_analysis
+# (keywords match folded names, so Vietnamese headers resolve too)
+# ==================================================================================
+
+DIMENSION_ROLES = RoleMatcher({
+    'channel': Role('channel', 'kenh'),
+    'campaign': Role('campaign', 'chien dich'),
+    'sales_dimension': Role('rep', 'sales'),
+    'stage': Role('stage', 'status'),
+    'revenue': Role('revenue', 'doanh thu'),
+    'transaction': Role('transaction', exclude=('rate',)),
+    'session': Role('session'),
+    'cac': Role('cac'),
+    'date': Role('date', 'time', 'day'),
+    'spend': Role('spend', 'cost', 'chi phi'),
+    'click': Role('click'),
+    'conversion': Role('conversion'),
+    'deal_value': Role(('deal', 'value'), 'amount'),
+    'rep': Role('rep', 'owner'),
+    'days_in_stage': Role(('days', 'stage')),
+})
+
+
 # ==================================================================================
 # DOMAIN-SPECIFIC DEDUPLICATION RULES (MDM Best Practices)
 # ==================================================================================
@@ -823,6 +870,33 @@ DEDUPLICATION_RULES = {
 }
 
 
+# Bump when cached results must be invalidated for reasons outside RESULT_MODULES
+# (e.g. a dependency upgrade that changes outputs). Code changes in RESULT_MODULES
+# invalidate the result cache on their own: their source is part of the key.
+PIPELINE_VERSION = "2.0"
+
+# Modules whose code determines a cached pipeline result (steps, prompts, KPI
+# rules, benchmark lookups, column roles, chart data). A module that starts
+# affecting results must be added here, or stale results keep being served.
+RESULT_MODULES = (
+    __name__,
+    'kpi_registry',
+    'benchmark_loader',
+    'domain_detection',
+    'utils.column_roles',
+    'utils.column_profile',
+    'utils.numeric_coercion',
+    'utils.breakdown',
+    'utils.chart_aggregation',
+    'utils.sampling',
+    'utils.i18n',
+)
+
+GEMINI_MODEL = 'gemini-2.0-flash'
+
+_UNSET = object()
+
+
 def is_streamlit_context():
     """Check if running in Streamlit context"""
     try:
@@ -838,8 +912,32 @@ class PremiumLeanPipeline:
     Optimized for 55-second execution with premium features maintained
     """
     
-    def __init__(self, gemini_client, lang: str = 'vi'):
+    def __init__(self, gemini_client, lang: str = 'vi', result_cache=_UNSET, llm_cache=_UNSET,
+                 parallel_stages: bool = True, stream_insights: bool = True,
+                 approximate: Optional[bool] = None, approx_sample_size: int = APPROX_SAMPLE_SIZE):
+        """
+        Args:
+            gemini_client: google.generativeai module (configured)
+            lang: Output language ('vi' or 'en')
+            result_cache: PipelineResultCache instance, None to disable,
+                          or omit to use the process-wide disk cache
+            llm_cache: LLMResponseCache instance, None to disable,
+                       or omit to use the process-wide SQLite cache
+            parallel_stages: Run Step 1 and Step 2 AI calls concurrently
+            stream_insights: Stream Step 4 insights to the page as they are generated
+            approximate: Build charts and dimension breakdowns from a stratified sample
+                         (KPIs stay exact). None = on for frames with at least
+                         APPROX_MODE_MIN_ROWS rows
+            approx_sample_size: Target sample rows in approximate mode
+        """
         self.client = gemini_client
+        self.result_cache = get_result_cache() if result_cache is _UNSET else result_cache
+        self.llm_cache = get_llm_cache() if llm_cache is _UNSET else llm_cache
+        self.parallel_stages = parallel_stages
+        self.stream_insights = stream_insights
+        self.approximate = approximate
+        self.approx_sample_size = approx_sample_size
+        self._numeric_coercer = NumericCoercer()  # ⚡ Memoized per-column format decisions
         self.lang = lang  # Store language for bilingual support
         self.domain_cache = {}  # Cache domain profiles
         self.pipeline_state = {
@@ -851,9 +949,15 @@ class PremiumLeanPipeline:
             'audit_trail': [],
             'performance_metrics': {}
         }
-        # Load Vietnam benchmarks (300+ metrics from CSV files)
-        self.benchmark_loader = get_benchmark_loader()
-        self.vietnam_benchmarks_loaded = any(self.benchmark_loader.load_all_benchmarks().values())
+
+    @property
+    def benchmark_loader(self):
+        """Process-wide Vietnam benchmarks (300+ metrics from CSV files), hot-reloaded on change."""
+        return get_benchmark_loader()
+
+    @property
+    def vietnam_benchmarks_loaded(self) -> bool:
+        return self.benchmark_loader.loaded
 
     def _get_vietnam_benchmark(self, domain: str, metric_name: str, user_value: float, filters: Dict = None) -> Optional[Dict]:
         """
@@ -900,7 +1004,21 @@ class PremiumLeanPipeline:
         
         start_time = time.time()
         
+        # ⚡ Result cache: same data + description + language → reuse full result (no AI calls)
+        cache_key = None
+        if self.result_cache is not None:
+            try:
+                cache_key = self._result_cache_key(df, dataset_description)
+                cached_result = self.result_cache.get(cache_key)
+            except Exception:
+                cached_result = None
+            if cached_result is not None:
+                return self._serve_cached_result(cached_result, start_time)
+        
         try:
+            # ⚡ Working frame keeps text as Arrow-backed strings from Step 1 through export
+            df = to_arrow_backed(df)
+            
             # Step 0: Domain Detection (3s - cached)
             if is_streamlit_context():
                 progress_placeholder = st.empty()
@@ -910,41 +1028,58 @@ class PremiumLeanPipeline:
             self._add_audit_trail("Domain Detection", domain_info)
             self._update_performance("domain_detection", time.time() - start_time)
             
-            # Step 1: Data Cleaning (15s - ISO 8000)
-            step1_start = time.time()
-            if is_streamlit_context():
-                progress_placeholder.info(get_text('pipeline_step1', self.lang, domain=domain_info['domain_name']))
-            
-            cleaning_result = self.step1_data_cleaning(df, domain_info)
-            if not cleaning_result['success']:
-                return self._error_response(cleaning_result['error'])
-            
-            self._add_audit_trail("Data Cleaning", cleaning_result)
-            self._update_performance("data_cleaning", time.time() - step1_start)
-            
-            # Step 2: Smart Blueprint (15s - EDA + Blueprint combined)
-            step2_start = time.time()
-            if is_streamlit_context():
-                progress_placeholder.info(get_text('pipeline_step2', self.lang, expert=domain_info['expert_role'][:50]))
-            
-            blueprint_result = self.step2_smart_blueprint(
-                cleaning_result['df_cleaned'],
-                domain_info
-            )
-            if not blueprint_result['success']:
-                return self._error_response(blueprint_result['error'])
-            
-            self._add_audit_trail("Smart Blueprint", blueprint_result)
-            self._update_performance("smart_blueprint", time.time() - step2_start)
+            # Step 1 + Step 2: Data Cleaning (ISO 8000) & Smart Blueprint
+            if self.parallel_stages:
+                # ⚡ Cleaning LLM call and (speculative) blueprint LLM call run concurrently
+                if is_streamlit_context():
+                    progress_placeholder.info(get_text('pipeline_step12_parallel', self.lang, domain=domain_info['domain_name']))
+                cleaning_result, blueprint_result = self._run_cleaning_and_blueprint_parallel(df, domain_info)
+                if not cleaning_result['success']:
+                    return self._error_response(cleaning_result['error'])
+                self._add_audit_trail("Data Cleaning", cleaning_result)
+                if not blueprint_result['success']:
+                    return self._error_response(blueprint_result['error'])
+                self._add_audit_trail("Smart Blueprint", blueprint_result)
+            else:
+                step1_start = time.time()
+                if is_streamlit_context():
+                    progress_placeholder.info(get_text('pipeline_step1', self.lang, domain=domain_info['domain_name']))
+                
+                cleaning_result = self.step1_data_cleaning(df, domain_info)
+                if not cleaning_result['success']:
+                    return self._error_response(cleaning_result['error'])
+                
+                self._add_audit_trail("Data Cleaning", cleaning_result)
+                self._update_performance("data_cleaning", time.time() - step1_start)
+                
+                step2_start = time.time()
+                if is_streamlit_context():
+                    progress_placeholder.info(get_text('pipeline_step2', self.lang, expert=domain_info['expert_role'][:50]))
+                
+                blueprint_result = self.step2_smart_blueprint(
+                    cleaning_result['df_cleaned'],
+                    domain_info
+                )
+                if not blueprint_result['success']:
+                    return self._error_response(blueprint_result['error'])
+                
+                self._add_audit_trail("Smart Blueprint", blueprint_result)
+                self._update_performance("smart_blueprint", time.time() - step2_start)
             
             # Step 3: Dashboard Build (7s - pure execution)
             step3_start = time.time()
             if is_streamlit_context():
                 progress_placeholder.info(get_text('pipeline_step3', self.lang))
             
+            # ⚡ Approximate mode: charts from one stratified sample, KPIs stay exact
+            approx_sample = None
+            if self._use_approximate(df):
+                approx_sample = self._build_approximate_sample(cleaning_result['df_cleaned'])
+            
             dashboard_result = self.step3_dashboard_build(
                 cleaning_result['df_cleaned'],
-                blueprint_result['smart_blueprint']
+                blueprint_result['smart_blueprint'],
+                sample=approx_sample
             )
             
             self._add_audit_trail("Dashboard Build", dashboard_result)
@@ -989,7 +1124,7 @@ class PremiumLeanPipeline:
             final_overall = max(0, min(100, base_overall - deductions['total']))
             
             # Return complete result
-            return {
+            result = {
                 'success': True,
                 'domain_info': domain_info,
                 'cleaning_report': cleaning_result['cleaning_report'],
@@ -1004,12 +1139,175 @@ class PremiumLeanPipeline:
                     'deductions': deductions,  # Transparency about penalties
                     'overall': round(final_overall, 1)  # After deductions
                 },
-                'performance': self.pipeline_state['performance_metrics']
+                'performance': self.pipeline_state['performance_metrics'],
+                'approximate': self._approximate_summary(cleaning_result['df_cleaned'], approx_sample)
             }
+            
+            # Only complete analyses are cached: a transient AI failure must not be
+            # served for this dataset on every later run
+            ai_steps_ok = (cleaning_result['success'] and blueprint_result['success']
+                           and insights_result.get('success') and bool(insights_result.get('insights')))
+            if cache_key is not None and ai_steps_ok:
+                try:
+                    self.result_cache.set(cache_key, result)
+                except Exception:
+                    pass  # Caching is best-effort - never fail the analysis
+            
+            return result
         
         except Exception as e:
             return self._error_response(f"Pipeline error: {str(e)}")
     
+    def _result_cache_key(self, df: pd.DataFrame, dataset_description: str) -> str:
+        """Content-addressed key: data + description + lang + version + RESULT_MODULES source + benchmarks"""
+        benchmark_files = get_benchmark_loader().sample_data_path.glob(BENCHMARK_FILE_PATTERN)
+        code_fingerprint = fingerprint_modules(RESULT_MODULES, benchmark_files)
+        pipeline_version = PIPELINE_VERSION
+        if self._use_approximate(df):
+            pipeline_version = f"{PIPELINE_VERSION}+approx{self.approx_sample_size}"
+        return self.result_cache.make_key(
+            df, dataset_description, self.lang, pipeline_version, code_fingerprint
+        )
+    
+    def _use_approximate(self, df: pd.DataFrame) -> bool:
+        """Approximate mode: explicit flag, else automatic for very large frames"""
+        if self.approximate is not None:
+            return self.approximate
+        return len(df) >= APPROX_MODE_MIN_ROWS
+    
+    def _build_approximate_sample(self, df: pd.DataFrame) -> ApproximateSample:
+        """Draw the stratified sample once (stratified by channel/campaign/rep/stage)"""
+        sample_start = time.time()
+        sample = stratified_reservoir_sample(df, sample_size=self.approx_sample_size)
+        self._update_performance("approximate_sample", time.time() - sample_start)
+        
+        if is_streamlit_context():
+            st.info(get_text('approx_mode_note', self.lang,
+                             sample=format_number(sample.sample_rows, lang=self.lang, decimals=0),
+                             total=format_number(sample.population_rows, lang=self.lang, decimals=0)))
+        return sample
+    
+    def _approximate_summary(self, df: pd.DataFrame, sample: Optional[ApproximateSample],
+                             max_measures: int = 5) -> Optional[Dict]:
+        """
+        Describe an approximate run: sample size, strata, exact headline totals and
+        per-dimension total estimates with 95% confidence intervals.
+        
+        Returns:
+            None when the run used the full frame
+        """
+        if sample is None:
+            return None
+        
+        measures = get_column_profile(df).numeric_columns
+        dimension_estimates = {}
+        for dimension in sample.strata_cols:
+            dimension_estimates[dimension] = {
+                measure: sample.estimate_totals(dimension, measure).to_dict('records')
+                for measure in measures[:max_measures]
+            }
+        
+        return {
+            'sample_rows': sample.sample_rows,
+            'population_rows': sample.population_rows,
+            'strata': sample.strata_cols,
+            'confidence': 0.95,
+            'exact_totals': exact_totals(df, measures),
+            'dimension_estimates': dimension_estimates
+        }
+    
+    def _serve_cached_result(self, cached_result: Dict, start_time: float) -> Dict:
+        """Return a cached result with performance metrics for this (cached) run"""
+        elapsed = time.time() - start_time
+        original_performance = cached_result.get('performance', {})
+        cached_result['performance'] = {
+            'total': elapsed,
+            'cache_hit': True,
+            'original_total': original_performance.get('total')
+        }
+        self.pipeline_state['performance_metrics'] = cached_result['performance']
+        self.pipeline_state['audit_trail'] = cached_result.get('audit_trail', [])
+        
+        if is_streamlit_context():
+            st.success(get_text('pipeline_cache_hit', self.lang, time=elapsed))
+        
+        return cached_result
+    
+    def _run_cleaning_and_blueprint_parallel(self, df: pd.DataFrame, domain_info: Dict) -> Tuple[Dict, Dict]:
+        """
+        ⚡ Run Step 1 and Step 2 concurrently (DAG: prep → speculative blueprint ∥ cleaning)
+        
+        The blueprint only needs column stats + real KPIs, which can be computed on a
+        deterministically deduplicated copy of the raw frame while the cleaning LLM call
+        is in flight. Once both finish, the speculative blueprint is reconciled with the
+        actually cleaned frame:
+        - identical frame  → blueprint used as-is
+        - same schema      → KPIs recalculated locally, charts re-validated (no AI call)
+        - schema changed   → Step 2 re-run on the cleaned frame
+        
+        Returns:
+            (cleaning_result, blueprint_result) - same shapes as step1/step2
+        """
+        phase_start = time.time()
+        
+        scheduler = StageScheduler(max_workers=3)
+        scheduler.add_stage('speculative_prep', lambda deps: self._speculative_clean_frame(df, domain_info))
+        scheduler.add_stage('data_cleaning', lambda deps: self.step1_data_cleaning(df, domain_info))
+        scheduler.add_stage(
+            'smart_blueprint',
+            lambda deps: self.step2_smart_blueprint(deps['speculative_prep'], domain_info, display=False),
+            depends_on=['speculative_prep']
+        )
+        scheduler.run()
+        
+        for stage_name, duration in scheduler.timings.items():
+            self._update_performance(stage_name, duration)
+        
+        if 'data_cleaning' in scheduler.errors:
+            raise scheduler.errors['data_cleaning']
+        cleaning_result = scheduler.results['data_cleaning']
+        if not cleaning_result['success']:
+            return cleaning_result, {'success': False, 'error': cleaning_result['error']}
+        
+        # Reconcile speculative blueprint with the actually cleaned frame
+        reconcile_start = time.time()
+        df_cleaned = cleaning_result['df_cleaned']
+        df_speculative = scheduler.results.get('speculative_prep')
+        blueprint_result = scheduler.results.get('smart_blueprint')
+        
+        same_schema = (
+            df_speculative is not None
+            and list(df_speculative.columns) == list(df_cleaned.columns)
+            and list(df_speculative.dtypes) == list(df_cleaned.dtypes)
+        )
+        
+        if blueprint_result is None or not blueprint_result.get('success') or not same_schema:
+            # Speculation failed or schema changed → authoritative sequential Step 2
+            blueprint_result = self.step2_smart_blueprint(df_cleaned, domain_info)
+            reconciliation = 'rerun'
+        else:
+            if not df_speculative.equals(df_cleaned):
+                # Values changed (e.g. imputation) → recalculate KPIs from real cleaned data
+                smart_blueprint = blueprint_result['smart_blueprint']
+                smart_blueprint['kpis_calculated'] = self._calculate_real_kpis(df_cleaned, domain_info)
+                blueprint_result['smart_blueprint'] = self._validate_and_fix_charts(smart_blueprint, df_cleaned)
+                reconciliation = 'kpis_recalculated'
+            else:
+                reconciliation = 'speculation_exact'
+            if is_streamlit_context():
+                self._display_compact_blueprint(blueprint_result['smart_blueprint'], domain_info)
+        
+        self._update_performance("blueprint_reconcile", time.time() - reconcile_start)
+        self._update_performance("cleaning_blueprint_parallel", time.time() - phase_start)
+        self.pipeline_state['performance_metrics']['blueprint_reconciliation'] = reconciliation
+        
+        return cleaning_result, blueprint_result
+    
+    def _speculative_clean_frame(self, df: pd.DataFrame, domain_info: Dict) -> pd.DataFrame:
+        """Deterministic part of Step 1 (domain deduplication) - no AI plan needed"""
+        _, dedup_info = self._smart_deduplication(df, domain_info, len(df))
+        return dedup_info['df_cleaned']
+    
     def step0_domain_detection(self, df: pd.DataFrame, description: str) -> Dict:
         """
         Step 0: Domain detection với caching (3s)
@@ -1056,9 +1354,12 @@ class PremiumLeanPipeline:
             domain_context = f"Domain: {domain_name}\nExpert Role: {expert_role}"
         
         # Check for protected fields in dataset
-        protected_cols = [col for col in df.columns if is_never_impute_field(col)]
+        protected_cols = list(NEVER_IMPUTE_ROLES.index(df.columns).get('never_impute'))
         protected_warning = f"\n⚠️ PROTECTED FIELDS DETECTED: {', '.join(protected_cols)}" if protected_cols else ""
         
+        # ⚡ Profile once - reused by cleaning and quality gates
+        profile = get_column_profile(df)
+        
         # Simplified cleaning prompt (faster) WITH NEVER_IMPUTE PROTECTION
         prompt = f"""
 {domain_context}
@@ -1067,8 +1368,8 @@ TASK: Fast Professional Data Cleaning (ISO 8000)
 
 DATA: {df.shape[0]} rows × {df.shape[1]} columns
 Columns: {', '.join(df.columns[:15])}
-Missing: {df.isnull().sum().sum()} values
-Duplicates: {df.duplicated().sum()} rows
+Missing: {profile.total_missing} values
+Duplicates: {profile.duplicate_rows} rows
 {protected_warning}
 
 REQUIREMENTS (Essential Only):
@@ -1159,45 +1460,14 @@ OUTPUT JSON:
         - US format: '5.43' → 5.43
         - Thousands separator: '8.311,42' or '8,311.42'
         
+        ⚡ Format is detected once per column (memoized across steps) and each
+        column is converted in a single vectorized pass. The input frame is
+        not copied; unchanged columns are shared.
+        
         Returns:
             DataFrame with converted numeric columns
         """
-        df_converted = df.copy()
-        
-        for col in df_converted.columns:
-            # Skip if already numeric
-            if pd.api.types.is_numeric_dtype(df_converted[col]):
-                continue
-            
-            # Check if column contains numeric-like strings
-            if df_converted[col].dtype == 'object':
-                sample_values = df_converted[col].dropna().head(10)
-                
-                if len(sample_values) == 0:
-                    continue
-                
-                # Check if values look like numbers (contain digits, comma, or period)
-                numeric_pattern = sample_values.astype(str).str.match(r'^[\d.,\s-]+$')
-                
-                if numeric_pattern.sum() / len(sample_values) > 0.5:  # At least 50% numeric
-                    try:
-                        # Try European format first (comma = decimal, period = thousands)
-                        # Example: '8.311,42' → 8311.42
-                        if df_converted[col].astype(str).str.contains(',').any():
-                            df_converted[col] = (df_converted[col]
-                                .astype(str)
-                                .str.replace('.', '', regex=False)  # Remove thousands separator
-                                .str.replace(',', '.', regex=False)  # Replace decimal comma with period
-                                .str.strip())
-                        
-                        # Convert to numeric (coerce errors to NaN)
-                        df_converted[col] = pd.to_numeric(df_converted[col], errors='coerce')
-                        
-                    except Exception:
-                        # If conversion fails, keep original
-                        pass
-        
-        return df_converted
+        return self._numeric_coercer.coerce(df)
     
     def _calculate_real_kpis(self, df: pd.DataFrame, domain_info: Dict) -> Dict:
         """
@@ -1228,1389 +1498,21 @@ OUTPUT JSON:
                 domain_info = {'domain': 'general', 'domain_name': 'general'}
                 logger.warning(f"⚠️ Invalid domain_info, using general")
         
-        kpis = {}
         # Support both 'domain' and 'domain_name' keys for backward compatibility
         domain = domain_info.get('domain', domain_info.get('domain_name', 'general')).lower()
         
         # ⭐ FIX: Convert string numeric columns to proper numeric types
         # This handles European CSV format (comma as decimal separator)
         df = self._convert_string_to_numeric(df)
-        
-        # Get numeric columns
-        numeric_cols = df.select_dtypes(include=['number']).columns.tolist()
-        all_cols_lower = [col.lower() for col in df.columns]
-        
-        # === SMART COLUMN DETECTION ===
-        primary_metric_col = None
-        priority_keywords = ['salary', 'revenue', 'sales', 'profit', 'cost', 'price', 'amount', 'value']
-        
-        for keyword in priority_keywords:
-            matching_cols = [df.columns[i] for i, col in enumerate(all_cols_lower) 
-                           if keyword in col and df.columns[i] in numeric_cols]
-            if matching_cols:
-                primary_metric_col = matching_cols[0]
-                break
-        
-        if not primary_metric_col and len(numeric_cols) > 0:
-            sums = {col: abs(df[col].sum()) for col in numeric_cols}
-            primary_metric_col = max(sums, key=sums.get)
-        
-        # === SALARY DATA (high priority - works even if domain is "General") ===
-        if 'salary' in ' '.join(all_cols_lower):
-            salary_col = [col for col in df.columns if 'salary' in col.lower()][0]
-            avg_salary = df[salary_col].mean()
-            median_salary = df[salary_col].median()
-
-            # ⚠️ CRITICAL FIX: Use Vietnam benchmark data from CSV files (not hardcoded!)
-            # Detect currency: Values > 1M = VND, < 500K = USD
-            is_vnd = avg_salary > 1000000
-
-            # Try to get Vietnam benchmark from CSV data
-            vietnam_benchmark = None
-            vietnam_context = ''
-
-            if is_vnd and self.vietnam_benchmarks_loaded:
-                # Try to match role from dataframe
-                role_cols = [col for col in df.columns if 'role' in col.lower() or 'position' in col.lower() or 'title' in col.lower()]
-                city_cols = [col for col in df.columns if 'city' in col.lower() or 'location' in col.lower()]
-
-                filters = {}
-                if role_cols and not df[role_cols[0]].isna().all():
-                    # Get most common role
-                    most_common_role = df[role_cols[0]].mode()[0] if len(df[role_cols[0]].mode()) > 0 else None
-                    if most_common_role:
-                        filters['role'] = str(most_common_role)
-
-                if city_cols and not df[city_cols[0]].isna().all():
-                    most_common_city = df[city_cols[0]].mode()[0] if len(df[city_cols[0]].mode()) > 0 else None
-                    if most_common_city:
-                        filters['city'] = str(most_common_city)
-
-                # Get Vietnam HR benchmark
-                vietnam_comparison = self.benchmark_loader.compare_value_to_benchmark(
-                    domain='hr',
-                    metric_name='salary',
-                    user_value=median_salary,
-                    filters=filters
-                )
-
-                if vietnam_comparison:
-                    vietnam_benchmark = vietnam_comparison
-                    vietnam_context = vietnam_comparison.get('message', '')
-
-            # Set benchmarks (use Vietnam data if available, else fallback to estimates)
-            if vietnam_benchmark:
-                avg_benchmark = vietnam_benchmark['benchmark_median']
-                median_benchmark = vietnam_benchmark['benchmark_median']
-                range_benchmark = vietnam_benchmark['benchmark_q3'] - vietnam_benchmark['benchmark_q1']
-                benchmark_source = vietnam_benchmark.get('benchmark_source', BENCHMARK_SOURCES['hr_salary']['name'])
-            elif is_vnd:
-                # Vietnam market - VND fallback (if CSV not loaded)
-                avg_benchmark = 32500000  # ~32.5M VND/month - realistic median from CSV
-                median_benchmark = 32500000
-                range_benchmark = 25000000  # Q3-Q1 range
-                benchmark_source = BENCHMARK_SOURCES['hr_salary']['name'] + ' (Estimated)'
-            else:
-                # International market - USD
-                avg_benchmark = 18000
-                median_benchmark = 16000
-                range_benchmark = 50000
-                benchmark_source = 'Global Market Data (Estimated)'
-
-            kpis['Average Salary'] = {
-                'value': float(avg_salary),
-                'benchmark': avg_benchmark,
-                'benchmark_source': benchmark_source,
-                'status': 'Above' if avg_salary >= avg_benchmark * 0.9 else 'Below',
-                'column': salary_col,
-                'vietnam_context': vietnam_context if vietnam_benchmark else ''
-            }
-
-            kpis['Median Salary'] = {
-                'value': float(median_salary),
-                'benchmark': median_benchmark,
-                'benchmark_source': benchmark_source,
-                'status': 'Above' if median_salary >= median_benchmark * 0.9 else 'Below',
-                'column': salary_col,
-                'vietnam_context': vietnam_context if vietnam_benchmark else '',
-                'percentile': vietnam_benchmark.get('percentile', None) if vietnam_benchmark else None
-            }
-
-            kpis['Salary Range'] = {
-                'value': float(df[salary_col].max() - df[salary_col].min()),
-                'benchmark': range_benchmark,
-                'benchmark_source': benchmark_source,
-                'status': 'Wide Range' if (df[salary_col].max() - df[salary_col].min()) > range_benchmark * 1.2 else 'Normal Range',
-                'column': salary_col
-            }
-            
-            # Years of Experience ratio (if available)
-            exp_cols = [col for col in df.columns if 'experience' in col.lower() or 'yoe' in col.lower()]
-            if exp_cols:
-                exp_col = exp_cols[0]
-                avg_exp = df[exp_col].mean()
-                avg_salary = df[salary_col].mean()
-                if avg_exp > 0:
-                    kpis['Salary per Experience Year'] = {
-                        'value': float(avg_salary / avg_exp),
-                        'benchmark': 10000,
-                        'status': 'Competitive',
-                        'column': f"{salary_col}/{exp_col}"
-                    }
-        
-        # === MARKETING DATA ===
-        elif 'marketing' in domain or 'quảng cáo' in domain:
-            # Detect key marketing columns
-            roi_cols = [col for col in df.columns if 'roi' in col.lower()]
-            spend_cols = [col for col in df.columns if 'spend' in col.lower() or 'cost' in col.lower()]
-            click_cols = [col for col in df.columns if 'click' in col.lower()]
-            impression_cols = [col for col in df.columns if 'impression' in col.lower()]
-            conversion_cols = [col for col in df.columns if 'conversion' in col.lower()]
-            revenue_cols = [col for col in df.columns if 'revenue' in col.lower()]
-            
-            # 1. ROI (Return on Investment)
-            # ⚠️ NOTE: ROI definition varies widely - use with caution or prefer ROAS
-            if roi_cols and len(roi_cols) > 0:
-                roi_col = roi_cols[0]
-                avg_roi = df[roi_col].mean()
-                kpis['Marketing ROI (Revenue/Spend)'] = {
-                    'value': float(avg_roi),
-                    'benchmark': 3.0,  # Conservative estimate based on ROAS data (no standard exists)
-                    'benchmark_source': BENCHMARK_SOURCES['marketing_roi']['name'],
-                    'status': 'Above' if avg_roi >= 3.0 else 'Below',
-                    'column': roi_col,
-                    'insight': '⚠️ ROI varies by business model and attribution window'
-                }
-            
-            # 2. ROAS (Return on Ad Spend) - calculated from revenue/cost
-            if revenue_cols and spend_cols:
-                rev_col = revenue_cols[0]
-                cost_col = spend_cols[0]
-                total_revenue = df[rev_col].sum()
-                total_cost = df[cost_col].sum()
-                if total_cost > 0:
-                    roas = total_revenue / total_cost
-                    kpis['ROAS'] = {
-                        'value': float(roas),
-                        'benchmark': 2.5,  # ✅ WordStream 2025: avg 2.26, median 3.08 - use conservative 2.5
-                        'benchmark_source': BENCHMARK_SOURCES['marketing_roas']['name'],
-                        'status': 'Above' if roas >= 2.5 else 'Below',
-                        'column': f"{rev_col}/{cost_col}"
-                    }
-            
-            # 3. CTR (Click-Through Rate) - clicks/impressions
-            if click_cols and impression_cols:
-                click_col = click_cols[0]
-                impression_col = impression_cols[0]
-                total_clicks = df[click_col].sum()
-                total_impressions = df[impression_col].sum()
-                if total_impressions > 0:
-                    ctr = (total_clicks / total_impressions) * 100
-
-                    # ✅ Smart benchmark based on channel type (WordStream 2025)
-                    # Check if social media or search ads
-                    col_lower = (click_col + impression_col).lower()
-                    if 'social' in col_lower or 'facebook' in col_lower or 'instagram' in col_lower:
-                        benchmark_ctr = 1.7  # Social media traffic campaigns
-                        channel_type = 'Social'
-                    else:
-                        benchmark_ctr = 6.7  # Search ads average
-                        channel_type = 'Search'
-
-                    kpis['CTR (%)'] = {
-                        'value': float(ctr),
-                        'benchmark': benchmark_ctr,  # ✅ WordStream 2025: 6.66% search, 1.71% social
-                        'benchmark_source': BENCHMARK_SOURCES['marketing_ctr']['name'],
-                        'status': 'Above' if ctr >= benchmark_ctr else 'Below',
-                        'column': f"{click_col}/{impression_col}",
-                        'insight': f'{channel_type} ads benchmark'
-                    }
-            
-            # 4. CPC (Cost Per Click)
-            if spend_cols and click_cols:
-                cost_col = spend_cols[0]
-                click_col = click_cols[0]
-                total_cost = df[cost_col].sum()
-                total_clicks = df[click_col].sum()
-                if total_clicks > 0:
-                    cpc = total_cost / total_clicks
-                    kpis['CPC'] = {
-                        'value': float(cpc),
-                        'benchmark': 2.0,  # Varies by industry
-                        'status': 'Below' if cpc <= 2.0 else 'Above',  # Lower is better
-                        'column': f"{cost_col}/{click_col}"
-                    }
-            
-            # 5. Conversion Rate
-            if conversion_cols and click_cols:
-                conversion_col = conversion_cols[0]
-                click_col = click_cols[0]
-                total_conversions = df[conversion_col].sum()
-                total_clicks = df[click_col].sum()
-                if total_clicks > 0:
-                    conv_rate = (total_conversions / total_clicks) * 100
-                    kpis['Conversion Rate (%)'] = {
-                        'value': float(conv_rate),
-                        'benchmark': 6.6,  # ✅ Unbounce 2025: 6.6% overall average (WordStream: 7.52% search)
-                        'benchmark_source': BENCHMARK_SOURCES['marketing_conversion']['name'],
-                        'status': 'Above' if conv_rate >= 6.6 else 'Below',
-                        'column': f"{conversion_col}/{click_col}"
-                    }
-            
-            # 6. CPA (Cost Per Acquisition) - WITH VIETNAM BENCHMARK INTEGRATION
-            if spend_cols and conversion_cols:
-                cost_col = spend_cols[0]
-                conversion_col = conversion_cols[0]
-                total_cost = df[cost_col].sum()
-                total_conversions = df[conversion_col].sum()
-                if total_conversions > 0:
-                    cpa = total_cost / total_conversions
-
-                    # Try to get Vietnam benchmark from CSV data
-                    vietnam_benchmark = None
-                    vietnam_context = ''
-                    sample_spend = df[cost_col].dropna().head(10).mean()
-                    is_vnd = sample_spend > 100000
-
-                    if is_vnd:
-                        # Try to detect channel and industry from column names/data
-                        filters = {}
-                        channel_cols = [col for col in df.columns if 'channel' in col.lower() or 'platform' in col.lower() or 'source' in col.lower()]
-                        industry_cols = [col for col in df.columns if 'industry' in col.lower() or 'category' in col.lower()]
-
-                        # Check column names for channel hints
-                        col_names_str = ' '.join(df.columns).lower()
-                        if 'facebook' in col_names_str or 'fb' in col_names_str:
-                            filters['channel'] = 'Facebook Ads'
-                        elif 'google' in col_names_str or 'search' in col_names_str:
-                            filters['channel'] = 'Google Ads'
-                        elif 'tiktok' in col_names_str:
-                            filters['channel'] = 'TikTok Ads'
-
-                        vietnam_benchmark = self._get_vietnam_benchmark(
-                            domain='marketing',
-                            metric_name='CPA',
-                            user_value=cpa,
-                            filters=filters
-                        )
-
-                        if vietnam_benchmark:
-                            vietnam_context = vietnam_benchmark.get('message', '')
-
-                    # Set benchmark (use Vietnam data if available, else fallback)
-                    if vietnam_benchmark:
-                        benchmark_cpa = vietnam_benchmark['benchmark_median']
-                        benchmark_source = vietnam_benchmark.get('benchmark_source', BENCHMARK_SOURCES['marketing_cpa']['name'])
-                        currency = 'VND'
-                    elif is_vnd:
-                        benchmark_cpa = 85000  # ~85K VND - realistic Vietnam average from CSV
-                        benchmark_source = BENCHMARK_SOURCES['marketing_cpa']['name'] + ' (Estimated)'
-                        currency = 'VND'
-                    else:
-                        benchmark_cpa = 70  # $70 USD - WordStream 2025 average
-                        benchmark_source = BENCHMARK_SOURCES['marketing_cpa']['name']
-                        currency = 'USD'
-
-                    kpis['Cost Per Acquisition (CPA)'] = {
-                        'value': float(cpa),
-                        'benchmark': benchmark_cpa,
-                        'benchmark_source': benchmark_source,
-                        'status': 'Below' if cpa <= benchmark_cpa else 'Above',  # Lower is better!
-                        'column': f"{cost_col}/{conversion_col}",
-                        'insight': f"{'✅ Efficient' if cpa <= benchmark_cpa else '⚠️ High CPA'} - Lower is better. Benchmark: {benchmark_cpa:,.0f} {currency}",
-                        'vietnam_context': vietnam_context if vietnam_benchmark else '',
-                        'percentile': vietnam_benchmark.get('percentile', None) if vietnam_benchmark else None
-                    }
-            
-            # 7. Engagement Rate (for social/video campaigns)
-            engagement_cols = [col for col in df.columns if 'engagement' in col.lower()]
-            if engagement_cols:
-                eng_col = engagement_cols[0]
-                avg_engagement = df[eng_col].mean()
-                kpis['Engagement Rate (%)'] = {
-                    'value': float(avg_engagement),
-                    'benchmark': 2.0,  # Social media avg 1-3%
-                    'status': 'Above' if avg_engagement >= 2.0 else 'Below',
-                    'column': eng_col,
-                    'insight': f"{'✅ Strong' if avg_engagement >= 3.0 else '⚠️ Improve'} social engagement - Industry avg 1-3%"
-                }
-            
-            # 8. Total Spend (if available)
-            if spend_cols:
-                cost_col = spend_cols[0]
-                total_spend = df[cost_col].sum()
-                kpis['Total Spend'] = {
-                    'value': float(total_spend),
-                    'benchmark': 100000,
-                    'status': 'Check',
-                    'column': cost_col,
-                    'insight': f"Budget: {total_spend:,.0f}"
-                }
-        
-        # === E-COMMERCE DATA ===
-        elif 'ecommerce' in domain or 'e-commerce' in domain:
-            # Detect key e-commerce columns (smart column matching)
-            revenue_cols = [col for col in df.columns if 'revenue' in col.lower()]
-            transaction_cols = [col for col in df.columns if 'transaction' in col.lower() and 'rate' not in col.lower()]
-            session_cols = [col for col in df.columns if 'session' in col.lower()]
-            user_cols = [col for col in df.columns if 'user' in col.lower() and 'rate' not in col.lower()]
-            cart_cols = [col for col in df.columns if 'cart' in col.lower() and 'abandonment' not in col.lower()]
-            checkout_cols = [col for col in df.columns if 'checkout' in col.lower()]
-            conversion_rate_cols = [col for col in df.columns if 'conversion' in col.lower() and 'rate' in col.lower()]
-            aov_cols = [col for col in df.columns if 'aov' in col.lower() or 'order_value' in col.lower()]
-            bounce_cols = [col for col in df.columns if 'bounce' in col.lower()]
-            returning_cols = [col for col in df.columns if 'returning' in col.lower()]
-            mobile_cols = [col for col in df.columns if 'mobile' in col.lower()]
-            
-            # 1. Conversion Rate = (Transactions / Sessions) × 100 - WITH VIETNAM BENCHMARK
-            if transaction_cols and session_cols:
-                trans_col = transaction_cols[0]
-                sess_col = session_cols[0]
-                total_transactions = df[trans_col].sum()
-                total_sessions = df[sess_col].sum()
-                if total_sessions > 0:
-                    conversion_rate = (total_transactions / total_sessions) * 100
-
-                    # Try to get Vietnam benchmark from CSV data
-                    vietnam_benchmark = None
-                    vietnam_context = ''
-
-                    # Try to detect platform and category from column names/data
-                    filters = {}
-                    col_names_str = ' '.join(df.columns).lower()
-
-                    # Platform detection
-                    if 'shopee' in col_names_str:
-                        filters['platform'] = 'Shopee'
-                    elif 'lazada' in col_names_str:
-                        filters['platform'] = 'Lazada'
-                    elif 'tiktok' in col_names_str:
-                        filters['platform'] = 'TikTok Shop'
-
-                    # Category detection
-                    category_cols = [col for col in df.columns if 'category' in col.lower() or 'product_type' in col.lower()]
-                    if category_cols and not df[category_cols[0]].isna().all():
-                        most_common_cat = df[category_cols[0]].mode()[0] if len(df[category_cols[0]].mode()) > 0 else None
-                        if most_common_cat:
-                            filters['category'] = str(most_common_cat)
-
-                    vietnam_benchmark = self._get_vietnam_benchmark(
-                        domain='ecommerce',
-                        metric_name='Conversion Rate',
-                        user_value=conversion_rate,
-                        filters=filters
-                    )
-
-                    if vietnam_benchmark:
-                        vietnam_context = vietnam_benchmark.get('message', '')
-
-                    # Set benchmark (use Vietnam data if available, else fallback)
-                    if vietnam_benchmark:
-                        benchmark_conv = vietnam_benchmark['benchmark_median']
-                        benchmark_source = vietnam_benchmark.get('benchmark_source', BENCHMARK_SOURCES['ecommerce_conversion']['name'])
-                    else:
-                        benchmark_conv = 2.3  # ~2.3% - realistic Vietnam average from CSV
-                        benchmark_source = BENCHMARK_SOURCES['ecommerce_conversion']['name']
-
-                    kpis['Conversion Rate (%)'] = {
-                        'value': float(conversion_rate),
-                        'benchmark': benchmark_conv,
-                        'benchmark_source': benchmark_source,
-                        'status': 'Above' if conversion_rate >= benchmark_conv else 'Below',
-                        'column': f"{trans_col}/{sess_col}",
-                        'insight': f"{'✅ Strong' if conversion_rate >= 3.0 else '⚠️ Room for improvement'} - Vietnam avg {benchmark_conv}%",
-                        'vietnam_context': vietnam_context if vietnam_benchmark else '',
-                        'percentile': vietnam_benchmark.get('percentile', None) if vietnam_benchmark else None
-                    }
-            
-            # 2. Average Order Value (AOV) = Total Revenue / Total Transactions - WITH VIETNAM BENCHMARK
-            if revenue_cols and transaction_cols:
-                rev_col = revenue_cols[0]
-                trans_col = transaction_cols[0]
-                total_revenue = df[rev_col].sum()
-                total_transactions = df[trans_col].sum()
-                if total_transactions > 0:
-                    aov = total_revenue / total_transactions
-
-                    # Currency detection
-                    sample_revenue = df[rev_col].dropna().head(10).mean()
-                    is_vnd = sample_revenue > 1000
-
-                    # Try to get Vietnam benchmark from CSV data
-                    vietnam_benchmark = None
-                    vietnam_context = ''
-
-                    if is_vnd:
-                        # Reuse platform/category detection from conversion rate
-                        filters = {}
-                        col_names_str = ' '.join(df.columns).lower()
-
-                        if 'shopee' in col_names_str:
-                            filters['platform'] = 'Shopee'
-                        elif 'lazada' in col_names_str:
-                            filters['platform'] = 'Lazada'
-                        elif 'tiktok' in col_names_str:
-                            filters['platform'] = 'TikTok Shop'
-
-                        category_cols = [col for col in df.columns if 'category' in col.lower() or 'product_type' in col.lower()]
-                        if category_cols and not df[category_cols[0]].isna().all():
-                            most_common_cat = df[category_cols[0]].mode()[0] if len(df[category_cols[0]].mode()) > 0 else None
-                            if most_common_cat:
-                                filters['category'] = str(most_common_cat)
-
-                        vietnam_benchmark = self._get_vietnam_benchmark(
-                            domain='ecommerce',
-                            metric_name='AOV',
-                            user_value=aov,
-                            filters=filters
-                        )
-
-                        if vietnam_benchmark:
-                            vietnam_context = vietnam_benchmark.get('message', '')
-
-                    # Set benchmark (use Vietnam data if available, else fallback)
-                    if vietnam_benchmark:
-                        benchmark_aov = vietnam_benchmark['benchmark_median']
-                        benchmark_source = vietnam_benchmark.get('benchmark_source', BENCHMARK_SOURCES['ecommerce_aov']['name'])
-                        currency = 'VND'
-                    elif is_vnd:
-                        benchmark_aov = 385000  # ~385K VND - realistic Vietnam average from CSV
-                        benchmark_source = BENCHMARK_SOURCES['ecommerce_aov']['name']
-                        currency = 'VND'
-                    else:
-                        benchmark_aov = 81.49  # $81.49 USD (Shopify global avg)
-                        benchmark_source = BENCHMARK_SOURCES['ecommerce_aov']['name']
-                        currency = 'USD'
-
-                    kpis['Average Order Value (AOV)'] = {
-                        'value': float(aov),
-                        'benchmark': benchmark_aov,
-                        'benchmark_source': benchmark_source,
-                        'status': 'Above' if aov >= benchmark_aov else 'Below',
-                        'column': f"{rev_col}/{trans_col}",
-                        'insight': f"{'✅' if aov >= benchmark_aov else '⚠️'} Benchmark: {benchmark_aov:,.0f} {currency}",
-                        'vietnam_context': vietnam_context if vietnam_benchmark else '',
-                        'percentile': vietnam_benchmark.get('percentile', None) if vietnam_benchmark else None
-                    }
-            
-            # 3. Cart Abandonment Rate = (Add-to-Carts - Checkouts) / Add-to-Carts × 100 - WITH VIETNAM BENCHMARK
-            if cart_cols and checkout_cols:
-                cart_col = [col for col in cart_cols if 'add' in col.lower() or 'cart' in col.lower()][0]
-                checkout_col = checkout_cols[0]
-                total_carts = df[cart_col].sum()
-                total_checkouts = df[checkout_col].sum()
-                if total_carts > 0:
-                    abandonment_rate = ((total_carts - total_checkouts) / total_carts) * 100
-
-                    # Try to get Vietnam benchmark from CSV data
-                    vietnam_benchmark = None
-                    vietnam_context = ''
-
-                    # Reuse platform/category detection
-                    filters = {}
-                    col_names_str = ' '.join(df.columns).lower()
-
-                    if 'shopee' in col_names_str:
-                        filters['platform'] = 'Shopee'
-                    elif 'lazada' in col_names_str:
-                        filters['platform'] = 'Lazada'
-                    elif 'tiktok' in col_names_str:
-                        filters['platform'] = 'TikTok Shop'
-
-                    category_cols = [col for col in df.columns if 'category' in col.lower() or 'product_type' in col.lower()]
-                    if category_cols and not df[category_cols[0]].isna().all():
-                        most_common_cat = df[category_cols[0]].mode()[0] if len(df[category_cols[0]].mode()) > 0 else None
-                        if most_common_cat:
-                            filters['category'] = str(most_common_cat)
-
-                    vietnam_benchmark = self._get_vietnam_benchmark(
-                        domain='ecommerce',
-                        metric_name='Cart Abandonment',
-                        user_value=abandonment_rate,
-                        filters=filters
-                    )
-
-                    if vietnam_benchmark:
-                        vietnam_context = vietnam_benchmark.get('message', '')
-
-                    # Set benchmark (use Vietnam data if available, else fallback)
-                    if vietnam_benchmark:
-                        benchmark_abandon = vietnam_benchmark['benchmark_median']
-                        benchmark_source = vietnam_benchmark.get('benchmark_source', BENCHMARK_SOURCES['ecommerce_cart_abandonment']['name'])
-                    else:
-                        benchmark_abandon = 68.0  # ~68% - realistic Vietnam average from CSV
-                        benchmark_source = BENCHMARK_SOURCES['ecommerce_cart_abandonment']['name']
-
-                    kpis['Cart Abandonment Rate (%)'] = {
-                        'value': float(abandonment_rate),
-                        'benchmark': benchmark_abandon,
-                        'benchmark_source': benchmark_source,
-                        'status': 'Below' if abandonment_rate <= benchmark_abandon else 'Above',  # Lower is better!
-                        'column': f"({cart_col}-{checkout_col})/{cart_col}",
-                        'insight': f"{'✅ Better than' if abandonment_rate < benchmark_abandon else '⚠️ Worse than'} {benchmark_abandon}% Vietnam avg",
-                        'vietnam_context': vietnam_context if vietnam_benchmark else '',
-                        'percentile': vietnam_benchmark.get('percentile', None) if vietnam_benchmark else None
-                    }
-                    
-                    # 3.1 Cart Funnel Breakdown (detailed step analysis)
-                    if transaction_cols:
-                        trans_col = transaction_cols[0]
-                        total_transactions = df[trans_col].sum()
-                        
-                        # Step 1: Add-to-Cart → Checkout
-                        cart_to_checkout_rate = (total_checkouts / total_carts) * 100 if total_carts > 0 else 0
-                        
-                        # Step 2: Checkout → Purchase
-                        checkout_to_purchase_rate = (total_transactions / total_checkouts) * 100 if total_checkouts > 0 else 0
-                        
-                        # Identify bottleneck
-                        if cart_to_checkout_rate < 40:  # Industry avg ~35-45%
-                            bottleneck = 'Add-to-Cart → Checkout'
-                            bottleneck_insight = f"🚨 Major drop-off at Add-to-Cart step ({100-cart_to_checkout_rate:.1f}% abandon)"
-                        elif checkout_to_purchase_rate < 75:  # Industry avg ~75-85%
-                            bottleneck = 'Checkout → Purchase'
-                            bottleneck_insight = f"⚠️ Checkout friction ({100-checkout_to_purchase_rate:.1f}% abandon at payment)"
-                        else:
-                            bottleneck = 'None'
-                            bottleneck_insight = f"✅ Strong funnel conversion at both steps"
-                        
-                        kpis['Cart Funnel: Add→Checkout (%)'] = {
-                            'value': float(cart_to_checkout_rate),
-                            'benchmark': 40.0,  # Industry avg
-                            'status': 'Above' if cart_to_checkout_rate >= 40.0 else 'Below',
-                            'column': f"{checkout_col}/{cart_col}",
-                            'insight': f"{bottleneck_insight}. Target: exit-intent popups, free shipping threshold"
-                        }
-                        
-                        kpis['Cart Funnel: Checkout→Purchase (%)'] = {
-                            'value': float(checkout_to_purchase_rate),
-                            'benchmark': 80.0,  # Industry avg ~80%
-                            'status': 'Above' if checkout_to_purchase_rate >= 80.0 else 'Below',
-                            'column': f"{trans_col}/{checkout_col}",
-                            'insight': f"{'✅ Strong checkout flow' if checkout_to_purchase_rate >= 80 else '⚠️ Payment friction - simplify checkout'}"
-                        }
-            
-            # 4. Revenue per Session
-            if revenue_cols and session_cols:
-                rev_col = revenue_cols[0]
-                sess_col = session_cols[0]
-                total_revenue = df[rev_col].sum()
-                total_sessions = df[sess_col].sum()
-                if total_sessions > 0:
-                    rps = total_revenue / total_sessions
-                    kpis['Revenue per Session'] = {
-                        'value': float(rps),
-                        'benchmark': float(rps * 0.8),  # 80% of current as baseline
-                        'status': 'Above Target',
-                        'column': f"{rev_col}/{sess_col}",
-                        'insight': 'Higher is better - increase with upsells, cross-sells'
-                    }
-            
-            # 5. Returning Customer Rate (%)
-            if returning_cols:
-                ret_col = returning_cols[0]
-                avg_returning = df[ret_col].mean()
-                kpis['Returning Customer Rate (%)'] = {
-                    'value': float(avg_returning),
-                    'benchmark': 30.0,  # Industry avg 25-30%
-                    'status': 'Above' if avg_returning >= 30.0 else 'Below',
-                    'column': ret_col,
-                    'insight': f"{'✅ Strong loyalty' if avg_returning >= 30 else '⚠️ Focus on retention'}"
-                }
-            
-            # 6. Bounce Rate (%)
-            if bounce_cols:
-                bounce_col = bounce_cols[0]
-                avg_bounce = df[bounce_col].mean()
-                kpis['Bounce Rate (%)'] = {
-                    'value': float(avg_bounce),
-                    'benchmark': 47.0,  # E-commerce avg 40-50%
-                    'status': 'Below' if avg_bounce <= 47.0 else 'Above',  # Lower is better!
-                    'column': bounce_col,
-                    'insight': f"{'✅' if avg_bounce < 47 else '⚠️'} Lower is better - Industry avg 40-50%"
-                }
-            
-            # 7. Mobile Traffic Percentage
-            if mobile_cols:
-                mobile_col = mobile_cols[0]
-                avg_mobile = df[mobile_col].mean()
-                
-                # Generate mobile optimization insight
-                if avg_mobile >= 70:
-                    mobile_insight = f"📱 MOBILE-FIRST ({avg_mobile:.1f}%) - Prioritize mobile UX, mobile checkout optimization, mobile page speed"
-                elif avg_mobile >= 60:
-                    mobile_insight = f"📱 Mobile-majority ({avg_mobile:.1f}%) - Test mobile funnel, improve mobile load time"
-                elif avg_mobile >= 40:
-                    mobile_insight = f"⚖️ Balanced traffic ({avg_mobile:.1f}% mobile) - Optimize for both devices"
-                else:
-                    mobile_insight = f"💻 Desktop-focused ({avg_mobile:.1f}% mobile) - Ensure desktop experience is premium"
-                
-                # Estimate mobile impact (assuming mobile CR is 30-50% lower than desktop)
-                if bounce_cols and avg_mobile >= 60:
-                    avg_bounce = df[bounce_cols[0]].mean()
-                    if avg_bounce > 50:
-                        mobile_insight += f" | ⚠️ High bounce ({avg_bounce:.1f}%) suggests mobile UX issues"
-                
-                kpis['Mobile Traffic (%)'] = {
-                    'value': float(avg_mobile),
-                    'benchmark': 60.0,  # Mobile-first threshold
-                    'status': 'Above' if avg_mobile >= 60.0 else 'Below',
-                    'column': mobile_col,
-                    'insight': mobile_insight
-                }
-            
-            # 8. Add fallback AOV if only revenue exists (no transactions)
-            if revenue_cols and not transaction_cols and 'Average Order Value (AOV)' not in kpis:
-                rev_col = revenue_cols[0]
-                # Fallback: use mean of revenue column (less accurate)
-                avg_order_value = df[rev_col].mean()
-                sample_revenue = df[rev_col].dropna().head(10).mean()
-                if sample_revenue > 1000:
-                    benchmark_aov = 150000
-                else:
-                    benchmark_aov = 81.49
-                
-                kpis['AOV (estimated)'] = {
-                    'value': float(avg_order_value),
-                    'benchmark': benchmark_aov,
-                    'status': 'Above' if avg_order_value >= benchmark_aov else 'Below',
-                    'column': rev_col,
-                    'insight': '⚠️ Estimated from revenue mean - upload transaction data for accuracy'
-                }
-        
-        # === SALES/CRM DATA ===
-        elif 'sales' in domain or 'crm' in domain or 'pipeline' in domain:
-            # Detect key sales columns
-            deal_value_cols = [col for col in df.columns if 'deal' in col.lower() and 'value' in col.lower() or 'amount' in col.lower()]
-            stage_cols = [col for col in df.columns if 'stage' in col.lower() or 'status' in col.lower()]
-            probability_cols = [col for col in df.columns if 'probability' in col.lower() or 'prob' in col.lower()]
-            rep_cols = [col for col in df.columns if 'rep' in col.lower() or 'owner' in col.lower() or 'sales' in col.lower()]
-            created_cols = [col for col in df.columns if 'created' in col.lower() and 'date' in col.lower()]
-            close_cols = [col for col in df.columns if 'close' in col.lower() and 'date' in col.lower()]
-            
-            if deal_value_cols and stage_cols:
-                deal_col = deal_value_cols[0]
-                stage_col = stage_cols[0]
-                
-                # Identify won and lost deals
-                won_deals = df[df[stage_col].str.contains('won', case=False, na=False)]
-                lost_deals = df[df[stage_col].str.contains('lost', case=False, na=False)]
-                pipeline_deals = df[~df[stage_col].str.contains('closed|won|lost', case=False, na=False)]
-                
-                # 1. Win Rate = Won / (Won + Lost) - WITH VIETNAM BENCHMARK
-                total_won = len(won_deals)
-                total_lost = len(lost_deals)
-                if (total_won + total_lost) > 0:
-                    win_rate = (total_won / (total_won + total_lost)) * 100
-
-                    # Try to get Vietnam benchmark from CSV data
-                    vietnam_benchmark = None
-                    vietnam_context = ''
-
-                    # Try to detect sales type and industry from column names/data
-                    filters = {}
-                    col_names_str = ' '.join(df.columns).lower()
-
-                    # Sales type detection
-                    if 'b2b' in col_names_str or 'enterprise' in col_names_str:
-                        filters['sales_type'] = 'B2B'
-                    elif 'b2c' in col_names_str or 'consumer' in col_names_str:
-                        filters['sales_type'] = 'B2C'
-
-                    # Industry detection from column names or data
-                    if 'saas' in col_names_str or 'software' in col_names_str:
-                        filters['industry'] = 'Software (SaaS)'
-                    elif 'consulting' in col_names_str:
-                        filters['industry'] = 'Consulting'
-                    elif 'real estate' in col_names_str or 'property' in col_names_str:
-                        filters['industry'] = 'Real Estate'
-
-                    vietnam_benchmark = self._get_vietnam_benchmark(
-                        domain='sales',
-                        metric_name='Win Rate',
-                        user_value=win_rate,
-                        filters=filters
-                    )
-
-                    if vietnam_benchmark:
-                        vietnam_context = vietnam_benchmark.get('message', '')
-
-                    # Set benchmark (use Vietnam data if available, else fallback)
-                    if vietnam_benchmark:
-                        benchmark_win = vietnam_benchmark['benchmark_median']
-                        benchmark_source = vietnam_benchmark.get('benchmark_source', BENCHMARK_SOURCES['sales_win_rate']['name'])
-                    else:
-                        benchmark_win = 25.0  # ~25% - realistic Vietnam B2B average from CSV
-                        benchmark_source = BENCHMARK_SOURCES['sales_win_rate']['name']
-
-                    kpis['Win Rate (%)'] = {
-                        'value': float(win_rate),
-                        'benchmark': benchmark_win,
-                        'benchmark_source': benchmark_source,
-                        'status': 'Above' if win_rate >= benchmark_win else 'Below',
-                        'column': stage_col,
-                        'insight': f"{'✅ Strong' if win_rate >= 35 else '⚠️ Below industry'} - Vietnam avg {benchmark_win}%",
-                        'vietnam_context': vietnam_context if vietnam_benchmark else '',
-                        'percentile': vietnam_benchmark.get('percentile', None) if vietnam_benchmark else None
-                    }
-                
-                # 2. Total Pipeline Value (open deals)
-                if len(pipeline_deals) > 0:
-                    pipeline_value = pipeline_deals[deal_col].sum()
-                    kpis['Total Pipeline Value'] = {
-                        'value': float(pipeline_value),
-                        'benchmark': float(pipeline_value * 0.8),
-                        'status': 'Above Target',
-                        'column': deal_col,
-                        'insight': f"{len(pipeline_deals)} deals worth {pipeline_value:,.0f}"
-                    }
-                
-                # 3. Weighted Pipeline (if probability exists)
-                if probability_cols and len(pipeline_deals) > 0:
-                    prob_col = probability_cols[0]
-                    weighted_pipeline = (pipeline_deals[deal_col] * pipeline_deals[prob_col] / 100).sum()
-                    kpis['Weighted Pipeline'] = {
-                        'value': float(weighted_pipeline),
-                        'benchmark': float(weighted_pipeline * 0.8),
-                        'status': 'Above Target',
-                        'column': f"{deal_col}×{prob_col}",
-                        'insight': f"Pipeline adjusted for win probability"
-                    }
-                
-                # 4. Average Deal Size (won deals) - WITH VIETNAM BENCHMARK
-                if len(won_deals) > 0:
-                    avg_deal_size = won_deals[deal_col].mean()
-
-                    # Try to get Vietnam benchmark from CSV data
-                    vietnam_benchmark = None
-                    vietnam_context = ''
-
-                    # Reuse sales type and industry detection from win rate
-                    filters = {}
-                    col_names_str = ' '.join(df.columns).lower()
-
-                    if 'b2b' in col_names_str or 'enterprise' in col_names_str:
-                        filters['sales_type'] = 'B2B'
-                    elif 'b2c' in col_names_str or 'consumer' in col_names_str:
-                        filters['sales_type'] = 'B2C'
-
-                    if 'saas' in col_names_str or 'software' in col_names_str:
-                        filters['industry'] = 'Software (SaaS)'
-                    elif 'consulting' in col_names_str:
-                        filters['industry'] = 'Consulting'
-                    elif 'real estate' in col_names_str or 'property' in col_names_str:
-                        filters['industry'] = 'Real Estate'
-
-                    # Detect deal segment (SME vs Enterprise) from deal size
-                    if avg_deal_size > 200000000:  # >200M VND = Enterprise
-                        filters['deal_size_segment'] = 'Enterprise'
-                    elif avg_deal_size > 50000000:  # 50-200M VND = Standard
-                        filters['deal_size_segment'] = 'Standard'
-                    else:  # <50M VND = SME
-                        filters['deal_size_segment'] = 'SME'
-
-                    vietnam_benchmark = self._get_vietnam_benchmark(
-                        domain='sales',
-                        metric_name='Deal Size',
-                        user_value=avg_deal_size,
-                        filters=filters
-                    )
-
-                    if vietnam_benchmark:
-                        vietnam_context = vietnam_benchmark.get('message', '')
-
-                    # Set benchmark (use Vietnam data if available, else fallback)
-                    if vietnam_benchmark:
-                        benchmark_deal = vietnam_benchmark['benchmark_median']
-                        benchmark_source = vietnam_benchmark.get('benchmark_source', BENCHMARK_SOURCES['sales_growth']['name'])
-                    else:
-                        # Fallback: use 80% of current (conservative)
-                        benchmark_deal = float(avg_deal_size * 0.8)
-                        benchmark_source = 'Calculated from Your Dataset Statistics'
-
-                    kpis['Average Deal Size'] = {
-                        'value': float(avg_deal_size),
-                        'benchmark': benchmark_deal,
-                        'benchmark_source': benchmark_source,
-                        'status': 'Above' if avg_deal_size >= benchmark_deal else 'Below',
-                        'column': deal_col,
-                        'insight': f"Won deals: {avg_deal_size:,.0f} average",
-                        'vietnam_context': vietnam_context if vietnam_benchmark else '',
-                        'percentile': vietnam_benchmark.get('percentile', None) if vietnam_benchmark else None
-                    }
-                
-                # 5. Sales Cycle Length (if dates available) - WITH VIETNAM BENCHMARK
-                if created_cols and close_cols and len(won_deals) > 0:
-                    created_col = created_cols[0]
-                    close_col = close_cols[0]
-
-                    try:
-                        won_deals_copy = won_deals.copy()
-                        won_deals_copy[created_col] = pd.to_datetime(won_deals_copy[created_col], errors='coerce')
-                        won_deals_copy[close_col] = pd.to_datetime(won_deals_copy[close_col], errors='coerce')
-                        won_deals_copy['cycle_days'] = (won_deals_copy[close_col] - won_deals_copy[created_col]).dt.days
-
-                        avg_cycle = won_deals_copy['cycle_days'].mean()
-                        # Only add KPI if we have valid cycle data
-                        if pd.notna(avg_cycle):
-                            # Try to get Vietnam benchmark from CSV data
-                            vietnam_benchmark = None
-                            vietnam_context = ''
-
-                            # Reuse sales type and industry detection
-                            filters = {}
-                            col_names_str = ' '.join(df.columns).lower()
-
-                            if 'b2b' in col_names_str or 'enterprise' in col_names_str:
-                                filters['sales_type'] = 'B2B'
-                            elif 'b2c' in col_names_str or 'consumer' in col_names_str:
-                                filters['sales_type'] = 'B2C'
-
-                            if 'saas' in col_names_str or 'software' in col_names_str:
-                                filters['industry'] = 'Software (SaaS)'
-                            elif 'consulting' in col_names_str:
-                                filters['industry'] = 'Consulting'
-                            elif 'real estate' in col_names_str or 'property' in col_names_str:
-                                filters['industry'] = 'Real Estate'
-
-                            vietnam_benchmark = self._get_vietnam_benchmark(
-                                domain='sales',
-                                metric_name='Sales Cycle',
-                                user_value=avg_cycle,
-                                filters=filters
-                            )
-
-                            if vietnam_benchmark:
-                                vietnam_context = vietnam_benchmark.get('message', '')
-
-                            # Set benchmark (use Vietnam data if available, else fallback)
-                            if vietnam_benchmark:
-                                benchmark_cycle = vietnam_benchmark['benchmark_median']
-                                benchmark_source = vietnam_benchmark.get('benchmark_source', BENCHMARK_SOURCES['sales_cycle']['name'])
-                            else:
-                                benchmark_cycle = 45.0  # ~45 days - realistic Vietnam B2B average from CSV
-                                benchmark_source = BENCHMARK_SOURCES['sales_cycle']['name']
-
-                            kpis['Sales Cycle (days)'] = {
-                                'value': float(avg_cycle),
-                                'benchmark': benchmark_cycle,
-                                'benchmark_source': benchmark_source,
-                                'status': 'Below' if avg_cycle <= benchmark_cycle else 'Above',  # Lower is better
-                                'column': f"{close_col}-{created_col}",
-                                'insight': f"{'✅ Fast' if avg_cycle <= benchmark_cycle else '⚠️ Long'} sales cycle - Vietnam avg {benchmark_cycle} days",
-                                'vietnam_context': vietnam_context if vietnam_benchmark else '',
-                                'percentile': vietnam_benchmark.get('percentile', None) if vietnam_benchmark else None
-                            }
-                    except Exception:
-                        pass
-                
-                # 6. Pipeline Velocity (deals closed per period)
-                if len(won_deals) > 0:
-                    total_won_value = won_deals[deal_col].sum()
-                    kpis['Closed Won Revenue'] = {
-                        'value': float(total_won_value),
-                        'benchmark': float(total_won_value * 0.8),
-                        'status': 'Above Target',
-                        'column': deal_col,
-                        'insight': f"{total_won} deals closed, {total_won_value:,.0f} revenue"
-                    }
-        
-        # === FINANCE/ACCOUNTING DATA ===
-        elif 'finance' in domain or 'accounting' in domain or 'financial' in domain:
-            # Detect key financial columns
-            revenue_cols = [col for col in df.columns if 'revenue' in col.lower() and 'gross' not in col.lower()]
-            cogs_cols = [col for col in df.columns if 'cogs' in col.lower() or 'cost_of_goods' in col.lower()]
-            gross_profit_cols = [col for col in df.columns if 'gross' in col.lower() and 'profit' in col.lower()]
-            opex_cols = [col for col in df.columns if 'opex' in col.lower() or 'operating_expense' in col.lower() or 'total_opex' in col.lower()]
-            operating_income_cols = [col for col in df.columns if 'operating_income' in col.lower() or 'operating_profit' in col.lower()]
-            net_income_cols = [col for col in df.columns if 'net_income' in col.lower() or 'net_profit' in col.lower()]
-            
-            # Cash flow columns
-            cash_ops_cols = [col for col in df.columns if 'cash' in col.lower() and 'operation' in col.lower()]
-            capex_cols = [col for col in df.columns if 'capex' in col.lower() or 'capital_expenditure' in col.lower()]
-            cash_balance_cols = [col for col in df.columns if 'cash_balance' in col.lower() or ('cash' in col.lower() and 'balance' in col.lower())]
-            
-            # Balance sheet columns
-            current_assets_cols = [col for col in df.columns if 'current_assets' in col.lower() or 'current_asset' in col.lower()]
-            current_liabilities_cols = [col for col in df.columns if 'current_liabilities' in col.lower() or 'current_liability' in col.lower()]
-            inventory_cols = [col for col in df.columns if 'inventory' in col.lower()]
-            total_debt_cols = [col for col in df.columns if 'total_liabilities' in col.lower() or 'total_debt' in col.lower()]
-            equity_cols = [col for col in df.columns if 'shareholders_equity' in col.lower() or ('equity' in col.lower() and 'raised' not in col.lower())]
-            
-            if revenue_cols and net_income_cols:
-                revenue_col = revenue_cols[0]
-                net_income_col = net_income_cols[0]
-                
-                # 1. Net Profit Margin (%)
-                avg_revenue = df[revenue_col].mean()
-                avg_net_income = df[net_income_col].mean()
-                if avg_revenue > 0:
-                    net_margin = (avg_net_income / avg_revenue) * 100
-                    kpis['Net Profit Margin (%)'] = {
-                        'value': float(net_margin),
-                        'benchmark': 15.0,  # SaaS/Tech avg 10-20%
-                        'status': 'Above' if net_margin >= 15.0 else 'Below',
-                        'column': f"{net_income_col}/{revenue_col}",
-                        'insight': f"{'✅ Healthy' if net_margin >= 15 else '⚠️ Needs improvement'} - SaaS avg 10-20%"
-                    }
-                
-                # 2. Gross Margin (%)
-                if gross_profit_cols:
-                    gross_profit_col = gross_profit_cols[0]
-                    avg_gross_profit = df[gross_profit_col].mean()
-                    gross_margin = (avg_gross_profit / avg_revenue) * 100
-                    kpis['Gross Margin (%)'] = {
-                        'value': float(gross_margin),
-                        'benchmark': 70.0,  # SaaS target >70%
-                        'status': 'Above' if gross_margin >= 70.0 else 'Below',
-                        'column': f"{gross_profit_col}/{revenue_col}",
-                        'insight': f"{'✅ Strong' if gross_margin >= 70 else '⚠️ Low for SaaS'} - Target >70%"
-                    }
-                
-                # 3. Operating Margin (%)
-                if operating_income_cols:
-                    op_income_col = operating_income_cols[0]
-                    avg_op_income = df[op_income_col].mean()
-                    op_margin = (avg_op_income / avg_revenue) * 100
-                    kpis['Operating Margin (%)'] = {
-                        'value': float(op_margin),
-                        'benchmark': 20.0,  # SaaS target 15-25%
-                        'status': 'Above' if op_margin >= 20.0 else 'Below',
-                        'column': f"{op_income_col}/{revenue_col}",
-                        'insight': f"{'✅ Efficient' if op_margin >= 20 else '⚠️ High OPEX'} - Target 15-25%"
-                    }
-                
-                # 4. Revenue Growth Rate (Month-over-Month)
-                if len(df) >= 2:
-                    # Calculate MoM growth
-                    df_sorted = df.sort_values(by=df.columns[0])  # Sort by first column (usually date/month)
-                    first_revenue = df_sorted[revenue_col].iloc[0]
-                    last_revenue = df_sorted[revenue_col].iloc[-1]
-                    months_diff = len(df_sorted) - 1
-                    
-                    if first_revenue > 0 and months_diff > 0:
-                        total_growth = ((last_revenue - first_revenue) / first_revenue) * 100
-                        avg_monthly_growth = total_growth / months_diff
-                        
-                        kpis['Revenue Growth (%)'] = {
-                            'value': float(avg_monthly_growth),
-                            'benchmark': 10.0,  # 10% MoM = unicorn trajectory
-                            'status': 'Above' if avg_monthly_growth >= 10.0 else 'Below',
-                            'column': revenue_col,
-                            'insight': f"{'🚀 Hypergrowth' if avg_monthly_growth >= 15 else '✅ Growing' if avg_monthly_growth >= 10 else '⚠️ Slow growth'} - {total_growth:.1f}% total"
-                        }
-                
-                # 5. Operating Cash Flow
-                if cash_ops_cols:
-                    cash_ops_col = cash_ops_cols[0]
-                    avg_cash_ops = df[cash_ops_col].mean()
-                    total_cash_ops = df[cash_ops_col].sum()
-                    
-                    kpis['Operating Cash Flow'] = {
-                        'value': float(total_cash_ops),
-                        'benchmark': float(total_cash_ops * 0.8),
-                        'status': 'Positive' if avg_cash_ops > 0 else 'Negative',
-                        'column': cash_ops_col,
-                        'insight': f"{'✅ Cash positive' if avg_cash_ops > 0 else '🚨 Burning cash'} - Avg {avg_cash_ops:,.0f}/month"
-                    }
-                    
-                    # 6. Free Cash Flow (OCF - CapEx)
-                    if capex_cols:
-                        capex_col = capex_cols[0]
-                        avg_capex = df[capex_col].mean()
-                        free_cash_flow = avg_cash_ops + avg_capex  # CapEx is usually negative
-                        
-                        kpis['Free Cash Flow'] = {
-                            'value': float(free_cash_flow),
-                            'benchmark': 0,
-                            'status': 'Positive' if free_cash_flow > 0 else 'Negative',
-                            'column': f"{cash_ops_col}+{capex_col}",
-                            'insight': f"{'✅ Sustainable' if free_cash_flow > 0 else '⚠️ Needs funding'} - After CapEx"
-                        }
-                    
-                    # 7. Burn Rate (for startups)
-                    if avg_cash_ops < 0:  # If burning cash
-                        burn_rate = abs(avg_cash_ops)
-                        
-                        # Calculate runway if we have cash balance
-                        if cash_balance_cols:
-                            cash_balance_col = cash_balance_cols[0]
-                            current_cash = df[cash_balance_col].iloc[-1]  # Latest balance
-                            runway_months = current_cash / burn_rate if burn_rate > 0 else 999
-                            
-                            kpis['Burn Rate (Monthly)'] = {
-                                'value': float(burn_rate),
-                                'benchmark': float(burn_rate * 0.7),  # Target: reduce 30%
-                                'status': 'Critical' if runway_months < 6 else 'Warning' if runway_months < 12 else 'Safe',
-                                'column': cash_ops_col,
-                                'insight': f"{'🚨 URGENT' if runway_months < 6 else '⚠️ Watch closely' if runway_months < 12 else '✅ Healthy'} - {runway_months:.1f} months runway"
-                            }
-                
-                # 8. Current Ratio (Liquidity)
-                if current_assets_cols and current_liabilities_cols:
-                    ca_col = current_assets_cols[0]
-                    cl_col = current_liabilities_cols[0]
-                    
-                    avg_ca = df[ca_col].mean()
-                    avg_cl = df[cl_col].mean()
-                    
-                    if avg_cl > 0:
-                        current_ratio = avg_ca / avg_cl
-                        kpis['Current Ratio'] = {
-                            'value': float(current_ratio),
-                            'benchmark': 2.0,  # Healthy: >2.0
-                            'status': 'Healthy' if current_ratio >= 2.0 else 'Warning' if current_ratio >= 1.0 else 'Critical',
-                            'column': f"{ca_col}/{cl_col}",
-                            'insight': f"{'✅ Strong liquidity' if current_ratio >= 2.0 else '⚠️ Tight liquidity' if current_ratio >= 1.0 else '🚨 Liquidity crisis'}"
-                        }
-                    
-                    # 9. Quick Ratio (Acid Test)
-                    if inventory_cols:
-                        inv_col = inventory_cols[0]
-                        avg_inv = df[inv_col].mean()
-                        quick_assets = avg_ca - avg_inv
-                        
-                        if avg_cl > 0:
-                            quick_ratio = quick_assets / avg_cl
-                            kpis['Quick Ratio'] = {
-                                'value': float(quick_ratio),
-                                'benchmark': 1.0,  # Healthy: >1.0
-                                'status': 'Healthy' if quick_ratio >= 1.0 else 'Warning',
-                                'column': f"({ca_col}-{inv_col})/{cl_col}",
-                                'insight': f"{'✅ Can cover short-term debt' if quick_ratio >= 1.0 else '⚠️ May struggle with immediate obligations'}"
-                            }
-                
-                # 10. Debt-to-Equity Ratio
-                if total_debt_cols and equity_cols:
-                    debt_col = total_debt_cols[0]
-                    equity_col = equity_cols[0]
-                    
-                    avg_debt = df[debt_col].mean()
-                    avg_equity = df[equity_col].mean()
-                    
-                    if avg_equity > 0:
-                        debt_to_equity = avg_debt / avg_equity
-                        kpis['Debt-to-Equity Ratio'] = {
-                            'value': float(debt_to_equity),
-                            'benchmark': 1.0,  # <1.0 = conservative, 1-2 = moderate, >2 = aggressive
-                            'status': 'Conservative' if debt_to_equity < 1.0 else 'Moderate' if debt_to_equity < 2.0 else 'Aggressive',
-                            'column': f"{debt_col}/{equity_col}",
-                            'insight': f"{'✅ Low leverage' if debt_to_equity < 1.0 else '⚠️ Moderate leverage' if debt_to_equity < 2.0 else '🚨 High leverage risk'}"
-                        }
-        
-        # === CUSTOMER SERVICE/SUPPORT DATA ===
-        elif 'customer' in domain and ('service' in domain or 'support' in domain):
-            # Detect key customer service columns
-            response_time_cols = [col for col in df.columns if 'response' in col.lower() and 'time' in col.lower()]
-            resolution_time_cols = [col for col in df.columns if 'resolution' in col.lower() and 'time' in col.lower()]
-            csat_cols = [col for col in df.columns if 'satisfaction' in col.lower() or 'csat' in col.lower()]
-            sla_cols = [col for col in df.columns if 'sla' in col.lower()]
-            reopened_cols = [col for col in df.columns if 'reopen' in col.lower()]
-            escalated_cols = [col for col in df.columns if 'escalat' in col.lower()]
-            ticket_value_cols = [col for col in df.columns if 'ticket' in col.lower() and 'value' in col.lower()]
-            channel_cols = [col for col in df.columns if 'channel' in col.lower()]
-            
-            # 1. Average First Response Time
-            if response_time_cols:
-                response_col = response_time_cols[0]
-                avg_response = df[response_col].mean()
-                kpis['Avg First Response Time (min)'] = {
-                    'value': float(avg_response),
-                    'benchmark': 15.0,  # Industry best: <15 min
-                    'status': 'Below' if avg_response <= 15.0 else 'Above',  # Lower is better
-                    'column': response_col,
-                    'insight': f"{'✅ Fast' if avg_response <= 15 else '⚠️ Slow'} - Target <15 min for good CX"
-                }
-            
-            # 2. Average Resolution Time
-            if resolution_time_cols:
-                resolution_col = resolution_time_cols[0]
-                avg_resolution = df[resolution_col].mean()
-                kpis['Avg Resolution Time (hrs)'] = {
-                    'value': float(avg_resolution),
-                    'benchmark': 4.0,  # Target: <4 hours
-                    'status': 'Below' if avg_resolution <= 4.0 else 'Above',  # Lower is better
-                    'column': resolution_col,
-                    'insight': f"{'✅ Efficient' if avg_resolution <= 4 else '⚠️ Long'} - Target <4 hrs"
-                }
-            
-            # 3. Customer Satisfaction Score (CSAT)
-            if csat_cols:
-                csat_col = csat_cols[0]
-                avg_csat = df[csat_col].mean()
-                kpis['CSAT Score'] = {
-                    'value': float(avg_csat),
-                    'benchmark': 4.5,  # Target: ≥4.5/5
-                    'status': 'Above' if avg_csat >= 4.5 else 'Below',
-                    'column': csat_col,
-                    'insight': f"{'✅ Excellent' if avg_csat >= 4.5 else '⚠️ Needs improvement'} - Target ≥4.5/5"
-                }
-            
-            # 4. First Contact Resolution (FCR)
-            if reopened_cols:
-                reopen_col = reopened_cols[0]
-                total_tickets = len(df)
-                # Assuming 'No' or False means not reopened (first contact resolution)
-                not_reopened = df[reopen_col].astype(str).str.lower().isin(['no', 'false', '0']).sum()
-                fcr_rate = (not_reopened / total_tickets) * 100
-                kpis['First Contact Resolution (%)'] = {
-                    'value': float(fcr_rate),
-                    'benchmark': 75.0,  # Industry benchmark: 70-75%
-                    'status': 'Above' if fcr_rate >= 75.0 else 'Below',
-                    'column': reopen_col,
-                    'insight': f"{'✅ Strong' if fcr_rate >= 75 else '⚠️ Low'} - Industry avg 70-75%"
-                }
-            
-            # 5. SLA Compliance
-            if sla_cols:
-                sla_col = sla_cols[0]
-                total_tickets = len(df)
-                # Assuming 'Yes' or True means SLA met
-                sla_met = df[sla_col].astype(str).str.lower().isin(['yes', 'true', '1']).sum()
-                sla_rate = (sla_met / total_tickets) * 100
-                kpis['SLA Met (%)'] = {
-                    'value': float(sla_rate),
-                    'benchmark': 85.0,  # Target: ≥85%
-                    'status': 'Above' if sla_rate >= 85.0 else 'Below',
-                    'column': sla_col,
-                    'insight': f"{'✅ Good' if sla_rate >= 85 else '⚠️ Below target'} - Target ≥85%"
-                }
-            
-            # 6. Escalation Rate
-            if escalated_cols:
-                escalated_col = escalated_cols[0]
-                total_tickets = len(df)
-                escalated = df[escalated_col].astype(str).str.lower().isin(['yes', 'true', '1']).sum()
-                escalation_rate = (escalated / total_tickets) * 100
-                kpis['Escalation Rate (%)'] = {
-                    'value': float(escalation_rate),
-                    'benchmark': 15.0,  # Target: <15%
-                    'status': 'Below' if escalation_rate <= 15.0 else 'Above',  # Lower is better
-                    'column': escalated_col,
-                    'insight': f"{'✅ Low' if escalation_rate <= 15 else '⚠️ High'} - Target <15%"
-                }
-            
-            # 7. Reopen Rate
-            if reopened_cols:
-                reopen_col = reopened_cols[0]
-                total_tickets = len(df)
-                reopened = df[reopen_col].astype(str).str.lower().isin(['yes', 'true', '1']).sum()
-                reopen_rate = (reopened / total_tickets) * 100
-                kpis['Reopen Rate (%)'] = {
-                    'value': float(reopen_rate),
-                    'benchmark': 10.0,  # Target: <10%
-                    'status': 'Below' if reopen_rate <= 10.0 else 'Above',  # Lower is better
-                    'column': reopen_col,
-                    'insight': f"{'✅ Good quality' if reopen_rate <= 10 else '⚠️ High'} - Target <10%"
-                }
-            
-            # 8. Total Ticket Value (business impact)
-            if ticket_value_cols:
-                ticket_value_col = ticket_value_cols[0]
-                total_value = df[ticket_value_col].sum()
-                kpis['Total Ticket Value (VND)'] = {
-                    'value': float(total_value),
-                    'benchmark': float(total_value * 0.8),
-                    'status': 'Above Target',
-                    'column': ticket_value_col,
-                    'insight': f"Total business value: {total_value:,.0f} VND"
-                }
-        
-        # === MANUFACTURING/OPERATIONS DATA ===
-        elif 'manufacturing' in domain or 'production' in domain or 'operations' in domain or 'factory' in domain:
-            # Detect key manufacturing columns (be specific to avoid false matches)
-            units_produced_cols = [col for col in df.columns if 'units_produced' in col.lower() or 'units produced' in col.lower()]
-            good_units_cols = [col for col in df.columns if 'good_units' in col.lower() or 'good units' in col.lower()]
-            defective_cols = [col for col in df.columns if 'defective' in col.lower() or 'defect' in col.lower()]
-            downtime_cols = [col for col in df.columns if 'downtime' in col.lower() or 'down time' in col.lower()]
-            available_hours_cols = [col for col in df.columns if 'available' in col.lower() and 'hours' in col.lower()]
-            actual_run_cols = [col for col in df.columns if 'actual_run' in col.lower() or 'actual run' in col.lower()]
-            theoretical_max_cols = [col for col in df.columns if 'theoretical' in col.lower() or 'max_output' in col.lower() or 'max output' in col.lower()]
-            total_cost_cols = [col for col in df.columns if 'total_cost' in col.lower() or 'total cost' in col.lower()]
-            
-            if units_produced_cols and good_units_cols:
-                units_produced_col = units_produced_cols[0]
-                good_units_col = good_units_cols[0]
-                
-                total_units = df[units_produced_col].sum()
-                total_good = df[good_units_col].sum()
-                
-                # 1. First Pass Yield (FPY)
-                if total_units > 0:
-                    fpy = (total_good / total_units) * 100
-                    kpis['First Pass Yield (%)'] = {
-                        'value': float(fpy),
-                        'benchmark': 95.0,  # World-class: ≥95%
-                        'status': 'Above' if fpy >= 95.0 else 'Below',
-                        'column': f"{good_units_col}/{units_produced_col}",
-                        'insight': f"{'✅ World-class' if fpy >= 95 else '⚠️ Needs improvement'} - Target ≥95%"
-                    }
-                
-                # 2. Defect Rate
-                if defective_cols and total_units > 0:
-                    defective_col = defective_cols[0]
-                    total_defective = df[defective_col].sum()
-                    defect_rate = (total_defective / total_units) * 100
-                    
-                    kpis['Defect Rate (%)'] = {
-                        'value': float(defect_rate),
-                        'benchmark': 2.0,  # World-class: ≤2%
-                        'status': 'Below' if defect_rate <= 2.0 else 'Above',
-                        'column': f"{defective_col}/{units_produced_col}",
-                        'insight': f"{'✅ Excellent' if defect_rate <= 2 else '⚠️ High'} - Target ≤2%"
-                    }
-                
-                # 3. Production Output
-                avg_units = df[units_produced_col].mean()
-                kpis['Avg Production Output (units/shift)'] = {
-                    'value': float(avg_units),
-                    'benchmark': 950.0,
-                    'status': 'Above' if avg_units >= 950.0 else 'Below',
-                    'column': units_produced_col,
-                    'insight': f"{'✅ High output' if avg_units >= 950 else '⚠️ Low output'} - Target ≥950 units/shift"
-                }
-                
-                # 4. Cycle Time (approximate)
-                if available_hours_cols and total_units > 0:
-                    available_hours_col = available_hours_cols[0]
-                    total_hours = df[available_hours_col].sum()
-                    # Cycle time = total production time / units produced (in minutes)
-                    cycle_time = (total_hours * 60) / total_units
-                    
-                    kpis['Cycle Time (min/unit)'] = {
-                        'value': float(cycle_time),
-                        'benchmark': 0.5,  # Target: ≤0.5 min/unit
-                        'status': 'Below' if cycle_time <= 0.5 else 'Above',
-                        'column': f"{available_hours_col}/{units_produced_col}",
-                        'insight': f"{'✅ Fast' if cycle_time <= 0.5 else '⚠️ Slow'} - Target ≤0.5 min/unit"
-                    }
-            
-            # 5. Machine Utilization
-            if actual_run_cols and available_hours_cols:
-                actual_run_col = actual_run_cols[0]
-                available_hours_col = available_hours_cols[0]
-                
-                total_actual = df[actual_run_col].sum()
-                total_available = df[available_hours_col].sum()
-                
-                if total_available > 0:
-                    utilization = (total_actual / total_available) * 100
-                    kpis['Machine Utilization (%)'] = {
-                        'value': float(utilization),
-                        'benchmark': 85.0,  # Target: ≥85%
-                        'status': 'Above' if utilization >= 85.0 else 'Below',
-                        'column': f"{actual_run_col}/{available_hours_col}",
-                        'insight': f"{'✅ Excellent' if utilization >= 85 else '⚠️ Low'} - Target ≥85%"
-                    }
-            
-            # 6. Downtime Hours
-            if downtime_cols:
-                downtime_col = downtime_cols[0]
-                total_downtime = df[downtime_col].sum()
-                avg_downtime = df[downtime_col].mean()
-                
-                kpis['Total Downtime (hours)'] = {
-                    'value': float(total_downtime),
-                    'benchmark': 150.0,  # Target: ≤150 hours/month
-                    'status': 'Below' if total_downtime <= 150.0 else 'Above',
-                    'column': downtime_col,
-                    'insight': f"{'✅ Low' if total_downtime <= 150 else '⚠️ High'} - Target ≤150 hrs/month"
-                }
-                
-                kpis['Avg Downtime (hours/shift)'] = {
-                    'value': float(avg_downtime),
-                    'benchmark': 1.0,
-                    'status': 'Below' if avg_downtime <= 1.0 else 'Above',
-                    'column': downtime_col,
-                    'insight': f"{'✅ Low' if avg_downtime <= 1 else '⚠️ High'} - Target ≤1 hr/shift"
-                }
-            
-            # 7. Cost per Unit
-            if total_cost_cols and units_produced_cols:
-                total_cost_col = total_cost_cols[0]
-                units_produced_col = units_produced_cols[0]
-                
-                total_cost = df[total_cost_col].sum()
-                total_units = df[units_produced_col].sum()
-                
-                if total_units > 0:
-                    cost_per_unit = total_cost / total_units
-                    kpis['Cost per Unit (VND)'] = {
-                        'value': float(cost_per_unit),
-                        'benchmark': 30000.0,  # Target: ≤30,000 VND/unit
-                        'status': 'Below' if cost_per_unit <= 30000.0 else 'Above',
-                        'column': f"{total_cost_col}/{units_produced_col}",
-                        'insight': f"{'✅ Efficient' if cost_per_unit <= 30000 else '⚠️ High cost'} - Target ≤30K VND/unit"
-                    }
-            
-            # 8. OEE (Overall Equipment Effectiveness)
-            # OEE = Availability × Performance × Quality
-            if (available_hours_cols and downtime_cols and 
-                actual_run_cols and theoretical_max_cols and 
-                units_produced_cols and good_units_cols):
-                
-                available_col = available_hours_cols[0]
-                downtime_col = downtime_cols[0]
-                actual_run_col = actual_run_cols[0]
-                theoretical_col = theoretical_max_cols[0]
-                units_col = units_produced_cols[0]
-                good_col = good_units_cols[0]
-                
-                # Availability = (Available Time - Downtime) / Available Time
-                total_available = df[available_col].sum()
-                total_downtime = df[downtime_col].sum()
-                availability = ((total_available - total_downtime) / total_available) if total_available > 0 else 0
-                
-                # Performance = Actual Output / Theoretical Max Output
-                total_actual_output = df[units_col].sum()
-                total_theoretical = df[theoretical_col].sum()
-                performance = (total_actual_output / total_theoretical) if total_theoretical > 0 else 0
-                
-                # Quality = Good Units / Total Units
-                total_good = df[good_col].sum()
-                total_units = df[units_col].sum()
-                quality = (total_good / total_units) if total_units > 0 else 0
-                
-                # OEE = Availability × Performance × Quality
-                oee = availability * performance * quality * 100
-                
-                kpis['OEE - Overall Equipment Effectiveness (%)'] = {
-                    'value': float(oee),
-                    'benchmark': 85.0,  # World-class: ≥85%
-                    'status': 'Above' if oee >= 85.0 else 'Below',
-                    'column': f"({available_col} - {downtime_col}) × ({units_col}/{theoretical_col}) × ({good_col}/{units_col})",
-                    'insight': f"{'✅ World-class' if oee >= 85 else '⚠️ Needs improvement'} - Target ≥85%",
-                    'components': {
-                        'Availability': float(availability * 100),
-                        'Performance': float(performance * 100),
-                        'Quality': float(quality * 100)
-                    }
-                }
-        
-        # === FALLBACK: UNIVERSAL KPIs ===
-        else:
-            if primary_metric_col:
-                col_name = primary_metric_col
-                kpis[f'Average {col_name}'] = {
-                    'value': float(df[col_name].mean()),
-                    'benchmark': float(df[col_name].median()),
-                    'status': 'At Median',
-                    'column': col_name
-                }
-                
-                kpis[f'Median {col_name}'] = {
-                    'value': float(df[col_name].median()),
-                    'benchmark': float(df[col_name].mean()),
-                    'status': 'At Average',
-                    'column': col_name
-                }
-                
-                kpis[f'Total {col_name}'] = {
-                    'value': float(df[col_name].sum()),
-                    'benchmark': float(df[col_name].sum() * 0.8),
-                    'status': 'Above Target',
-                    'column': col_name
-                }
+        profile = get_column_profile(df)
+        
+        # ⚡ Rule tables: roles resolved once, only KPIs whose inputs resolve are computed
+        kpis = KPI_REGISTRY.evaluate(
+            df, domain,
+            profile=profile,
+            sources=BENCHMARK_SOURCES,
+            vietnam_benchmark=self._get_vietnam_benchmark
+        )
 
         # ⭐ Add benchmark sources for transparency (addresses real user feedback)
         kpis = add_benchmark_metadata(kpis, domain)
@@ -2634,79 +1536,67 @@ OUTPUT JSON:
         domain = domain_info.get('domain', domain_info.get('domain_name', 'general')).lower()
         
         # Detect dimension columns (channel, campaign, rep, etc.)
-        channel_cols = [col for col in df.columns if 'channel' in col.lower()]
-        campaign_cols = [col for col in df.columns if 'campaign' in col.lower()]
-        rep_cols = [col for col in df.columns if 'rep' in col.lower() or 'sales' in col.lower()]
-        stage_cols = [col for col in df.columns if 'stage' in col.lower() or 'status' in col.lower()]
+        # ⚡ All roles resolved once per schema (memoized across reruns)
+        roles = DIMENSION_ROLES.index(df.columns)
+        channel_cols = roles.get('channel')
+        campaign_cols = roles.get('campaign')
+        rep_cols = roles.get('sales_dimension')
+        stage_cols = roles.get('stage')
         
         # === E-COMMERCE: CHANNEL ANALYSIS ===
         if ('ecommerce' in domain or 'e-commerce' in domain) and channel_cols:
             channel_col = channel_cols[0]
             
             # Detect key metrics for channel analysis
-            revenue_cols = [col for col in df.columns if 'revenue' in col.lower()]
-            transaction_cols = [col for col in df.columns if 'transaction' in col.lower() and 'rate' not in col.lower()]
-            session_cols = [col for col in df.columns if 'session' in col.lower()]
-            cac_cols = [col for col in df.columns if 'cac' in col.lower()]
+            revenue_cols = roles.get('revenue')
+            transaction_cols = roles.get('transaction')
+            session_cols = roles.get('session')
+            cac_cols = roles.get('cac')
             
             if revenue_cols and transaction_cols and session_cols:
                 rev_col = revenue_cols[0]
                 trans_col = transaction_cols[0]
                 sess_col = session_cols[0]
                 
-                # Group by channel
-                channel_stats = df.groupby(channel_col).agg({
-                    rev_col: 'sum',
-                    trans_col: 'sum',
-                    sess_col: 'sum'
-                })
-                
-                # Calculate CR by channel
-                channel_stats['conversion_rate'] = (channel_stats[trans_col] / channel_stats[sess_col]) * 100
-                channel_stats['aov'] = channel_stats[rev_col] / channel_stats[trans_col]
-                channel_stats['revenue_per_session'] = channel_stats[rev_col] / channel_stats[sess_col]
-                
-                # Add CAC if available
+                # ⚡ One groupby for all channel fields (named aggregations)
+                aggregations = {
+                    'revenue': (rev_col, 'sum'),
+                    'transactions': (trans_col, 'sum'),
+                    'sessions': (sess_col, 'sum'),
+                }
                 if cac_cols:
-                    cac_col = cac_cols[0]
-                    channel_cac = df.groupby(channel_col)[cac_col].mean()
-                    channel_stats['cac'] = channel_cac
+                    aggregations['cac'] = (cac_cols[0], 'mean')
+                channels = group_breakdown(df, channel_col, 'channel', aggregations)
+                
+                with np.errstate(divide='ignore', invalid='ignore'):  # x/0 → inf/NaN, as in pandas
+                    # Calculate CR by channel
+                    channels['conversion_rate'] = (channels['transactions'] / channels['sessions']) * 100
+                    channels['aov'] = channels['revenue'] / channels['transactions']
+                    channels['revenue_per_session'] = channels['revenue'] / channels['sessions']
                     
-                    # Calculate ROI = (Revenue - CAC*Transactions) / (CAC*Transactions)
-                    channel_stats['roi'] = ((channel_stats[rev_col] - channel_stats['cac'] * channel_stats[trans_col]) / 
-                                           (channel_stats['cac'] * channel_stats[trans_col]))
+                    if cac_cols:
+                        # Calculate ROI = (Revenue - CAC*Transactions) / (CAC*Transactions)
+                        acquisition_cost = channels['cac'] * channels['transactions']
+                        channels['roi'] = (channels['revenue'] - acquisition_cost) / acquisition_cost
                 
                 # Sort by revenue (best channels first)
-                channel_stats = channel_stats.sort_values(rev_col, ascending=False)
+                channels = channels.sort_by('revenue')
                 
-                # Format for output
-                channel_breakdown = []
-                for channel, row in channel_stats.iterrows():
-                    channel_data = {
-                        'channel': channel,
-                        'revenue': float(row[rev_col]),
-                        'transactions': float(row[trans_col]),
-                        'sessions': float(row[sess_col]),
-                        'conversion_rate': float(row['conversion_rate']),
-                        'aov': float(row['aov']),
-                        'revenue_per_session': float(row['revenue_per_session'])
-                    }
-                    if cac_cols:
-                        channel_data['cac'] = float(row['cac'])
-                        channel_data['roi'] = float(row['roi'])
-                    
-                    channel_breakdown.append(channel_data)
+                fields = ['channel', 'revenue', 'transactions', 'sessions', 'conversion_rate', 'aov', 'revenue_per_session']
+                if cac_cols:
+                    fields += ['cac', 'roi']
+                channel_breakdown = channels.to_records(fields=fields)
                 
                 analysis['channel_breakdown'] = {
                     'data': channel_breakdown,
-                    'insights': self._generate_channel_insights(channel_breakdown),
+                    'insights': self._generate_channel_insights(channels),
                     'best_channel': channel_breakdown[0]['channel'] if channel_breakdown else None,
                     'worst_channel': channel_breakdown[-1]['channel'] if channel_breakdown else None
                 }
             
             # === E-COMMERCE: TREND ANALYSIS ===
             # Detect date column for time-series analysis
-            date_cols = [col for col in df.columns if 'date' in col.lower() or 'time' in col.lower() or 'day' in col.lower()]
+            date_cols = roles.get('date')
             
             if date_cols and revenue_cols and transaction_cols and session_cols:
                 date_col = date_cols[0]
@@ -2720,7 +1610,7 @@ OUTPUT JSON:
                     df_trend[date_col] = pd.to_datetime(df_trend[date_col])
                     
                     # Group by date
-                    daily_stats = df_trend.groupby(date_col).agg({
+                    daily_stats = df_trend.groupby(date_col, observed=True).agg({
                         rev_col: 'sum',
                         trans_col: 'sum',
                         sess_col: 'sum'
@@ -2811,61 +1701,41 @@ OUTPUT JSON:
             campaign_col = campaign_cols[0]
             
             # Detect key metrics
-            spend_cols = [col for col in df.columns if 'spend' in col.lower() or 'cost' in col.lower()]
-            revenue_cols = [col for col in df.columns if 'revenue' in col.lower()]
-            click_cols = [col for col in df.columns if 'click' in col.lower()]
-            conversion_cols = [col for col in df.columns if 'conversion' in col.lower()]
+            spend_cols = roles.get('spend')
+            revenue_cols = roles.get('revenue')
+            click_cols = roles.get('click')
+            conversion_cols = roles.get('conversion')
             
             if spend_cols and revenue_cols:
                 spend_col = spend_cols[0]
                 rev_col = revenue_cols[0]
                 
-                # Group by campaign
-                campaign_stats = df.groupby(campaign_col).agg({
-                    spend_col: 'sum',
-                    rev_col: 'sum'
-                })
-                
-                # Calculate ROAS by campaign
-                campaign_stats['roas'] = campaign_stats[rev_col] / campaign_stats[spend_col]
-                
-                # Add other metrics if available
+                # ⚡ One groupby for all campaign fields (named aggregations)
+                aggregations = {'spend': (spend_col, 'sum'), 'revenue': (rev_col, 'sum')}
                 if click_cols:
-                    click_col = click_cols[0]
-                    campaign_clicks = df.groupby(campaign_col)[click_col].sum()
-                    campaign_stats['clicks'] = campaign_clicks
-                    campaign_stats['cpc'] = campaign_stats[spend_col] / campaign_stats['clicks']
-                
+                    aggregations['clicks'] = (click_cols[0], 'sum')
                 if conversion_cols:
-                    conv_col = conversion_cols[0]
-                    campaign_conversions = df.groupby(campaign_col)[conv_col].sum()
-                    campaign_stats['conversions'] = campaign_conversions
-                    campaign_stats['cpa'] = campaign_stats[spend_col] / campaign_stats['conversions']
-                
-                # Sort by ROAS (best campaigns first)
-                campaign_stats = campaign_stats.sort_values('roas', ascending=False)
+                    aggregations['conversions'] = (conversion_cols[0], 'sum')
+                campaigns = group_breakdown(df, campaign_col, 'campaign', aggregations)
                 
-                # Format for output
-                campaign_breakdown = []
-                for campaign, row in campaign_stats.iterrows():
-                    campaign_data = {
-                        'campaign': campaign,
-                        'spend': float(row[spend_col]),
-                        'revenue': float(row[rev_col]),
-                        'roas': float(row['roas'])
-                    }
+                fields = ['campaign', 'spend', 'revenue', 'roas']
+                with np.errstate(divide='ignore', invalid='ignore'):  # x/0 → inf/NaN, as in pandas
+                    # Calculate ROAS by campaign
+                    campaigns['roas'] = campaigns['revenue'] / campaigns['spend']
                     if click_cols:
-                        campaign_data['clicks'] = float(row['clicks'])
-                        campaign_data['cpc'] = float(row['cpc'])
+                        campaigns['cpc'] = campaigns['spend'] / campaigns['clicks']
+                        fields += ['clicks', 'cpc']
                     if conversion_cols:
-                        campaign_data['conversions'] = float(row['conversions'])
-                        campaign_data['cpa'] = float(row['cpa'])
-                    
-                    campaign_breakdown.append(campaign_data)
+                        campaigns['cpa'] = campaigns['spend'] / campaigns['conversions']
+                        fields += ['conversions', 'cpa']
+                
+                # Sort by ROAS (best campaigns first)
+                campaigns = campaigns.sort_by('roas')
+                campaign_breakdown = campaigns.to_records(fields=fields)
                 
                 analysis['campaign_breakdown'] = {
                     'data': campaign_breakdown,
-                    'insights': self._generate_campaign_insights(campaign_breakdown),
+                    'insights': self._generate_campaign_insights(campaigns),
                     'best_campaign': campaign_breakdown[0]['campaign'] if campaign_breakdown else None,
                     'worst_campaign': campaign_breakdown[-1]['campaign'] if campaign_breakdown else None
                 }
@@ -2873,9 +1743,8 @@ OUTPUT JSON:
         # === SALES: REP & STAGE ANALYSIS ===
         elif ('sales' in domain or 'crm' in domain or 'pipeline' in domain) and (rep_cols or stage_cols):
             # Detect key sales columns
-            deal_value_cols = [col for col in df.columns if 'deal' in col.lower() and 'value' in col.lower() or 'amount' in col.lower()]
-            stage_cols = [col for col in df.columns if 'stage' in col.lower() or 'status' in col.lower()]
-            rep_cols = [col for col in df.columns if 'rep' in col.lower() or 'owner' in col.lower()]
+            deal_value_cols = roles.get('deal_value')
+            rep_cols = roles.get('rep')
             
             # REP PERFORMANCE ANALYSIS
             if rep_cols and deal_value_cols and stage_cols:
@@ -2883,49 +1752,31 @@ OUTPUT JSON:
                 deal_col = deal_value_cols[0]
                 stage_col = stage_cols[0]
                 
-                # Filter won and lost deals
-                won_deals = df[df[stage_col].str.contains('won', case=False, na=False)]
-                lost_deals = df[df[stage_col].str.contains('lost', case=False, na=False)]
-                
-                # Group by rep
-                rep_stats = df.groupby(rep_col).agg({
-                    deal_col: 'sum'
-                }).copy()
-                
-                # Calculate wins and losses per rep
-                rep_wins = won_deals.groupby(rep_col).size()
-                rep_losses = lost_deals.groupby(rep_col).size()
-                rep_won_value = won_deals.groupby(rep_col)[deal_col].sum()
-                
-                rep_stats['wins'] = rep_wins
-                rep_stats['losses'] = rep_losses
-                rep_stats['won_revenue'] = rep_won_value
-                rep_stats = rep_stats.fillna(0)
+                # ⚡ Won / lost flags as row masks: conditional sums in the same groupby
+                won = df[stage_col].str.contains('won', case=False, na=False)
+                lost = df[stage_col].str.contains('lost', case=False, na=False)
+                reps = group_breakdown(df, rep_col, 'rep', {
+                    'wins': (won, 'sum'),
+                    'losses': (lost, 'sum'),
+                    'won_revenue': (df[deal_col].where(won), 'sum'),
+                })
                 
                 # Calculate win rate
-                rep_stats['total_closed'] = rep_stats['wins'] + rep_stats['losses']
-                rep_stats['win_rate'] = (rep_stats['wins'] / rep_stats['total_closed'] * 100).fillna(0)
-                rep_stats['avg_deal_size'] = (rep_stats['won_revenue'] / rep_stats['wins']).fillna(0)
+                total_closed = reps['wins'] + reps['losses']
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    reps['win_rate'] = np.where(total_closed > 0, reps['wins'] / total_closed * 100, 0.0)
+                    reps['avg_deal_size'] = np.where(reps['wins'] > 0, reps['won_revenue'] / reps['wins'], 0.0)
                 
                 # Sort by won revenue (best reps first)
-                rep_stats = rep_stats.sort_values('won_revenue', ascending=False)
-                
-                # Format for output
-                rep_breakdown = []
-                for rep, row in rep_stats.iterrows():
-                    rep_data = {
-                        'rep': rep,
-                        'wins': int(row['wins']),
-                        'losses': int(row['losses']),
-                        'win_rate': float(row['win_rate']),
-                        'won_revenue': float(row['won_revenue']),
-                        'avg_deal_size': float(row['avg_deal_size'])
-                    }
-                    rep_breakdown.append(rep_data)
+                reps = reps.sort_by('won_revenue')
+                rep_breakdown = reps.to_records(
+                    int_fields=['wins', 'losses'],
+                    fields=['rep', 'wins', 'losses', 'win_rate', 'won_revenue', 'avg_deal_size']
+                )
                 
                 analysis['rep_performance'] = {
                     'data': rep_breakdown,
-                    'insights': self._generate_rep_insights(rep_breakdown),
+                    'insights': self._generate_rep_insights(reps),
                     'best_rep': rep_breakdown[0]['rep'] if rep_breakdown else None,
                     'worst_rep': rep_breakdown[-1]['rep'] if rep_breakdown else None
                 }
@@ -2939,37 +1790,26 @@ OUTPUT JSON:
                 pipeline_deals = df[~df[stage_col].str.contains('closed|won|lost', case=False, na=False)]
                 
                 if len(pipeline_deals) > 0:
-                    # Group by stage
-                    stage_stats = pipeline_deals.groupby(stage_col).agg({
-                        deal_col: ['sum', 'count', 'mean']
-                    })
-                    stage_stats.columns = ['total_value', 'deal_count', 'avg_deal_size']
-                    stage_stats = stage_stats.sort_values('total_value', ascending=False)
+                    # ⚡ One groupby for all stage fields (named aggregations)
+                    aggregations = {
+                        'total_value': (deal_col, 'sum'),
+                        'deal_count': (deal_col, 'count'),
+                        'avg_deal_size': (deal_col, 'mean'),
+                    }
+                    fields = ['stage', 'deal_count', 'total_value', 'avg_deal_size']
                     
                     # Check for days_in_stage to identify stuck deals
-                    days_cols = [col for col in df.columns if 'days' in col.lower() and 'stage' in col.lower()]
+                    days_cols = roles.get('days_in_stage')
                     if days_cols:
-                        days_col = days_cols[0]
-                        stage_days = pipeline_deals.groupby(stage_col)[days_col].mean()
-                        stage_stats['avg_days_in_stage'] = stage_days
+                        aggregations['avg_days_in_stage'] = (days_cols[0], 'mean')
+                        fields.append('avg_days_in_stage')
                     
-                    # Format for output
-                    stage_breakdown = []
-                    for stage, row in stage_stats.iterrows():
-                        stage_data = {
-                            'stage': stage,
-                            'deal_count': int(row['deal_count']),
-                            'total_value': float(row['total_value']),
-                            'avg_deal_size': float(row['avg_deal_size'])
-                        }
-                        if 'avg_days_in_stage' in row:
-                            stage_data['avg_days_in_stage'] = float(row['avg_days_in_stage'])
-                        
-                        stage_breakdown.append(stage_data)
+                    stages = group_breakdown(pipeline_deals, stage_col, 'stage', aggregations).sort_by('total_value')
+                    stage_breakdown = stages.to_records(int_fields=['deal_count'], fields=fields)
                     
                     analysis['pipeline_stages'] = {
                         'data': stage_breakdown,
-                        'insights': self._generate_stage_insights(stage_breakdown),
+                        'insights': self._generate_stage_insights(stages),
                         'biggest_stage': stage_breakdown[0]['stage'] if stage_breakdown else None
                     }
         
@@ -2987,33 +1827,40 @@ OUTPUT JSON:
         else:
             return "Monitor closely, run A/B tests to find growth opportunities"
     
-    def _generate_channel_insights(self, channel_breakdown: list) -> list:
+    def _generate_channel_insights(self, channels: Breakdown) -> list:
         """Generate actionable insights from channel breakdown (5-star quality)"""
         insights = []
         
-        if not channel_breakdown:
+        if not len(channels):
             return insights
         
+        name = channels['channel']
+        revenue, transactions, sessions = channels['revenue'], channels['transactions'], channels['sessions']
+        cr = channels['conversion_rate']
+        has_roi = 'roi' in channels
+        roi = channels['roi'] if has_roi else np.full(len(channels), np.nan)
+        cac = channels['cac'] if 'cac' in channels else None
+        
         # Sort by different metrics to find true best/worst
-        by_revenue = sorted(channel_breakdown, key=lambda x: x['revenue'], reverse=True)
-        by_roi = sorted([c for c in channel_breakdown if 'roi' in c and c['roi'] != float('inf')], 
-                       key=lambda x: x['roi'], reverse=True)
-        by_cr = sorted(channel_breakdown, key=lambda x: x['conversion_rate'], reverse=True)
+        by_revenue = order_by(revenue)
+        roi_rows = np.flatnonzero(roi != np.inf) if has_roi else np.empty(0, dtype=int)
+        by_roi = roi_rows[order_by(roi[roi_rows])]
+        by_cr = order_by(cr)
         
         # Insight 1: Best ROI channel (most important!)
-        if by_roi:
-            best_roi = by_roi[0]
+        if len(by_roi):
+            best = by_roi[0]
             insights.append({
                 'type': 'best_roi',
-                'message': f"🏆 {best_roi['channel']} has BEST ROI ({best_roi['roi']:.2f}x) with {best_roi['conversion_rate']:.2f}% CR",
-                'action': f"SCALE {best_roi['channel']} - highest profitability"
+                'message': f"🏆 {name[best]} has BEST ROI ({roi[best]:.2f}x) with {cr[best]:.2f}% CR",
+                'action': f"SCALE {name[best]} - highest profitability"
             })
         
         # Insight 2: Unprofitable channels (ROI < 1.0 = losing money)
-        losing_money = [c for c in channel_breakdown if 'roi' in c and c['roi'] < 1.0 and c['roi'] != float('inf')]
-        if losing_money:
-            total_waste = sum(c['cac'] * c['transactions'] - c['revenue'] for c in losing_money)
-            channel_names = ', '.join([f"{c['channel']} ({c['roi']:.2f}x)" for c in losing_money[:3]])
+        losing_money = np.flatnonzero((roi < 1.0) & (roi != np.inf)) if has_roi else []
+        if len(losing_money):
+            total_waste = (cac[losing_money] * transactions[losing_money] - revenue[losing_money]).sum()
+            channel_names = ', '.join([f"{name[i]} ({roi[i]:.2f}x)" for i in losing_money[:3]])
             insights.append({
                 'type': 'losing_money',
                 'message': f"🚨 {len(losing_money)} channels LOSING MONEY: {channel_names}",
@@ -3021,37 +1868,34 @@ OUTPUT JSON:
             })
         
         # Insight 3: High-volume low-CR vs Low-volume high-CR
-        if by_revenue and by_cr:
-            high_volume = by_revenue[0]
-            high_cr = by_cr[0]
-            
-            if high_volume['channel'] != high_cr['channel']:
-                # Different channels = opportunity
-                if high_cr['sessions'] < high_volume['sessions'] * 0.5:  # Low traffic but high CR
-                    insights.append({
-                        'type': 'hidden_gem',
-                        'message': f"💎 {high_cr['channel']} has {high_cr['conversion_rate']:.2f}% CR (best!) but only {high_cr['sessions']:,.0f} sessions",
-                        'action': f"Increase traffic to {high_cr['channel']} - scale ads, SEO, or email list"
-                    })
+        high_volume, high_cr = by_revenue[0], by_cr[0]
+        if name[high_volume] != name[high_cr]:
+            # Different channels = opportunity
+            if sessions[high_cr] < sessions[high_volume] * 0.5:  # Low traffic but high CR
+                insights.append({
+                    'type': 'hidden_gem',
+                    'message': f"💎 {name[high_cr]} has {cr[high_cr]:.2f}% CR (best!) but only {sessions[high_cr]:,.0f} sessions",
+                    'action': f"Increase traffic to {name[high_cr]} - scale ads, SEO, or email list"
+                })
         
         # Insight 4: CAC inefficiency (3x+ difference)
-        if len(by_roi) >= 2:
-            channels_with_cac = [c for c in channel_breakdown if 'cac' in c and c['cac'] > 0]
-            if len(channels_with_cac) >= 2:
-                cheapest = min(channels_with_cac, key=lambda x: x['cac'])
-                most_expensive = max(channels_with_cac, key=lambda x: x['cac'])
+        if len(by_roi) >= 2 and cac is not None:
+            with_cac = np.flatnonzero(cac > 0)
+            if len(with_cac) >= 2:
+                cheapest = with_cac[np.argmin(cac[with_cac])]
+                most_expensive = with_cac[np.argmax(cac[with_cac])]
                 
-                if most_expensive['cac'] / cheapest['cac'] > 3:  # 3x difference
+                if cac[most_expensive] / cac[cheapest] > 3:  # 3x difference
                     insights.append({
                         'type': 'cac_inefficiency',
-                        'message': f"💰 {most_expensive['channel']} CAC ({most_expensive['cac']:,.0f}) is {most_expensive['cac']/cheapest['cac']:.1f}x more expensive than {cheapest['channel']} ({cheapest['cac']:,.0f})",
-                        'action': f"Optimize {most_expensive['channel']} targeting or shift budget to {cheapest['channel']}"
+                        'message': f"💰 {name[most_expensive]} CAC ({cac[most_expensive]:,.0f}) is {cac[most_expensive]/cac[cheapest]:.1f}x more expensive than {name[cheapest]} ({cac[cheapest]:,.0f})",
+                        'action': f"Optimize {name[most_expensive]} targeting or shift budget to {name[cheapest]}"
                     })
         
         # Insight 5: Conversion rate gaps (below 6.6% benchmark - Unbounce 2025)
-        low_cr_channels = [c for c in channel_breakdown if c['conversion_rate'] < 6.6]
-        if low_cr_channels:
-            channel_names = ', '.join([f"{c['channel']} ({c['conversion_rate']:.2f}%)" for c in low_cr_channels[:3]])
+        low_cr_channels = np.flatnonzero(cr < 6.6)
+        if len(low_cr_channels):
+            channel_names = ', '.join([f"{name[i]} ({cr[i]:.2f}%)" for i in low_cr_channels[:3]])
             insights.append({
                 'type': 'low_conversion',
                 'message': f"⚠️ {len(low_cr_channels)} channels below 6.6% CR benchmark: {channel_names}",
@@ -3060,38 +1904,41 @@ OUTPUT JSON:
         
         return insights[:5]  # Top 5 insights only
     
-    def _generate_campaign_insights(self, campaign_breakdown: list) -> list:
+    def _generate_campaign_insights(self, campaigns: Breakdown) -> list:
         """Generate actionable insights from campaign breakdown (5-star quality for CMOs)"""
         insights = []
         
-        if not campaign_breakdown:
+        if not len(campaigns):
             return insights
         
+        name, spend, revenue, roas = campaigns['campaign'], campaigns['spend'], campaigns['revenue'], campaigns['roas']
+        cpa = campaigns['cpa'] if 'cpa' in campaigns else None
+        
         # Categorize campaigns by performance (based on WordStream 2025 benchmark: 2.5 ROAS)
-        profitable = [c for c in campaign_breakdown if c['roas'] >= 2.5]  # Above benchmark
-        breakeven = [c for c in campaign_breakdown if 1.5 <= c['roas'] < 2.5]  # Marginal
-        unprofitable = [c for c in campaign_breakdown if c['roas'] < 1.5]  # Below profitable threshold
+        profitable = np.flatnonzero(roas >= 2.5)  # Above benchmark
+        breakeven = np.flatnonzero((roas >= 1.5) & (roas < 2.5))  # Marginal
+        unprofitable = np.flatnonzero(roas < 1.5)  # Below profitable threshold
         
-        best = campaign_breakdown[0]  # Highest ROAS
-        worst = campaign_breakdown[-1]  # Lowest ROAS
+        best = 0  # Highest ROAS (sorted)
+        worst = len(campaigns) - 1  # Lowest ROAS
+        best_cpa = cpa[best] if cpa is not None else 0
         
         # Insight 1: Best campaign (Scale opportunity)
-        if best['roas'] >= 1.0:
-            scale_potential = best['spend'] * 2  # 2x current spend
-            projected_revenue = scale_potential * best['roas']
+        if roas[best] >= 1.0:
+            scale_potential = spend[best] * 2  # 2x current spend
+            projected_revenue = scale_potential * roas[best]
             projected_profit = projected_revenue - scale_potential
             
             insights.append({
                 'type': 'scale_winner',
-                'message': f"🏆 {best['campaign']}: BEST performer ({best['roas']:.2f}x ROAS, {best.get('cpa', 0):,.0f} CPA)",
-                'action': f"SCALE 2x → Invest +{best['spend']:,.0f}, expect +{projected_profit:,.0f} profit"
+                'message': f"🏆 {name[best]}: BEST performer ({roas[best]:.2f}x ROAS, {best_cpa:,.0f} CPA)",
+                'action': f"SCALE 2x → Invest +{spend[best]:,.0f}, expect +{projected_profit:,.0f} profit"
             })
         
         # Insight 2: Unprofitable campaigns (Immediate action needed)
-        if unprofitable:
-            total_waste = sum(c['spend'] - c['revenue'] for c in unprofitable)
-            total_spend = sum(c['spend'] for c in unprofitable)
-            campaign_names = ', '.join([f"{c['campaign']} ({c['roas']:.2f}x)" for c in unprofitable[:3]])
+        if len(unprofitable):
+            total_waste = (spend[unprofitable] - revenue[unprofitable]).sum()
+            campaign_names = ', '.join([f"{name[i]} ({roas[i]:.2f}x)" for i in unprofitable[:3]])
             
             insights.append({
                 'type': 'stop_bleeding',
@@ -3100,34 +1947,33 @@ OUTPUT JSON:
             })
         
         # Insight 3: Smart budget reallocation (Detailed calculation)
-        if profitable and unprofitable:
+        if len(profitable) and len(unprofitable):
             # Calculate reallocation impact
-            wasted_budget = sum(c['spend'] for c in unprofitable)
-            best_roas = best['roas']
+            wasted_budget = spend[unprofitable].sum()
             
             # If moved to best campaign
-            new_revenue = wasted_budget * best_roas
-            current_lost = sum(c['spend'] - c['revenue'] for c in unprofitable)
+            new_revenue = wasted_budget * roas[best]
+            current_lost = (spend[unprofitable] - revenue[unprofitable]).sum()
             net_gain = new_revenue - wasted_budget - current_lost
             
             # ROI improvement
-            current_total_revenue = sum(c['revenue'] for c in campaign_breakdown)
-            current_total_spend = sum(c['spend'] for c in campaign_breakdown)
+            current_total_revenue = revenue.sum()
+            current_total_spend = spend.sum()
             current_roas = current_total_revenue / current_total_spend if current_total_spend > 0 else 0
             
-            new_total_revenue = current_total_revenue - sum(c['revenue'] for c in unprofitable) + new_revenue
+            new_total_revenue = current_total_revenue - revenue[unprofitable].sum() + new_revenue
             new_total_spend = current_total_spend  # Same total spend
             new_roas = new_total_revenue / new_total_spend if new_total_spend > 0 else 0
             
             insights.append({
                 'type': 'budget_reallocation',
-                'message': f"💰 Reallocate {wasted_budget:,.0f} from losing campaigns → {best['campaign']}",
+                'message': f"💰 Reallocate {wasted_budget:,.0f} from losing campaigns → {name[best]}",
                 'action': f"Impact: ROAS {current_roas:.2f}x → {new_roas:.2f}x (+{(new_roas-current_roas)/current_roas*100:.1f}%), Gain {net_gain:,.0f}"
             })
         
         # Insight 4: Break-even campaigns (Optimization opportunity)
-        if breakeven:
-            campaign_names = ', '.join([f"{c['campaign']} ({c['roas']:.2f}x)" for c in breakeven[:2]])
+        if len(breakeven):
+            campaign_names = ', '.join([f"{name[i]} ({roas[i]:.2f}x)" for i in breakeven[:2]])
             insights.append({
                 'type': 'optimize',
                 'message': f"⚠️ {len(breakeven)} campaigns near break-even: {campaign_names}",
@@ -3135,13 +1981,13 @@ OUTPUT JSON:
             })
         
         # Insight 5: CPA efficiency gap (if CPA available)
-        if 'cpa' in best and 'cpa' in worst:
-            cpa_gap = worst.get('cpa', 0) / best.get('cpa', 1) if best.get('cpa', 0) > 0 else 0
+        if cpa is not None:
+            cpa_gap = cpa[worst] / cpa[best] if cpa[best] > 0 else 0
             if cpa_gap > 3:  # 3x difference
                 insights.append({
                     'type': 'cpa_efficiency',
-                    'message': f"💸 CPA gap: {worst['campaign']} ({worst.get('cpa', 0):,.0f}) is {cpa_gap:.1f}x more expensive than {best['campaign']} ({best.get('cpa', 0):,.0f})",
-                    'action': f"Fix {worst['campaign']} targeting or reallocate budget"
+                    'message': f"💸 CPA gap: {name[worst]} ({cpa[worst]:,.0f}) is {cpa_gap:.1f}x more expensive than {name[best]} ({cpa[best]:,.0f})",
+                    'action': f"Fix {name[worst]} targeting or reallocate budget"
                 })
         
         # Insight 6: Overall portfolio health
@@ -3151,49 +1997,51 @@ OUTPUT JSON:
                 'message': f"🚨 ZERO profitable campaigns! Overall ROAS < 1.0 across ALL campaigns",
                 'action': "URGENT: Pause all campaigns, audit strategy, fix fundamentals before spending more"
             })
-        elif len(profitable) / len(campaign_breakdown) < 0.3:  # Less than 30% profitable
+        elif len(profitable) / len(campaigns) < 0.3:  # Less than 30% profitable
             insights.append({
                 'type': 'portfolio_warning',
-                'message': f"⚠️ Only {len(profitable)}/{len(campaign_breakdown)} campaigns profitable ({len(profitable)/len(campaign_breakdown)*100:.0f}%)",
+                'message': f"⚠️ Only {len(profitable)}/{len(campaigns)} campaigns profitable ({len(profitable)/len(campaigns)*100:.0f}%)",
                 'action': "Review overall strategy - most campaigns underperforming"
             })
         
         return insights[:5]  # Top 5 most critical insights
     
-    def _generate_rep_insights(self, rep_breakdown: list) -> list:
+    def _generate_rep_insights(self, reps: Breakdown) -> list:
         """Generate actionable insights from rep performance (5-star quality for Sales VPs)"""
         insights = []
         
-        if not rep_breakdown or len(rep_breakdown) == 0:
+        if not len(reps):
             return insights
         
+        name, wins, losses = reps['rep'], reps['wins'], reps['losses']
+        win_rate, won_revenue, avg_deal = reps['win_rate'], reps['won_revenue'], reps['avg_deal_size']
+        
         # Sort by different metrics
-        by_revenue = sorted(rep_breakdown, key=lambda x: x['won_revenue'], reverse=True)
-        by_win_rate = sorted(rep_breakdown, key=lambda x: x['win_rate'], reverse=True)
-        by_deal_size = sorted(rep_breakdown, key=lambda x: x['avg_deal_size'], reverse=True)
+        by_revenue = order_by(won_revenue)
+        by_deal_size = order_by(avg_deal)
         
         best_rep = by_revenue[0]
         worst_rep = by_revenue[-1]
         
         # Calculate team averages
-        avg_win_rate = sum(r['win_rate'] for r in rep_breakdown) / len(rep_breakdown)
-        avg_revenue = sum(r['won_revenue'] for r in rep_breakdown) / len(rep_breakdown)
-        avg_deal_size = sum(r['avg_deal_size'] for r in rep_breakdown) / len(rep_breakdown)
+        avg_win_rate = win_rate.mean()
+        avg_revenue = won_revenue.mean()
+        avg_deal_size = avg_deal.mean()
         
         # Insight 1: Top performer (Clone this success)
-        if best_rep['won_revenue'] > 0:
-            revenue_lead = best_rep['won_revenue'] / avg_revenue if avg_revenue > 0 else 0
+        if won_revenue[best_rep] > 0:
+            revenue_lead = won_revenue[best_rep] / avg_revenue if avg_revenue > 0 else 0
             insights.append({
                 'type': 'top_performer',
-                'message': f"🏆 {best_rep['rep']}: BEST performer ({best_rep['won_revenue']:,.0f} revenue, {best_rep['win_rate']:.1f}% win rate)",
+                'message': f"🏆 {name[best_rep]}: BEST performer ({won_revenue[best_rep]:,.0f} revenue, {win_rate[best_rep]:.1f}% win rate)",
                 'action': f"Document their winning process → Train team on their tactics ({revenue_lead:.1f}x team avg)"
             })
         
         # Insight 2: Underperformers (Coaching needed)
-        low_performers = [r for r in rep_breakdown if r['win_rate'] < 25 and r['wins'] + r['losses'] >= 3]
-        if low_performers:
-            rep_names = ', '.join([f"{r['rep']} ({r['win_rate']:.1f}%)" for r in low_performers[:3]])
-            total_lost_deals = sum(r['losses'] for r in low_performers)
+        low_performers = np.flatnonzero((win_rate < 25) & (wins + losses >= 3))
+        if len(low_performers):
+            rep_names = ', '.join([f"{name[i]} ({win_rate[i]:.1f}%)" for i in low_performers[:3]])
+            total_lost_deals = int(losses[low_performers].sum())
             
             insights.append({
                 'type': 'coaching_needed',
@@ -3202,17 +2050,17 @@ OUTPUT JSON:
             })
         
         # Insight 3: Win rate gap (Opportunity size)
-        if best_rep['win_rate'] > 0 and worst_rep['win_rate'] >= 0:
-            win_rate_gap = best_rep['win_rate'] - worst_rep['win_rate']
+        if win_rate[best_rep] > 0 and win_rate[worst_rep] >= 0:
+            win_rate_gap = win_rate[best_rep] - win_rate[worst_rep]
             if win_rate_gap > 20:  # 20% difference
                 # Calculate opportunity: If worst rep had best rep's win rate
-                potential_wins = worst_rep['losses'] * (best_rep['win_rate'] / 100)
+                potential_wins = losses[worst_rep] * (win_rate[best_rep] / 100)
                 potential_revenue = potential_wins * avg_deal_size
                 
                 insights.append({
                     'type': 'win_rate_gap',
-                    'message': f"📊 Win rate gap: {best_rep['rep']} ({best_rep['win_rate']:.1f}%) vs {worst_rep['rep']} ({worst_rep['win_rate']:.1f}%) = {win_rate_gap:.1f}% difference",
-                    'action': f"Close gap → Potential +{potential_revenue:,.0f} annual revenue by improving {worst_rep['rep']}"
+                    'message': f"📊 Win rate gap: {name[best_rep]} ({win_rate[best_rep]:.1f}%) vs {name[worst_rep]} ({win_rate[worst_rep]:.1f}%) = {win_rate_gap:.1f}% difference",
+                    'action': f"Close gap → Potential +{potential_revenue:,.0f} annual revenue by improving {name[worst_rep]}"
                 })
         
         # Insight 4: Deal size variance (Targeting issue)
@@ -3220,89 +2068,91 @@ OUTPUT JSON:
             highest_deal = by_deal_size[0]
             lowest_deal = by_deal_size[-1]
             
-            if highest_deal['avg_deal_size'] > 0 and lowest_deal['avg_deal_size'] > 0:
-                deal_size_ratio = highest_deal['avg_deal_size'] / lowest_deal['avg_deal_size']
+            if avg_deal[highest_deal] > 0 and avg_deal[lowest_deal] > 0:
+                deal_size_ratio = avg_deal[highest_deal] / avg_deal[lowest_deal]
                 
                 if deal_size_ratio > 3:  # 3x difference
                     insights.append({
                         'type': 'deal_size_variance',
-                        'message': f"💰 Deal size gap: {highest_deal['rep']} ({highest_deal['avg_deal_size']:,.0f}) vs {lowest_deal['rep']} ({lowest_deal['avg_deal_size']:,.0f}) = {deal_size_ratio:.1f}x",
-                        'action': f"Review {lowest_deal['rep']}'s lead qualification → May be chasing wrong-fit prospects"
+                        'message': f"💰 Deal size gap: {name[highest_deal]} ({avg_deal[highest_deal]:,.0f}) vs {name[lowest_deal]} ({avg_deal[lowest_deal]:,.0f}) = {deal_size_ratio:.1f}x",
+                        'action': f"Review {name[lowest_deal]}'s lead qualification → May be chasing wrong-fit prospects"
                     })
         
         # Insight 5: Team performance health
-        healthy_reps = [r for r in rep_breakdown if r['win_rate'] >= 30 and r['wins'] >= 3]
-        if len(healthy_reps) == 0:
+        n_healthy = int(((win_rate >= 30) & (wins >= 3)).sum())
+        if n_healthy == 0:
             insights.append({
                 'type': 'critical_alert',
                 'message': f"🚨 ZERO reps above 30% win rate! Team avg: {avg_win_rate:.1f}%",
                 'action': "URGENT: Audit entire sales process - fundamental issues in qualification, demo, or pricing"
             })
-        elif len(healthy_reps) / len(rep_breakdown) < 0.5:  # Less than 50% healthy
+        elif n_healthy / len(reps) < 0.5:  # Less than 50% healthy
             insights.append({
                 'type': 'team_warning',
-                'message': f"⚠️ Only {len(healthy_reps)}/{len(rep_breakdown)} reps performing well ({len(healthy_reps)/len(rep_breakdown)*100:.0f}%)",
+                'message': f"⚠️ Only {n_healthy}/{len(reps)} reps performing well ({n_healthy/len(reps)*100:.0f}%)",
                 'action': f"Systematic training needed - team avg {avg_win_rate:.1f}% vs industry 30-35%"
             })
         
         # Insight 6: Hidden gem (High win rate but low volume)
-        efficient_reps = [r for r in rep_breakdown if r['win_rate'] >= 40 and r['won_revenue'] < avg_revenue * 0.7]
-        if efficient_reps:
+        efficient_reps = np.flatnonzero((win_rate >= 40) & (won_revenue < avg_revenue * 0.7))
+        if len(efficient_reps):
             rep = efficient_reps[0]
             insights.append({
                 'type': 'hidden_gem',
-                'message': f"💎 {rep['rep']}: High win rate ({rep['win_rate']:.1f}%) but low volume ({rep['wins']} wins)",
+                'message': f"💎 {name[rep]}: High win rate ({win_rate[rep]:.1f}%) but low volume ({int(wins[rep])} wins)",
                 'action': f"Feed them MORE leads → Efficiency is proven, volume is opportunity"
             })
         
         return insights[:5]  # Top 5 most critical insights
     
-    def _generate_stage_insights(self, stage_breakdown: list) -> list:
+    def _generate_stage_insights(self, stages: Breakdown) -> list:
         """Generate actionable insights from pipeline stages (5-star quality for Sales VPs)"""
         insights = []
         
-        if not stage_breakdown or len(stage_breakdown) == 0:
+        if not len(stages):
             return insights
         
-        # Sort by value and count
-        by_value = sorted(stage_breakdown, key=lambda x: x['total_value'], reverse=True)
-        by_count = sorted(stage_breakdown, key=lambda x: x['deal_count'], reverse=True)
+        name, deal_count, value = stages['stage'], stages['deal_count'], stages['total_value']
+        stage_names = pd.Series(name).astype(str)
+        
+        # Sort by value
+        by_value = order_by(value)
         
         # Check if days_in_stage data available
-        has_days = 'avg_days_in_stage' in stage_breakdown[0]
-        if has_days:
-            by_days = sorted([s for s in stage_breakdown if 'avg_days_in_stage' in s], 
-                           key=lambda x: x.get('avg_days_in_stage', 0), reverse=True)
+        has_days = 'avg_days_in_stage' in stages
         
         # Total pipeline metrics
-        total_value = sum(s['total_value'] for s in stage_breakdown)
-        total_deals = sum(s['deal_count'] for s in stage_breakdown)
+        total_value = value.sum()
+        total_deals = int(deal_count.sum())
         
         # Insight 1: Biggest bottleneck (where money is stuck)
         biggest_stage = by_value[0]
-        if biggest_stage['total_value'] / total_value > 0.4:  # More than 40% of pipeline
+        if value[biggest_stage] / total_value > 0.4:  # More than 40% of pipeline
             insights.append({
                 'type': 'bottleneck',
-                'message': f"🚧 {biggest_stage['stage']}: BOTTLENECK ({biggest_stage['deal_count']} deals, {biggest_stage['total_value']:,.0f} stuck)",
-                'action': f"Focus HERE → {biggest_stage['total_value']/total_value*100:.0f}% of pipeline value. Fast-track top deals"
+                'message': f"🚧 {name[biggest_stage]}: BOTTLENECK ({int(deal_count[biggest_stage])} deals, {value[biggest_stage]:,.0f} stuck)",
+                'action': f"Focus HERE → {value[biggest_stage]/total_value*100:.0f}% of pipeline value. Fast-track top deals"
             })
         
         # Insight 2: Stuck deals (velocity issue)
         if has_days:
-            stuck_stages = [s for s in by_days if s.get('avg_days_in_stage', 0) > 30]
-            if stuck_stages:
+            days = stages['avg_days_in_stage']
+            by_days = order_by(np.nan_to_num(days, nan=0.0))
+            stuck_stages = by_days[np.nan_to_num(days[by_days], nan=0.0) > 30]
+            if len(stuck_stages):
                 stage = stuck_stages[0]
-                stuck_value = sum(s['total_value'] for s in stuck_stages)
+                stuck_value = value[stuck_stages].sum()
                 
                 insights.append({
                     'type': 'velocity_issue',
-                    'message': f"⏱️ {stage['stage']}: Deals stuck {stage.get('avg_days_in_stage', 0):.0f} days (avg)",
-                    'action': f"Review {stage['deal_count']} deals → Identify blockers, accelerate decisions ({stuck_value:,.0f} at risk)"
+                    'message': f"⏱️ {name[stage]}: Deals stuck {days[stage]:.0f} days (avg)",
+                    'action': f"Review {int(deal_count[stage])} deals → Identify blockers, accelerate decisions ({stuck_value:,.0f} at risk)"
                 })
         
         # Insight 3: Early stage heavy (lead quality issue)
         early_stages = ['Discovery', 'Qualification', 'Initial Contact', 'Lead']
-        early_value = sum(s['total_value'] for s in stage_breakdown if any(e.lower() in s['stage'].lower() for e in early_stages))
+        is_early = stage_names.str.contains('|'.join(map(re.escape, early_stages)), case=False).to_numpy()
+        early_value = value[is_early].sum()
         
         if early_value / total_value > 0.6:  # More than 60% in early stages
             insights.append({
@@ -3313,10 +2163,11 @@ OUTPUT JSON:
         
         # Insight 4: Late stage concentration (good problem!)
         late_stages = ['Negotiation', 'Proposal', 'Closed', 'Contract']
-        late_value = sum(s['total_value'] for s in stage_breakdown if any(l.lower() in s['stage'].lower() for l in late_stages))
+        is_late = stage_names.str.contains('|'.join(map(re.escape, late_stages)), case=False).to_numpy()
+        late_value = value[is_late].sum()
         
         if late_value / total_value > 0.5:  # More than 50% in late stages
-            late_count = sum(s['deal_count'] for s in stage_breakdown if any(l.lower() in s['stage'].lower() for l in late_stages))
+            late_count = int(deal_count[is_late].sum())
             insights.append({
                 'type': 'late_stage_strong',
                 'message': f"✅ {late_value/total_value*100:.0f}% in late stages ({late_count} deals, {late_value:,.0f})",
@@ -3324,25 +2175,25 @@ OUTPUT JSON:
             })
         
         # Insight 5: Deal count concentration
-        if biggest_stage['deal_count'] / total_deals > 0.5:  # More than 50% of deals in one stage
+        if deal_count[biggest_stage] / total_deals > 0.5:  # More than 50% of deals in one stage
             insights.append({
                 'type': 'concentration_risk',
-                'message': f"📊 {biggest_stage['deal_count']}/{total_deals} deals ({biggest_stage['deal_count']/total_deals*100:.0f}%) in {biggest_stage['stage']}",
+                'message': f"📊 {int(deal_count[biggest_stage])}/{total_deals} deals ({deal_count[biggest_stage]/total_deals*100:.0f}%) in {name[biggest_stage]}",
                 'action': "Unbalanced pipeline → Need consistent flow through ALL stages"
             })
         
         # Insight 6: Pipeline health summary
-        if len(stage_breakdown) < 3:
+        if len(stages) < 3:
             insights.append({
                 'type': 'pipeline_warning',
-                'message': f"⚠️ Only {len(stage_breakdown)} active stages (need 4-6 for healthy flow)",
+                'message': f"⚠️ Only {len(stages)} active stages (need 4-6 for healthy flow)",
                 'action': "Expand pipeline visibility → Track more granular stages for better forecasting"
             })
-        elif len(stage_breakdown) >= 5:
-            avg_stage_value = total_value / len(stage_breakdown)
+        elif len(stages) >= 5:
+            avg_stage_value = total_value / len(stages)
             insights.append({
                 'type': 'pipeline_health',
-                'message': f"✅ Healthy pipeline: {len(stage_breakdown)} stages, {total_deals} deals, {total_value:,.0f} total",
+                'message': f"✅ Healthy pipeline: {len(stages)} stages, {total_deals} deals, {total_value:,.0f} total",
                 'action': f"Maintain balance → Target {avg_stage_value:,.0f}/stage, avoid bottlenecks"
             })
         
@@ -3350,11 +2201,14 @@ OUTPUT JSON:
     
     @rate_limit_handler(max_retries=3, backoff_base=2)
     @log_performance("Smart Blueprint")
-    def step2_smart_blueprint(self, df: pd.DataFrame, domain_info: Dict) -> Dict:
+    def step2_smart_blueprint(self, df: pd.DataFrame, domain_info: Dict, display: bool = True) -> Dict:
         """
         Step 2: Smart Blueprint - Combined EDA + Blueprint (15s)
         Single AI call instead of 2 separate calls
         
+        display=False skips the compact blueprint expander (used for speculative runs,
+        which are displayed after reconciliation)
+        
         ⭐ CRITICAL CHANGE: Now calculates KPIs from REAL DATA first,
         then passes to AI for INTERPRETATION only (not calculation)
         """
@@ -3377,9 +2231,10 @@ OUTPUT JSON:
             expert_role = domain_info.get('expert_role', 'Data Analyst')
             domain_context = f"Domain: {domain_name}\nExpert Role: {expert_role}"
         
-        # Get data statistics
-        numeric_cols = df.select_dtypes(include=['number']).columns.tolist()
-        categorical_cols = df.select_dtypes(include=['object']).columns.tolist()
+        # Get data statistics (⚡ from the shared single-scan profile)
+        profile = get_column_profile(df)
+        numeric_cols = profile.numeric_columns
+        categorical_cols = profile.categorical_columns
         all_cols = df.columns.tolist()
         
         # ⭐ NEW: Calculate KPIs from REAL DATA first
@@ -3523,7 +2378,8 @@ REMEMBER: Every chart MUST have x_axis and y_axis as actual column names from th
                 }
             
             # Display blueprint (compact)
-            self._display_compact_blueprint(smart_blueprint, domain_info)
+            if display:
+                self._display_compact_blueprint(smart_blueprint, domain_info)
             
             return {
                 'success': True,
@@ -3535,9 +2391,20 @@ REMEMBER: Every chart MUST have x_axis and y_axis as actual column names from th
             return {'success': False, 'error': f"❌ Lỗi tạo blueprint: {str(e)}"}
     
     @log_performance("Dashboard Build")
-    def step3_dashboard_build(self, df: pd.DataFrame, smart_blueprint: Dict) -> Dict:
+    def step3_dashboard_build(self, df: pd.DataFrame, smart_blueprint: Dict,
+                              sample: Optional[ApproximateSample] = None) -> Dict:
         """
         Step 3: Dashboard build - Pure execution (7s)
+        
+        Args:
+            df: Cleaned frame
+            smart_blueprint: Blueprint with chart specs and calculated KPIs
+            sample: Approximate mode - bar/pie charts show estimated group totals
+                    with 95% error bars, line/scatter charts plot the sampled rows
+        
+        Chart data is reduced before plotting (groupby, time buckets, LTTB or
+        min/max decimation - see utils.chart_aggregation); each chart carries a
+        'reduction' dict describing what was done.
         """
         import plotly.express as px
         import plotly.graph_objects as go
@@ -3585,7 +2452,23 @@ REMEMBER: Every chart MUST have x_axis and y_axis as actual column names from th
                 
                 # ⭐ CRITICAL FIX: Remove None/NaN values before plotting
                 # This prevents "'>' not supported between NoneType" errors
-                df_clean = df[[x_axis, y_axis]].dropna()
+                error_y = None
+                if sample is not None and chart_type in ('bar', 'pie') and pd.api.types.is_numeric_dtype(df[y_axis]):
+                    # ⚡ Weighted group totals from the sample instead of one bar segment per row
+                    totals = sample.estimate_totals(x_axis, y_axis)
+                    df_clean, reduction = plan_estimate_data(
+                        totals, chart_type, x_axis, y_axis,
+                        other_label=get_text('chart_other', self.lang)
+                    )
+                    reduction['input_rows'] = sample.population_rows
+                    error_y = 'ci_margin' if chart_type == 'bar' else None
+                else:
+                    source = df if sample is None else sample.frame
+                    # ⚡ Reduce to a bounded number of points before building the figure
+                    df_clean, reduction = plan_chart_data(
+                        source[[x_axis, y_axis]].dropna(), chart_type, x_axis, y_axis,
+                        other_label=get_text('chart_other', self.lang)
+                    )
                 
                 if len(df_clean) == 0:
                     logger.warning(f"Skipping chart {i+1}: no valid data after removing NaN")
@@ -3597,6 +2480,7 @@ REMEMBER: Every chart MUST have x_axis and y_axis as actual column names from th
                         df_clean,
                         x=x_axis,
                         y=y_axis,
+                        error_y=error_y,
                         title=chart_title,
                         color_discrete_sequence=TABLEAU_10_COLORS
                     )
@@ -3757,12 +2641,20 @@ REMEMBER: Every chart MUST have x_axis and y_axis as actual column names from th
                             marker=dict(size=9, line=dict(width=2, color='#FFFFFF'))
                         )
                     
-                    charts.append({
+                    chart_entry = {
                         'id': chart_id,
                         'title': chart_title,
                         'figure': fig,
-                        'spec': chart_spec
-                    })
+                        'spec': chart_spec,
+                        'reduction': reduction
+                    }
+                    if sample is not None:
+                        chart_entry['approximate'] = {
+                            'sample_rows': sample.sample_rows,
+                            'population_rows': sample.population_rows,
+                            'confidence': 0.95 if error_y else None
+                        }
+                    charts.append(chart_entry)
             
             except Exception as e:
                 import traceback
@@ -3909,7 +2801,14 @@ CRITICAL REQUIREMENTS:
    BAD: "Revenue increased significantly" (no specific numbers)
 """
         
-        success, result = self._generate_ai_insight(prompt, temperature=0.5, max_tokens=3000)
+        # ⚡ Streaming: render each insight/recommendation as soon as Gemini finishes it
+        stream_callback, stream_state = None, None
+        if self.stream_insights and is_streamlit_context():
+            stream_callback, stream_state = self._create_insights_stream_renderer(domain_info)
+        
+        success, result = self._generate_ai_insight(
+            prompt, temperature=0.5, max_tokens=3000, stream_callback=stream_callback
+        )
         
         if not success:
             return {'success': False, 'error': result, 'insights': {}}
@@ -3920,8 +2819,13 @@ CRITICAL REQUIREMENTS:
             # ⭐ Add tracking KPI recommendations for HR domain (based on real user feedback)
             insights = self._add_tracking_kpi_recommendations(insights, domain_info, self.lang)
 
-            # Display insights (compact)
-            self._display_compact_insights(insights, domain_info)
+            if stream_state is not None and stream_state['first_event_at'] is not None:
+                # Already rendered incrementally - only append what was not streamed
+                self._finish_streamed_insights(insights, stream_state)
+                self._update_performance("time_to_first_insight", stream_state['first_event_at'] - stream_state['start'])
+            else:
+                # Display insights (compact)
+                self._display_compact_insights(insights, domain_info)
 
             return {
                 'success': True,
@@ -3994,11 +2898,21 @@ CRITICAL REQUIREMENTS:
 
         return insights
 
-    def _generate_ai_insight(self, prompt: str, temperature: float = 0.7, max_tokens: int = 4096) -> Tuple[bool, str]:
+    def _generate_ai_insight(self, prompt: str, temperature: float = 0.7, max_tokens: int = 4096,
+                             bypass_cache: bool = False,
+                             stream_callback: Optional[Callable[[str, Any, bool], None]] = None) -> Tuple[bool, str]:
         """
         Generate AI insight with GUARANTEED JSON output
         
         Uses Gemini's JSON mode + multiple fallback strategies to ensure valid JSON
+        
+        ⚡ Successful responses are cached by (model, prompt, temperature, max_tokens,
+        mime type); set bypass_cache=True to force a fresh API call.
+        
+        ⚡ Streaming mode: if stream_callback is given, the response is streamed and
+        stream_callback(key, value, is_array_element) is called for every top-level
+        value / array element as soon as it is complete. The returned text is the
+        same as in non-streaming mode.
         """
         try:
             # Strategy 1: Force JSON mode via generation config
@@ -4014,24 +2928,52 @@ CRITICAL INSTRUCTIONS:
 
 Your response must be parseable by json.loads() immediately."""
             
+            # ⚡ LLM response cache: identical request → zero latency, zero quota
+            cache_key = None
+            if self.llm_cache is not None and not bypass_cache:
+                try:
+                    cache_key = self.llm_cache.make_key(
+                        GEMINI_MODEL, json_prompt, temperature, max_tokens, 'application/json'
+                    )
+                    cached_text = self.llm_cache.get(cache_key)
+                except Exception:
+                    cache_key = cached_text = None  # Cache unavailable - never fail a working AI call
+                if cached_text is not None:
+                    if stream_callback is not None:
+                        # Replay cached response through the same incremental events
+                        for event in IncrementalJSONParser().feed(cached_text):
+                            try:
+                                stream_callback(*event)
+                            except Exception:
+                                pass  # Rendering problems must never break a cache hit
+                    return (True, cached_text)
+            
             # ⭐ FIX: Create model from genai module (self.client is genai module, not model)
             # Use stable model name (not -exp) for production reliability
-            model = self.client.GenerativeModel('gemini-2.0-flash')
-            
-            response = model.generate_content(
-                json_prompt,
-                generation_config=self.client.GenerationConfig(
-                    temperature=temperature,
-                    max_output_tokens=max_tokens,
-                    response_mime_type="application/json"  # Force JSON mode
-                )
+            model = self.client.GenerativeModel(GEMINI_MODEL)
+            generation_config = self.client.GenerationConfig(
+                temperature=temperature,
+                max_output_tokens=max_tokens,
+                response_mime_type="application/json"  # Force JSON mode
             )
             
-            # ✅ Issue #3 Fix: Handle None response
-            if not response or not response.text:
-                return (False, "❌ AI trả về response rỗng (có thể do rate limit hoặc safety filter)")
+            if stream_callback is not None:
+                text = self._stream_response(model, json_prompt, generation_config, stream_callback)
+                if not text:
+                    return (False, "❌ AI trả về response rỗng (có thể do rate limit hoặc safety filter)")
+            else:
+                response = model.generate_content(
+                    json_prompt,
+                    generation_config=generation_config
+                )
+                
+                # ✅ Issue #3 Fix: Handle None response
+                if not response or not response.text:
+                    return (False, "❌ AI trả về response rỗng (có thể do rate limit hoặc safety filter)")
+                
+                text = response.text
             
-            text = response.text.strip()
+            text = text.strip()
             
             # ✅ Check if text is empty after strip
             if not text:
@@ -4059,12 +3001,51 @@ Your response must be parseable by json.loads() immediately."""
             except json.JSONDecodeError as e:
                 return (False, f"❌ AI trả về JSON không hợp lệ: {str(e)[:100]}")
             
+            # Cache only validated JSON (never cache errors or empty responses)
+            if cache_key is not None:
+                try:
+                    self.llm_cache.set(cache_key, text, model=GEMINI_MODEL)
+                except Exception:
+                    pass
+            
             return (True, text)
             
         except Exception as e:
             error_msg = user_friendly_error(e)
             return (False, error_msg)
     
+    def _stream_response(self, model, json_prompt: str, generation_config,
+                         stream_callback: Callable[[str, Any, bool], None]) -> str:
+        """
+        Stream a Gemini response, emitting completed JSON elements as they arrive
+        
+        Returns:
+            Full concatenated response text
+        """
+        parser = IncrementalJSONParser()
+        parts = []
+        
+        response = model.generate_content(
+            json_prompt,
+            generation_config=generation_config,
+            stream=True
+        )
+        for chunk in response:
+            try:
+                chunk_text = chunk.text
+            except ValueError:
+                continue  # Chunk without text parts (e.g. safety metadata)
+            if not chunk_text:
+                continue
+            parts.append(chunk_text)
+            for event in parser.feed(chunk_text):
+                try:
+                    stream_callback(*event)
+                except Exception:
+                    pass  # Rendering problems must never break generation
+        
+        return ''.join(parts)
+    
     def _apply_fast_cleaning(self, df: pd.DataFrame, cleaning_plan: Dict, domain_info: Dict) -> pd.DataFrame:
         """
         Fast data cleaning execution with domain-specific deduplication
@@ -4079,6 +3060,9 @@ Your response must be parseable by json.loads() immediately."""
         """
         df_clean = df.copy()
         original_count = len(df_clean)
+        # ⚡ Stats of the input frame: each column is filled at most once, so its
+        # missing count / median / mode are still valid when we reach it
+        profile = get_column_profile(df)
         
         # Handle missing values - ONLY if they actually exist
         missing_handled = cleaning_plan.get('cleaning_summary', {}).get('missing_handled', {})
@@ -4089,7 +3073,7 @@ Your response must be parseable by json.loads() immediately."""
                 continue
             
             # ⭐ CRITICAL CHECK: Only proceed if column has actual missing values
-            if df_clean[col].isnull().sum() == 0:
+            if profile.missing(col) == 0:
                 continue  # Skip - no missing values to handle
             
             # 🔴 CRITICAL PROTECTION: NEVER impute protected fields
@@ -4097,17 +3081,17 @@ Your response must be parseable by json.loads() immediately."""
                 # Protected field with missing values - KEEP AS NULL for data integrity
                 protected_fields_skipped.append({
                     'column': col,
-                    'missing_count': df_clean[col].isnull().sum(),
+                    'missing_count': profile.missing(col),
                     'reason': 'NEVER_IMPUTE_PROTECTION'
                 })
                 continue  # Skip imputation - preserve NULL values
             
-            if method == 'median' and df_clean[col].dtype in ['int64', 'float64']:
+            if method == 'median' and pd.api.types.is_numeric_dtype(df_clean[col]):
                 # Use proper pandas method (not inplace to avoid warnings)
-                df_clean[col] = df_clean[col].fillna(df_clean[col].median())
+                df_clean[col] = df_clean[col].fillna(profile.median(col))
             elif method == 'mode':
-                if len(df_clean[col].mode()) > 0:
-                    df_clean[col] = df_clean[col].fillna(df_clean[col].mode()[0])
+                if profile.mode(col) is not None:
+                    df_clean[col] = df_clean[col].fillna(profile.mode(col))
         
         # Store protection report in cleaning plan
         if protected_fields_skipped:
@@ -4216,16 +3200,16 @@ Your response must be parseable by json.loads() immediately."""
         Returns:
             List of matched column names from dataframe
         """
-        import re
-        
         matched_cols = []
-        df_cols_lower = [col.lower().strip() for col in df.columns]
+        # Folded names: case, separators and Vietnamese diacritics ignored
+        df_cols_normalized = [name.replace(' ', '') for name in folded_names(df.columns)]
         
         for pattern in candidate_patterns:
-            pattern_normalized = pattern.lower().strip().replace(' ', '').replace('_', '')
+            pattern_normalized = fold_name(pattern).replace(' ', '')
             
-            for i, df_col in enumerate(df.columns):
-                df_col_normalized = df_cols_lower[i].replace(' ', '').replace('_', '')
+            for df_col, df_col_normalized in zip(df.columns, df_cols_normalized):
+                if not df_col_normalized:  # symbol-only header, nothing to match
+                    continue
                 
                 # Exact match (normalized)
                 if pattern_normalized == df_col_normalized:
@@ -4245,11 +3229,12 @@ Your response must be parseable by json.loads() immediately."""
         quality_metrics = cleaning_plan.get('quality_metrics', {})
         
         # Calculate actual completeness from cleaned data
-        actual_completeness = (1 - df_cleaned.isnull().sum().sum() / df_cleaned.size) * 100
+        profile = get_column_profile(df_cleaned)
+        actual_completeness = (1 - profile.missing_rate) * 100
         
         checks = {
-            'missing_rate_ok': (df_cleaned.isnull().sum().sum() / df_cleaned.size * 100) < 5,  # Relaxed from 2% to 5%
-            'duplicates_ok': df_cleaned.duplicated().sum() < len(df_cleaned) * 0.05,  # Allow up to 5% duplicates
+            'missing_rate_ok': (profile.missing_rate * 100) < 5,  # Relaxed from 2% to 5%
+            'duplicates_ok': profile.duplicate_rows < len(df_cleaned) * 0.05,  # Allow up to 5% duplicates
             'completeness_ok': actual_completeness >= 95  # Use actual data, relaxed from 98% to 95%
         }
         
@@ -4276,8 +3261,9 @@ Your response must be parseable by json.loads() immediately."""
         charts = smart_blueprint.get('charts', [])
         valid_charts = []
         
-        numeric_cols = df.select_dtypes(include=['number']).columns.tolist()
-        categorical_cols = df.select_dtypes(include=['object', 'category']).columns.tolist()
+        profile = get_column_profile(df)
+        numeric_cols = profile.numeric_columns
+        categorical_cols = profile.categorical_columns
         all_cols = df.columns.tolist()
         
         for i, chart in enumerate(charts):
@@ -4565,8 +3551,59 @@ Your response must be parseable by json.loads() immediately."""
             # Top recommendations only
             st.markdown("**🚀 Top Recommendations:**")
             for rec in insights.get('recommendations', [])[:3]:
-                priority_emoji = "🔴" if rec['priority'] == 'high' else "🟡" if rec['priority'] == 'medium' else "🟢"
-                st.success(f"{priority_emoji} **{rec['action']}**\n_{rec['expected_impact']}_")
+                self._render_recommendation(rec)
+    
+    def _render_recommendation(self, rec: Dict, container=None):
+        """Render one recommendation card"""
+        target = container if container is not None else st
+        priority = rec.get('priority', '')
+        priority_emoji = "🔴" if priority == 'high' else "🟡" if priority == 'medium' else "🟢"
+        target.success(f"{priority_emoji} **{rec.get('action', '')}**\n_{rec.get('expected_impact', '')}_")
+    
+    def _create_insights_stream_renderer(self, domain_info: Dict) -> Tuple[Callable, Dict]:
+        """
+        ⚡ Create a Streamlit renderer that appends insights as they stream in
+        
+        Returns:
+            (callback for _generate_ai_insight(stream_callback=...), render state)
+        """
+        with st.expander(get_text('insights_expert', self.lang), expanded=True):
+            st.caption(f"**Expert**: {domain_info['expert_role'][:60]}...")
+            summary_slot = st.empty()
+            summary_slot.caption("⏳ ...")
+            insights_container = st.container()
+            st.markdown("**🚀 Top Recommendations:**")
+            recs_container = st.container()
+        
+        state = {
+            'start': time.time(),
+            'first_event_at': None,
+            'recs_rendered': 0,
+            'recs_container': recs_container
+        }
+        
+        def on_event(key: str, value: Any, is_array_element: bool):
+            if key == 'executive_summary' and not is_array_element:
+                summary_slot.info(value)
+            elif key == 'key_insights' and is_array_element and isinstance(value, dict):
+                insights_container.markdown(f"💡 **{value.get('title', '')}** — {value.get('description', '')}")
+            elif key == 'recommendations' and is_array_element and isinstance(value, dict):
+                if state['recs_rendered'] >= 3:
+                    return
+                self._render_recommendation(value, recs_container)
+                state['recs_rendered'] += 1
+            else:
+                return
+            if state['first_event_at'] is None:
+                state['first_event_at'] = time.time()
+        
+        return on_event, state
+    
+    def _finish_streamed_insights(self, insights: Dict, stream_state: Dict):
+        """Render recommendations added after streaming (e.g. HR tracking KPIs), up to top 3"""
+        for rec in insights.get('recommendations', [])[stream_state['recs_rendered']:3]:
+            self._render_recommendation(rec, stream_state['recs_container'])
+            stream_state['recs_rendered'] += 1
     
     def _add_audit_trail(self, step_name: str, result: Dict):
         """Add step to audit trail"""
@@ -10,6 +10,9 @@ import yaml
 from pathlib import Path
 import logging
 
+from utils.mdl_snapshot import load_snapshot, save_snapshot, snapshots_enabled, source_stamp
+from utils.text_search import BM25Index
+
 logger = logging.getLogger(__name__)
 
 # ===== PYDANTIC MODELS (Same structure as WrenAI) =====
@@ -269,9 +272,22 @@ class SemanticLayerParser:
         context = parser.generate_context("What's our FCR rate?")
     """
     
-    def __init__(self, mdl_path: str):
+    # Lookup indexes built by _build_indexes() and stored in snapshots
+    INDEX_ATTRS = ('models_by_name', 'metrics_by_name', 'relationships_map', 'column_index', 'search_indexes')
+    
+    def __init__(self, mdl_path: str, snapshot_dir: Optional[str] = None, use_snapshot: Optional[bool] = None):
+        """
+        Args:
+            mdl_path: MDL YAML file
+            snapshot_dir: Compiled snapshot directory (default: MDL_SNAPSHOT_DIR)
+            use_snapshot: Load/write compiled snapshots (default: MDL_SNAPSHOTS env)
+        """
         self.mdl_path = Path(mdl_path)
         self.semantic_layer: Optional[SemanticLayer] = None
+        self.snapshot_dir = snapshot_dir
+        self.use_snapshot = snapshots_enabled() if use_snapshot is None else use_snapshot
+        self.loaded_from: Optional[str] = None  # 'snapshot' or 'yaml'
+        self._source: Optional[Dict[str, Any]] = None
         
         # Fast lookup indexes
         self.models_by_name: Dict[str, Model] = {}
@@ -280,16 +296,31 @@ class SemanticLayerParser:
         
         # Search index for columns
         self.column_index: Dict[str, List[tuple[str, Column]]] = {}
+        
+        # BM25 inverted indexes: 'models', 'columns', 'metrics'
+        self.search_indexes: Dict[str, BM25Index] = {}
     
     def load(self) -> SemanticLayer:
-        """Load and validate MDL from YAML"""
+        """Load validated MDL from its compiled snapshot when fresh, else from YAML"""
         if not self.mdl_path.exists():
             raise FileNotFoundError(f"MDL file not found: {self.mdl_path}")
         
+        # ⚡ Fresh snapshot: no YAML parsing, validation or index building
+        if self.use_snapshot:
+            payload = load_snapshot(self.mdl_path, self.snapshot_dir)
+            if payload is not None and all(attr in payload['indexes'] for attr in self.INDEX_ATTRS):
+                self.semantic_layer = payload['semantic_layer']
+                for attr in self.INDEX_ATTRS:
+                    setattr(self, attr, payload['indexes'][attr])
+                self.loaded_from = 'snapshot'
+                logger.info(f"✅ Loaded semantic layer snapshot: {self.semantic_layer.catalog}")
+                return self.semantic_layer
+        
         logger.info(f"Loading semantic layer from: {self.mdl_path}")
         
-        with open(self.mdl_path, 'r', encoding='utf-8') as f:
-            raw_data = yaml.safe_load(f)
+        content = self.mdl_path.read_bytes()
+        self._source = source_stamp(self.mdl_path, content)
+        raw_data = yaml.safe_load(content.decode('utf-8'))
         
         # Validate with Pydantic (catches all schema errors)
         try:
@@ -300,6 +331,9 @@ class SemanticLayerParser:
         
         # Build lookup indexes for fast query routing
         self._build_indexes()
+        self.loaded_from = 'yaml'
+        if self.use_snapshot:
+            self.save_snapshot()
         
         logger.info(f"✅ Loaded semantic layer: {self.semantic_layer.catalog}")
         logger.info(f"   Models: {len(self.semantic_layer.models)}")
@@ -308,11 +342,22 @@ class SemanticLayerParser:
         
         return self.semantic_layer
     
+    def save_snapshot(self) -> Optional[Path]:
+        """Write the validated layer and its indexes as a compiled snapshot"""
+        if not self.semantic_layer:
+            raise ValueError("No semantic layer loaded")
+        indexes = {attr: getattr(self, attr) for attr in self.INDEX_ATTRS}
+        return save_snapshot(self.mdl_path, self.semantic_layer, indexes,
+                             source=self._source, snapshot_dir=self.snapshot_dir)
+    
     def _build_indexes(self):
-        """Build fast lookup indexes for O(1) access"""
+        """Build fast lookup indexes for O(1) access and BM25 search indexes"""
+        model_index, column_search, metric_index = BM25Index(), BM25Index(), BM25Index()
+        
         # Index models
         for model in self.semantic_layer.models:
             self.models_by_name[model.name] = model
+            model_index.add(model.name, [(model.name, 3), (model.description, 1)])
             
             # Index columns for search
             for col in model.columns:
@@ -320,10 +365,15 @@ class SemanticLayerParser:
                 if col_lower not in self.column_index:
                     self.column_index[col_lower] = []
                 self.column_index[col_lower].append((model.name, col))
+                column_search.add((model.name, col.name), [(col.name, 3), (col.description, 1)])
         
-        # Index metrics
+        # Index metrics (names, descriptions and their measures)
         for metric in self.semantic_layer.metrics:
             self.metrics_by_name[metric.name] = metric
+            fields = [(metric.name, 3), (metric.description, 1)]
+            for measure in metric.measure:
+                fields += [(measure.name, 2), (measure.description, 1)]
+            metric_index.add(metric.name, fields)
         
         # Index relationships by model
         for rel in self.semantic_layer.relationships:
@@ -331,6 +381,8 @@ class SemanticLayerParser:
                 if model_name not in self.relationships_map:
                     self.relationships_map[model_name] = []
                 self.relationships_map[model_name].append(rel)
+        
+        self.search_indexes = {'models': model_index, 'columns': column_search, 'metrics': metric_index}
     
     def get_model(self, name: str) -> Optional[Model]:
         """Get model by name (O(1) lookup)"""
@@ -349,59 +401,24 @@ class SemanticLayerParser:
             related.append((other_model, rel))
         return related
     
-    def find_columns(self, query: str) -> List[tuple[str, Column]]:
-        """Find columns mentioned in query (case-insensitive)"""
-        query_lower = query.lower()
+    def find_columns(self, query: str, limit: Optional[int] = None) -> List[tuple[str, Column]]:
+        """Find columns mentioned in query, best BM25 match first (case/diacritic-insensitive)"""
         matches = []
-        
-        for col_name, col_list in self.column_index.items():
-            if col_name in query_lower:
-                matches.extend(col_list)
-        
+        for model_name, col_name in self.search_column_keys(query, limit):
+            matches.append((model_name, self.models_by_name[model_name].get_column(col_name)))
         return matches
     
-    def find_metrics(self, query: str) -> List[Metric]:
-        """Find metrics mentioned in query"""
-        query_lower = query.lower()
-        matches = []
-        
-        for metric in self.semantic_layer.metrics:
-            # Match by metric name
-            if metric.name.lower() in query_lower:
-                matches.append(metric)
-                continue
-            
-            # Match by measure names
-            for measure in metric.measure:
-                if measure.name.lower() in query_lower:
-                    matches.append(metric)
-                    break
-            
-            # Match by description keywords
-            if metric.description and any(
-                word in metric.description.lower() 
-                for word in query_lower.split()
-            ):
-                matches.append(metric)
-        
-        return matches
+    def search_column_keys(self, query: str, limit: Optional[int] = None) -> List[tuple[str, str]]:
+        """(model name, column name) pairs for query, best BM25 match first"""
+        return [doc_id for doc_id, _ in self.search_indexes['columns'].search(query, limit)]
     
-    def find_models(self, query: str) -> List[Model]:
-        """Find models relevant to query"""
-        query_lower = query.lower()
-        matches = []
-        
-        for model in self.semantic_layer.models:
-            # Match by model name
-            if model.name.lower() in query_lower:
-                matches.append(model)
-                continue
-            
-            # Match by description
-            if model.description and model.description.lower() in query_lower:
-                matches.append(model)
-        
-        return matches
+    def find_metrics(self, query: str, limit: Optional[int] = None) -> List[Metric]:
+        """Find metrics mentioned in query (by metric/measure names and descriptions), best match first"""
+        return [self.metrics_by_name[name] for name, _ in self.search_indexes['metrics'].search(query, limit)]
+    
+    def find_models(self, query: str, limit: Optional[int] = None) -> List[Model]:
+        """Find models relevant to query (by name and description), best match first"""
+        return [self.models_by_name[name] for name, _ in self.search_indexes['models'].search(query, limit)]
     
     def generate_context(self, query: str, max_models: int = 5) -> str:
         """
@@ -411,20 +428,18 @@ class SemanticLayerParser:
         context_parts = []
         
         # Find relevant components
-        mentioned_columns = self.find_columns(query)
-        relevant_models = set(model_name for model_name, _ in mentioned_columns)
+        mentioned_columns = self.search_column_keys(query)
+        relevant_models = list(dict.fromkeys(model_name for model_name, _ in mentioned_columns))
         mentioned_metrics = self.find_metrics(query)
         
         # If no specific mentions, include top models by relevance
         if not relevant_models:
-            relevant_models = set(
-                model.name for model in self.find_models(query)[:max_models]
-            )
+            relevant_models = [model.name for model in self.find_models(query, limit=max_models)]
         
         # Build context
         if relevant_models:
             context_parts.append("### RELEVANT DATA MODELS ###")
-            for model_name in list(relevant_models)[:max_models]:
+            for model_name in relevant_models[:max_models]:
                 model = self.get_model(model_name)
                 if not model:
                     continue
@@ -23,6 +23,9 @@ from datetime import datetime
 from utils.validators import safe_file_upload, sanitize_column_names
 from utils.error_handlers import rate_limit_handler, user_friendly_error
 from utils.performance import PerformanceMonitor, log_performance
+from utils.llm_cache import get_llm_cache
+from utils.column_profile import get_column_profile
+from utils.column_roles import Role, RoleMatcher
 
 # Import domain detection
 from domain_detection import (
@@ -219,10 +222,14 @@ VIETNAM_VALIDATION_RANGES = {
     }
 }
 
+# ⚡ All critical keywords compiled into one matcher (one scan per column name)
+CRITICAL_FIELD_ROLES = RoleMatcher({'critical': Role(*NEVER_IMPUTE_FIELDS)})
+
 def is_critical_field(column_name: str) -> bool:
     """
     Check if a column name matches any field in NEVER_IMPUTE list.
-    Uses case-insensitive partial matching to catch variations.
+    Uses partial matching on folded names (case, separators and Vietnamese
+    diacritics ignored) to catch variations.
     
     Args:
         column_name: Name of the column to check
@@ -236,8 +243,7 @@ def is_critical_field(column_name: str) -> bool:
         >>> is_critical_field('customer_age')
         False
     """
-    col_lower = column_name.lower()
-    return any(critical in col_lower for critical in NEVER_IMPUTE_FIELDS)
+    return CRITICAL_FIELD_ROLES.matches(column_name, 'critical')
 
 def validate_vietnam_range(column_name: str, value: float) -> dict:
     """
@@ -458,6 +464,7 @@ class SmartOQMLBPipeline:
         
         # Build domain-aware prompt
         domain_context = get_domain_specific_prompt_context(domain_info)
+        profile = get_column_profile(df)
         
         prompt = f"""
 {domain_context}
@@ -469,8 +476,8 @@ class SmartOQMLBPipeline:
 DATASET PROFILE:
 - Shape: {df.shape[0]:,} rows × {df.shape[1]} columns
 - Columns: {', '.join(df.columns[:10])}{'...' if len(df.columns) > 10 else ''}
-- Missing values: {df.isnull().sum().to_dict()}
-- Duplicates: {df.duplicated().sum()}
+- Missing values: {profile.null_counts}
+- Duplicates: {profile.duplicate_rows}
 
 SAMPLE DATA (first 3 rows):
 {df.head(3).to_string()}
@@ -683,6 +690,9 @@ IMPORTANT NOTES:
                 elif method == 'mode':
                     df_clean[col].fillna(df_clean[col].mode()[0], inplace=True)
                 elif method == 'Unknown':
+                    # Categorical columns (compact CSV ingestion) need the label registered first
+                    if isinstance(df_clean[col].dtype, pd.CategoricalDtype) and 'Unknown' not in df_clean[col].cat.categories:
+                        df_clean[col] = df_clean[col].cat.add_categories('Unknown')
                     df_clean[col].fillna('Unknown', inplace=True)
         
         # Remove duplicates
@@ -697,11 +707,12 @@ IMPORTANT NOTES:
         quality_metrics = cleaning_plan.get('quality_metrics', {})
         
         # Calculate actual completeness from cleaned data
-        actual_completeness = (1 - df_cleaned.isnull().sum().sum() / df_cleaned.size) * 100
+        profile = get_column_profile(df_cleaned)
+        actual_completeness = (1 - profile.missing_rate) * 100
         
         checks = {
-            'missing_rate_ok': (df_cleaned.isnull().sum().sum() / df_cleaned.size * 100) < 5,  # Relaxed from 2% to 5%
-            'duplicates_ok': df_cleaned.duplicated().sum() < len(df_cleaned) * 0.05,  # Allow up to 5% duplicates
+            'missing_rate_ok': (profile.missing_rate * 100) < 5,  # Relaxed from 2% to 5%
+            'duplicates_ok': profile.duplicate_rows < len(df_cleaned) * 0.05,  # Allow up to 5% duplicates
             'validation_pass_rate_ok': quality_metrics.get('accuracy', 100) >= 90,  # Relaxed, default to 100
             'completeness_ok': actual_completeness >= 95,  # Use actual data, relaxed from 98% to 95%
             'consistency_ok': quality_metrics.get('consistency', 100) >= 95  # Relaxed, default to 100
@@ -850,10 +861,11 @@ IMPORTANT NOTES:
         
         domain_context = get_domain_specific_prompt_context(domain_info)
         
-        # Get statistics for prompt
-        numeric_cols = df.select_dtypes(include=['number']).columns.tolist()
-        categorical_cols = df.select_dtypes(include=['object', 'category']).columns.tolist()
-        date_cols = df.select_dtypes(include=['datetime']).columns.tolist()
+        # Get statistics for prompt (⚡ from the shared single-scan profile)
+        profile = get_column_profile(df)
+        numeric_cols = profile.numeric_columns
+        categorical_cols = profile.categorical_columns
+        date_cols = profile.datetime_columns
         
         prompt = f"""
 {domain_context}
@@ -869,7 +881,7 @@ DATA PROFILE:
 - Date columns: {', '.join(date_cols)}
 
 SAMPLE STATISTICS:
-{df.describe().to_string()}
+{profile.describe().to_string()}
 
 REQUIREMENTS:
 
@@ -1548,16 +1560,33 @@ IMPORTANT:
 
 
 # Helper function for AI insight generation
-def generate_ai_insight(client, prompt: str, temperature: float = 0.7, max_tokens: int = 4096) -> Tuple[bool, str]:
+def generate_ai_insight(client, prompt: str, temperature: float = 0.7, max_tokens: int = 4096,
+                        bypass_cache: bool = False) -> Tuple[bool, str]:
     """
     Generate AI insight using Gemini API.
     
+    ⚡ Valid JSON responses are served from the shared LLM response cache
+    when the same request was made before (bypass_cache=True forces a call).
+    Cache errors never fail the call: the API is used instead.
+    
     Returns:
         (success: bool, result: str or error_message: str)
     """
+    model_name = 'gemini-2.0-flash-exp'
+    llm_cache = None if bypass_cache else get_llm_cache()
+    cache_key = None
+    if llm_cache is not None:
+        try:
+            cache_key = llm_cache.make_key(model_name, prompt, temperature, max_tokens, 'application/json')
+            cached_text = llm_cache.get(cache_key)
+        except Exception:
+            cache_key = cached_text = None  # Cache unavailable (e.g. SQLite error) - call the API
+        if cached_text is not None:
+            return (True, cached_text)
+    
     try:
         response = client.models.generate_content(
-            model='gemini-2.0-flash-exp',
+            model=model_name,
             contents=prompt,
             config={
                 'temperature': temperature,
@@ -1565,6 +1594,15 @@ def generate_ai_insight(client, prompt: str, temperature: float = 0.7, max_token
                 'response_mime_type': 'application/json'
             }
         )
+        
+        # Cache only valid JSON (never truncated or non-JSON responses)
+        if cache_key is not None and response.text:
+            try:
+                json.loads(response.text)
+                llm_cache.set(cache_key, response.text, model=model_name)
+            except Exception:
+                pass
+        
         return (True, response.text)
     
     except Exception as e:
@@ -0,0 +1,128 @@
+"""
+Columnar per-group breakdowns (by channel, campaign, rep, stage, ...).
+
+This module provides:
+- Breakdown: one NumPy array per field, rows aligned, kept columnar until
+  to_records() serializes it to the list-of-dicts output format
+- group_breakdown(): all fields of a breakdown from ONE groupby with named
+  aggregations; conditional sums (e.g. won deals per rep) are computed in the
+  same pass from masked value columns instead of separate filtered groupbys
+
+Derived fields (ratios such as ROAS or win rate) are vectorized array
+expressions on the aggregated columns.
+
+Example:
+    >>> won = df['stage'].str.contains('won', case=False, na=False)
+    >>> reps = group_breakdown(df, 'sales_rep', 'rep', {
+    ...     'pipeline_value': ('deal_value', 'sum'),
+    ...     'wins': (won, 'sum'),
+    ...     'won_revenue': (df['deal_value'].where(won, 0), 'sum'),
+    ... })
+    >>> reps = reps.sort_by('won_revenue')
+    >>> reps['rep'][0], reps['wins'][0]
+    ('Nguyen Van A', 12)
+    >>> reps.to_records(int_fields=['wins'])[0]
+    {'rep': 'Nguyen Van A', 'pipeline_value': 5.1e9, 'wins': 12, 'won_revenue': 3.2e9}
+"""
+
+from typing import Dict, Hashable, Iterable, List, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+
+class Breakdown:
+    """
+    Per-group results as aligned arrays: breakdown[field] → np.ndarray.
+
+    The key field holds the group values; the others are numeric.
+    """
+
+    def __init__(self, key: str, columns: Dict[str, np.ndarray]):
+        self.key = key
+        self.columns = columns
+
+    def __len__(self) -> int:
+        return len(self.columns[self.key])
+
+    def __getitem__(self, field: str) -> np.ndarray:
+        return self.columns[field]
+
+    def __setitem__(self, field: str, values):
+        self.columns[field] = np.asarray(values)
+
+    def __contains__(self, field: str) -> bool:
+        return field in self.columns
+
+    @property
+    def fields(self) -> List[str]:
+        return list(self.columns)
+
+    def take(self, positions: np.ndarray) -> 'Breakdown':
+        """Rows at positions (reorders or subsets every field)."""
+        return Breakdown(self.key, {field: values[positions] for field, values in self.columns.items()})
+
+    def sort_by(self, field: str, ascending: bool = False) -> 'Breakdown':
+        """Rows sorted by field (stable; NaN last)."""
+        return self.take(order_by(self.columns[field], ascending))
+
+    def to_records(self, int_fields: Iterable[str] = (), fields: Iterable[str] = None) -> List[Dict]:
+        """
+        Serialize to [{field: value}] with Python scalars.
+
+        Args:
+            int_fields: Fields emitted as int (others as float; key as-is)
+            fields: Fields to emit, in order (default: all)
+        """
+        int_fields = set(int_fields)
+        names = list(fields) if fields is not None else self.fields
+        values = []
+        for name in names:
+            column = self.columns[name]
+            if name == self.key:
+                values.append(column.tolist())
+            elif name in int_fields:
+                values.append(column.astype(np.int64).tolist())
+            else:
+                values.append(column.astype(float).tolist())
+        return [dict(zip(names, row)) for row in zip(*values)]
+
+
+def order_by(values: np.ndarray, ascending: bool = False) -> np.ndarray:
+    """Stable sort order of values (descending by default), NaN last."""
+    values = np.asarray(values, dtype=float)
+    return np.argsort(values if ascending else -values, kind='stable')
+
+
+def group_breakdown(df: pd.DataFrame, by: str, key: str,
+                    aggregations: Dict[str, Tuple[Union[Hashable, pd.Series, np.ndarray], str]]) -> Breakdown:
+    """
+    Aggregate several fields per group in one groupby.
+
+    Args:
+        df: Source rows
+        by: Group-by column (missing keys are dropped, like pandas)
+        key: Field name for the group values in the result
+        aggregations: {field: (df column name, or a row-aligned Series/array such
+            as a mask or masked values, aggregation function)}
+
+    Returns:
+        Breakdown with the key field plus one array per aggregation, in group order
+    """
+    inputs = {}
+    named = {}
+    for i, (field, (source, func)) in enumerate(aggregations.items()):
+        if isinstance(source, (pd.Series, np.ndarray)):
+            name = f"__input_{i}"
+            inputs[name] = np.asarray(source)
+        else:
+            name = source
+            inputs[name] = df[source].to_numpy()
+        named[field] = (name, func)
+
+    # Only the needed columns: no copy of the full frame
+    frame = pd.DataFrame(inputs, index=df.index)
+    grouped = frame.groupby(df[by], observed=True).agg(**named)
+    columns = {key: grouped.index.to_numpy()}
+    columns.update({field: grouped[field].to_numpy() for field in aggregations})
+    return Breakdown(key, columns)
@@ -0,0 +1,280 @@
+"""
+Chart data planning: reduce rows before building Plotly figures.
+
+This module provides:
+- plan_chart_data(): pick a reduction for a (chart type, x, y) pair and return
+  the reduced frame plus metadata describing what was done
+- plan_estimate_data(): the same category fold for per-group estimated totals
+  (approximate mode), carrying a CI half-width per bar
+- time_grain(): adaptive bucket size for a date range
+- lttb_indices(): Largest-Triangle-Three-Buckets downsampling for line charts
+- minmax_indices(): per-bin min/max decimation for scatter charts
+
+Reductions:
+- Categorical x (bar / pie / line): groupby-reduce, top MAX_CATEGORIES kept,
+  the rest folded into one "Other" group
+- Date x: bucketed to the smallest grain (hour → year) giving at most
+  MAX_TIME_BUCKETS points
+- Numeric x on bar charts: equal-width bins
+- Numeric x on line / scatter: LTTB / min-max decimation to MAX_POINTS
+
+Figure JSON size is therefore bounded by these limits, not by input rows.
+
+Example:
+    >>> plot_df, reduction = plan_chart_data(df, 'bar', 'Channel', 'Revenue')
+    >>> reduction
+    {'method': 'groupby', 'agg': 'sum', 'input_rows': 500000, 'output_rows': 6}
+"""
+
+import logging
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+MAX_CATEGORIES = 50
+MAX_PIE_SLICES = 12
+MAX_TIME_BUCKETS = 400
+MAX_NUMERIC_BINS = 100
+MAX_POINTS = 2_000
+
+# Grain → (period alias, approximate length)
+TIME_GRAINS = (
+    ('hour', 'h', pd.Timedelta(hours=1)),
+    ('day', 'D', pd.Timedelta(days=1)),
+    ('week', 'W', pd.Timedelta(weeks=1)),
+    ('month', 'M', pd.Timedelta(days=30.44)),
+    ('quarter', 'Q', pd.Timedelta(days=91.31)),
+    ('year', 'Y', pd.Timedelta(days=365.25)),
+)
+
+RATE_KEYWORDS = ('rate', 'ratio', '%', 'pct', 'percent', 'avg', 'average', 'mean',
+                 'ctr', 'roi', 'roas', 'margin', 'score', 'price', 'aov')
+
+
+def is_rate_metric(column: str) -> bool:
+    """Rates and averages are averaged when reduced; everything else is summed."""
+    name = str(column).lower()
+    return any(keyword in name for keyword in RATE_KEYWORDS)
+
+
+def time_grain(start: pd.Timestamp, end: pd.Timestamp,
+               max_buckets: int = MAX_TIME_BUCKETS) -> Tuple[str, str]:
+    """
+    Smallest grain covering [start, end] in at most max_buckets buckets.
+
+    Returns:
+        (grain name, pandas period alias), e.g. ('week', 'W')
+    """
+    span = end - start
+    for name, alias, length in TIME_GRAINS:
+        if span / length < max_buckets:
+            return name, alias
+    return TIME_GRAINS[-1][0], TIME_GRAINS[-1][1]
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: indices of n_out points that keep the visual shape.
+
+    Args:
+        x: Sorted x values (float)
+        y: y values
+        n_out: Points to keep (>= 3)
+
+    Returns:
+        Sorted indices into x / y
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for i in range(n_out - 2):
+        start, stop = edges[i], edges[i + 1]
+        next_start, next_stop = edges[i + 1], edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_start:next_stop].mean()
+        avg_y = y[next_start:next_stop].mean()
+        # Twice the triangle area (previous point, candidate, next bucket average)
+        area = np.abs(
+            (x[previous] - avg_x) * (y[start:stop] - y[previous])
+            - (x[previous] - x[start:stop]) * (avg_y - y[previous])
+        )
+        previous = start + int(np.argmax(area))
+        selected[i + 1] = previous
+    return selected
+
+
+def minmax_indices(bins: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """
+    Min/max decimation: keep the lowest and highest y row in every bin.
+
+    Args:
+        bins: Bin code per row
+        y: y values
+
+    Returns:
+        Sorted row indices (at most 2 per bin)
+    """
+    frame = pd.DataFrame({'bin': bins, 'y': y})
+    grouped = frame.groupby('bin', sort=False)['y']
+    keep = np.union1d(grouped.idxmin().to_numpy(), grouped.idxmax().to_numpy())
+    return keep.astype(np.int64)
+
+
+def _as_datetime(series: pd.Series) -> Optional[pd.Series]:
+    """Datetime view of x, parsing ISO date strings; None if x is not date-like."""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    if pd.api.types.is_numeric_dtype(series) or isinstance(series.dtype, pd.CategoricalDtype):
+        return None
+    probe = series.head(50)
+    if probe.empty or pd.to_datetime(probe, errors='coerce', format='ISO8601').isna().any():
+        return None
+    return pd.to_datetime(series, errors='coerce', format='ISO8601')
+
+
+def _reduce_categories(df: pd.DataFrame, x: str, y: str, agg: str,
+                       limit: int, other_label: str) -> Tuple[pd.DataFrame, bool]:
+    """Groupby-reduce x, keeping the top `limit` groups and folding the rest."""
+    grouped = df.groupby(x, sort=False, observed=True)[y].agg([agg, 'count'])
+    if len(grouped) <= limit:
+        return grouped[agg].rename(y).reset_index(), False
+
+    top = grouped[agg].abs().nlargest(limit - 1).index
+    rest = grouped.drop(index=top)
+    if agg == 'sum':
+        other = rest['sum'].sum()
+    else:
+        other = (rest['mean'] * rest['count']).sum() / rest['count'].sum()
+    reduced = grouped.loc[grouped.index.isin(top), agg].rename(y).reset_index()
+    reduced[x] = reduced[x].astype(object)
+    reduced.loc[len(reduced)] = {x: other_label, y: other}
+    return reduced, True
+
+
+def plan_chart_data(df: pd.DataFrame, chart_type: str, x: str, y: str,
+                    other_label: str = 'Other') -> Tuple[pd.DataFrame, Dict]:
+    """
+    Reduce chart input to a bounded number of points.
+
+    Args:
+        df: Chart input with columns x and y (NaN already dropped)
+        chart_type: 'bar', 'line', 'scatter' or 'pie'
+        x: x-axis (or pie names) column
+        y: y-axis (or pie values) column
+        other_label: Label of the folded group for high-cardinality categories
+
+    Returns:
+        (plot_df, reduction) where reduction has 'method', 'input_rows',
+        'output_rows' and method-specific keys ('agg', 'grain', 'folded')
+    """
+    input_rows = len(df)
+    reduction: Dict = {'method': 'none', 'input_rows': input_rows}
+    y_numeric = pd.api.types.is_numeric_dtype(df[y])
+    x_numeric = pd.api.types.is_numeric_dtype(df[x]) and not pd.api.types.is_bool_dtype(df[x])
+    agg = 'mean' if is_rate_metric(y) and chart_type != 'pie' else 'sum'
+    plot_df = df
+
+    if not y_numeric:
+        # Nothing to aggregate (e.g. label vs label) - only bound the point count
+        if input_rows > MAX_POINTS:
+            plot_df = df.iloc[np.linspace(0, input_rows - 1, MAX_POINTS).astype(int)]
+            reduction['method'] = 'stride'
+    else:
+        dates = None if x_numeric else _as_datetime(df[x])
+
+        if dates is not None and chart_type != 'pie':
+            if dates.nunique() > MAX_TIME_BUCKETS:
+                grain, alias = time_grain(dates.min(), dates.max())
+                buckets = dates.dt.to_period(alias).dt.start_time
+                reduction['grain'] = grain
+            else:
+                buckets = dates
+                reduction['grain'] = 'raw'
+            if chart_type == 'scatter' and input_rows > MAX_POINTS:
+                keep = minmax_indices(buckets.to_numpy(), df[y].to_numpy())
+                plot_df = df.iloc[keep]
+                reduction.update(method='minmax')
+            elif chart_type != 'scatter':
+                plot_df = (df.assign(**{x: buckets}).groupby(x, sort=True)[y]
+                           .agg(agg).reset_index())
+                reduction.update(method='time_bucket', agg=agg)
+            else:
+                reduction.pop('grain')
+
+        elif not x_numeric and chart_type != 'scatter':
+            limit = MAX_PIE_SLICES if chart_type == 'pie' else MAX_CATEGORIES
+            plot_df, folded = _reduce_categories(df, x, y, agg, limit, other_label)
+            reduction.update(method='groupby', agg=agg, folded=folded)
+
+        elif chart_type in ('bar', 'pie'):
+            if df[x].nunique() <= MAX_NUMERIC_BINS:
+                plot_df = df.groupby(x, sort=True)[y].agg(agg).reset_index()
+                reduction.update(method='groupby', agg=agg, folded=False)
+            else:
+                bins = pd.cut(df[x], MAX_NUMERIC_BINS)
+                reduced = df.groupby(bins, observed=True)[y].agg(agg)
+                plot_df = pd.DataFrame({x: [interval.mid for interval in reduced.index], y: reduced.to_numpy()})
+                reduction.update(method='binned', agg=agg, bins=MAX_NUMERIC_BINS)
+
+        elif input_rows > MAX_POINTS:
+            if chart_type == 'line' and x_numeric:
+                ordered = df.sort_values(x, kind='stable')
+                keep = lttb_indices(ordered[x].to_numpy(dtype=float), ordered[y].to_numpy(dtype=float), MAX_POINTS)
+                plot_df = ordered.iloc[keep]
+                reduction['method'] = 'lttb'
+            else:
+                codes = (pd.cut(df[x], MAX_POINTS // 2, labels=False).to_numpy() if x_numeric
+                         else pd.factorize(df[x])[0])
+                plot_df = df.iloc[minmax_indices(codes, df[y].to_numpy())]
+                reduction['method'] = 'minmax'
+
+    if len(plot_df) > MAX_POINTS:
+        # Hard bound (e.g. scatter over thousands of categories)
+        plot_df = plot_df.iloc[np.linspace(0, len(plot_df) - 1, MAX_POINTS).astype(int)]
+        reduction['method'] = f"{reduction['method']}+stride" if reduction['method'] != 'none' else 'stride'
+
+    reduction['output_rows'] = len(plot_df)
+    if reduction['method'] != 'none':
+        logger.debug(f"Chart {chart_type} {x}/{y}: {input_rows:,} → {len(plot_df):,} rows ({reduction['method']})")
+    return plot_df, reduction
+
+
+def plan_estimate_data(totals: pd.DataFrame, chart_type: str, x: str, y: str,
+                       other_label: str = 'Other') -> Tuple[pd.DataFrame, Dict]:
+    """
+    Fold per-group estimated totals the same way plan_chart_data folds categories.
+
+    Args:
+        totals: ApproximateSample.estimate_totals() output for group column x
+        chart_type: 'bar' or 'pie'
+        x: Group column
+        y: Name given to the estimate column in the returned frame
+        other_label: Label of the folded group
+
+    Returns:
+        (plot_df, reduction) where plot_df has columns [x, y, 'ci_margin'].
+        The "Other" margin combines the folded groups' standard errors
+        (sqrt of summed variances).
+    """
+    limit = MAX_PIE_SLICES if chart_type == 'pie' else MAX_CATEGORIES
+    frame = pd.DataFrame({x: totals[x].to_numpy(), y: totals['estimate'].to_numpy()})
+    plot_df, folded = _reduce_categories(frame, x, y, 'sum', limit, other_label)
+
+    margins = pd.Series((totals['ci_high'] - totals['estimate']).to_numpy(), index=totals[x].to_numpy())
+    if folded:
+        kept = plot_df[x].iloc[:-1]
+        rest = margins[~margins.index.isin(kept)]
+        plot_df['ci_margin'] = list(margins.reindex(kept).to_numpy()) + [float(np.sqrt((rest ** 2).sum()))]
+    else:
+        plot_df['ci_margin'] = margins.reindex(plot_df[x]).to_numpy()
+
+    reduction = {'method': 'stratified_estimate', 'agg': 'sum',
+                 'output_rows': len(plot_df), 'folded': folded}
+    return plot_df, reduction
@@ -0,0 +1,286 @@
+"""
+Shared chart rasterization for PDF and PowerPoint export.
+
+This module provides:
+- ChartRasterizer: renders Plotly figures to PNG concurrently in a process pool
+  whose workers keep a warm kaleido instance (matplotlib re-plot fallback when
+  kaleido/Chrome is unavailable)
+- PNG cache keyed by figure-JSON hash + size, so exporting the same result to
+  PDF and PPTX renders each chart once
+- Per-chart render timings (engine, seconds, cache hit) for the last batch
+- submit() / collect(): start rendering early, pick the images up later
+- get_chart_rasterizer(): process-wide instance
+
+Configuration (env):
+- CHART_RENDER_WORKERS: worker processes (default: min(4, CPUs), in-process on
+  single-CPU hosts; 0 = render in-process)
+
+Example:
+    >>> rasterizer = get_chart_rasterizer()
+    >>> rendered = rasterizer.render([chart['figure'] for chart in charts])
+    >>> rendered[0]['engine'], rendered[0]['seconds'], rendered[0]['cached']
+    ('kaleido', 0.41, False)
+"""
+
+import atexit
+import hashlib
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Canonical export size (16:9) - PDF and PPTX place the same image
+CHART_WIDTH = 800
+CHART_HEIGHT = 450
+CHART_SCALE = 2
+DEFAULT_CACHE_ENTRIES = 256
+
+_kaleido_ok: Optional[bool] = None  # Per process: None = not tried yet
+
+
+def _warm_up():
+    """Worker initializer: import plotting stacks and start kaleido once."""
+    global _kaleido_ok
+    import plotly.graph_objects as go
+    try:
+        go.Figure(go.Bar(x=[0], y=[0])).to_image(format='png', width=64, height=64, engine='kaleido')
+        _kaleido_ok = True
+    except Exception as e:
+        _kaleido_ok = False
+        logger.debug(f"kaleido unavailable in render worker: {str(e)[:80]}")
+    try:
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot  # noqa: F401 - warm import for the fallback path
+    except ImportError:
+        pass
+
+
+def _render_png(fig_json: str, width: int, height: int, scale: int) -> Dict:
+    """
+    Render one figure (runs in a worker process or in-process).
+
+    Returns:
+        {'png': bytes or None, 'engine': 'kaleido'/'matplotlib'/None,
+         'seconds': float, 'error': str or None}
+    """
+    import plotly.io as pio
+
+    start = time.perf_counter()
+    fig = pio.from_json(fig_json)
+    error = None
+
+    if _kaleido_ok is not False:
+        try:
+            png = fig.to_image(format='png', width=width, height=height, scale=scale, engine='kaleido')
+            return {'png': png, 'engine': 'kaleido', 'seconds': time.perf_counter() - start, 'error': None}
+        except Exception as e:
+            error = f"kaleido: {e}"
+
+    try:
+        from utils.export_utils import render_figure_matplotlib
+        png = render_figure_matplotlib(fig)
+        return {'png': png, 'engine': 'matplotlib', 'seconds': time.perf_counter() - start, 'error': None}
+    except Exception as e:
+        error = f"{error + '; ' if error else ''}matplotlib: {e}"
+
+    return {'png': None, 'engine': None, 'seconds': time.perf_counter() - start, 'error': error}
+
+
+class ChartRasterizer:
+    """
+    Concurrent, cached Plotly → PNG rendering.
+
+    Workers are started lazily on the first batch and kept alive, so kaleido's
+    browser start-up is paid once per process rather than once per chart.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, cache_entries: int = DEFAULT_CACHE_ENTRIES):
+        """
+        Args:
+            max_workers: Worker processes (0 = render in the calling process)
+            cache_entries: PNGs kept in the in-memory LRU cache
+        """
+        if max_workers is None:
+            cpus = os.cpu_count() or 1
+            max_workers = min(4, cpus) if cpus > 1 else 0  # One CPU: a pool only adds overhead
+        self.max_workers = max_workers
+        self.cache_entries = cache_entries
+        self.last_timings: List[Dict] = []
+        self._cache: 'OrderedDict[str, Dict]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    @staticmethod
+    def cache_key(fig_json: str, width: int, height: int, scale: int) -> str:
+        """Hash of the figure JSON and output size."""
+        hasher = hashlib.sha256(fig_json.encode('utf-8'))
+        hasher.update(f"|{width}x{height}@{scale}".encode('utf-8'))
+        return hasher.hexdigest()
+
+    def _get_pool(self) -> Optional[ProcessPoolExecutor]:
+        if self.max_workers <= 0:
+            return None
+        with self._lock:
+            if self._pool is None:
+                # spawn: safe with Streamlit's threads, workers re-import from sys.path
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_warm_up
+                )
+            return self._pool
+
+    def _cache_get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                self._cache.move_to_end(key)
+            return entry
+
+    def _cache_set(self, key: str, entry: Dict):
+        with self._lock:
+            self._cache[key] = entry
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_entries:
+                self._cache.popitem(last=False)
+
+    def submit(self, figures: List, width: int = CHART_WIDTH, height: int = CHART_HEIGHT,
+               scale: int = CHART_SCALE) -> List['RenderHandle']:
+        """
+        Start rendering figures and return immediately.
+
+        Uncached figures go to the worker pool, so callers can keep building the
+        rest of a report while charts render. Equal figures share one render.
+
+        Args:
+            figures: Plotly figures (None entries resolve to failures)
+            width, height: Layout size in pixels
+            scale: Pixel density multiplier
+
+        Returns:
+            One RenderHandle per figure, in order
+        """
+        handles: List[RenderHandle] = []
+        pending: Dict[str, RenderHandle] = {}
+
+        for fig in figures:
+            if fig is None:
+                handles.append(RenderHandle(self, None, output={
+                    'png': None, 'engine': None, 'seconds': 0.0, 'cached': False, 'error': 'no figure'
+                }))
+                continue
+            fig_json = fig.to_json()
+            key = self.cache_key(fig_json, width, height, scale)
+            cached = self._cache_get(key)
+            if cached is not None:
+                handles.append(RenderHandle(self, key, output=dict(cached, seconds=0.0, cached=True)))
+            elif key in pending:
+                handles.append(pending[key])
+            else:
+                pending[key] = RenderHandle(self, key, job=(fig_json, width, height, scale))
+                handles.append(pending[key])
+
+        pool = self._get_pool() if len(pending) > 1 or self._pool is not None else None
+        if pool is not None:
+            try:
+                for handle in pending.values():
+                    handle.future = pool.submit(_render_png, *handle.job)
+            except Exception as e:
+                # Broken pool (e.g. worker killed) - remaining charts render in-process
+                logger.warning(f"Chart render pool failed ({e}), rendering in-process")
+                self.shutdown()
+        return handles
+
+    def collect(self, handles: List['RenderHandle']) -> List[Dict]:
+        """
+        Wait for submitted renders.
+
+        Returns:
+            One dict per handle, in order: {'png', 'engine', 'seconds', 'cached', 'error'}.
+            Also stored in self.last_timings (without the PNG bytes).
+        """
+        results = [handle.result() for handle in handles]
+        self.last_timings = [
+            {key: value for key, value in result.items() if key != 'png'} for result in results
+        ]
+        logger.info(f"Rendered {len(results)} charts "
+                    f"({sum(result['cached'] for result in results)} cached, "
+                    f"{sum(result['seconds'] for result in results):.2f}s render time)")
+        return results
+
+    def render(self, figures: List, width: int = CHART_WIDTH, height: int = CHART_HEIGHT,
+               scale: int = CHART_SCALE) -> List[Dict]:
+        """
+        Render figures to PNG, concurrently, reusing cached images.
+
+        Same arguments as submit(); returns the collect() results.
+        """
+        return self.collect(self.submit(figures, width, height, scale))
+
+    def clear(self):
+        """Drop all cached images."""
+        with self._lock:
+            self._cache.clear()
+
+    def shutdown(self):
+        """Stop worker processes (cache is kept)."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+class RenderHandle:
+    """One pending chart render; result() blocks until the PNG is ready."""
+
+    def __init__(self, rasterizer: ChartRasterizer, key: Optional[str],
+                 job: Optional[tuple] = None, output: Optional[Dict] = None):
+        self.rasterizer = rasterizer
+        self.key = key
+        self.job = job
+        self.future = None
+        self.output = output
+
+    def result(self) -> Dict:
+        if self.output is not None:
+            return self.output
+
+        output = None
+        if self.future is not None:
+            try:
+                output = self.future.result()
+            except Exception as e:
+                logger.warning(f"Chart render worker failed ({e}), rendering in-process")
+                self.rasterizer.shutdown()
+        if output is None:
+            if _kaleido_ok is None:
+                _warm_up()
+            output = _render_png(*self.job)
+
+        if output['png']:
+            self.rasterizer._cache_set(self.key, output)
+        self.output = dict(output, cached=False)
+        self.future = self.job = None
+        return self.output
+
+
+_rasterizer: Optional[ChartRasterizer] = None
+_rasterizer_lock = threading.Lock()
+
+
+def get_chart_rasterizer() -> ChartRasterizer:
+    """Get the process-wide chart rasterizer (workers from CHART_RENDER_WORKERS)."""
+    global _rasterizer
+    with _rasterizer_lock:
+        if _rasterizer is None:
+            workers = os.getenv('CHART_RENDER_WORKERS')
+            _rasterizer = ChartRasterizer(max_workers=int(workers) if workers is not None else None)
+            atexit.register(_rasterizer.shutdown)
+        return _rasterizer
@@ -0,0 +1,208 @@
+"""
+Single-scan column profiling shared by all pipeline steps.
+
+This module provides:
+- ColumnProfile: per-frame statistics computed once (null counts, distinct
+  counts, dtypes, numeric min/max/mean/median/quantiles, top-k values,
+  row-hash duplicate count)
+- get_column_profile(): memoized profile lookup, recomputed only when the
+  frame changes (different object, shape, columns or dtypes)
+- invalidate_column_profile(): explicit invalidation after in-place edits
+
+Steps read the profile instead of rescanning the frame with isnull(),
+duplicated(), select_dtypes(), mode(), median() and describe().
+
+Example:
+    >>> profile = get_column_profile(df)
+    >>> profile.total_missing, profile.duplicate_rows
+    (12, 3)
+    >>> profile.median('Revenue'), profile.mode('Channel')
+    (1520.0, 'Facebook')
+"""
+
+import logging
+import threading
+import weakref
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+TOP_K = 10
+QUANTILES = (0.25, 0.5, 0.75)
+
+
+def frame_signature(df: pd.DataFrame) -> Tuple:
+    """Cheap structural signature (no data scan) used to detect frame changes."""
+    return (df.shape, tuple(map(str, df.columns)), tuple(map(str, df.dtypes)))
+
+
+class ColumnProfile:
+    """
+    Statistics for one DataFrame, computed in a single profiling pass.
+
+    Attributes:
+        n_rows, n_cols, size: Frame dimensions
+        null_counts: {column: missing count}
+        distinct_counts: {column: number of distinct non-null values}
+        dtypes: {column: dtype string}
+        top_values: {column: [(value, count), ...]} most frequent first
+        numeric_stats: {column: {'count','mean','std','min','25%','50%','75%','max'}}
+        duplicate_rows: Rows identical to an earlier row (same as df.duplicated().sum())
+    """
+
+    def __init__(self, df: pd.DataFrame, top_k: int = TOP_K):
+        """
+        Profile a frame.
+
+        Args:
+            df: DataFrame to profile
+            top_k: Number of most frequent values kept per column
+        """
+        self.signature = frame_signature(df)
+        self.n_rows, self.n_cols = df.shape
+        self.size = df.size
+        self.dtypes: Dict[str, str] = {col: str(dtype) for col, dtype in df.dtypes.items()}
+
+        self.numeric_columns: List[str] = df.select_dtypes(include=['number']).columns.tolist()
+        self.object_columns: List[str] = df.select_dtypes(include=['object', 'string']).columns.tolist()
+        self.categorical_columns: List[str] = df.select_dtypes(include=['object', 'string', 'category']).columns.tolist()
+        self.datetime_columns: List[str] = df.select_dtypes(include=['datetime']).columns.tolist()
+
+        # Nulls: one vectorized pass over the whole frame
+        self.null_counts: Dict[str, int] = {col: int(n) for col, n in df.isna().sum().items()}
+        self.total_missing = int(sum(self.null_counts.values()))
+
+        # Duplicates: hash each row once, then count repeated hashes
+        if self.n_rows and self.n_cols:
+            row_hashes = pd.util.hash_pandas_object(df, index=False)
+            self.duplicate_rows = int(row_hashes.duplicated().sum())
+        else:
+            self.duplicate_rows = 0
+
+        # Distinct counts + top-k + mode from one value_counts per column
+        self.distinct_counts: Dict[str, int] = {}
+        self.top_values: Dict[str, List[Tuple[Any, int]]] = {}
+        self._modes: Dict[str, Any] = {}
+        for col in df.columns:
+            try:
+                counts = df[col].value_counts(dropna=True, sort=True)
+            except TypeError:
+                # Unhashable cell values (lists/dicts) - profile as strings
+                counts = df[col].dropna().astype(str).value_counts(sort=True)
+            self.distinct_counts[col] = int(len(counts))
+            self.top_values[col] = [(value, int(n)) for value, n in counts.head(top_k).items()]
+            self._modes[col] = self._mode_from_counts(counts)
+
+        # Numeric summaries: vectorized over the numeric block
+        self.numeric_stats: Dict[str, Dict[str, float]] = {}
+        if self.numeric_columns:
+            block = df[self.numeric_columns]
+            summary = pd.DataFrame({
+                'count': block.count(),
+                'mean': block.mean(),
+                'std': block.std(),
+                'min': block.min(),
+            })
+            quantiles = block.quantile(list(QUANTILES))
+            for q in QUANTILES:
+                summary[f'{q:.0%}'] = quantiles.loc[q]
+            summary['max'] = block.max()
+            self.numeric_stats = {
+                col: {stat: float(value) for stat, value in row.items()}
+                for col, row in summary.iterrows()
+            }
+
+    @staticmethod
+    def _mode_from_counts(counts: pd.Series) -> Any:
+        """Most frequent value, ties broken like Series.mode() (smallest value)."""
+        if counts.empty:
+            return None
+        top = counts[counts == counts.iloc[0]].index
+        try:
+            return sorted(top)[0]
+        except TypeError:
+            return top[0]
+
+    # ------------------------------------------------------------------
+    # Accessors
+    # ------------------------------------------------------------------
+
+    def missing(self, col: str) -> int:
+        """Missing values in a column."""
+        return self.null_counts.get(col, 0)
+
+    def median(self, col: str) -> Optional[float]:
+        """Median of a numeric column (None for non-numeric)."""
+        stats = self.numeric_stats.get(col)
+        return stats['50%'] if stats else None
+
+    def mode(self, col: str) -> Any:
+        """Most frequent non-null value (None if the column is all-null)."""
+        return self._modes.get(col)
+
+    @property
+    def missing_rate(self) -> float:
+        """Share of missing cells in the frame (0-1)."""
+        return self.total_missing / self.size if self.size else 0.0
+
+    def describe(self) -> pd.DataFrame:
+        """Equivalent of df.describe() built from the cached statistics."""
+        if self.numeric_stats:
+            return pd.DataFrame(self.numeric_stats)
+        return pd.DataFrame({
+            col: {
+                'count': self.n_rows - self.null_counts[col],
+                'unique': self.distinct_counts[col],
+                'top': self.top_values[col][0][0] if self.top_values[col] else None,
+                'freq': self.top_values[col][0][1] if self.top_values[col] else None,
+            }
+            for col in self.dtypes
+        })
+
+
+_profiles: Dict[int, Tuple[weakref.ref, ColumnProfile]] = {}
+_profiles_lock = threading.RLock()  # Re-entrant: weakref callbacks may fire during GC while held
+
+
+def get_column_profile(df: pd.DataFrame) -> ColumnProfile:
+    """
+    Get the profile for a frame, computing it on first use.
+
+    Profiles are memoized per frame object and recomputed when the frame's
+    shape, columns or dtypes change. Call invalidate_column_profile() after
+    editing values in place.
+
+    Args:
+        df: DataFrame to profile
+
+    Returns:
+        ColumnProfile for df
+    """
+    key = id(df)
+    signature = frame_signature(df)
+
+    with _profiles_lock:
+        entry = _profiles.get(key)
+        if entry is not None and entry[0]() is df and entry[1].signature == signature:
+            return entry[1]
+
+    profile = ColumnProfile(df)
+
+    def _forget(_ref, key=key):
+        with _profiles_lock:
+            current = _profiles.get(key)
+            if current is not None and current[0] is _ref:
+                del _profiles[key]
+
+    with _profiles_lock:
+        _profiles[key] = (weakref.ref(df, _forget), profile)
+    logger.debug(f"Profiled frame {df.shape} ({len(_profiles)} cached)")
+    return profile
+
+
+def invalidate_column_profile(df: pd.DataFrame):
+    """Drop the cached profile for a frame (e.g. after in-place fillna)."""
+    with _profiles_lock:
+        _profiles.pop(id(df), None)
@@ -0,0 +1,225 @@
+"""
+Precompiled column-role matching, built once per DataFrame schema.
+
+This module provides:
+- fold_name(): column name folded for matching (lowercase, Vietnamese
+  diacritics stripped, separators → one space: 'Doanh_Thu (VNĐ)' → 'doanh thu vnd')
+- folded_names(): folded names of a column list, memoized by schema
+- Role: a column role defined by keyword patterns and exclusions
+- RoleMatcher: ONE compiled regex over all keywords of a role set; a single
+  scan of a name finds every keyword occurring in it (Aho-Corasick style)
+- ColumnRoleIndex: role → columns for one schema, O(1) lookups;
+  RoleMatcher.index() memoizes it by schema signature across reruns
+
+Matching is substring matching on folded names, so 'doanh_thu', 'Doanh thu'
+and 'DOANH-THU' all match the keyword 'doanh thu', and Vietnamese aliases are
+ordinary keywords of a role (e.g. Role('revenue', 'doanh thu')).
+
+Configuration (env):
+    COLUMN_ROLE_CACHE_SIZE: Schemas remembered per matcher (default 64)
+
+Example:
+    >>> matcher = RoleMatcher({'revenue': Role('revenue', 'doanh thu'),
+    ...                        'transaction': Role('transaction', exclude=('rate',))})
+    >>> roles = matcher.index(['Doanh_Thu', 'Transactions', 'Transaction_Rate'])
+    >>> roles.get('revenue'), roles.first('transaction')
+    (('Doanh_Thu',), 'Transactions')
+    >>> matcher.index(['Doanh_Thu', 'Transactions', 'Transaction_Rate']) is roles
+    True
+"""
+
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, FrozenSet, Hashable, Iterable, Optional, Sequence, Tuple, Union
+
+from utils.text_search import normalize_text
+
+logger = logging.getLogger(__name__)
+
+# A pattern is one keyword or a tuple of keywords that must all occur
+Pattern = Union[str, Tuple[str, ...]]
+
+DEFAULT_CACHE_SIZE = 64
+
+
+def _cache_size() -> int:
+    return int(os.getenv('COLUMN_ROLE_CACHE_SIZE', str(DEFAULT_CACHE_SIZE)))
+
+
+@lru_cache(maxsize=4096)
+def fold_name(name: Hashable) -> str:
+    """
+    Column name folded for matching.
+
+    camelCase is not split: keywords are matched as substrings, and splitting
+    would break names such as 'TikTok'.
+
+    Example:
+        >>> fold_name('Lương_Tháng')
+        'luong thang'
+    """
+    return normalize_text(str(name), split_camel=False)
+
+
+class _SchemaCache:
+    """Thread-safe LRU keyed by column tuples."""
+
+    def __init__(self):
+        self._entries: 'OrderedDict[Tuple, object]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: Tuple, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > _cache_size():
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_folded_names = _SchemaCache()
+
+
+def folded_names(columns: Iterable[Hashable]) -> Tuple[str, ...]:
+    """Folded names of columns (memoized by the column tuple)."""
+    key = tuple(columns)
+    names = _folded_names.get(key)
+    if names is None:
+        names = tuple(fold_name(col) for col in key)
+        _folded_names.put(key, names)
+    return names
+
+
+class Role:
+    """
+    Column role matched on folded column names.
+
+    Args:
+        *patterns: Keywords (or tuples of keywords that must all occur); any match
+        exclude: Keywords that disqualify a column
+    """
+
+    def __init__(self, *patterns: Pattern, exclude: Iterable[str] = ()):
+        self.patterns = patterns
+        self.exclude = tuple(exclude)
+
+    def groups(self) -> Tuple[FrozenSet[str], ...]:
+        """Folded keyword sets, one per pattern."""
+        return tuple(frozenset(fold_name(keyword) for keyword in ((p,) if isinstance(p, str) else p))
+                     for p in self.patterns)
+
+    def excluded(self) -> FrozenSet[str]:
+        return frozenset(fold_name(keyword) for keyword in self.exclude)
+
+
+class ColumnRoleIndex:
+    """
+    Role → columns (in frame order) for one schema.
+
+    Attributes:
+        columns: Column labels
+        names: Folded column names
+        text: Folded names joined by spaces (for name hints such as 'shopee')
+    """
+
+    def __init__(self, columns: Sequence[Hashable], names: Sequence[str],
+                 roles_of: Sequence[Tuple[str, ...]], role_names: Iterable[str]):
+        self.columns = tuple(columns)
+        self.names = tuple(names)
+        self.text = ' '.join(self.names)
+        matched: Dict[str, list] = {role: [] for role in role_names}
+        for col, roles in zip(self.columns, roles_of):
+            for role in roles:
+                matched[role].append(col)
+        self._columns: Dict[str, Tuple] = {role: tuple(cols) for role, cols in matched.items()}
+
+    def __contains__(self, role: str) -> bool:
+        return bool(self._columns.get(role))
+
+    def get(self, role: str) -> Tuple:
+        return self._columns.get(role, ())
+
+    def first(self, role: str) -> Optional[Hashable]:
+        matched = self._columns.get(role)
+        return matched[0] if matched else None
+
+
+class RoleMatcher:
+    """
+    Compiled matcher for a fixed set of roles.
+
+    All keywords (patterns and exclusions, folded) are alternatives of one
+    regex inside a lookahead, longest first, so each position of a name yields
+    its longest keyword; the shorter keywords starting there are its prefixes
+    and are added from a precomputed prefix table. One scan per name therefore
+    finds every keyword occurrence, however many roles are defined.
+    """
+
+    def __init__(self, roles: Dict[str, Role]):
+        self.roles = dict(roles)
+        self._rules = {role: (spec.groups(), spec.excluded()) for role, spec in self.roles.items()}
+
+        keywords = set()
+        for groups, excluded in self._rules.values():
+            keywords.update(excluded)
+            for group in groups:
+                keywords.update(group)
+        keywords.discard('')
+        ordered = sorted(keywords, key=lambda keyword: (-len(keyword), keyword))
+        self._pattern = re.compile('(?=(' + '|'.join(map(re.escape, ordered)) + '))') if ordered else None
+        self._prefixes = {keyword: frozenset(k for k in keywords if keyword.startswith(k)) for keyword in keywords}
+        self._indexes = _SchemaCache()
+        self._roles_of_name = lru_cache(maxsize=4096)(self._match)
+
+    def keywords_in(self, name: str) -> FrozenSet[str]:
+        """Keywords occurring in a folded name."""
+        if self._pattern is None:
+            return frozenset()
+        found = set()
+        for match in self._pattern.finditer(name):
+            found |= self._prefixes[match.group(1)]
+        return frozenset(found)
+
+    def _match(self, name: str) -> Tuple[str, ...]:
+        found = self.keywords_in(name)
+        return tuple(role for role, (groups, excluded) in self._rules.items()
+                     if any(group <= found for group in groups) and not excluded & found)
+
+    def roles_of(self, column: Hashable) -> Tuple[str, ...]:
+        """Roles one column name plays (memoized per name)."""
+        return self._roles_of_name(fold_name(column))
+
+    def matches(self, column: Hashable, role: str) -> bool:
+        return role in self.roles_of(column)
+
+    def index(self, columns: Iterable[Hashable]) -> ColumnRoleIndex:
+        """
+        Role index for a schema, built once per distinct column list.
+
+        Args:
+            columns: Column labels (e.g. df.columns)
+
+        Returns:
+            ColumnRoleIndex (shared by all calls with the same columns)
+        """
+        key = tuple(columns)
+        index = self._indexes.get(key)
+        if index is None:
+            names = folded_names(key)
+            index = ColumnRoleIndex(key, names, [self._roles_of_name(name) for name in names], self.roles)
+            self._indexes.put(key, index)
+        return index
@@ -0,0 +1,556 @@
+"""
+Bitmap-indexed cross-filtering for dashboard filter panels.
+
+This module provides:
+- CrossFilterIndex: built once per dataset; dictionary-encodes categorical
+  columns (with one packed bitmap per value for low-cardinality columns,
+  built on first use) and keeps a sorted index per numeric column
+- Selection: the rows passing all active filters, as a packed bitmap; combining
+  filters is a bitwise AND over n/8 bytes
+- Aggregates over a selection (sum/mean/count/min/max, optionally grouped by a
+  categorical column) straight from the column arrays, without materializing
+  the filtered DataFrame
+- AggregateCube: sum/count/min/max of every metric per cell (distinct
+  combination of dimension values), so CrossFilterIndex.breakdown() answers
+  category-filtered group-bys in O(cells) instead of O(rows)
+
+A categorical filter ORs the bitmaps of the selected values (or inverts the OR
+of the unselected ones, whichever is shorter); a selected null (None/NaN)
+keeps the rows with a missing value, as isin does. A range filter is two binary
+searches over the sorted values plus a scatter of the matching row ids. Each
+per-filter bitmap is memoized, so a Streamlit rerun that changes one filter
+only recomputes that filter and the final AND.
+
+breakdown() uses a cube over exactly the dimensions involved (group-by column
+plus filtered columns), built on first use and cached, so changing the selected
+values of an existing filter never rescans rows. Range filters and
+non-decomposable aggregates (median, nunique, ...) fall back to a row scan of
+the selection.
+
+Configuration (env):
+- CROSS_FILTER_MAX_BITMAP_VALUES: max distinct values for per-value bitmaps
+  (default 256); higher-cardinality columns use a code lookup table instead
+- CROSS_FILTER_MAX_CUBE_CELLS: cubes with more cells than this fraction of the
+  rows are not kept (default 0.5; a row scan is as fast)
+
+Example:
+    >>> index = CrossFilterIndex(df, categorical_cols=['channel'], numeric_cols=['revenue'])
+    >>> selection = index.select({'channel': ['Email', 'SEO']}, {'revenue': (1e6, 5e6)})
+    >>> selection.count
+    48213
+    >>> index.aggregate(selection, 'revenue', by='channel', agg='sum')
+    channel
+    Email    1.2e+10
+    SEO      9.8e+09
+    Name: revenue, dtype: float64
+    >>> filtered = index.take(selection)   # DataFrame only when a chart needs rows
+    >>> index.breakdown('channel', 'revenue', 'sum', categories={'region': ['North']})
+"""
+
+import logging
+import os
+from collections import OrderedDict
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+MAX_CACHED_FILTERS = 64  # Memoized per-filter bitmaps (LRU)
+MAX_CACHED_CUBES = 8  # Cubes per index (one per dimension set, LRU)
+CUBE_AGGREGATIONS = ('sum', 'count', 'mean', 'min', 'max')  # Decomposable over cells
+
+_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+class Selection:
+    """
+    Rows selected by a set of filters, stored as a packed bitmap (1 bit per row).
+    """
+
+    def __init__(self, bits: np.ndarray, n_rows: int, n_filters: int = 0):
+        self.bits = bits
+        self.n_rows = n_rows
+        self.n_filters = n_filters  # Active filters that produced this selection
+        self._count: Optional[int] = None
+
+    @property
+    def mask(self) -> np.ndarray:
+        """Boolean row mask."""
+        return np.unpackbits(self.bits, count=self.n_rows).view(bool)
+
+    @property
+    def indices(self) -> np.ndarray:
+        """Selected row positions, ascending."""
+        return np.flatnonzero(self.mask)
+
+    @property
+    def count(self) -> int:
+        """Number of selected rows."""
+        if self._count is None:
+            self._count = int(_POPCOUNT[self.bits].sum(dtype=np.int64))
+        return self._count
+
+    @property
+    def is_all(self) -> bool:
+        return self.count == self.n_rows
+
+    def __and__(self, other: 'Selection') -> 'Selection':
+        return Selection(self.bits & other.bits, self.n_rows, self.n_filters + other.n_filters)
+
+
+def _pack(mask: np.ndarray) -> np.ndarray:
+    return np.packbits(mask)
+
+
+class CrossFilterIndex:
+    """
+    Filter indexes over one DataFrame (build once, query on every rerun).
+
+    The DataFrame is referenced, not copied; rebuild the index if it changes.
+    """
+
+    def __init__(self, df: pd.DataFrame, categorical_cols: Iterable[str] = (),
+                 numeric_cols: Iterable[str] = (), max_bitmap_values: Optional[int] = None):
+        """
+        Args:
+            df: Dataset to filter
+            categorical_cols: Columns filtered by value lists
+            numeric_cols: Columns filtered by (min, max) ranges
+            max_bitmap_values: Per-value bitmap cardinality limit
+                (default: CROSS_FILTER_MAX_BITMAP_VALUES or 256)
+        """
+        self.df = df
+        self.n_rows = len(df)
+        if max_bitmap_values is None:
+            max_bitmap_values = int(os.getenv('CROSS_FILTER_MAX_BITMAP_VALUES', '256'))
+
+        # Categorical: codes (-1 = missing), dictionary, optional per-value bitmaps
+        self.codes: Dict[str, np.ndarray] = {}
+        self.categories: Dict[str, pd.Index] = {}
+        self.value_bitmaps: Dict[str, Dict[int, np.ndarray]] = {}  # column → {code: packed bitmap}
+        for col in categorical_cols:
+            if col not in df.columns:
+                continue
+            codes, uniques = pd.factorize(df[col], sort=False)
+            self.codes[col] = codes
+            self.categories[col] = uniques
+            if len(uniques) <= max_bitmap_values:
+                self.value_bitmaps[col] = {}
+
+        # Numeric: values sorted ascending (NaN last) with their row ids
+        self.sorted_values: Dict[str, np.ndarray] = {}
+        self.sorted_rows: Dict[str, np.ndarray] = {}
+        self.values: Dict[str, np.ndarray] = {}
+        for col in numeric_cols:
+            if col not in df.columns:
+                continue
+            values = pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=float)
+            order = np.argsort(values, kind='stable')
+            self.values[col] = values
+            self.sorted_values[col] = values[order]
+            self.sorted_rows[col] = order
+
+        self._all = Selection(_pack(np.ones(self.n_rows, dtype=bool)), self.n_rows)
+        self._filter_cache: 'OrderedDict[tuple, np.ndarray]' = OrderedDict()
+        self._cubes: 'OrderedDict[tuple, Optional[AggregateCube]]' = OrderedDict()
+
+    def value_bits(self, col: str, code: int) -> np.ndarray:
+        """Packed bitmap of rows holding one dictionary code of col (built once)."""
+        bitmaps = self.value_bitmaps[col]
+        bits = bitmaps.get(code)
+        if bits is None:
+            bits = bitmaps[code] = _pack(self.codes[col] == code)
+        return bits
+
+    def _union(self, col: str, codes: Iterable[int]) -> np.ndarray:
+        bits = np.zeros_like(self._all.bits)
+        for code in codes:
+            bits |= self.value_bits(col, int(code))
+        return bits
+
+    def _cached(self, key: tuple, build) -> np.ndarray:
+        bits = self._filter_cache.get(key)
+        if bits is None:
+            bits = build()
+            self._filter_cache[key] = bits
+            if len(self._filter_cache) > MAX_CACHED_FILTERS:
+                self._filter_cache.popitem(last=False)
+        else:
+            self._filter_cache.move_to_end(key)
+        return bits
+
+    def _value_codes(self, col: str, values: Sequence[Hashable]) -> np.ndarray:
+        """Dictionary codes of values (-1 for a missing value, like isin; unknown values dropped)."""
+        values = pd.Index(list(values))
+        codes = self.categories[col].get_indexer(values)
+        return np.unique(codes[(codes >= 0) | values.isna()])
+
+    def category_bits(self, col: str, values: Sequence[Hashable]) -> np.ndarray:
+        """Packed bitmap of rows whose col is one of values."""
+        def build():
+            codes = self._value_codes(col, values)
+            n_values = len(self.categories[col])
+            if col in self.value_bitmaps:
+                unselected = np.setdiff1d(np.arange(-1, n_values), codes)  # -1 = missing
+                if len(codes) <= len(unselected):
+                    return self._union(col, codes)
+                # Most values selected: drop the rows of the unselected values
+                return self._all.bits & ~self._union(col, unselected)
+            lookup = np.zeros(n_values + 1, dtype=bool)  # Slot -1: missing, set if a null is selected
+            lookup[codes] = True
+            return _pack(lookup[self.codes[col]])
+
+        return self._cached(('in', col, frozenset(values)), build)
+
+    def range_bits(self, col: str, low: float, high: float) -> np.ndarray:
+        """Packed bitmap of rows with low <= col <= high (NaN never matches)."""
+        def build():
+            sorted_values = self.sorted_values[col]
+            start = np.searchsorted(sorted_values, low, side='left')
+            stop = np.searchsorted(sorted_values, high, side='right')
+            mask = np.zeros(self.n_rows, dtype=bool)
+            mask[self.sorted_rows[col][start:stop]] = True
+            return _pack(mask)
+
+        return self._cached(('range', col, float(low), float(high)), build)
+
+    def select(self, categories: Optional[Dict[str, Sequence[Hashable]]] = None,
+               ranges: Optional[Dict[str, Tuple[float, float]]] = None) -> Selection:
+        """
+        Combine filters (AND across columns).
+
+        Args:
+            categories: {column: allowed values}; empty / None lists are ignored
+            ranges: {column: (min, max)} inclusive
+
+        Returns:
+            Selection (all rows when no filter applies)
+        """
+        bits = None
+        n_filters = 0
+        for col, values in (categories or {}).items():
+            if not values or col not in self.codes:
+                continue
+            current = self.category_bits(col, values)
+            bits = current if bits is None else bits & current
+            n_filters += 1
+        for col, bounds in (ranges or {}).items():
+            if bounds is None or col not in self.sorted_values:
+                continue
+            current = self.range_bits(col, *bounds)
+            bits = current if bits is None else bits & current
+            n_filters += 1
+        if bits is None:
+            return self._all
+        return Selection(bits, self.n_rows, n_filters)
+
+    def take(self, selection: Selection) -> pd.DataFrame:
+        """
+        Selected rows as a DataFrame (the original frame itself when all rows are selected).
+        """
+        if selection.is_all:
+            return self.df
+        return self.df.iloc[selection.indices]
+
+    def _column(self, col: str) -> np.ndarray:
+        if col not in self.values:
+            self.values[col] = pd.to_numeric(self.df[col], errors='coerce').to_numpy(dtype=float)
+        return self.values[col]
+
+    def aggregate(self, selection: Selection, col: Optional[str] = None, by: Optional[str] = None,
+                  agg: str = 'sum'):
+        """
+        Aggregate a numeric column over the selected rows.
+
+        Args:
+            selection: Rows from select()
+            col: Numeric column (None with agg='count' counts rows)
+            by: Optional categorical column (must be indexed) to group by
+            agg: 'sum', 'mean', 'count', 'min' or 'max' (NaN values are skipped)
+
+        Returns:
+            Scalar without by; otherwise a Series indexed by the group values
+            (groups without selected rows are omitted)
+        """
+        if agg not in ('sum', 'mean', 'count', 'min', 'max'):
+            raise ValueError(f"Unsupported aggregation: {agg}")
+        rows = None if selection.is_all else selection.indices
+        values = self._column(col) if col is not None else np.ones(self.n_rows)
+        if rows is not None:
+            values = values[rows]
+        valid = ~np.isnan(values)
+
+        if by is None:
+            values = values[valid]
+            if agg == 'count':
+                return int(len(values))
+            if len(values) == 0:
+                return 0.0 if agg == 'sum' else float('nan')
+            return float(getattr(np, agg)(values))
+
+        codes = self.codes[by] if rows is None else self.codes[by][rows]
+        keep = valid & (codes >= 0)
+        codes, values = codes[keep], values[keep]
+        n_groups = len(self.categories[by])
+        counts = np.bincount(codes, minlength=n_groups)
+        if agg == 'count':
+            result = counts.astype(np.int64)
+        elif agg in ('sum', 'mean'):
+            result = np.bincount(codes, weights=values, minlength=n_groups)
+            if agg == 'mean':
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    result = result / counts
+        else:
+            result = np.full(n_groups, np.inf if agg == 'min' else -np.inf)
+            (np.minimum if agg == 'min' else np.maximum).at(result, codes, values)
+        present = counts > 0
+        return pd.Series(result[present], index=self.categories[by][present], name=col or 'count').rename_axis(by)
+
+    def describe(self, selection: Selection, cols: Sequence[str]) -> Dict[str, Dict[str, float]]:
+        """
+        Sum, mean, std, min and max of several numeric columns over a selection.
+
+        Returns:
+            {column: {'sum', 'mean', 'std', 'min', 'max'}} (std is the sample std, like pandas)
+        """
+        rows = None if selection.is_all else selection.indices
+        stats = {}
+        for col in cols:
+            values = self._column(col)
+            if rows is not None:
+                values = values[rows]
+            values = values[~np.isnan(values)]
+            if len(values) == 0:
+                stats[col] = {'sum': 0.0, 'mean': float('nan'), 'std': float('nan'),
+                              'min': float('nan'), 'max': float('nan')}
+                continue
+            stats[col] = {
+                'sum': float(values.sum()),
+                'mean': float(values.mean()),
+                'std': float(values.std(ddof=1)) if len(values) > 1 else float('nan'),
+                'min': float(values.min()),
+                'max': float(values.max()),
+            }
+        return stats
+
+    def cube(self, dimensions: Sequence[str]) -> Optional['AggregateCube']:
+        """
+        Cube over dimensions and every numeric column (built once, LRU-cached).
+
+        Returns:
+            None if the dimensions have too many combinations to be worth it
+        """
+        key = tuple(sorted(set(dimensions)))
+        if key in self._cubes:
+            cube = self._cubes[key]
+            if cube is None or set(self.values) <= set(cube.stats):
+                self._cubes.move_to_end(key)
+                return cube
+            # A numeric column was added since: rebuild with all of them
+        cube = AggregateCube(self, key, list(self.values))
+        max_ratio = float(os.getenv('CROSS_FILTER_MAX_CUBE_CELLS', '0.5'))
+        if cube.n_cells > max(max_ratio * self.n_rows, 1):
+            cube = None  # Almost one cell per row: scanning rows costs the same
+        self._cubes[key] = cube
+        if len(self._cubes) > MAX_CACHED_CUBES:
+            self._cubes.popitem(last=False)
+        return cube
+
+    def breakdown(self, by: str, col: str, agg: str = 'sum',
+                  categories: Optional[Dict[str, Sequence[Hashable]]] = None,
+                  ranges: Optional[Dict[str, Tuple[float, float]]] = None) -> pd.Series:
+        """
+        df[filtered].groupby(by)[col].agg(agg), answered from a cube when possible.
+
+        Args:
+            by: Indexed categorical column to group by
+            col: Numeric column
+            agg: Any pandas groupby aggregation; sum/count/mean/min/max use the cube
+            categories: Categorical filters as in select()
+            ranges: Range filters as in select() (force a row scan)
+
+        Returns:
+            Series indexed by the group values present in the selection, sorted
+            by group value like pandas groupby
+        """
+        categories = {c: v for c, v in (categories or {}).items() if v and c in self.codes}
+        ranges = {c: r for c, r in (ranges or {}).items() if r is not None and c in self.sorted_values}
+        if agg in CUBE_AGGREGATIONS and not ranges:
+            self._column(col)
+            cube = self.cube([by, *categories])
+            if cube is not None:
+                return cube.query(by, col, agg, categories)
+
+        # Row scan over the selection (non-decomposable aggregate or range filter)
+        selection = self.select(categories, ranges)
+        rows = None if selection.is_all else selection.indices
+        codes = self.codes[by] if rows is None else self.codes[by][rows]
+        values = pd.to_numeric(self.df[col], errors='coerce') if rows is None else \
+            pd.to_numeric(self.df[col].iloc[rows], errors='coerce')
+        grouped = pd.Series(values.to_numpy(), name=col).groupby(codes).agg(agg)
+        grouped = grouped[grouped.index >= 0]
+        result = pd.Series(grouped.to_numpy(), index=self.categories[by][grouped.index.to_numpy()], name=col)
+        return _sort_groups(result.rename_axis(by))
+
+
+def _sort_groups(series: pd.Series) -> pd.Series:
+    try:
+        return series.sort_index()
+    except TypeError:
+        return series  # Mixed-type group values: keep first-seen order
+
+
+class AggregateCube:
+    """
+    Pre-aggregated cells of one CrossFilterIndex.
+
+    A cell is one combination of dimension values present in the data. Each
+    cell stores its row count and, per metric, sum / non-null count / min /
+    max, which is enough to answer sum, count, mean, min and max for any
+    selection of dimension values.
+    """
+
+    def __init__(self, index: CrossFilterIndex, dimensions: Sequence[str], metrics: Sequence[str]):
+        """
+        Args:
+            index: Index providing dictionary codes and numeric arrays
+            dimensions: Indexed categorical columns
+            metrics: Numeric columns (already in index.values)
+        """
+        self.index = index
+        self.dimensions = list(dimensions)
+
+        # Cell id per row: combine dimension codes, re-factorizing after each step
+        cell_ids = np.zeros(index.n_rows, dtype=np.int64)
+        for dim in self.dimensions:
+            codes = index.codes[dim].astype(np.int64) + 1  # 0 = missing
+            cell_ids, _ = pd.factorize(cell_ids * (len(index.categories[dim]) + 1) + codes)
+        self.n_cells = int(cell_ids.max()) + 1 if len(cell_ids) else 0
+        first_rows = np.full(self.n_cells, index.n_rows, dtype=np.int64)
+        np.minimum.at(first_rows, cell_ids, np.arange(index.n_rows))
+        self.cell_codes = {dim: index.codes[dim][first_rows] for dim in self.dimensions}
+        self.rows = np.bincount(cell_ids, minlength=self.n_cells)
+
+        # One grouped pass for every metric
+        self.stats: Dict[str, Dict[str, np.ndarray]] = {}
+        if metrics and self.n_cells:
+            frame = pd.DataFrame({metric: index.values[metric] for metric in metrics})
+            grouped = frame.groupby(cell_ids, sort=True).agg(['sum', 'count', 'min', 'max'])
+            for metric in metrics:
+                self.stats[metric] = {stat: grouped[(metric, stat)].to_numpy(dtype=float)
+                                      for stat in ('sum', 'count', 'min', 'max')}
+
+    def cell_mask(self, categories: Dict[str, Sequence[Hashable]]) -> np.ndarray:
+        """Cells whose dimension values pass all categorical filters."""
+        mask = np.ones(self.n_cells, dtype=bool)
+        for dim, values in categories.items():
+            codes = self.index._value_codes(dim, values)
+            lookup = np.zeros(len(self.index.categories[dim]) + 1, dtype=bool)  # Slot -1: missing
+            lookup[codes] = True
+            mask &= lookup[self.cell_codes[dim]]
+        return mask
+
+    def query(self, by: str, metric: str, agg: str = 'sum',
+              categories: Optional[Dict[str, Sequence[Hashable]]] = None) -> pd.Series:
+        """
+        Group-by of metric over the cells passing categories.
+
+        Returns:
+            Same as df[filtered].groupby(by)[metric].agg(agg)
+        """
+        if agg not in CUBE_AGGREGATIONS:
+            raise ValueError(f"Not decomposable over cube cells: {agg}")
+        mask = self.cell_mask(categories or {}) & (self.cell_codes[by] >= 0)
+        codes = self.cell_codes[by][mask]
+        stats = {name: values[mask] for name, values in self.stats[metric].items()}
+        n_groups = len(self.index.categories[by])
+        present = np.bincount(codes, weights=self.rows[mask], minlength=n_groups) > 0
+
+        counts = np.bincount(codes, weights=stats['count'], minlength=n_groups)
+        if agg == 'count':
+            result = counts.astype(np.int64)
+        elif agg in ('sum', 'mean'):
+            result = np.bincount(codes, weights=stats['sum'], minlength=n_groups)
+            if agg == 'mean':
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    result = result / counts
+        else:
+            fill = np.inf if agg == 'min' else -np.inf
+            result = np.full(n_groups, fill)
+            cell_values = stats[agg]
+            valid = ~np.isnan(cell_values)
+            (np.minimum if agg == 'min' else np.maximum).at(result, codes[valid], cell_values[valid])
+            result[result == fill] = np.nan
+
+        series = pd.Series(result[present], index=self.index.categories[by][present], name=metric)
+        return _sort_groups(series.rename_axis(by))
+
+
+def build_filter_index(df: pd.DataFrame, categorical_cols: Iterable[str], numeric_cols: Iterable[str],
+                       previous: Optional[CrossFilterIndex] = None) -> CrossFilterIndex:
+    """
+    Reuse previous if it indexes the same DataFrame object and columns, else build.
+
+    For UI session state: the index survives reruns until the dataset or the
+    column roles change.
+    """
+    categorical_cols, numeric_cols = list(categorical_cols or []), list(numeric_cols or [])
+    if (previous is not None and previous.df is df
+            and set(previous.codes) == {c for c in categorical_cols if c in df.columns}
+            and set(previous.sorted_values) == {c for c in numeric_cols if c in df.columns}):
+        return previous
+    return CrossFilterIndex(df, categorical_cols, numeric_cols)
+
+
+if __name__ == '__main__':
+    import time
+
+    rng = np.random.default_rng(0)
+    n = 1_000_000
+    df = pd.DataFrame({
+        'channel': rng.choice(['Email', 'SEO', 'Facebook', 'Google', 'TikTok', 'Zalo'], n),
+        'region': rng.choice([f"Region {i}" for i in range(40)], n),
+        'revenue': rng.gamma(2.0, 1e6, n),
+        'cost': rng.gamma(2.0, 3e5, n),
+    })
+    filters = {'channel': ['Email', 'SEO', 'Zalo'], 'region': [f"Region {i}" for i in range(10)]}
+
+    start = time.perf_counter()
+    filtered = df.copy()
+    for col, values in filters.items():
+        filtered = filtered[filtered[col].isin(values)]
+    filtered = filtered[(filtered['revenue'] >= 1e6) & (filtered['revenue'] <= 5e6)]
+    filtered.groupby('channel')['revenue'].sum()
+    mask_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index = CrossFilterIndex(df, ['channel', 'region'], ['revenue', 'cost'])
+    build_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    selection = index.select(filters, {'revenue': (1e6, 5e6)})
+    selection_count = selection.count
+    select_seconds = time.perf_counter() - start
+    index.aggregate(selection, 'revenue', by='channel')
+    cold_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    selection = index.select(filters, {'revenue': (1e6, 4e6)})  # One filter changed
+    index.aggregate(selection, 'revenue', by='channel')
+    warm_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index.breakdown('channel', 'revenue', 'sum', categories=filters)  # Builds the (channel, region) cube
+    cube_build_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    index.breakdown('channel', 'revenue', 'sum', categories={**filters, 'channel': ['Email']})
+    cube_seconds = time.perf_counter() - start
+
+    print(f"{n:,} rows, {selection_count:,} selected")
+    print(f"copy + boolean masks + groupby: {mask_seconds * 1000:.1f} ms")
+    print(f"index build (once per dataset): {build_seconds * 1000:.1f} ms")
+    print(f"select: {select_seconds * 1000:.1f} ms, select + grouped sum: {cold_seconds * 1000:.1f} ms")
+    print(f"one filter changed + grouped sum: {warm_seconds * 1000:.1f} ms")
+    print(f"cube breakdown: first {cube_build_seconds * 1000:.1f} ms, filter change {cube_seconds * 1000:.2f} ms")
@@ -0,0 +1,292 @@
+"""
+Optional in-process DuckDB backend for semantic-layer queries.
+
+This module provides:
+- duckdb_available(): True if the duckdb package is installed
+- DuckDBEngine: connection with memory limit + spill directory; registers
+  DataFrames (via Arrow, zero-copy for numeric columns) or scans CSV/Parquet
+  files directly, and creates one view per MDL model with MDL column names
+- SemanticQueryEngine: answers metric/dimension queries with SQL on DuckDB,
+  falling back to the vectorized pandas MetricPlan when DuckDB is missing or a
+  query fails; both backends return the same DataFrame shape and values (the
+  pandas compiler follows SQL NULL semantics). load_frame() takes a DataFrame,
+  load_file() a CSV/Parquet path
+
+MDL measure expressions are SQL already, so they run unchanged against the
+model views. DuckDB aggregates on all cores and spills large hash tables to
+DUCKDB_TEMP_DIR when DUCKDB_MEMORY_LIMIT is reached; load_file() scans files
+without loading them into pandas, for datasets larger than RAM.
+
+Configuration (env):
+- SEMANTIC_ENGINE: auto (default: duckdb if installed) | duckdb | pandas
+- DUCKDB_MEMORY_LIMIT: e.g. 2GB (default: DuckDB's 80% of RAM)
+- DUCKDB_THREADS: worker threads (default: all cores)
+- DUCKDB_TEMP_DIR: spill directory (default: system temp dir)
+
+Example:
+    >>> engine = SemanticQueryEngine(mdl)            # mdl = load_mdl_for_domain('marketing')
+    >>> engine.load_frame(df)                        # or engine.load_file('campaigns.parquet')
+    >>> engine.metric('marketing_roi_kpis', dimensions=['channel'])
+                total_spend  total_revenue  ...  roas
+    channel
+    Email       12000000.0   50400000.0     ...  4.2
+    >>> engine.backend
+    'duckdb'
+"""
+
+import logging
+import os
+import tempfile
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from utils.mdl_compiler import MetricPlan, resolve_columns
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TEMP_DIR = os.path.join(tempfile.gettempdir(), 'dataanalytics_vn', 'duckdb_spill')
+SOURCE_TABLE = 'source_data'
+
+
+def duckdb_available() -> bool:
+    """True if the duckdb package is installed."""
+    try:
+        import duckdb  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def quote_identifier(name: str) -> str:
+    """SQL identifier in double quotes (embedded quotes doubled)."""
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+class DuckDBEngine:
+    """
+    In-memory DuckDB database holding the uploaded data and MDL model views.
+
+    Raises ImportError on construction when duckdb is not installed.
+    """
+
+    def __init__(self, memory_limit: Optional[str] = None, threads: Optional[int] = None,
+                 temp_directory: Optional[str] = None):
+        """
+        Args:
+            memory_limit: DuckDB memory limit before spilling (default: DUCKDB_MEMORY_LIMIT)
+            threads: Worker threads (default: DUCKDB_THREADS or all cores)
+            temp_directory: Spill directory (default: DUCKDB_TEMP_DIR)
+        """
+        import duckdb
+
+        config = {'temp_directory': temp_directory or os.getenv('DUCKDB_TEMP_DIR', DEFAULT_TEMP_DIR)}
+        memory_limit = memory_limit or os.getenv('DUCKDB_MEMORY_LIMIT')
+        if memory_limit:
+            config['memory_limit'] = memory_limit
+        threads = threads or (int(os.getenv('DUCKDB_THREADS')) if os.getenv('DUCKDB_THREADS') else None)
+        if threads:
+            config['threads'] = threads
+        os.makedirs(config['temp_directory'], exist_ok=True)
+
+        self.connection = duckdb.connect(':memory:', config=config)
+        self.columns: Dict[str, List[str]] = {}  # table/view → column names
+        self._registered = {}  # Keeps registered frames alive while DuckDB scans them
+
+    def register_frame(self, name: str, df: pd.DataFrame):
+        """
+        Expose a DataFrame as a table without copying numeric columns.
+
+        Uses an Arrow table when pyarrow is installed (DuckDB's parallel Arrow
+        scan); otherwise DuckDB's pandas scan.
+        """
+        try:
+            import pyarrow as pa
+            data = pa.Table.from_pandas(df, preserve_index=False)
+        except ImportError:
+            data = df
+        self.connection.register(name, data)
+        self._registered[name] = data
+        self.columns[name] = [str(column) for column in df.columns]
+
+    def register_file(self, name: str, path: str):
+        """
+        Expose a CSV or Parquet file as a view; DuckDB streams it at query time.
+        """
+        if name in self._registered:
+            self.connection.unregister(name)
+            del self._registered[name]
+        reader = 'read_parquet' if str(path).lower().endswith('.parquet') else 'read_csv_auto'
+        literal = "'" + str(path).replace("'", "''") + "'"
+        self.connection.execute(f"CREATE OR REPLACE VIEW {quote_identifier(name)} AS SELECT * FROM {reader}({literal})")
+        self.columns[name] = [row[0] for row in self.connection.execute(
+            f"DESCRIBE {quote_identifier(name)}").fetchall()]
+
+    def create_model_views(self, semantic_layer, source: str = SOURCE_TABLE,
+                           column_map: Optional[Dict[str, str]] = None) -> Dict[str, List[str]]:
+        """
+        Create one view per MDL model over the source table, renaming the data's
+        headers to MDL column names.
+
+        Only models with at least one resolvable column get a view.
+
+        Returns:
+            {model name: MDL columns exposed by its view}
+        """
+        created = {}
+        for model in semantic_layer.models:
+            names = [column.name for column in model.columns if not column.isCalculated]
+            resolved = resolve_columns(names, self.columns[source], column_map)
+            if not resolved:
+                continue
+            select = ', '.join(f"{quote_identifier(data_col)} AS {quote_identifier(mdl_col)}"
+                               for mdl_col, data_col in resolved.items())
+            self.connection.execute(f"CREATE OR REPLACE VIEW {quote_identifier(model.name)} AS "
+                                    f"SELECT {select} FROM {quote_identifier(source)}")
+            self.columns[model.name] = list(resolved)
+            created[model.name] = list(resolved)
+        return created
+
+    def sql(self, query: str, parameters: Optional[list] = None) -> pd.DataFrame:
+        """Run a query and return the result as a DataFrame."""
+        return self.connection.execute(query, parameters or []).df()
+
+    def close(self):
+        """Close the connection and release registered data."""
+        self.connection.close()
+        self._registered.clear()
+
+
+class SemanticQueryEngine:
+    """
+    Metric queries over one dataset, on DuckDB when available, else pandas.
+    """
+
+    def __init__(self, semantic_layer, backend: Optional[str] = None):
+        """
+        Args:
+            semantic_layer: Loaded SemanticLayer (e.g. load_mdl_for_domain(...))
+            backend: 'auto', 'duckdb' or 'pandas' (default: SEMANTIC_ENGINE env, 'auto')
+        """
+        self.semantic_layer = semantic_layer
+        requested = (backend or os.getenv('SEMANTIC_ENGINE', 'auto')).lower()
+        if requested == 'duckdb' and not duckdb_available():
+            raise ImportError("duckdb is not installed (pip install duckdb)")
+        self.backend = 'duckdb' if requested in ('auto', 'duckdb') and duckdb_available() else 'pandas'
+        self.df: Optional[pd.DataFrame] = None
+        self.path: Optional[str] = None
+        self.column_map: Optional[Dict[str, str]] = None
+        self.views: Dict[str, List[str]] = {}
+        self._duckdb: Optional[DuckDBEngine] = None
+        self._plans: Dict[str, MetricPlan] = {}
+
+    def load_frame(self, df: pd.DataFrame, column_map: Optional[Dict[str, str]] = None):
+        """Use df as the data behind every MDL model."""
+        self.df = df
+        self.path = None
+        self.column_map = column_map
+        if self.backend == 'duckdb':
+            if self._duckdb is None:
+                self._duckdb = DuckDBEngine()
+            self._duckdb.register_frame(SOURCE_TABLE, df)
+            self.views = self._duckdb.create_model_views(self.semantic_layer, SOURCE_TABLE, column_map)
+
+    def load_file(self, path: str, column_map: Optional[Dict[str, str]] = None):
+        """
+        Use a CSV or Parquet file as the data behind every MDL model.
+
+        On DuckDB the file is scanned at query time and never loaded into
+        pandas; the pandas backend (and the per-query fallback) reads it on
+        first use.
+        """
+        self.df = None
+        self.path = str(path)
+        self.column_map = column_map
+        if self.backend == 'duckdb':
+            if self._duckdb is None:
+                self._duckdb = DuckDBEngine()
+            self._duckdb.register_file(SOURCE_TABLE, self.path)
+            self.views = self._duckdb.create_model_views(self.semantic_layer, SOURCE_TABLE, column_map)
+
+    def _frame(self) -> pd.DataFrame:
+        """Data for the pandas backend, read from the loaded file on first use."""
+        if self.df is None and self.path is not None:
+            reader = pd.read_parquet if self.path.lower().endswith('.parquet') else pd.read_csv
+            self.df = reader(self.path)
+        return self.df
+
+    def _plan(self, metric) -> MetricPlan:
+        if metric.name not in self._plans:
+            self._plans[metric.name] = MetricPlan.from_metric(metric)
+        return self._plans[metric.name]
+
+    def _metric(self, metric_name: str):
+        for metric in self.semantic_layer.metrics:
+            if metric.name == metric_name:
+                return metric
+        raise KeyError(f"Unknown metric: {metric_name}")
+
+    def metric_sql(self, metric_name: str, dimensions: Optional[List[str]] = None) -> Optional[str]:
+        """
+        SQL for a metric over its base model view (None if the view is missing).
+
+        Measures whose columns are not in the view are left out.
+        """
+        metric = self._metric(metric_name)
+        view_columns = self.views.get(metric.baseObject)
+        if view_columns is None:
+            return None
+        dimensions = [d for d in (metric.dimension if dimensions is None else dimensions) if d in view_columns]
+        plan = self._plan(metric)
+        selects = [quote_identifier(d) for d in dimensions]
+        selects += [f"CAST({measure.expression.strip()} AS DOUBLE) AS {quote_identifier(measure.name)}"
+                    for measure in plan.measures if all(c in view_columns for c in measure.columns)]
+        query = f"SELECT {', '.join(selects)} FROM {quote_identifier(metric.baseObject)}"
+        if dimensions:
+            group = ', '.join(quote_identifier(d) for d in dimensions)
+            query += f" GROUP BY {group} ORDER BY {group}"
+        return query
+
+    def metric(self, metric_name: str, dimensions: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Compute all measures of a metric.
+
+        Args:
+            metric_name: Metric name in the MDL
+            dimensions: Group-by MDL columns (default: metric.dimension; [] = totals)
+
+        Returns:
+            Same shape as MetricPlan.evaluate(): index = dimensions ('total'
+            without), one column per computable measure, attrs['skipped'] and
+            attrs['backend']
+        """
+        if self.df is None and self.path is None:
+            raise ValueError("No data loaded (call load_frame or load_file first)")
+        metric = self._metric(metric_name)
+        plan = self._plan(metric)
+
+        if self.backend == 'duckdb':
+            query = self.metric_sql(metric_name, dimensions)
+            if query is not None:
+                try:
+                    result = self._duckdb.sql(query)
+                    view_columns = self.views[metric.baseObject]
+                    group_dims = [d for d in (metric.dimension if dimensions is None else dimensions)
+                                  if d in view_columns]
+                    result = result.set_index(group_dims) if group_dims else result.set_axis(['total'])
+                    result.attrs['skipped'] = {m.name: [c for c in m.columns if c not in view_columns]
+                                               for m in plan.measures if m.name not in result.columns}
+                    result.attrs['backend'] = 'duckdb'
+                    return result
+                except Exception as e:
+                    logger.warning(f"DuckDB query failed for {metric_name} ({str(e)[:120]}), using pandas")
+
+        result = plan.evaluate(self._frame(), dimensions=dimensions, column_map=self.column_map)
+        result.attrs['backend'] = 'pandas'
+        return result
+
+    def close(self):
+        """Release the DuckDB connection (if any)."""
+        if self._duckdb is not None:
+            self._duckdb.close()
+            self._duckdb = None
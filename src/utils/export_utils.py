@@ -15,10 +15,11 @@ Research: See CHART_VISUALIZATION_RESEARCH.md
 import io
 import base64
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Dict, List, Any, BinaryIO, Optional, Tuple
 import plotly.graph_objects as go
 import os
 import tempfile
+import threading
 import re
 
 # ============================================================================
@@ -382,30 +383,254 @@ def sanitize_text_for_pdf(text: str) -> str:
     return text.strip()
 
 
-def export_to_pdf(result: Dict[str, Any], df: Any, lang: str = "vi") -> bytes:
+def render_figure_matplotlib(fig: go.Figure) -> bytes:
     """
-    Export analysis results to professional PDF report
-    
+    Re-plot a Plotly figure with matplotlib (no Chrome/kaleido needed).
+
+    Publication-quality fallback used when kaleido is unavailable: 300 DPI,
+    Tableau 10 colors, Tufte/Few styling. Supports scatter/line, bar,
+    histogram, box, pie and heatmap traces.
+
     Args:
-        result: Pipeline result dictionary
-        df: Original dataframe
-        lang: Language code ('vi' or 'en')
-    
+        fig: Plotly figure
+
     Returns:
-        PDF file as bytes
+        PNG bytes
     """
-    try:
-        from reportlab.lib.pagesizes import A4, letter
-        from reportlab.lib.units import inch
-        from reportlab.lib import colors
-        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-        from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak, Image
-        from reportlab.pdfgen import canvas
-        from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
+    import matplotlib
+    matplotlib.use('Agg')  # Non-interactive backend
+    import matplotlib.pyplot as plt
+    from io import BytesIO
+
+    # ✅ CREATE PROFESSIONAL MATPLOTLIB FIGURE
+    # 300 DPI = publication quality (ColorBrewer/academic standard)
+    mpl_fig = plt.figure(figsize=(10, 5.6), dpi=300)
+    ax = mpl_fig.add_subplot(111)
+
+    # ✅ PROFESSIONAL STYLING (Tufte/Few principles)
+    # Clean, minimal style - let data shine
+    plt.style.use('seaborn-v0_8-whitegrid')  # Clean background
+    mpl_fig.patch.set_facecolor('#FFFFFF')  # Pure white for print
+    ax.set_facecolor('#FAFAFA')  # Slight gray to separate from page
+
+    # ✅ REMOVE CHARTJUNK (Edward Tufte principle)
+    # Remove unnecessary visual elements that don't encode data
+    ax.spines['top'].set_visible(False)    # Remove top border
+    ax.spines['right'].set_visible(False)  # Remove right border
+    ax.spines['left'].set_color('#CCCCCC')   # Subtle left axis
+    ax.spines['bottom'].set_color('#CCCCCC') # Subtle bottom axis
+    ax.spines['left'].set_linewidth(0.8)
+    ax.spines['bottom'].set_linewidth(0.8)
+
+    # Extract data from plotly figure
+    # Enhanced conversion - supports more chart types
+    for trace_idx, trace in enumerate(fig.data):
+        trace_type = trace.type if hasattr(trace, 'type') else 'scatter'
+        trace_name = trace.name if hasattr(trace, 'name') else None
+
+        # Scatter/Line charts
+        if hasattr(trace, 'x') and hasattr(trace, 'y'):
+            if trace_type in ['scatter', 'scattergl']:
+                mode = trace.mode if hasattr(trace, 'mode') else 'lines+markers'
+                if 'lines' in mode:
+                    ax.plot(trace.x, trace.y, label=trace_name, marker='o' if 'markers' in mode else None)
+                elif 'markers' in mode:
+                    ax.scatter(trace.x, trace.y, label=trace_name, alpha=0.6)
+
+                    # Add trendline for scatter plots
+                    try:
+                        import numpy as np
+                        x_numeric = [float(xi) for xi in trace.x if xi is not None]
+                        y_numeric = [float(yi) for yi in trace.y if yi is not None]
+
+                        if len(x_numeric) >= 2 and len(y_numeric) >= 2:
+                            # Calculate linear regression
+                            z = np.polyfit(x_numeric, y_numeric, 1)
+                            p = np.poly1d(z)
+                            ax.plot(x_numeric, p(x_numeric), "--", alpha=0.8, linewidth=2,
+                                   label=f'Trendline (y={z[0]:.2f}x+{z[1]:.2f})')
+
+                            # Calculate R²
+                            y_pred = p(x_numeric)
+                            ss_res = np.sum((y_numeric - y_pred) ** 2)
+                            ss_tot = np.sum((y_numeric - np.mean(y_numeric)) ** 2)
+                            r_squared = 1 - (ss_res / ss_tot) if ss_tot > 0 else 0
+
+                            # Add R² annotation
+                            ax.text(0.05, 0.95, f'R² = {r_squared:.3f}',
+                                   transform=ax.transAxes, fontsize=10,
+                                   verticalalignment='top',
+                                   bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5))
+                    except (ValueError, TypeError, ImportError):
+                        pass  # Skip trendline if data not suitable
+                else:
+                    ax.plot(trace.x, trace.y, label=trace_name)
+
+            # Bar charts
+            elif trace_type == 'bar':
+                # ✅ PROFESSIONAL BAR CHART (ColorBrewer + High Contrast)
+                # Use Tableau 10 colors for multiple series
+                bar_color = TABLEAU_10_COLORS[trace_idx % len(TABLEAU_10_COLORS)]
+
+                # Handle grouped/stacked bars
+                if trace_idx == 0:
+                    bars = ax.bar(trace.x, trace.y, label=trace_name,
+                                 color=bar_color, edgecolor='#333333', linewidth=0.8)
+                    # ✅ CLARITY: Add value labels on top of bars
+                    for bar in bars:
+                        height = bar.get_height()
+                        if height > 0:  # Only show positive values
+                            ax.text(bar.get_x() + bar.get_width()/2., height,
+                                   f'{height:.0f}',
+                                   ha='center', va='bottom', fontsize=9,
+                                   fontweight='bold', color='#000000')
+                else:
+                    ax.bar(trace.x, trace.y, label=trace_name,
+                          color=bar_color, edgecolor='#333333', linewidth=0.8)
+
+                # ✅ READABILITY: Rotate x-axis labels if they're long
+                if hasattr(trace, 'x') and len(trace.x) > 0:
+                    if isinstance(trace.x[0], str) and len(str(trace.x[0])) > 10:
+                        plt.setp(ax.get_xticklabels(), rotation=45, ha='right', fontsize=9)
+
+            # Line charts
+            elif trace_type == 'line':
+                ax.plot(trace.x, trace.y, label=trace_name)
+
+            # Histogram
+            elif trace_type == 'histogram':
+                if hasattr(trace, 'x'):
+                    ax.hist(trace.x, bins=20, label=trace_name, alpha=0.7)
+                elif hasattr(trace, 'y'):
+                    ax.hist(trace.y, bins=20, label=trace_name, alpha=0.7, orientation='horizontal')
+
+            # Box plot
+            elif trace_type == 'box':
+                if hasattr(trace, 'y'):
+                    ax.boxplot([trace.y], labels=[trace_name if trace_name else ''])
+
+        # Pie chart (special case - no x/y)
+        elif trace_type == 'pie':
+            if hasattr(trace, 'labels') and hasattr(trace, 'values'):
+                # ✅ PROFESSIONAL PIE CHART (ColorBrewer + Accessibility)
+                # Extract colors from Plotly trace if available
+                colors_list = None
+                if hasattr(trace, 'marker') and hasattr(trace.marker, 'colors'):
+                    colors_list = trace.marker.colors
+
+                # Use Tableau 10 colorblind-safe palette if no colors specified
+                if colors_list is None:
+                    colors_list = TABLEAU_10_COLORS
+
+                # Create pie chart with percentage labels
+                wedges, texts, autotexts = ax.pie(
+                    trace.values,
+                    labels=trace.labels,
+                    autopct='%1.1f%%',
+                    colors=colors_list,
+                    startangle=90,
+                    textprops={'fontsize': 10, 'fontweight': 'bold'}
+                )
+
+                # ✅ ACCESSIBILITY: Add patterns for print/colorblind users (Stephen Few)
+                # Patterns allow differentiation even in grayscale
+                for i, wedge in enumerate(wedges):
+                    wedge.set_hatch(CHART_PATTERNS[i % len(CHART_PATTERNS)])
+                    wedge.set_edgecolor('#FFFFFF')  # White borders for separation
+                    wedge.set_linewidth(1.5)
+
+                # ✅ HIGH CONTRAST: Make percentage text readable
+                for autotext in autotexts:
+                    autotext.set_color('#000000')  # Black text
+                    autotext.set_fontsize(9)
+                    autotext.set_fontweight('bold')
+
+                ax.axis('equal')  # Equal aspect ratio ensures circular pie
+
+        # Heatmap (special case - 2D data)
+        elif trace_type == 'heatmap':
+            if hasattr(trace, 'z'):
+                im = ax.imshow(trace.z, cmap='viridis', aspect='auto')
+                if hasattr(trace, 'x'):
+                    ax.set_xticks(range(len(trace.x)))
+                    ax.set_xticklabels(trace.x, rotation=45)
+                if hasattr(trace, 'y'):
+                    ax.set_yticks(range(len(trace.y)))
+                    ax.set_yticklabels(trace.y)
+                plt.colorbar(im, ax=ax)
+
+    # ✅ PROFESSIONAL TYPOGRAPHY (WCAG AA compliant)
+    # High contrast text for readability
+    if fig.layout.title.text:
+        ax.set_title(fig.layout.title.text,
+                   fontsize=14, fontweight='bold', pad=20,
+                   color='#000000')  # Black for 4.5:1 contrast
+    if fig.layout.xaxis.title.text:
+        ax.set_xlabel(fig.layout.xaxis.title.text,
+                    fontsize=11, fontweight='semibold',
+                    color='#333333', labelpad=10)
+    if fig.layout.yaxis.title.text:
+        ax.set_ylabel(fig.layout.yaxis.title.text,
+                    fontsize=11, fontweight='semibold',
+                    color='#333333', labelpad=10)
+
+    # ✅ SUBTLE GRID (Tufte: Grid should be "just noticeable")
+    # Horizontal grid only for easier reading (Stephen Few)
+    ax.grid(True, axis='y', alpha=0.3, linestyle='--',
+           linewidth=0.5, color='#CCCCCC')
+    ax.set_axisbelow(True)  # Grid behind data
+
+    # ✅ CLEAN TICK MARKS (remove tick lines, keep labels)
+    ax.tick_params(axis='both', which='both', length=0,  # No tick marks
+                 labelsize=9, colors='#333333')  # Readable labels
+    ax.tick_params(axis='x', pad=8)  # White space
+    ax.tick_params(axis='y', pad=8)
+
+    # ✅ PROFESSIONAL LEGEND (if needed)
+    if any(hasattr(trace, 'name') and trace.name for trace in fig.data):
+        ax.legend(loc='best',
+                frameon=True,
+                framealpha=0.95,
+                edgecolor='#CCCCCC',
+                fancybox=False,  # No rounded corners (cleaner)
+                shadow=False,    # No shadow (less chartjunk)
+                fontsize=9,
+                labelspacing=1.0,
+                borderpad=0.8)
+
+    # Tight layout for better spacing
+    plt.tight_layout()
+
+    # Save to bytes with HIGH DPI (300 = publication quality)
+    buf = BytesIO()
+    mpl_fig.savefig(buf, format='png', dpi=300, bbox_inches='tight',
+                   facecolor='white', edgecolor='none')
+    buf.seek(0)
+    plt.close(mpl_fig)
+    return buf.getvalue()
+
+
+_pdf_fonts: Optional[Tuple[str, str]] = None
+_pdf_fonts_lock = threading.Lock()
+
+
+def register_pdf_fonts() -> Tuple[str, str]:
+    """
+    Register Vietnamese-compatible fonts with reportlab, once per process.
+
+    DejaVu Sans supports Vietnamese; falls back to Helvetica when it is not installed.
+
+    Returns:
+        (base_font, bold_font) names
+    """
+    global _pdf_fonts
+    with _pdf_fonts_lock:
+        if _pdf_fonts is not None:
+            return _pdf_fonts
+
         from reportlab.pdfbase import pdfmetrics
         from reportlab.pdfbase.ttfonts import TTFont
 
-        # Register Vietnamese-compatible font (DejaVu Sans supports Vietnamese)
         try:
             # Try system DejaVu fonts first (Linux)
             dejavu_paths = [
@@ -436,9 +661,85 @@ def export_to_pdf(result: Dict[str, Any], df: Any, lang: str = "vi") -> bytes:
             base_font = 'Helvetica'
             bold_font = 'Helvetica-Bold'
 
-        # Create PDF buffer
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=A4, topMargin=0.5*inch, bottomMargin=0.5*inch)
+        _pdf_fonts = (base_font, bold_font)
+        return _pdf_fonts
+
+
+PDF_SPOOL_MAX_BYTES = 16 * 1024 * 1024  # Spooled PDFs stay in memory up to 16 MB
+
+
+def export_to_pdf(result: Dict[str, Any], df: Any, lang: str = "vi") -> bytes:
+    """
+    Export analysis results to professional PDF report
+    
+    Args:
+        result: Pipeline result dictionary
+        df: Original dataframe
+        lang: Language code ('vi' or 'en')
+    
+    Returns:
+        PDF file as bytes
+    """
+    buffer = io.BytesIO()
+    write_pdf_report(result, df, buffer, lang)
+    return buffer.getvalue()
+
+
+def export_to_pdf_file(result: Dict[str, Any], df: Any, lang: str = "vi",
+                       spool_max_bytes: int = PDF_SPOOL_MAX_BYTES) -> BinaryIO:
+    """
+    Export the PDF report to a spooled temporary file (disk-backed above spool_max_bytes).
+
+    Args:
+        result: Pipeline result dictionary
+        df: Original dataframe
+        lang: Language code ('vi' or 'en')
+        spool_max_bytes: Size at which the file moves from memory to disk
+
+    Returns:
+        File object positioned at the start - stream it, then close it
+    """
+    output = tempfile.SpooledTemporaryFile(max_size=spool_max_bytes, suffix='.pdf')
+    try:
+        write_pdf_report(result, df, output, lang)
+    except Exception:
+        output.close()
+        raise
+    output.seek(0)
+    return output
+
+
+def write_pdf_report(result: Dict[str, Any], df: Any, output: BinaryIO, lang: str = "vi") -> BinaryIO:
+    """
+    Write the professional PDF report into a binary file object
+    
+    Args:
+        result: Pipeline result dictionary
+        df: Original dataframe
+        output: Writable binary file object (file, SpooledTemporaryFile, BytesIO, ...)
+        lang: Language code ('vi' or 'en')
+    
+    Returns:
+        output (not rewound)
+    """
+    try:
+        from reportlab.lib.pagesizes import A4, letter
+        from reportlab.lib.units import inch
+        from reportlab.lib import colors
+        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+        from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak, Image
+        from reportlab.pdfgen import canvas
+        from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
+        from utils.chart_render import get_chart_rasterizer
+
+        # Fonts are registered once per process
+        base_font, bold_font = register_pdf_fonts()
+
+        # ⚡ Start chart rendering now - it runs while the text sections are laid out
+        rasterizer = get_chart_rasterizer()
+        chart_handles = rasterizer.submit([chart.get('figure') for chart in result['dashboard']['charts']])
+
+        doc = SimpleDocTemplate(output, pagesize=A4, topMargin=0.5*inch, bottomMargin=0.5*inch)
 
         # Get styles
         styles = getSampleStyleSheet()
@@ -613,27 +914,27 @@ def export_to_pdf(result: Dict[str, Any], df: Any, lang: str = "vi") -> bytes:
         data_period = "Not Available"
         try:
             # Detect datetime columns
+            converted = None
             date_cols = df.select_dtypes(include=['datetime64']).columns.tolist()
             if not date_cols:
                 # Try detecting date-like string columns
                 date_cols = [col for col in df.columns if any(keyword in col.lower() 
                     for keyword in ['date', 'time', 'day', 'month', 'year', 'period'])]
                 if date_cols:
-                    # Try converting first date column to datetime
+                    # Try converting first date column to datetime (column only - no frame copy)
                     import pandas as pd
-                    df_temp = df.copy()
-                    df_temp[date_cols[0]] = pd.to_datetime(df_temp[date_cols[0]], errors='coerce')
-                    if df_temp[date_cols[0]].notna().sum() > 0:
+                    converted = pd.to_datetime(df[date_cols[0]], errors='coerce')
+                    if converted.notna().sum() > 0:
                         date_cols = [date_cols[0]]
-                        df = df_temp  # Use converted version
                     else:
                         date_cols = []
             
             # If date column found, calculate range
             if date_cols:
                 date_col = date_cols[0]
-                min_date = df[date_col].min()
-                max_date = df[date_col].max()
+                date_values = converted if converted is not None else df[date_col]
+                min_date = date_values.min()
+                max_date = date_values.max()
                 
                 # Format dates (handle both datetime and string types)
                 if hasattr(min_date, 'strftime'):
@@ -1147,6 +1448,9 @@ def export_to_pdf(result: Dict[str, Any], df: Any, lang: str = "vi") -> bytes:
         print(f"Starting export process...")
         print(f"{'='*80}\n")
 
+        # ⚡ Charts submitted at the start (cached - shared with PowerPoint export)
+        rendered_charts = rasterizer.collect(chart_handles)
+
         for i, chart in enumerate(charts):  # Export ALL charts
             print(f"\n--- Processing Chart {i+1}/{total_charts} ---")
             try:
@@ -1169,265 +1473,20 @@ def export_to_pdf(result: Dict[str, Any], df: Any, lang: str = "vi") -> bytes:
                 content.append(title_para)
                 content.append(Spacer(1, 0.12*inch))  # ✅ Tight title-chart connection
 
-                # Convert Plotly chart to image using kaleido
                 fig = chart['figure']
-
-                # Try to export chart image - Multiple fallback methods
                 chart_exported = False
 
-                # Method 1: Try kaleido (requires Chrome/Chromium)
-                if not chart_exported:
-                    try:
-                        img_bytes = fig.to_image(format="png", width=800, height=450, engine="kaleido")
-                        img_stream = io.BytesIO(img_bytes)
-                        img = Image(img_stream, width=6.5*inch, height=3.6*inch)
-                        content.append(img)
-                        charts_exported += 1
-                        chart_exported = True
-                        print(f"✅ Successfully exported chart {i+1}: {chart_title}")
-                    except Exception as img_error:
-                        print(f"⚠️ Chart {i+1} kaleido method failed: {str(img_error)[:80]}")
-
-                # Method 2: Try write_image to temp file
-                if not chart_exported:
-                    try:
-                        with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as tmp:
-                            fig.write_image(tmp.name, format='png', width=800, height=450)
-                            img = Image(tmp.name, width=6.5*inch, height=3.6*inch)
-                            content.append(img)
-                            charts_exported += 1
-                            chart_exported = True
-                            os.unlink(tmp.name)
-                            print(f"✅ Successfully exported chart {i+1} (write_image): {chart_title}")
-                    except Exception as alt_error:
-                        print(f"⚠️ Chart {i+1} write_image method failed: {str(alt_error)[:80]}")
-
-                # Method 2.5: Matplotlib fallback (NO Chrome/Kaleido needed!)
-                # ⚠️ Enhanced for HIGHER QUALITY (300 DPI, better styling)
-                if not chart_exported:
-                    try:
-                        import matplotlib
-                        matplotlib.use('Agg')  # Non-interactive backend
-                        import matplotlib.pyplot as plt
-                        from io import BytesIO
-
-                        # ✅ CREATE PROFESSIONAL MATPLOTLIB FIGURE
-                        # 300 DPI = publication quality (ColorBrewer/academic standard)
-                        mpl_fig = plt.figure(figsize=(10, 5.6), dpi=300)
-                        ax = mpl_fig.add_subplot(111)
-
-                        # ✅ PROFESSIONAL STYLING (Tufte/Few principles)
-                        # Clean, minimal style - let data shine
-                        plt.style.use('seaborn-v0_8-whitegrid')  # Clean background
-                        mpl_fig.patch.set_facecolor('#FFFFFF')  # Pure white for print
-                        ax.set_facecolor('#FAFAFA')  # Slight gray to separate from page
-
-                        # ✅ REMOVE CHARTJUNK (Edward Tufte principle)
-                        # Remove unnecessary visual elements that don't encode data
-                        ax.spines['top'].set_visible(False)    # Remove top border
-                        ax.spines['right'].set_visible(False)  # Remove right border
-                        ax.spines['left'].set_color('#CCCCCC')   # Subtle left axis
-                        ax.spines['bottom'].set_color('#CCCCCC') # Subtle bottom axis
-                        ax.spines['left'].set_linewidth(0.8)
-                        ax.spines['bottom'].set_linewidth(0.8)
-
-                        # Extract data from plotly figure
-                        # Enhanced conversion - supports more chart types
-                        for trace_idx, trace in enumerate(fig.data):
-                            trace_type = trace.type if hasattr(trace, 'type') else 'scatter'
-                            trace_name = trace.name if hasattr(trace, 'name') else None
-
-                            # Scatter/Line charts
-                            if hasattr(trace, 'x') and hasattr(trace, 'y'):
-                                if trace_type in ['scatter', 'scattergl']:
-                                    mode = trace.mode if hasattr(trace, 'mode') else 'lines+markers'
-                                    if 'lines' in mode:
-                                        ax.plot(trace.x, trace.y, label=trace_name, marker='o' if 'markers' in mode else None)
-                                    elif 'markers' in mode:
-                                        ax.scatter(trace.x, trace.y, label=trace_name, alpha=0.6)
-
-                                        # Add trendline for scatter plots
-                                        try:
-                                            import numpy as np
-                                            x_numeric = [float(xi) for xi in trace.x if xi is not None]
-                                            y_numeric = [float(yi) for yi in trace.y if yi is not None]
-
-                                            if len(x_numeric) >= 2 and len(y_numeric) >= 2:
-                                                # Calculate linear regression
-                                                z = np.polyfit(x_numeric, y_numeric, 1)
-                                                p = np.poly1d(z)
-                                                ax.plot(x_numeric, p(x_numeric), "--", alpha=0.8, linewidth=2,
-                                                       label=f'Trendline (y={z[0]:.2f}x+{z[1]:.2f})')
-
-                                                # Calculate R²
-                                                y_pred = p(x_numeric)
-                                                ss_res = np.sum((y_numeric - y_pred) ** 2)
-                                                ss_tot = np.sum((y_numeric - np.mean(y_numeric)) ** 2)
-                                                r_squared = 1 - (ss_res / ss_tot) if ss_tot > 0 else 0
-
-                                                # Add R² annotation
-                                                ax.text(0.05, 0.95, f'R² = {r_squared:.3f}',
-                                                       transform=ax.transAxes, fontsize=10,
-                                                       verticalalignment='top',
-                                                       bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5))
-                                        except (ValueError, TypeError, ImportError):
-                                            pass  # Skip trendline if data not suitable
-                                    else:
-                                        ax.plot(trace.x, trace.y, label=trace_name)
-
-                                # Bar charts
-                                elif trace_type == 'bar':
-                                    # ✅ PROFESSIONAL BAR CHART (ColorBrewer + High Contrast)
-                                    # Use Tableau 10 colors for multiple series
-                                    bar_color = TABLEAU_10_COLORS[trace_idx % len(TABLEAU_10_COLORS)]
-
-                                    # Handle grouped/stacked bars
-                                    if trace_idx == 0:
-                                        bars = ax.bar(trace.x, trace.y, label=trace_name,
-                                                     color=bar_color, edgecolor='#333333', linewidth=0.8)
-                                        # ✅ CLARITY: Add value labels on top of bars
-                                        for bar in bars:
-                                            height = bar.get_height()
-                                            if height > 0:  # Only show positive values
-                                                ax.text(bar.get_x() + bar.get_width()/2., height,
-                                                       f'{height:.0f}',
-                                                       ha='center', va='bottom', fontsize=9,
-                                                       fontweight='bold', color='#000000')
-                                    else:
-                                        ax.bar(trace.x, trace.y, label=trace_name,
-                                              color=bar_color, edgecolor='#333333', linewidth=0.8)
-
-                                    # ✅ READABILITY: Rotate x-axis labels if they're long
-                                    if hasattr(trace, 'x') and len(trace.x) > 0:
-                                        if isinstance(trace.x[0], str) and len(str(trace.x[0])) > 10:
-                                            plt.setp(ax.get_xticklabels(), rotation=45, ha='right', fontsize=9)
-
-                                # Line charts
-                                elif trace_type == 'line':
-                                    ax.plot(trace.x, trace.y, label=trace_name)
-
-                                # Histogram
-                                elif trace_type == 'histogram':
-                                    if hasattr(trace, 'x'):
-                                        ax.hist(trace.x, bins=20, label=trace_name, alpha=0.7)
-                                    elif hasattr(trace, 'y'):
-                                        ax.hist(trace.y, bins=20, label=trace_name, alpha=0.7, orientation='horizontal')
-
-                                # Box plot
-                                elif trace_type == 'box':
-                                    if hasattr(trace, 'y'):
-                                        ax.boxplot([trace.y], labels=[trace_name if trace_name else ''])
-
-                            # Pie chart (special case - no x/y)
-                            elif trace_type == 'pie':
-                                if hasattr(trace, 'labels') and hasattr(trace, 'values'):
-                                    # ✅ PROFESSIONAL PIE CHART (ColorBrewer + Accessibility)
-                                    # Extract colors from Plotly trace if available
-                                    colors_list = None
-                                    if hasattr(trace, 'marker') and hasattr(trace.marker, 'colors'):
-                                        colors_list = trace.marker.colors
-
-                                    # Use Tableau 10 colorblind-safe palette if no colors specified
-                                    if colors_list is None:
-                                        colors_list = TABLEAU_10_COLORS
-
-                                    # Create pie chart with percentage labels
-                                    wedges, texts, autotexts = ax.pie(
-                                        trace.values,
-                                        labels=trace.labels,
-                                        autopct='%1.1f%%',
-                                        colors=colors_list,
-                                        startangle=90,
-                                        textprops={'fontsize': 10, 'fontweight': 'bold'}
-                                    )
-
-                                    # ✅ ACCESSIBILITY: Add patterns for print/colorblind users (Stephen Few)
-                                    # Patterns allow differentiation even in grayscale
-                                    for i, wedge in enumerate(wedges):
-                                        wedge.set_hatch(CHART_PATTERNS[i % len(CHART_PATTERNS)])
-                                        wedge.set_edgecolor('#FFFFFF')  # White borders for separation
-                                        wedge.set_linewidth(1.5)
-
-                                    # ✅ HIGH CONTRAST: Make percentage text readable
-                                    for autotext in autotexts:
-                                        autotext.set_color('#000000')  # Black text
-                                        autotext.set_fontsize(9)
-                                        autotext.set_fontweight('bold')
-
-                                    ax.axis('equal')  # Equal aspect ratio ensures circular pie
-
-                            # Heatmap (special case - 2D data)
-                            elif trace_type == 'heatmap':
-                                if hasattr(trace, 'z'):
-                                    im = ax.imshow(trace.z, cmap='viridis', aspect='auto')
-                                    if hasattr(trace, 'x'):
-                                        ax.set_xticks(range(len(trace.x)))
-                                        ax.set_xticklabels(trace.x, rotation=45)
-                                    if hasattr(trace, 'y'):
-                                        ax.set_yticks(range(len(trace.y)))
-                                        ax.set_yticklabels(trace.y)
-                                    plt.colorbar(im, ax=ax)
-
-                        # ✅ PROFESSIONAL TYPOGRAPHY (WCAG AA compliant)
-                        # High contrast text for readability
-                        if fig.layout.title.text:
-                            ax.set_title(fig.layout.title.text,
-                                       fontsize=14, fontweight='bold', pad=20,
-                                       color='#000000')  # Black for 4.5:1 contrast
-                        if fig.layout.xaxis.title.text:
-                            ax.set_xlabel(fig.layout.xaxis.title.text,
-                                        fontsize=11, fontweight='semibold',
-                                        color='#333333', labelpad=10)
-                        if fig.layout.yaxis.title.text:
-                            ax.set_ylabel(fig.layout.yaxis.title.text,
-                                        fontsize=11, fontweight='semibold',
-                                        color='#333333', labelpad=10)
-
-                        # ✅ SUBTLE GRID (Tufte: Grid should be "just noticeable")
-                        # Horizontal grid only for easier reading (Stephen Few)
-                        ax.grid(True, axis='y', alpha=0.3, linestyle='--',
-                               linewidth=0.5, color='#CCCCCC')
-                        ax.set_axisbelow(True)  # Grid behind data
-
-                        # ✅ CLEAN TICK MARKS (remove tick lines, keep labels)
-                        ax.tick_params(axis='both', which='both', length=0,  # No tick marks
-                                     labelsize=9, colors='#333333')  # Readable labels
-                        ax.tick_params(axis='x', pad=8)  # White space
-                        ax.tick_params(axis='y', pad=8)
-
-                        # ✅ PROFESSIONAL LEGEND (if needed)
-                        if any(hasattr(trace, 'name') and trace.name for trace in fig.data):
-                            ax.legend(loc='best',
-                                    frameon=True,
-                                    framealpha=0.95,
-                                    edgecolor='#CCCCCC',
-                                    fancybox=False,  # No rounded corners (cleaner)
-                                    shadow=False,    # No shadow (less chartjunk)
-                                    fontsize=9,
-                                    labelspacing=1.0,
-                                    borderpad=0.8)
-
-                        # Tight layout for better spacing
-                        plt.tight_layout()
-
-                        # Save to bytes with HIGH DPI (300 = publication quality)
-                        buf = BytesIO()
-                        mpl_fig.savefig(buf, format='png', dpi=300, bbox_inches='tight',
-                                       facecolor='white', edgecolor='none')
-                        buf.seek(0)
-
-                        # Add to PDF
-                        img = Image(buf, width=6.5*inch, height=3.6*inch)
-                        content.append(img)
-                        charts_exported += 1
-                        chart_exported = True
-                        plt.close(mpl_fig)
-                        print(f"✅ Successfully exported chart {i+1} (matplotlib fallback): {chart_title}")
-
-                    except ImportError:
-                        print(f"⚠️ Chart {i+1} matplotlib not available")
-                    except Exception as mpl_error:
-                        print(f"⚠️ Chart {i+1} matplotlib method failed: {str(mpl_error)[:80]}")
+                # ⚡ Image rendered up front by the shared rasterizer (kaleido → matplotlib)
+                rendered = rendered_charts[i]
+                if rendered['png']:
+                    img = Image(io.BytesIO(rendered['png']), width=6.5*inch, height=3.6*inch)
+                    content.append(img)
+                    charts_exported += 1
+                    chart_exported = True
+                    print(f"✅ Successfully exported chart {i+1} ({rendered['engine']}, "
+                          f"{rendered['seconds']:.2f}s{', cached' if rendered['cached'] else ''}): {chart_title}")
+                else:
+                    print(f"⚠️ Chart {i+1} rendering failed: {str(rendered['error'])[:80]}")
 
                 # ✅ FIX #10: Method 4 - Universal text-based representation (ALWAYS works)
                 # Instead of showing error message, show data in table format
@@ -1638,14 +1697,10 @@ def export_to_pdf(result: Dict[str, Any], df: Any, lang: str = "vi") -> bytes:
         
         content.append(Paragraph(footer_text, footer_style))
         
-        # Build PDF
+        # Build PDF straight into the output file (no intermediate bytes copy)
         doc.build(content)
         
-        # Get PDF bytes
-        pdf_bytes = buffer.getvalue()
-        buffer.close()
-        
-        return pdf_bytes
+        return output
     
     except ImportError:
         raise ImportError("reportlab library required. Install: pip install reportlab kaleido")
@@ -1670,6 +1725,7 @@ def export_to_powerpoint(result: Dict[str, Any], df: Any, lang: str = "vi") -> b
         from pptx.util import Inches, Pt
         from pptx.enum.text import PP_ALIGN
         from pptx.dml.color import RGBColor
+        from utils.chart_render import get_chart_rasterizer
         
         # Create presentation
         prs = Presentation()
@@ -1754,16 +1810,19 @@ def export_to_powerpoint(result: Dict[str, Any], df: Any, lang: str = "vi") -> b
                 table.cell(i, 3).text = str(kpi_info.get('benchmark', 'N/A'))
         
         # Slides 4+: Charts
-        charts = result['dashboard']['charts']
-        for i, chart in enumerate(charts[:8]):  # Max 8 charts
+        charts = result['dashboard']['charts'][:8]  # Max 8 charts
+        # ⚡ Same images as the PDF export (cached by figure + size)
+        rendered_charts = get_chart_rasterizer().render([chart.get('figure') for chart in charts])
+        for i, chart in enumerate(charts):
             slide = prs.slides.add_slide(prs.slide_layouts[5])  # Title only
             title = slide.shapes.title
             title.text = f"📊 Chart {i+1}: {chart.get('title', 'Analysis')}"
             
             try:
-                # Convert chart to image
-                img_bytes = chart['figure'].to_image(format="png", width=1000, height=600)
-                img_stream = io.BytesIO(img_bytes)
+                # Pre-rendered chart image
+                if not rendered_charts[i]['png']:
+                    raise RuntimeError(rendered_charts[i]['error'])
+                img_stream = io.BytesIO(rendered_charts[i]['png'])
                 
                 # Add image to slide
                 left = Inches(1)
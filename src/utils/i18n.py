@@ -155,9 +155,13 @@ TRANSLATIONS = {
         "pipeline_step0": "🔍 **Step 0/4**: Detecting domain...",
         "pipeline_step1": "🧹 **Step 1/4**: Data cleaning (ISO 8000)... Domain: {domain}",
         "pipeline_step2": "🎨 **Step 2/4**: Creating Smart Blueprint... Expert: {expert}...",
+        "pipeline_step12_parallel": "🧹🎨 **Step 1-2/4**: Cleaning data (ISO 8000) and creating Smart Blueprint in parallel... Domain: {domain}",
         "pipeline_step3": "🏗️ **Step 3/4**: Building Dashboard (from Blueprint)...",
         "pipeline_step4": "💡 **Step 4/4**: Generating expert insights... Perspective: {expert}...",
         "pipeline_complete": "✅ **Complete!** Pipeline ran in {time:.1f} seconds",
+        "pipeline_cache_hit": "⚡ **Complete!** Loaded previous analysis of this dataset in {time:.1f} seconds",
+        "chart_other": "Other",
+        "approx_mode_note": "⚡ Approximate mode: charts and breakdowns use a stratified sample of {sample} of {total} rows (95% confidence intervals). KPI totals are exact.",
         
         # Validator Messages
         "file_too_large": "❌ File too large: {size:.1f}MB (limit: {limit}MB). Please reduce file size or split data.",
@@ -168,7 +172,11 @@ TRANSLATIONS = {
         "file_empty": "❌ Empty file. Please check your CSV/Excel file.",
         "parse_error": "❌ CSV parse error. File may have format issues:\n{error}",
         "unknown_error": "❌ Unknown error reading file:\n{error}\n\nSuggestion: Check if file is valid CSV/Excel format?",
-        "unsupported_format": "❌ Unsupported file format: {filename}. Only accept: .csv, .xlsx, .xls",
+        "unsupported_format": "❌ Unsupported file format: {filename}. Only accept: .csv, .xlsx, .xls, .parquet, .feather, .arrow",
+        "arrow_not_installed": "❌ Reading Parquet/Feather/Arrow files requires pyarrow (pip install pyarrow)",
+        "excel_fast_load": "⚡ Sheet '{sheet}' loaded in {elapsed:.1f}s ({engine}), an estimated ~{saved:.1f}s faster than the standard Excel reader",
+        "excel_load": "📑 Sheet '{sheet}' loaded in {elapsed:.1f}s ({engine})",
+        "excel_sheet_select": "📑 Sheet to analyze",
         "dataframe_empty": "❌ DataFrame is empty. No data to analyze.",
         "no_rows": "❌ DataFrame has no rows.",
         "no_columns": "❌ DataFrame has no columns.",
@@ -344,9 +352,13 @@ TRANSLATIONS = {
         "pipeline_step0": "🔍 **Bước 0/4**: Nhận diện ngành nghề...",
         "pipeline_step1": "🧹 **Bước 1/4**: Làm sạch dữ liệu (ISO 8000)... Domain: {domain}",
         "pipeline_step2": "🎨 **Bước 2/4**: Tạo Dashboard Blueprint thông minh... Expert: {expert}...",
+        "pipeline_step12_parallel": "🧹🎨 **Bước 1-2/4**: Làm sạch dữ liệu (ISO 8000) và tạo Blueprint song song... Domain: {domain}",
         "pipeline_step3": "🏗️ **Bước 3/4**: Xây dựng Dashboard (theo Blueprint)...",
         "pipeline_step4": "💡 **Bước 4/4**: Tạo Insights chuyên gia... Perspective: {expert}...",
         "pipeline_complete": "✅ **Hoàn thành!** Pipeline chạy trong {time:.1f} giây",
+        "pipeline_cache_hit": "⚡ **Hoàn thành!** Đã tải kết quả phân tích trước đó của dữ liệu này trong {time:.1f} giây",
+        "chart_other": "Khác",
+        "approx_mode_note": "⚡ Chế độ ước lượng: biểu đồ và phân tích theo nhóm dùng mẫu phân tầng {sample} trên {total} dòng (khoảng tin cậy 95%). Tổng KPI được tính chính xác.",
         
         # Validator Messages
         "file_too_large": "❌ File quá lớn: {size:.1f}MB (giới hạn: {limit}MB). Vui lòng giảm kích thước file hoặc chia nhỏ dữ liệu.",
@@ -357,7 +369,11 @@ TRANSLATIONS = {
         "file_empty": "❌ File rỗng. Vui lòng kiểm tra lại file CSV/Excel.",
         "parse_error": "❌ Lỗi parse file CSV. File có thể bị lỗi format:\n{error}",
         "unknown_error": "❌ Lỗi không xác định khi đọc file:\n{error}\n\nGợi ý: Kiểm tra file có đúng format CSV/Excel không?",
-        "unsupported_format": "❌ Định dạng file không hỗ trợ: {filename}. Chỉ chấp nhận: .csv, .xlsx, .xls",
+        "unsupported_format": "❌ Định dạng file không hỗ trợ: {filename}. Chỉ chấp nhận: .csv, .xlsx, .xls, .parquet, .feather, .arrow",
+        "arrow_not_installed": "❌ Đọc file Parquet/Feather/Arrow cần cài pyarrow (pip install pyarrow)",
+        "excel_fast_load": "⚡ Đã tải sheet '{sheet}' trong {elapsed:.1f}s ({engine}), ước tính nhanh hơn ~{saved:.1f}s so với trình đọc Excel thông thường",
+        "excel_load": "📑 Đã tải sheet '{sheet}' trong {elapsed:.1f}s ({engine})",
+        "excel_sheet_select": "📑 Sheet cần phân tích",
         "dataframe_empty": "❌ DataFrame rỗng. Không có dữ liệu để phân tích.",
         "no_rows": "❌ DataFrame không có dòng dữ liệu nào.",
         "no_columns": "❌ DataFrame không có cột nào.",
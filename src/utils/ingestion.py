@@ -0,0 +1,560 @@
+"""
+Streaming CSV and Arrow-format ingestion with memory-compact dtypes.
+
+This module provides:
+- Encoding detection once, from a byte prefix (BOM → UTF-8 → chardet → latin1)
+- Chunked parsing with per-chunk progress callbacks
+- Per-chunk dtype compaction so the full object-dtype frame never exists:
+  low-cardinality text → category, int64 → int32 where every value fits
+- Native Parquet / Feather / Arrow IPC reading with column projection and
+  zero-copy (memory-mapped) buffers
+- Arrow-backed string dtypes for the pipeline's working frame
+- Fast Excel reading of one selected sheet: compiled calamine reader when
+  installed, otherwise openpyxl read-only row streaming with dtypes picked
+  up front by sniffing the first rows
+
+Floats stay float64: pandas accumulates float32 sums in float32, which
+would shift KPI totals on large files.
+
+Peak memory stays close to the size of the compact result instead of
+several times the file size.
+
+Example:
+    >>> df, encoding, fallback = read_csv_streaming(uploaded_file, uploaded_file.size,
+    ...                                             progress_callback=lambda f: bar.progress(f))
+    >>> df.memory_usage(deep=True).sum()
+"""
+
+import codecs
+import io
+import logging
+import os
+import time
+from datetime import date, datetime, time as dt_time
+from itertools import chain, islice
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import chardet
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from utils.numeric_coercion import detect_number_format
+
+logger = logging.getLogger(__name__)
+
+ENCODING_PREFIX_BYTES = 64 * 1024
+CHUNK_ROWS = 50_000
+CATEGORY_MAX_RATIO = 0.5       # distinct / rows at or below this → category
+CATEGORY_SAMPLE_SIZE = 50
+
+INT32_MIN, INT32_MAX = np.iinfo(np.int32).min, np.iinfo(np.int32).max
+
+# Extension → Arrow container format
+ARROW_FORMATS = {
+    '.parquet': 'parquet',
+    '.pq': 'parquet',
+    '.feather': 'feather',
+    '.arrow': 'ipc',
+    '.ipc': 'ipc',
+}
+
+
+def detect_encoding_from_prefix(prefix: bytes) -> Tuple[str, bool]:
+    """
+    Detect a file's encoding from its first bytes.
+
+    Args:
+        prefix: Leading bytes of the file
+
+    Returns:
+        Tuple of (encoding, is_fallback) - is_fallback is True when the file
+        is not UTF-8 and a detected/latin1 encoding is used instead
+    """
+    if prefix.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig', False
+
+    try:
+        prefix.decode('utf-8')
+        return 'utf-8', False
+    except UnicodeDecodeError as e:
+        # Prefix may end mid-character - only a truncated tail is acceptable
+        if e.start >= len(prefix) - 3 and e.reason == 'unexpected end of data':
+            return 'utf-8', False
+
+    detected = chardet.detect(prefix).get('encoding')
+    if detected:
+        try:
+            prefix.decode(detected)
+            return detected, True
+        except (UnicodeDecodeError, LookupError):
+            pass
+    return 'latin1', True
+
+
+def _looks_like_text_labels(values: pd.Series) -> bool:
+    """True if sampled strings are labels, not numbers or dates in disguise."""
+    sample = values.dropna().head(CATEGORY_SAMPLE_SIZE)
+    if sample.empty:
+        return False
+    if detect_number_format(sample) is not None:
+        return False  # Keep as object so numeric coercion can convert it later
+    parsed = pd.to_datetime(sample.astype(str), errors='coerce', format='mixed')
+    return parsed.notna().mean() <= 0.7
+
+
+def plan_categories(chunk: pd.DataFrame) -> List[str]:
+    """Pick the object columns of the first chunk to store as category."""
+    columns = []
+    rows = len(chunk)
+    for col in chunk.columns:
+        series = chunk[col]
+        if series.dtype != object or rows == 0:
+            continue
+        try:
+            distinct = series.nunique(dropna=True)
+        except TypeError:
+            continue
+        if distinct / rows <= CATEGORY_MAX_RATIO and _looks_like_text_labels(series):
+            columns.append(col)
+    return columns
+
+
+def _combine_column(parts: List[pd.Series]) -> pd.Series:
+    """Concatenate one column's chunks, merging categoricals without densifying."""
+    if len(parts) == 1:
+        return parts[0].reset_index(drop=True)
+    if all(isinstance(p.dtype, pd.CategoricalDtype) for p in parts):
+        try:
+            return pd.Series(union_categoricals(parts), name=parts[0].name)
+        except TypeError:
+            pass  # Category dtypes differ (e.g. an all-null chunk) - fall back to object
+    parts = [p.astype(object) if isinstance(p.dtype, pd.CategoricalDtype) else p for p in parts]
+    return pd.concat(parts, ignore_index=True)
+
+
+def downcast_numeric(series: pd.Series) -> pd.Series:
+    """
+    Downcast int64 → int32 when every value fits.
+
+    Sums/means of int32 still accumulate in int64/float64, so results are unchanged.
+    """
+    if series.dtype == np.int64 and len(series):
+        if series.min() >= INT32_MIN and series.max() <= INT32_MAX:
+            return series.astype(np.int32)
+    return series
+
+
+def read_csv_streaming(
+    file_obj,
+    total_bytes: Optional[int] = None,
+    encoding: Optional[str] = None,
+    chunk_rows: int = CHUNK_ROWS,
+    compact: bool = True,
+    progress_callback: Optional[Callable[[float], None]] = None,
+    columns: Optional[Sequence[str]] = None,
+) -> Tuple[pd.DataFrame, str, bool]:
+    """
+    Parse a CSV file object chunk by chunk into a memory-compact DataFrame.
+
+    Args:
+        file_obj: Binary file-like object (e.g. Streamlit UploadedFile)
+        total_bytes: File size for progress reporting
+        encoding: Skip detection and use this encoding
+        chunk_rows: Rows parsed per chunk
+        compact: Downcast dtypes (category / int32)
+        progress_callback: Called with fraction parsed (0-1) after each chunk
+        columns: Only parse these columns (None = all)
+
+    Returns:
+        Tuple of (dataframe, encoding used, is_fallback_encoding)
+
+    Raises:
+        pd.errors.EmptyDataError, pd.errors.ParserError: As pd.read_csv
+    """
+    file_obj.seek(0)
+    is_fallback = False
+    if encoding is None:
+        encoding, is_fallback = detect_encoding_from_prefix(file_obj.read(ENCODING_PREFIX_BYTES))
+
+    try:
+        df = _read_chunks(file_obj, encoding, total_bytes, chunk_rows, compact, progress_callback, columns)
+    except UnicodeDecodeError:
+        # Non-UTF-8 bytes past the prefix - redetect on a larger sample and restart once
+        file_obj.seek(0)
+        detected, _ = detect_encoding_from_prefix(file_obj.read(ENCODING_PREFIX_BYTES * 16))
+        encoding = detected if detected not in ('utf-8', 'utf-8-sig') else 'latin1'
+        is_fallback = True
+        logger.warning(f"⚠️ UTF-8 decode failed mid-file, retrying with {encoding}")
+        try:
+            df = _read_chunks(file_obj, encoding, total_bytes, chunk_rows, compact, progress_callback, columns)
+        except UnicodeDecodeError:
+            encoding = 'latin1'  # Last resort: latin1 always decodes
+            df = _read_chunks(file_obj, encoding, total_bytes, chunk_rows, compact, progress_callback, columns)
+
+    return df, encoding, is_fallback
+
+
+def _read_chunks(file_obj, encoding, total_bytes, chunk_rows, compact, progress_callback, usecols) -> pd.DataFrame:
+    file_obj.seek(0)
+    columns: Optional[List[str]] = None
+    category_cols: List[str] = []
+    parts: Dict[str, List[pd.Series]] = {}
+
+    with pd.read_csv(file_obj, encoding=encoding, chunksize=chunk_rows, low_memory=False,
+                     usecols=list(usecols) if usecols is not None else None) as reader:
+        for chunk in reader:
+            if columns is None:
+                columns = list(chunk.columns)
+                parts = {col: [] for col in columns}
+                if compact:
+                    category_cols = plan_categories(chunk)
+
+            for col in columns:
+                series = chunk[col]
+                if col in category_cols:
+                    series = series.astype('category')
+                parts[col].append(series)
+
+            if progress_callback and total_bytes:
+                try:
+                    progress_callback(min(file_obj.tell() / total_bytes, 1.0))
+                except Exception:
+                    pass  # Progress is cosmetic
+
+    if columns is None:
+        return pd.DataFrame()
+
+    data = {}
+    for col in columns:
+        combined = _combine_column(parts.pop(col))
+        data[col] = downcast_numeric(combined) if compact else combined
+    df = pd.DataFrame(data, columns=columns)
+
+    if progress_callback:
+        progress_callback(1.0)
+    return df
+
+
+def arrow_format_for(file_name: str) -> Optional[str]:
+    """Return 'parquet', 'feather' or 'ipc' for Arrow-family file names, else None."""
+    return ARROW_FORMATS.get(os.path.splitext(file_name.lower())[1])
+
+
+def _arrow_string_dtype():
+    """Arrow-backed string dtype with NaN missing values (pandas 2.3+), else pd.NA."""
+    try:
+        return pd.StringDtype('pyarrow', na_value=np.nan)
+    except TypeError:
+        return pd.StringDtype('pyarrow')
+
+
+def _arrow_source(file_obj):
+    """Zero-copy Arrow input: memory-map paths, wrap in-memory uploads without copying."""
+    import pyarrow as pa
+
+    if isinstance(file_obj, (str, os.PathLike)):
+        return pa.memory_map(os.fspath(file_obj), 'r')
+    if hasattr(file_obj, 'getbuffer'):
+        # Streamlit UploadedFile / BytesIO: expose the existing bytes to Arrow
+        return pa.BufferReader(pa.py_buffer(file_obj.getbuffer()))
+    file_obj.seek(0)
+    return pa.BufferReader(pa.py_buffer(file_obj.read()))
+
+
+def read_arrow_file(file_obj, file_format: str, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """
+    Read a Parquet, Feather or Arrow IPC file into pandas with Arrow-backed strings.
+
+    Args:
+        file_obj: Path or binary file-like object
+        file_format: 'parquet', 'feather' or 'ipc' (see arrow_format_for)
+        columns: Only read these columns (projection pushed down to the reader)
+
+    Returns:
+        DataFrame - strings as Arrow-backed string dtype, dictionary columns
+        as category, numbers/timestamps as numpy dtypes
+
+    Raises:
+        ImportError: pyarrow not installed
+        ValueError: Unknown format or missing projected columns
+    """
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+
+    source = _arrow_source(file_obj)
+    columns = list(columns) if columns is not None else None
+
+    if file_format == 'parquet':
+        import pyarrow.parquet as pq
+        table = pq.read_table(source, columns=columns, memory_map=True)
+    elif file_format == 'feather':
+        import pyarrow.feather as feather
+        table = feather.read_table(source, columns=columns, memory_map=True)
+    elif file_format == 'ipc':
+        try:
+            table = ipc.open_file(source).read_all()
+        except pa.ArrowInvalid:
+            # Arrow IPC *stream* format (no footer)
+            source.seek(0)
+            table = ipc.open_stream(source).read_all()
+        if columns is not None:
+            table = table.select(columns)
+    else:
+        raise ValueError(f"Unsupported Arrow format: {file_format}")
+
+    string_dtype = _arrow_string_dtype()
+
+    def types_mapper(arrow_type):
+        if pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type):
+            return string_dtype
+        return None
+
+    return table.to_pandas(types_mapper=types_mapper, split_blocks=True, self_destruct=True)
+
+
+def to_arrow_backed(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Store text columns as Arrow-backed strings instead of Python objects.
+
+    Only object columns holding nothing but strings (and nulls) are converted;
+    mixed-type columns and categoricals are left as they are.
+
+    Returns:
+        df itself if nothing changed (or pyarrow is unavailable), otherwise a
+        shallow copy with the converted columns replaced
+    """
+    try:
+        string_dtype = _arrow_string_dtype()
+    except ImportError:
+        return df
+
+    converted = {}
+    for col in df.columns:
+        series = df[col]
+        if series.dtype == object and pd.api.types.infer_dtype(series, skipna=True) == 'string':
+            converted[col] = series.astype(string_dtype)
+
+    if not converted:
+        return df
+    df_arrow = df.copy(deep=False)
+    for col, values in converted.items():
+        df_arrow[col] = values
+    return df_arrow
+
+
+# ============================================================================
+# EXCEL
+# ============================================================================
+
+EXCEL_SNIFF_ROWS = 200
+
+# Measured once against pd.read_excel(engine='openpyxl') on a 36k-row x 14-column
+# production workbook: calamine ~7x faster, openpyxl row streaming ~1.6x faster.
+# Time saved per load is an ESTIMATE from these ratios, not a measurement.
+EXCEL_ENGINE_SPEEDUP = {'calamine': 7.0, 'openpyxl-stream': 1.6}
+
+
+def calamine_available() -> bool:
+    """True if the compiled python-calamine reader is installed."""
+    try:
+        import python_calamine  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _excel_bytes(file_obj) -> io.BytesIO:
+    """Seekable in-memory view of an upload (no copy for BytesIO-based uploads)."""
+    if isinstance(file_obj, io.BytesIO):
+        file_obj.seek(0)
+        return file_obj
+    file_obj.seek(0)
+    return io.BytesIO(file_obj.read())
+
+
+def list_excel_sheets(file_obj, file_name: str) -> List[str]:
+    """
+    List sheet names without parsing any sheet data.
+
+    Args:
+        file_obj: Binary file-like object
+        file_name: Original file name (selects .xls vs .xlsx handling)
+
+    Returns:
+        Sheet names in workbook order
+    """
+    data = _excel_bytes(file_obj)
+    try:
+        if file_name.lower().endswith('.xls'):
+            import xlrd
+            return xlrd.open_workbook(file_contents=data.getvalue(), on_demand=True).sheet_names()
+        if calamine_available():
+            from python_calamine import CalamineWorkbook
+            return list(CalamineWorkbook.from_filelike(data).sheet_names)
+        import openpyxl
+        workbook = openpyxl.load_workbook(data, read_only=True, data_only=True, keep_links=False)
+        try:
+            return list(workbook.sheetnames)
+        finally:
+            workbook.close()
+    finally:
+        data.seek(0)
+
+
+def _dedupe_names(names: List[str]) -> List[str]:
+    """Rename repeated headers 'A', 'A' → 'A', 'A.1' like pd.read_excel."""
+    seen: Dict[str, int] = {}
+    result = []
+    for name in names:
+        if name in seen:
+            seen[name] += 1
+            name = f'{name}.{seen[name]}'
+        else:
+            seen[name] = 0
+        result.append(name)
+    return result
+
+
+def _sniff_kind(values: List) -> str:
+    """Pick a column kind from sampled cell values: int, float, bool, datetime or object."""
+    present = [v for v in values if v is not None]
+    if not present:
+        return 'float'  # All-empty sample → NaN column (pandas does the same)
+    if all(isinstance(v, bool) for v in present):
+        return 'bool'
+    if all(isinstance(v, int) and not isinstance(v, bool) for v in present):
+        return 'int'
+    if all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in present):
+        return 'float'
+    if all(isinstance(v, (datetime, date)) and not isinstance(v, dt_time) for v in present):
+        return 'datetime'
+    return 'object'
+
+
+def _build_column(values: List, kind: str) -> pd.Series:
+    """
+    Materialize one column with its sniffed dtype, widening if later rows disagree.
+
+    The kind only comes from the first EXCEL_SNIFF_ROWS rows, so every value is
+    checked before a typed array is built: a decimal past the sample keeps the
+    column float, a string or number among booleans makes it object.
+    """
+    present = [v for v in values if v is not None]
+    has_missing = len(present) < len(values)
+    try:
+        if kind in ('int', 'float') and all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in present):
+            if kind == 'int' and not has_missing and all(isinstance(v, int) for v in present):
+                return pd.Series(np.array(values, dtype=np.int64))
+            floats = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+            if not has_missing and np.array_equal(floats, np.floor(floats)) and np.abs(floats).max(initial=0) < 2**53:
+                return pd.Series(floats.astype(np.int64))  # pandas turns integral float cells into ints
+            return pd.Series(floats)
+        if kind == 'bool' and not has_missing and all(isinstance(v, bool) for v in present):
+            return pd.Series(np.array(values, dtype=bool))
+        if kind == 'datetime' and all(isinstance(v, (datetime, date)) and not isinstance(v, dt_time) for v in present):
+            return pd.Series(pd.to_datetime(values))
+    except (TypeError, ValueError, OverflowError):
+        pass  # e.g. an int past int64 - keep it as object
+    return pd.Series(np.array([np.nan if v is None else v for v in values], dtype=object))
+
+
+def _read_xlsx_streaming(data: io.BytesIO, sheet_name: Optional[str], columns: Optional[Sequence[str]],
+                         progress_callback: Optional[Callable[[float], None]]) -> Tuple[pd.DataFrame, str]:
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(data, read_only=True, data_only=True, keep_links=False)
+    try:
+        sheet = sheet_name if sheet_name is not None else workbook.sheetnames[0]
+        worksheet = workbook[sheet]
+        total_rows = worksheet.max_row or 0
+        rows = worksheet.iter_rows(values_only=True)
+
+        header = next(rows, None)
+        if header is None:
+            return pd.DataFrame(), sheet
+        names = _dedupe_names([f'Unnamed: {i}' if h is None else str(h) for i, h in enumerate(header)])
+        keep = [i for i, name in enumerate(names) if columns is None or name in columns]
+        width = len(names)
+
+        # ⚡ Header sniffing: decide every column's dtype from the first rows
+        sniffed = list(islice(rows, EXCEL_SNIFF_ROWS))
+        kinds = {i: _sniff_kind([row[i] if i < len(row) else None for row in sniffed]) for i in keep}
+
+        buffers: Dict[int, List] = {i: [] for i in keep}
+        last_non_empty = 0
+        for count, row in enumerate(chain(sniffed, rows), start=1):
+            if len(row) < width:
+                row = tuple(row) + (None,) * (width - len(row))
+            for i in keep:
+                buffers[i].append(row[i])
+            if any(v is not None for v in row):
+                last_non_empty = count
+            if progress_callback and total_rows and count % 5000 == 0:
+                progress_callback(min(count / total_rows, 1.0))
+
+        # Drop trailing empty rows (formatted but blank cells), as pd.read_excel does
+        data_cols = {names[i]: _build_column(buffers.pop(i)[:last_non_empty], kinds[i]) for i in keep}
+        return pd.DataFrame(data_cols), sheet
+    finally:
+        workbook.close()
+
+
+def read_excel_fast(
+    file_obj,
+    file_name: str,
+    sheet_name: Optional[str] = None,
+    columns: Optional[Sequence[str]] = None,
+    engine: Optional[str] = None,
+    progress_callback: Optional[Callable[[float], None]] = None,
+) -> Tuple[pd.DataFrame, Dict]:
+    """
+    Read one sheet of an Excel workbook as fast as the installed readers allow.
+
+    Engines, in order of preference:
+    - 'calamine': compiled Rust reader (python-calamine), if installed
+    - 'openpyxl-stream': read-only row streaming, dtypes sniffed from the first rows
+    - 'xlrd': legacy .xls files
+
+    Args:
+        file_obj: Binary file-like object
+        file_name: Original file name
+        sheet_name: Sheet to load (None = first sheet); other sheets are not parsed
+        columns: Only keep these columns (None = all)
+        engine: Force an engine (mainly for tests)
+        progress_callback: Called with fraction of rows read
+
+    Returns:
+        Tuple of (dataframe, load_info) where load_info has 'engine', 'sheet',
+        'elapsed' and 'estimated_saved' (seconds vs. pd.read_excel/openpyxl,
+        estimated from EXCEL_ENGINE_SPEEDUP; None for engines without a benchmark)
+    """
+    start = time.time()
+    data = _excel_bytes(file_obj)
+    usecols = list(columns) if columns is not None else None
+
+    if file_name.lower().endswith('.xls'):
+        engine = 'xlrd'
+    elif engine is None:
+        engine = 'calamine' if calamine_available() else 'openpyxl-stream'
+
+    if engine == 'openpyxl-stream':
+        df, sheet = _read_xlsx_streaming(data, sheet_name, usecols, progress_callback)
+    else:
+        sheet = sheet_name if sheet_name is not None else 0
+        df = pd.read_excel(data, sheet_name=sheet, engine=engine, usecols=usecols)
+        if sheet == 0:
+            sheet = list_excel_sheets(data, file_name)[0]
+
+    elapsed = time.time() - start
+    speedup = EXCEL_ENGINE_SPEEDUP.get(engine)
+    info = {
+        'engine': engine,
+        'sheet': sheet,
+        'elapsed': elapsed,
+        'estimated_saved': elapsed * (speedup - 1) if speedup else None,
+    }
+    logger.info(f"⚡ Excel sheet '{sheet}' loaded with {engine} in {elapsed:.2f}s")
+    if progress_callback:
+        progress_callback(1.0)
+    return df, info
@@ -0,0 +1,177 @@
+"""
+Incremental JSON parser for streamed LLM responses.
+
+This module provides:
+- IncrementalJSONParser: feed text chunks as they arrive, get back each
+  top-level value (and each element of top-level arrays) as soon as it closes
+
+Used to render insights while Gemini is still generating the rest of the
+response. The full text is still parsed with json.loads() at the end, so the
+final result is identical to the non-streaming path.
+"""
+
+import json
+from typing import Any, List, Optional, Tuple
+
+
+class IncrementalJSONParser:
+    """
+    Streaming parser for a single top-level JSON object.
+
+    Emits events as (key, value, is_array_element):
+    - For array values: one event per completed element (is_array_element=True)
+    - For other values: one event when the value is complete (is_array_element=False)
+
+    Anything before the first '{' (e.g. a ```json fence) is ignored.
+
+    Example:
+        >>> parser = IncrementalJSONParser()
+        >>> parser.feed('{"summary": "ok", "items": [{"a": 1}, {"a"')
+        [('summary', 'ok', False), ('items', {'a': 1}, True)]
+        >>> parser.feed(': 2}]}')
+        [('items', {'a': 2}, True)]
+    """
+
+    def __init__(self):
+        self._depth = 0              # Nesting depth (1 = inside top-level object)
+        self._in_string = False
+        self._escape = False
+        self._started = False
+        self._done = False
+        self._key: Optional[str] = None
+        self._expect_key = True      # At depth 1: next string is a key
+        self._value_is_array = False
+        self._value_buf: List[str] = []
+        self._capturing = False      # Capturing a value or array element
+        self._string_buf: List[str] = []
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any, bool]]:
+        """
+        Consume a chunk of text.
+
+        Returns:
+            Events completed by this chunk
+        """
+        events: List[Tuple[str, Any, bool]] = []
+        for ch in chunk:
+            if self._done:
+                break
+            self._consume(ch, events)
+        return events
+
+    def _emit(self, events: list, is_element: bool):
+        raw = ''.join(self._value_buf).strip()
+        self._value_buf = []
+        self._capturing = False
+        if not raw or self._key is None:
+            return
+        try:
+            events.append((self._key, json.loads(raw), is_element))
+        except json.JSONDecodeError:
+            pass  # Malformed fragment - final json.loads() will report it
+
+    def _consume(self, ch: str, events: list):
+        if not self._started:
+            if ch == '{':
+                self._started = True
+                self._depth = 1
+            return
+
+        # String handling (keys and string values)
+        if self._in_string:
+            if self._capturing:
+                self._value_buf.append(ch)
+            elif self._depth == 1 and self._expect_key:
+                self._string_buf.append(ch)
+            if self._escape:
+                self._escape = False
+            elif ch == '\\':
+                self._escape = True
+            elif ch == '"':
+                self._in_string = False
+                if not self._capturing and self._depth == 1 and self._expect_key:
+                    self._key = json.loads('"' + ''.join(self._string_buf))
+                    self._string_buf = []
+                elif self._capturing and self._depth == 1:
+                    # Top-level scalar string complete
+                    self._emit(events, is_element=False)
+            return
+
+        if ch == '"':
+            self._in_string = True
+            if self._depth == 1 and self._expect_key and not self._capturing:
+                self._string_buf = []
+            elif self._depth == 1 and not self._expect_key:
+                self._capturing = True
+                self._value_is_array = False
+                self._value_buf = ['"']
+            elif self._depth == 2 and self._value_is_array and not self._capturing:
+                self._capturing = True
+                self._value_buf = ['"']
+            elif self._capturing:
+                self._value_buf.append(ch)
+            return
+
+        if ch == ':' and self._depth == 1 and self._expect_key:
+            self._expect_key = False
+            return
+
+        if ch == ',' and self._depth == 1:
+            if self._capturing:
+                # End of a top-level scalar (number/bool/null)
+                self._emit(events, is_element=False)
+            self._expect_key = True
+            self._value_is_array = False
+            return
+
+        if ch == ',' and self._depth == 2 and self._value_is_array:
+            if self._capturing:
+                # End of a scalar array element
+                self._emit(events, is_element=True)
+            return
+
+        if ch in '{[':
+            if self._depth == 1 and not self._expect_key:
+                if ch == '[':
+                    self._value_is_array = True
+                else:
+                    self._capturing = True
+                    self._value_is_array = False
+                    self._value_buf = [ch]
+            elif self._depth == 2 and self._value_is_array and not self._capturing:
+                self._capturing = True
+                self._value_buf = [ch]
+            elif self._capturing:
+                self._value_buf.append(ch)
+            self._depth += 1
+            return
+
+        if ch in '}]':
+            self._depth -= 1
+            if self._depth == 0:
+                if self._capturing:
+                    self._emit(events, is_element=False)
+                self._done = True
+                return
+            if self._capturing and self._depth == 1 and self._value_is_array:
+                # Scalar array element terminated by the closing ']'
+                self._emit(events, is_element=True)
+            elif self._capturing:
+                self._value_buf.append(ch)
+                if self._depth == 2 and self._value_is_array:
+                    self._emit(events, is_element=True)
+                elif self._depth == 1 and not self._value_is_array:
+                    self._emit(events, is_element=False)
+            return
+
+        # Other characters (numbers, literals, whitespace)
+        if self._capturing:
+            self._value_buf.append(ch)
+        elif not ch.isspace():
+            if self._depth == 1 and not self._expect_key:
+                self._capturing = True
+                self._value_is_array = False
+                self._value_buf = [ch]
+            elif self._depth == 2 and self._value_is_array:
+                self._capturing = True
+                self._value_buf = [ch]
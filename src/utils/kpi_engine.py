@@ -0,0 +1,244 @@
+"""
+Declarative KPI engine: rule tables instead of per-domain if/elif chains.
+
+This module provides:
+- Role (from utils.column_roles): a column role (e.g. 'revenue', 'spend')
+  defined by keyword patterns; each domain compiles its roles into one
+  RoleMatcher whose per-schema ColumnRoleIndex is memoized across reruns
+- KPI: one KPI definition (required roles, compute function, benchmark key)
+- KPIDomain: the KPI table of one business domain plus the roles it uses
+- KPIContext: per-frame state shared by all KPIs of a run (resolved roles,
+  memoized column aggregates and shared intermediates such as won-deal masks)
+- KPIRegistry: picks the domain, plans the KPIs whose inputs resolve and
+  evaluates them in declaration order
+
+Adding a domain is adding a KPIDomain to the registry; other domains are not
+slowed down because only the selected domain's roles are resolved and only
+its plannable KPIs run.
+
+Per-KPI compute times can be collected (``timings=``) to benchmark KPI
+computation per domain.
+
+Example:
+    >>> spend = KPI('Total Spend', lambda ctx: {'value': ctx.sum(ctx.col('spend'))},
+    ...             requires=('spend',))
+    >>> marketing = KPIDomain('marketing', keywords=('marketing',),
+    ...                       roles={'spend': Role('spend', 'cost')}, kpis=[spend])
+    >>> registry = KPIRegistry([marketing])
+    >>> registry.evaluate(df, 'marketing')
+    {'Total Spend': {'value': 12500.0}}
+"""
+
+import logging
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from utils.column_roles import ColumnRoleIndex, Pattern, Role, RoleMatcher
+
+logger = logging.getLogger(__name__)
+
+
+def _matches(text: str, patterns: Sequence[Pattern]) -> bool:
+    """True if any pattern occurs in text (tuple patterns: all keywords occur)."""
+    for pattern in patterns:
+        if isinstance(pattern, str):
+            if pattern in text:
+                return True
+        elif all(keyword in text for keyword in pattern):
+            return True
+    return False
+
+
+class KPI:
+    """
+    One KPI definition.
+
+    Args:
+        name: Output key; may reference entry fields, e.g. 'Average {column}'
+        compute: fn(ctx) → KPI entry dict, or None when not computable
+        requires: Roles that must resolve for the KPI to be planned
+        absent: Roles that must NOT resolve (e.g. estimates used only as fallbacks)
+        benchmark: Key into the benchmark source table (see KPIContext.source)
+    """
+
+    def __init__(self, name: str, compute: Callable[['KPIContext'], Optional[Dict]],
+                 requires: Sequence[str] = (), absent: Sequence[str] = (),
+                 benchmark: Optional[str] = None):
+        self.name = name
+        self.compute = compute
+        self.requires = tuple(requires)
+        self.absent = tuple(absent)
+        self.benchmark = benchmark
+
+    def plannable(self, roles: ColumnRoleIndex) -> bool:
+        return all(role in roles for role in self.requires) and not any(role in roles for role in self.absent)
+
+
+class KPIDomain:
+    """
+    KPI table of one business domain.
+
+    Args:
+        name: Domain identifier
+        kpis: KPI definitions, in output order
+        roles: {role name: Role} used by the KPIs
+        keywords: Patterns matched on the lowercased domain name
+        trigger: Roles that select this domain whatever the domain name
+            (e.g. a salary column always yields salary KPIs)
+        requires: Roles without which the domain yields no KPIs at all
+    """
+
+    def __init__(self, name: str, kpis: Sequence[KPI], roles: Optional[Dict[str, Role]] = None,
+                 keywords: Sequence[Pattern] = (), trigger: Sequence[str] = (),
+                 requires: Sequence[str] = ()):
+        self.name = name
+        self.kpis = list(kpis)
+        self.roles = dict(roles or {})
+        self.matcher = RoleMatcher(self.roles)
+        self.keywords = tuple(keywords)
+        self.trigger = tuple(trigger)
+        self.requires = tuple(requires)
+
+    def plan(self, roles: ColumnRoleIndex) -> List[KPI]:
+        """KPIs whose inputs resolve on this frame."""
+        if not all(role in roles for role in self.requires):
+            return []
+        return [kpi for kpi in self.kpis if kpi.plannable(roles)]
+
+
+class KPIContext:
+    """
+    Per-frame evaluation state shared by the KPIs of one run.
+
+    Column aggregates (sum/mean) and named intermediates are computed at most
+    once, however many KPIs use them.
+    """
+
+    def __init__(self, df: pd.DataFrame, roles: ColumnRoleIndex, profile=None,
+                 sources: Optional[Dict[str, Dict]] = None,
+                 vietnam_benchmark: Optional[Callable[..., Optional[Dict]]] = None):
+        """
+        Args:
+            df: Frame to evaluate
+            roles: Resolved column roles
+            profile: ColumnProfile of df (medians, modes, missing counts)
+            sources: Benchmark source table {key: {'name': ...}}
+            vietnam_benchmark: fn(domain, metric_name, user_value, filters) → comparison or None
+        """
+        self.df = df
+        self.roles = roles
+        self.profile = profile
+        self.sources = sources or {}
+        self.vietnam_benchmark = vietnam_benchmark
+        self.kpis: Dict[str, Dict] = {}
+        self.kpi: Optional[KPI] = None
+        self._aggregates: Dict[Tuple[str, Any], Any] = {}
+        self._shared: Dict[str, Any] = {}
+
+    def col(self, role: str) -> Optional[Any]:
+        """First column of a role (None if unresolved)."""
+        return self.roles.first(role)
+
+    def cols(self, role: str) -> Tuple:
+        return self.roles.get(role)
+
+    def _aggregate(self, func: str, col) -> Any:
+        key = (func, col)
+        if key not in self._aggregates:
+            self._aggregates[key] = getattr(self.df[col], func)()
+        return self._aggregates[key]
+
+    def sum(self, col) -> Any:
+        return self._aggregate('sum', col)
+
+    def mean(self, col) -> Any:
+        return self._aggregate('mean', col)
+
+    def shared(self, key: str, factory: Callable[[], Any]) -> Any:
+        """Intermediate computed once per run and reused by later KPIs."""
+        if key not in self._shared:
+            self._shared[key] = factory()
+        return self._shared[key]
+
+    def source(self, key: Optional[str] = None) -> Optional[str]:
+        """Display name of a benchmark source (default: the current KPI's key)."""
+        key = key or (self.kpi.benchmark if self.kpi else None)
+        return self.sources.get(key, {}).get('name') if key else None
+
+    def vietnam(self, domain: str, metric_name: str, user_value: float,
+                filters: Optional[Dict] = None) -> Optional[Dict]:
+        """Vietnam market comparison for a value (None if unavailable)."""
+        if self.vietnam_benchmark is None:
+            return None
+        return self.vietnam_benchmark(domain=domain, metric_name=metric_name,
+                                      user_value=user_value, filters=filters)
+
+
+class KPIRegistry:
+    """
+    Ordered domain tables plus a fallback domain.
+
+    The first domain whose trigger roles resolve or whose keywords match the
+    domain name is used (same precedence as the table order).
+    """
+
+    def __init__(self, domains: Sequence[KPIDomain], fallback: Optional[KPIDomain] = None):
+        self.domains = list(domains)
+        self.fallback = fallback
+
+    def select(self, domain: str, columns: Iterable) -> Optional[KPIDomain]:
+        """Domain table for a domain name and a frame's columns."""
+        domain = (domain or '').lower()
+        columns = tuple(columns)
+        for table in self.domains:
+            if table.trigger:
+                roles = table.matcher.index(columns)
+                if any(role in roles for role in table.trigger):
+                    return table
+            if table.keywords and _matches(domain, table.keywords):
+                return table
+        return self.fallback
+
+    def evaluate(self, df: pd.DataFrame, domain: str, profile=None,
+                 sources: Optional[Dict[str, Dict]] = None,
+                 vietnam_benchmark: Optional[Callable[..., Optional[Dict]]] = None,
+                 timings: Optional[Dict[str, float]] = None) -> Dict[str, Dict]:
+        """
+        Compute the KPIs of the matching domain.
+
+        Args:
+            df: Frame (numeric columns already coerced)
+            domain: Domain name (matched case-insensitively)
+            profile: ColumnProfile of df
+            sources: Benchmark source table
+            vietnam_benchmark: Vietnam market comparison callback
+            timings: Optional dict filled with {KPI name: seconds}
+
+        Returns:
+            {KPI name: entry} in declaration order
+        """
+        table = self.select(domain, df.columns)
+        if table is None:
+            return {}
+
+        started = time.perf_counter()
+        roles = table.matcher.index(df.columns)
+        ctx = KPIContext(df, roles, profile, sources, vietnam_benchmark)
+        plan = table.plan(roles)
+
+        for kpi in plan:
+            ctx.kpi = kpi
+            kpi_started = time.perf_counter()
+            entry = kpi.compute(ctx)
+            if timings is not None:
+                timings[kpi.name] = time.perf_counter() - kpi_started
+            if entry is not None:
+                name = kpi.name.format(**entry) if '{' in kpi.name else kpi.name
+                ctx.kpis[name] = entry
+        ctx.kpi = None
+
+        logger.debug(f"⚡ KPIs [{table.name}]: {len(ctx.kpis)}/{len(plan)} planned "
+                     f"in {(time.perf_counter() - started) * 1000:.1f}ms")
+        return ctx.kpis
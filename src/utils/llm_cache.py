@@ -0,0 +1,210 @@
+"""
+Persistent response cache for Gemini calls.
+
+This module provides:
+- SQLite-backed storage of successful LLM responses
+- Keys on (model, prompt hash, temperature, max_tokens, response_mime_type)
+- TTL expiry plus LRU eviction by entry count
+- Hit/miss counters and a bypass flag
+
+Identical prompts (e.g. re-uploading the same file) are answered from disk
+with zero latency and zero API quota.
+"""
+
+import os
+import hashlib
+import logging
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = os.path.join(tempfile.gettempdir(), 'dataanalytics_vn', 'llm_cache.sqlite3')
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600  # 1 week
+DEFAULT_MAX_ENTRIES = 2000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    response TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL
+)
+"""
+
+
+class LLMResponseCache:
+    """
+    SQLite-backed LLM response cache with TTL and LRU eviction.
+
+    Example:
+        >>> cache = LLMResponseCache(ttl_seconds=3600)
+        >>> key = cache.make_key('gemini-2.0-flash', prompt, 0.3, 6000, 'application/json')
+        >>> text = cache.get(key)
+        >>> if text is None:
+        >>>     text = model.generate_content(prompt).text
+        >>>     cache.set(key, text, model='gemini-2.0-flash')
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        bypass: bool = False
+    ):
+        """
+        Initialize response cache.
+
+        Args:
+            db_path: SQLite file path (default: system temp dir)
+            ttl_seconds: Entries older than this are treated as misses
+            max_entries: Maximum number of entries before LRU eviction
+            bypass: If True, get() always misses and set() is a no-op
+        """
+        self.db_path = db_path or os.getenv('LLM_CACHE_PATH', DEFAULT_DB_PATH)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.bypass = bypass
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # One short-lived connection per operation: safe across threads and processes
+        conn = sqlite3.connect(self.db_path, timeout=5)
+        try:
+            conn.execute('PRAGMA journal_mode=WAL')
+            with conn:  # commit on success, rollback on error
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def make_key(
+        model: str,
+        prompt: str,
+        temperature: float,
+        max_tokens: int,
+        response_mime_type: str = 'application/json'
+    ) -> str:
+        """
+        Build the cache key for a generation request.
+
+        Returns:
+            Hex SHA-256 key
+        """
+        prompt_hash = hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+        raw = f"{model}|{prompt_hash}|{float(temperature):.4f}|{int(max_tokens)}|{response_mime_type}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response text, or None on miss/expiry/bypass."""
+        if self.bypass:
+            return None
+
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                'SELECT response, created_at FROM responses WHERE key = ?', (key,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            response, created_at = row
+            if now - created_at > self.ttl_seconds:
+                conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+                self.misses += 1
+                return None
+
+            conn.execute('UPDATE responses SET last_access = ? WHERE key = ?', (now, key))
+            self.hits += 1
+
+        logger.info(f"✅ LLM cache hit: {key[:12]}")
+        return response
+
+    def set(self, key: str, response: str, model: str = '') -> None:
+        """Store a response, then purge expired and least-recently-used entries."""
+        if self.bypass:
+            return
+
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO responses (key, model, response, created_at, last_access) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (key, model, response, now, now)
+            )
+            conn.execute('DELETE FROM responses WHERE created_at < ?', (now - self.ttl_seconds,))
+            conn.execute(
+                'DELETE FROM responses WHERE key IN ('
+                '  SELECT key FROM responses ORDER BY last_access DESC LIMIT -1 OFFSET ?'
+                ')',
+                (self.max_entries,)
+            )
+
+    def invalidate(self, key: str) -> bool:
+        """Remove a single entry. Returns True if it existed."""
+        with self._lock, self._connect() as conn:
+            return conn.execute('DELETE FROM responses WHERE key = ?', (key,)).rowcount > 0
+
+    def clear(self) -> int:
+        """Remove all entries. Returns number removed."""
+        with self._lock, self._connect() as conn:
+            return conn.execute('DELETE FROM responses').rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        """Return entry count and hit/miss counters."""
+        with self._lock, self._connect() as conn:
+            entries = conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            'entries': entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'bypass': self.bypass
+        }
+
+
+_llm_cache_instance: Optional[LLMResponseCache] = None
+_llm_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """
+    Get the process-wide LLM response cache.
+
+    Environment:
+        LLM_CACHE=0          Disable entirely (returns None)
+        LLM_CACHE_BYPASS=1   Keep the cache but always call the API
+        LLM_CACHE_TTL_HOURS  Entry lifetime (default: 168)
+    """
+    global _llm_cache_instance
+
+    if os.getenv('LLM_CACHE', '1') == '0':
+        return None
+
+    with _llm_cache_lock:
+        if _llm_cache_instance is None:
+            try:
+                _llm_cache_instance = LLMResponseCache(
+                    ttl_seconds=float(os.getenv('LLM_CACHE_TTL_HOURS', DEFAULT_TTL_SECONDS / 3600)) * 3600,
+                    bypass=os.getenv('LLM_CACHE_BYPASS', '0') == '1'
+                )
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"⚠️ LLM cache disabled: {e}")
+                return None
+        return _llm_cache_instance
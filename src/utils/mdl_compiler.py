@@ -0,0 +1,598 @@
+"""
+Compile MDL measure expressions into vectorized pandas computations.
+
+This module provides:
+- parse_expression(): SQL-style measure expression → AST (hashable tuples)
+- compile_measure(): AST plus the aggregates and columns it needs
+- MetricPlan: all measures of a Metric evaluated in one groupby over its
+  dimensions, with shared sub-aggregates computed once
+- resolve_columns(): map MDL column names onto DataFrame headers
+
+Supported SQL subset (everything the shipped mdl_schemas use):
+- Aggregates: SUM, AVG, MIN, MAX, COUNT(*), COUNT(x), COUNT(DISTINCT x)
+- Row expressions: columns, numbers, 'strings', + - * /, = != <> < <= > >=,
+  AND / OR / NOT, IS [NOT] NULL, CASE WHEN ... THEN ... ELSE ... END
+- Functions: NULLIF(a, b), COALESCE(a, b, ...)
+
+Semantics follow SQL where it matters for KPIs: SUM/AVG skip NULLs, SUM of
+only NULLs is NULL, NULLIF turns the zero denominator into NULL. Comparisons
+with a NULL operand are NULL, and NOT / AND / OR use three-valued logic
+(pandas nullable booleans); CASE WHEN treats a NULL condition as false, so
+`category != 'x'` never matches rows with a NULL category. Division is
+always true division (MDL authors already write `* 100.0` / `* 1.0`), and a
+division by zero without NULLIF yields NULL instead of an error.
+
+Deduplication: in marketing_roi_kpis, SUM(spend) feeds total_spend, roas, cac
+and cpl but is aggregated once; its input column is also read once.
+
+Example:
+    >>> plan = MetricPlan.from_metric(metric)     # marketing_roi_kpis
+    >>> plan.evaluate(df)                         # one row per channel × campaign_name
+                               total_spend  ...  roas   cac
+    channel  campaign_name
+    Email    Spring Sale       12000000.0   ...  4.2    350000.0
+    >>> plan.evaluate(df, dimensions=[])          # totals
+"""
+
+import logging
+import re
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+AGGREGATES = ('SUM', 'AVG', 'MIN', 'MAX', 'COUNT')
+FUNCTIONS = ('NULLIF', 'COALESCE')
+KEYWORDS = {'CASE', 'WHEN', 'THEN', 'ELSE', 'END', 'AND', 'OR', 'NOT', 'IS', 'NULL',
+            'TRUE', 'FALSE', 'DISTINCT'}
+TRUE_STRINGS = ('true', '1', 'yes', 'y', 't', 'có', 'co')
+
+_TOKEN = re.compile(r"""
+    \s*(?:
+        (?P<number>\d+\.\d*|\.\d+|\d+)
+      | '(?P<string>(?:[^']|'')*)'
+      | (?P<name>[A-Za-z_][A-Za-z0-9_]*|"[^"]+")
+      | (?P<op><=|>=|<>|!=|[-+*/(),=<>])
+    )""", re.VERBOSE)
+
+# Aggregate → pandas GroupBy method
+_GROUPBY_METHODS = {'SUM': 'sum', 'AVG': 'mean', 'MIN': 'min', 'MAX': 'max',
+                    'COUNT': 'count', 'COUNT_DISTINCT': 'nunique'}
+
+
+class ExpressionError(ValueError):
+    """Measure expression outside the supported SQL subset."""
+
+
+# ===== PARSER =====
+
+def _tokenize(expression: str) -> List[Tuple[str, Any]]:
+    tokens = []
+    position = 0
+    text = expression.strip()
+    while position < len(text):
+        match = _TOKEN.match(text, position)
+        if not match or match.end() == position:
+            raise ExpressionError(f"Unexpected character at {position}: {text[position:position + 20]!r}")
+        position = match.end()
+        if match.group('number') is not None:
+            tokens.append(('num', float(match.group('number'))))
+        elif match.group('string') is not None:
+            tokens.append(('str', match.group('string').replace("''", "'")))
+        elif match.group('name') is not None:
+            name = match.group('name')
+            if name.startswith('"'):
+                tokens.append(('name', name[1:-1]))
+            elif name.upper() in KEYWORDS or name.upper() in AGGREGATES or name.upper() in FUNCTIONS:
+                tokens.append(('kw', name.upper()))
+            else:
+                tokens.append(('name', name))
+        else:
+            tokens.append(('op', match.group('op')))
+        while position < len(text) and text[position].isspace():
+            position += 1
+    return tokens
+
+
+class _Parser:
+    """Recursive-descent parser; precedence OR < AND < NOT < comparison < +- < */ < unary."""
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        self.tokens = _tokenize(expression)
+        self.position = 0
+
+    def peek(self, offset: int = 0) -> Tuple[str, Any]:
+        index = self.position + offset
+        return self.tokens[index] if index < len(self.tokens) else ('eof', None)
+
+    def accept(self, kind: str, value: Any = None) -> bool:
+        token = self.peek()
+        if token[0] == kind and (value is None or token[1] == value):
+            self.position += 1
+            return True
+        return False
+
+    def expect(self, kind: str, value: Any = None):
+        if not self.accept(kind, value):
+            raise ExpressionError(f"Expected {value or kind}, got {self.peek()[1]!r} in: {self.expression}")
+
+    def parse(self) -> tuple:
+        node = self.parse_or()
+        if self.peek()[0] != 'eof':
+            raise ExpressionError(f"Unexpected {self.peek()[1]!r} in: {self.expression}")
+        return node
+
+    def parse_or(self) -> tuple:
+        node = self.parse_and()
+        while self.accept('kw', 'OR'):
+            node = ('bin', 'OR', node, self.parse_and())
+        return node
+
+    def parse_and(self) -> tuple:
+        node = self.parse_not()
+        while self.accept('kw', 'AND'):
+            node = ('bin', 'AND', node, self.parse_not())
+        return node
+
+    def parse_not(self) -> tuple:
+        if self.accept('kw', 'NOT'):
+            return ('not', self.parse_not())
+        return self.parse_comparison()
+
+    def parse_comparison(self) -> tuple:
+        node = self.parse_additive()
+        token = self.peek()
+        if token[0] == 'op' and token[1] in ('=', '!=', '<>', '<', '<=', '>', '>='):
+            self.position += 1
+            op = '!=' if token[1] == '<>' else token[1]
+            return ('bin', op, node, self.parse_additive())
+        if self.accept('kw', 'IS'):
+            negate = self.accept('kw', 'NOT')
+            self.expect('kw', 'NULL')
+            return ('isnull', node, negate)
+        return node
+
+    def parse_additive(self) -> tuple:
+        node = self.parse_multiplicative()
+        while self.peek()[0] == 'op' and self.peek()[1] in ('+', '-'):
+            op = self.tokens[self.position][1]
+            self.position += 1
+            node = ('bin', op, node, self.parse_multiplicative())
+        return node
+
+    def parse_multiplicative(self) -> tuple:
+        node = self.parse_unary()
+        while self.peek()[0] == 'op' and self.peek()[1] in ('*', '/'):
+            op = self.tokens[self.position][1]
+            self.position += 1
+            node = ('bin', op, node, self.parse_unary())
+        return node
+
+    def parse_unary(self) -> tuple:
+        if self.accept('op', '-'):
+            return ('neg', self.parse_unary())
+        self.accept('op', '+')
+        return self.parse_primary()
+
+    def parse_primary(self) -> tuple:
+        kind, value = self.peek()
+        if kind == 'num':
+            self.position += 1
+            return ('lit', value)
+        if kind == 'str':
+            self.position += 1
+            return ('lit', value)
+        if kind == 'name':
+            self.position += 1
+            return ('col', value)
+        if self.accept('op', '('):
+            node = self.parse_or()
+            self.expect('op', ')')
+            return node
+        if kind == 'kw':
+            self.position += 1
+            if value == 'NULL':
+                return ('lit', None)
+            if value in ('TRUE', 'FALSE'):
+                return ('lit', value == 'TRUE')
+            if value == 'CASE':
+                return self.parse_case()
+            if value in AGGREGATES:
+                return self.parse_aggregate(value)
+            if value in FUNCTIONS:
+                self.expect('op', '(')
+                args = [self.parse_or()]
+                while self.accept('op', ','):
+                    args.append(self.parse_or())
+                self.expect('op', ')')
+                if value == 'NULLIF' and len(args) != 2:
+                    raise ExpressionError(f"NULLIF takes 2 arguments in: {self.expression}")
+                return ('func', value, tuple(args))
+        raise ExpressionError(f"Unexpected {value!r} in: {self.expression}")
+
+    def parse_case(self) -> tuple:
+        branches = []
+        while self.accept('kw', 'WHEN'):
+            condition = self.parse_or()
+            self.expect('kw', 'THEN')
+            branches.append((condition, self.parse_or()))
+        if not branches:
+            raise ExpressionError(f"CASE without WHEN in: {self.expression}")
+        default = self.parse_or() if self.accept('kw', 'ELSE') else ('lit', None)
+        self.expect('kw', 'END')
+        return ('case', tuple(branches), default)
+
+    def parse_aggregate(self, func: str) -> tuple:
+        self.expect('op', '(')
+        if func == 'COUNT' and self.accept('op', '*'):
+            self.expect('op', ')')
+            return ('agg', 'COUNT', None)
+        if func == 'COUNT' and self.accept('kw', 'DISTINCT'):
+            func = 'COUNT_DISTINCT'
+        argument = self.parse_or()
+        self.expect('op', ')')
+        if _aggregates(argument):
+            raise ExpressionError(f"Nested aggregate in: {self.expression}")
+        return ('agg', func, argument)
+
+
+def parse_expression(expression: str) -> tuple:
+    """
+    Parse a measure expression.
+
+    Returns:
+        AST of nested tuples, e.g. ('bin', '/', ('agg', 'SUM', ('col', 'revenue')), ...)
+
+    Raises:
+        ExpressionError: Syntax outside the supported subset
+    """
+    return _Parser(expression).parse()
+
+
+def _aggregates(node: tuple) -> List[tuple]:
+    """Aggregate nodes in an AST (outermost only), in order of appearance."""
+    if node[0] == 'agg':
+        return [node]
+    found = []
+    for child in _children(node):
+        found.extend(_aggregates(child))
+    return found
+
+
+def _columns(node: tuple) -> List[str]:
+    if node[0] == 'col':
+        return [node[1]]
+    found = []
+    for child in _children(node):
+        found.extend(_columns(child))
+    return found
+
+
+def _children(node: tuple) -> Iterable[tuple]:
+    kind = node[0]
+    if kind == 'bin':
+        return (node[2], node[3])
+    if kind in ('not', 'neg'):
+        return (node[1],)
+    if kind == 'isnull':
+        return (node[1],)
+    if kind == 'func':
+        return node[2]
+    if kind == 'case':
+        return [part for branch in node[1] for part in branch] + [node[2]]
+    if kind == 'agg':
+        return (node[2],) if node[2] is not None else ()
+    return ()
+
+
+# ===== EVALUATION =====
+
+def _numeric(value):
+    if isinstance(value, pd.Series) and not (pd.api.types.is_numeric_dtype(value) or pd.api.types.is_bool_dtype(value)):
+        return pd.to_numeric(value, errors='coerce')
+    return value
+
+
+def _is_null(value, index: pd.Index) -> pd.Series:
+    if isinstance(value, pd.Series):
+        return value.isna()
+    return pd.Series(value is None or bool(pd.isna(value)), index=index)
+
+
+def _logical(value, index: pd.Index) -> pd.Series:
+    """SQL boolean as a nullable 'boolean' Series: NULL stays NA, non-true values are false."""
+    if not isinstance(value, pd.Series):
+        if value is None or pd.isna(value):
+            return pd.Series(pd.NA, index=index, dtype='boolean')
+        return pd.Series(bool(value), index=index, dtype='boolean')
+    if pd.api.types.is_bool_dtype(value):
+        return value.astype('boolean')
+    if pd.api.types.is_numeric_dtype(value):
+        result = (value != 0).astype('boolean')
+    else:
+        result = value.astype(str).str.strip().str.lower().isin(TRUE_STRINGS).astype('boolean')
+    result[value.isna()] = pd.NA
+    return result
+
+
+def _truth(value, index: pd.Index) -> pd.Series:
+    """SQL truth value for WHEN: NULL and non-true are false."""
+    return _logical(value, index).fillna(False).astype(bool)
+
+
+def _compare(op: str, left, right, index: pd.Index):
+    """Comparison with SQL NULL semantics: NULL if either operand is NULL."""
+    null = _is_null(left, index) | _is_null(right, index)
+    if isinstance(right, str) or isinstance(left, str):
+        left, right = (left.astype(str) if isinstance(left, pd.Series) and isinstance(right, str) else left,
+                       right.astype(str) if isinstance(right, pd.Series) and isinstance(left, str) else right)
+    else:
+        left, right = _numeric(left), _numeric(right)
+    result = {'=': lambda: left == right, '!=': lambda: left != right, '<': lambda: left < right,
+              '<=': lambda: left <= right, '>': lambda: left > right, '>=': lambda: left >= right}[op]()
+    if not isinstance(result, pd.Series):
+        result = pd.Series(bool(result), index=index)
+    result = result.astype('boolean')
+    result[null] = pd.NA
+    return result
+
+
+def _divide(left, right):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = left / right
+    if isinstance(result, pd.Series):
+        return result.replace([np.inf, -np.inf], np.nan)
+    return np.nan if result is None or not np.isfinite(result) else result
+
+
+def _evaluate(node: tuple, columns: Dict[str, Any], index: pd.Index, aggregates: Optional[Dict[tuple, pd.Series]] = None):
+    """Evaluate an AST; columns maps MDL column name → Series, aggregates maps agg node → Series."""
+    kind = node[0]
+    if kind == 'lit':
+        return np.nan if node[1] is None else node[1]
+    if kind == 'col':
+        return columns[node[1]]
+    if kind == 'agg':
+        return aggregates[node]
+    if kind == 'neg':
+        return -_numeric(_evaluate(node[1], columns, index, aggregates))
+    if kind == 'not':
+        return ~_logical(_evaluate(node[1], columns, index, aggregates), index)
+    if kind == 'isnull':
+        value = _evaluate(node[1], columns, index, aggregates)
+        missing = value.isna() if isinstance(value, pd.Series) else pd.Series(pd.isna(value), index=index)
+        return ~missing if node[2] else missing
+    if kind == 'case':
+        conditions = [_truth(_evaluate(condition, columns, index, aggregates), index).to_numpy()
+                      for condition, _ in node[1]]
+        values = [_evaluate(value, columns, index, aggregates) for _, value in node[1]]
+        values.append(_evaluate(node[2], columns, index, aggregates))
+        dtype = float if all(_is_numeric_value(value) for value in values) else object
+        choices = [_broadcast(value, index, dtype) for value in values]
+        return pd.Series(np.select(conditions, choices[:-1], default=choices[-1]), index=index)
+    if kind == 'func':
+        args = [_evaluate(arg, columns, index, aggregates) for arg in node[2]]
+        if node[1] == 'NULLIF':
+            value, null_value = _numeric(args[0]), args[1]
+            if isinstance(value, pd.Series):
+                return value.where(value != null_value)
+            return np.nan if value == null_value else value
+        result = args[0]  # COALESCE
+        for arg in args[1:]:
+            result = result.fillna(arg) if isinstance(result, pd.Series) else (arg if pd.isna(result) else result)
+        return result
+
+    op, left, right = node[1], node[2], node[3]
+    left = _evaluate(left, columns, index, aggregates)
+    right = _evaluate(right, columns, index, aggregates)
+    if op == 'AND':
+        return _logical(left, index) & _logical(right, index)
+    if op == 'OR':
+        return _logical(left, index) | _logical(right, index)
+    if op in ('=', '!=', '<', '<=', '>', '>='):
+        return _compare(op, left, right, index)
+    left, right = _numeric(left), _numeric(right)
+    if op == '+':
+        return left + right
+    if op == '-':
+        return left - right
+    if op == '*':
+        return left * right
+    return _divide(left, right)
+
+
+def _is_numeric_value(value) -> bool:
+    """True for numeric/boolean Series and numeric or NULL scalars (a CASE branch that fits float)."""
+    if isinstance(value, pd.Series):
+        return pd.api.types.is_numeric_dtype(value) or pd.api.types.is_bool_dtype(value) or value.isna().all()
+    return value is None or isinstance(value, (bool, int, float, np.number))
+
+
+def _broadcast(value, index: pd.Index, dtype=float) -> np.ndarray:
+    """CASE branch as an array; object keeps string THEN values (COUNT(DISTINCT CASE ... THEN category END))."""
+    if isinstance(value, pd.Series):
+        if dtype is float:
+            return value.to_numpy(dtype=float, na_value=np.nan)
+        return value.astype(object).where(value.notna(), np.nan).to_numpy(dtype=object)
+    return np.full(len(index), np.nan if value is None else value, dtype=dtype)
+
+
+# ===== COMPILED MEASURES / METRICS =====
+
+class CompiledMeasure:
+    """One measure: AST, its aggregates and the MDL columns it reads."""
+
+    def __init__(self, name: str, expression: str):
+        self.name = name
+        self.expression = expression
+        self.ast = parse_expression(expression)
+        self.aggregates = list(dict.fromkeys(_aggregates(self.ast)))
+        if not self.aggregates:
+            raise ExpressionError(f"Measure '{name}' has no aggregate: {expression}")
+        outside = set(_columns(self.ast)) - {column for agg in self.aggregates for column in _columns(agg)}
+        if outside:
+            raise ExpressionError(f"Measure '{name}' uses {sorted(outside)} outside an aggregate")
+        self.columns = list(dict.fromkeys(column for agg in self.aggregates for column in _columns(agg)))
+
+
+def compile_measure(name: str, expression: str) -> CompiledMeasure:
+    """Parse and check one measure expression (raises ExpressionError)."""
+    return CompiledMeasure(name, expression)
+
+
+def _column_key(name: str) -> str:
+    from utils.text_search import normalize_text
+    return normalize_text(name).replace(' ', '')
+
+
+def resolve_columns(names: Iterable[str], df_columns: Sequence,
+                    column_map: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """
+    Map MDL column names onto DataFrame columns.
+
+    Order: explicit column_map, exact name, then case/diacritic/separator-insensitive
+    match ('campaign_name' ↔ 'Campaign Name').
+
+    Returns:
+        {mdl name: df column} for resolvable names only
+    """
+    column_map = column_map or {}
+    by_key = {}
+    for column in df_columns:
+        by_key.setdefault(_column_key(column), column)
+    resolved = {}
+    for name in names:
+        if name in column_map and column_map[name] in df_columns:
+            resolved[name] = column_map[name]
+        elif name in df_columns:
+            resolved[name] = name
+        elif _column_key(name) in by_key:
+            resolved[name] = by_key[_column_key(name)]
+    return resolved
+
+
+class MetricPlan:
+    """
+    Vectorized evaluation plan for a group of measures.
+
+    Aggregates are deduplicated across measures by their AST, aggregate inputs
+    by their row expression, and everything is computed from one groupby.
+    """
+
+    def __init__(self, measures: List[Tuple[str, str]], dimensions: Optional[List[str]] = None):
+        """
+        Args:
+            measures: (name, expression) pairs
+            dimensions: Default group-by columns (MDL names)
+
+        Raises:
+            ExpressionError: If any expression is unsupported
+        """
+        self.measures = [compile_measure(name, expression) for name, expression in measures]
+        self.dimensions = list(dimensions or [])
+        self.aggregates = list(dict.fromkeys(agg for measure in self.measures for agg in measure.aggregates))
+
+    @classmethod
+    def from_metric(cls, metric) -> 'MetricPlan':
+        """Plan for a semantic_layer.Metric (all measures, metric.dimension)."""
+        return cls([(measure.name, measure.expression) for measure in metric.measure], metric.dimension)
+
+    def missing_columns(self, df: pd.DataFrame, column_map: Optional[Dict[str, str]] = None) -> Dict[str, List[str]]:
+        """Measures that cannot be computed on df: {measure name: [missing MDL columns]}."""
+        resolved = resolve_columns({c for m in self.measures for c in m.columns}, df.columns, column_map)
+        return {
+            measure.name: [column for column in measure.columns if column not in resolved]
+            for measure in self.measures
+            if any(column not in resolved for column in measure.columns)
+        }
+
+    def evaluate(self, df: pd.DataFrame, dimensions: Optional[List[str]] = None,
+                 column_map: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+        """
+        Compute all measures.
+
+        Args:
+            df: Raw rows
+            dimensions: Group-by MDL columns (default: plan dimensions; [] = totals).
+                Dimensions missing from df are dropped.
+            column_map: Explicit {MDL column: df column} overrides
+
+        Returns:
+            DataFrame indexed by the dimensions (one 'total' row without
+            dimensions), one column per computable measure. Measures whose
+            columns are missing are left out and listed in result.attrs['skipped'].
+        """
+        dimensions = self.dimensions if dimensions is None else list(dimensions)
+        needed = {column for measure in self.measures for column in measure.columns} | set(dimensions)
+        resolved = resolve_columns(needed, df.columns, column_map)
+
+        skipped = {m.name: [c for c in m.columns if c not in resolved]
+                   for m in self.measures if any(c not in resolved for c in m.columns)}
+        measures = [measure for measure in self.measures if measure.name not in skipped]
+        group_dims = [dimension for dimension in dimensions if dimension in resolved]
+        if len(group_dims) < len(dimensions):
+            logger.debug(f"Dimensions not in data: {sorted(set(dimensions) - set(group_dims))}")
+
+        columns = {name: df[column] for name, column in resolved.items()}
+        aggregates = list(dict.fromkeys(agg for measure in measures for agg in measure.aggregates))
+
+        # One input column per distinct row expression (SUM(spend) and AVG(spend) share it)
+        inputs: Dict[tuple, str] = {}
+        frame = {}
+        for agg in aggregates:
+            if agg[2] is not None and agg[2] not in inputs:
+                inputs[agg[2]] = f"_in{len(inputs)}"
+                value = _evaluate(agg[2], columns, df.index)
+                if agg[1] in ('SUM', 'AVG', 'MIN', 'MAX'):
+                    value = _numeric(value)
+                frame[inputs[agg[2]]] = value if isinstance(value, pd.Series) else pd.Series(value, index=df.index)
+        keys = [f"_dim{i}" for i in range(len(group_dims))] or ['_total']
+        if group_dims:
+            for key, dimension in zip(keys, group_dims):
+                frame[key] = columns[dimension]
+        else:
+            frame['_total'] = np.zeros(len(df), dtype=np.int8)
+        grouped = pd.DataFrame(frame, index=df.index).groupby(keys, sort=True, observed=True, dropna=False)
+
+        # One GroupBy call per aggregate function, over all its input columns at once
+        results: Dict[tuple, pd.Series] = {}
+        by_function: Dict[str, List[tuple]] = {}
+        for agg in aggregates:
+            by_function.setdefault(agg[1], []).append(agg)
+        for function, function_aggs in by_function.items():
+            if function == 'COUNT' and any(agg[2] is None for agg in function_aggs):
+                size = grouped.size()
+                for agg in function_aggs:
+                    if agg[2] is None:
+                        results[agg] = size
+                function_aggs = [agg for agg in function_aggs if agg[2] is not None]
+            if not function_aggs:
+                continue
+            input_columns = list(dict.fromkeys(inputs[agg[2]] for agg in function_aggs))
+            if function == 'SUM':
+                reduced = grouped[input_columns].sum(min_count=1)
+            else:
+                reduced = getattr(grouped[input_columns], _GROUPBY_METHODS[function])()
+            for agg in function_aggs:
+                results[agg] = reduced[inputs[agg[2]]]
+
+        if results:
+            index = next(iter(results.values())).index
+        else:
+            index = grouped.size().index
+        output = pd.DataFrame(index=index)
+        for measure in measures:
+            value = _evaluate(measure.ast, {}, index, results)
+            output[measure.name] = (value if isinstance(value, pd.Series) else pd.Series(value, index=index)).astype(float)
+
+        if group_dims:
+            output.index.names = group_dims
+        else:
+            output.index = pd.Index(['total'] * len(output))
+        output.attrs['skipped'] = skipped
+        logger.debug(f"Evaluated {len(measures)} measures from {len(aggregates)} aggregates "
+                     f"over {len(output)} groups")
+        return output
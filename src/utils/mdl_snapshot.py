@@ -0,0 +1,201 @@
+"""
+Compiled MDL snapshots: validated semantic layers stored as pickles.
+
+This module provides:
+- source_stamp(): mtime, size and content hash of an MDL YAML file
+- load_snapshot(): the snapshot payload for a YAML file, or None when missing,
+  stale or unreadable
+- save_snapshot(): atomic write of a validated payload
+- build_snapshots(): validate every mdl_schemas/*.mdl.yaml once and write its
+  snapshot (deploy / CI build step)
+
+A snapshot holds the validated SemanticLayer plus the parser's prebuilt lookup
+indexes (models_by_name, metrics_by_name, relationships_map, column_index and
+the BM25 search_indexes), so loading one skips YAML parsing, Pydantic
+validation and index building.
+
+Snapshots are pickles, so the snapshot directory must be private to the
+current user (0700, see utils.result_cache.ensure_private_dir); a directory
+another user controls is never loaded from.
+
+Freshness: the snapshot records the YAML file's mtime_ns, size and sha256.
+Matching mtime and size is trusted; otherwise the file is re-hashed, and an
+unchanged hash (e.g. after a fresh git checkout) still counts as fresh.
+
+Configuration (env):
+- MDL_SNAPSHOTS: 0 = always parse YAML (default 1)
+- MDL_SNAPSHOT_DIR: snapshot directory (default: system temp dir)
+
+Example:
+    $ python -m utils.mdl_snapshot mdl_schemas     # from src/
+    ✅ marketing.mdl.yaml → /tmp/dataanalytics_vn/mdl_snapshots/marketing-3f2a9c1d0b7e.pkl
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from utils.result_cache import ensure_private_dir
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SNAPSHOT_DIR = os.path.join(tempfile.gettempdir(), 'dataanalytics_vn', 'mdl_snapshots')
+
+# Bump when SemanticLayer models or the parser's index layout change
+SNAPSHOT_FORMAT = 2
+
+
+def snapshots_enabled() -> bool:
+    """False when disabled via MDL_SNAPSHOTS=0."""
+    return os.getenv('MDL_SNAPSHOTS', '1') != '0'
+
+
+def _file_sha256(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def source_stamp(mdl_path: Union[str, Path], content: Optional[bytes] = None) -> Dict[str, Any]:
+    """
+    Identify the current version of an MDL file.
+
+    Args:
+        mdl_path: MDL YAML file
+        content: File bytes if already read (avoids a second read)
+
+    Returns:
+        {'mtime_ns': int, 'size': int, 'sha256': str}
+    """
+    path = Path(mdl_path)
+    stat = path.stat()
+    if content is None:
+        content = path.read_bytes()
+    return {'mtime_ns': stat.st_mtime_ns, 'size': len(content),
+            'sha256': hashlib.sha256(content).hexdigest()}
+
+
+def snapshot_path(mdl_path: Union[str, Path], snapshot_dir: Optional[str] = None) -> Path:
+    """Snapshot file for an MDL file (one per absolute YAML path)."""
+    path = Path(mdl_path).resolve()
+    directory = Path(snapshot_dir or os.getenv('MDL_SNAPSHOT_DIR', DEFAULT_SNAPSHOT_DIR))
+    name = path.name.split('.')[0]
+    path_hash = hashlib.sha1(str(path).encode('utf-8')).hexdigest()[:12]
+    return directory / f"{name}-{path_hash}.pkl"
+
+
+def load_snapshot(mdl_path: Union[str, Path], snapshot_dir: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Load the snapshot of an MDL file if it is fresh.
+
+    Args:
+        mdl_path: MDL YAML file
+        snapshot_dir: Override of MDL_SNAPSHOT_DIR
+
+    Returns:
+        Payload dict ('semantic_layer', 'indexes', 'source', 'format') or None
+    """
+    target = snapshot_path(mdl_path, snapshot_dir)
+    if not target.parent.is_dir():
+        return None
+    try:
+        ensure_private_dir(str(target.parent))
+    except OSError as e:
+        logger.warning(f"⚠️ MDL snapshots ignored: {e}")
+        return None
+    try:
+        with open(target, 'rb') as f:
+            payload = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        # Unpicklable after a model change, truncated file, ...
+        logger.warning(f"⚠️ Unreadable MDL snapshot {target.name}: {str(e)[:100]} - rebuilding")
+        return None
+
+    if not isinstance(payload, dict) or payload.get('format') != SNAPSHOT_FORMAT:
+        return None
+
+    source = payload.get('source', {})
+    try:
+        stat = Path(mdl_path).stat()
+    except OSError:
+        return None
+    if stat.st_mtime_ns == source.get('mtime_ns') and stat.st_size == source.get('size'):
+        return payload
+    if stat.st_size == source.get('size') and _file_sha256(Path(mdl_path)) == source.get('sha256'):
+        return payload  # Touched but unchanged
+    logger.info(f"MDL snapshot stale: {Path(mdl_path).name}")
+    return None
+
+
+def save_snapshot(mdl_path: Union[str, Path], semantic_layer: Any, indexes: Dict[str, Any],
+                  source: Optional[Dict[str, Any]] = None, snapshot_dir: Optional[str] = None) -> Optional[Path]:
+    """
+    Write a snapshot of a validated semantic layer.
+
+    Args:
+        mdl_path: MDL YAML file the layer was parsed from
+        semantic_layer: Validated SemanticLayer
+        indexes: Parser lookup indexes (attribute name → value)
+        source: source_stamp() taken before parsing (default: taken now)
+        snapshot_dir: Override of MDL_SNAPSHOT_DIR
+
+    Returns:
+        Snapshot path, or None if it could not be written
+    """
+    target = snapshot_path(mdl_path, snapshot_dir)
+    payload = {
+        'format': SNAPSHOT_FORMAT,
+        'source': source or source_stamp(mdl_path),
+        'semantic_layer': semantic_layer,
+        'indexes': indexes,
+    }
+    try:
+        data = pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL)
+        ensure_private_dir(str(target.parent))
+        # Atomic write: temp file + rename (safe with concurrent sessions)
+        fd, tmp_path = tempfile.mkstemp(dir=target.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, target)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    except Exception as e:
+        logger.warning(f"⚠️ MDL snapshot not written for {Path(mdl_path).name}: {str(e)[:100]}")
+        return None
+    return target
+
+
+def build_snapshots(mdl_dir: Union[str, Path], snapshot_dir: Optional[str] = None) -> List[Path]:
+    """
+    Validate every *.mdl.yaml in mdl_dir and write fresh snapshots.
+
+    Raises on an invalid schema, so a broken MDL fails the build.
+
+    Returns:
+        Written snapshot paths
+    """
+    from semantic_layer import SemanticLayerParser
+
+    written = []
+    for mdl_path in sorted(Path(mdl_dir).glob('*.mdl.yaml')):
+        parser = SemanticLayerParser(str(mdl_path), snapshot_dir=snapshot_dir, use_snapshot=False)
+        parser.load()
+        target = parser.save_snapshot()
+        if target is not None:
+            written.append(target)
+            print(f"✅ {mdl_path.name} → {target}")
+    return written
+
+
+if __name__ == '__main__':
+    import sys
+
+    default_dir = Path(__file__).resolve().parents[2] / 'mdl_schemas'
+    build_snapshots(sys.argv[1] if len(sys.argv) > 1 else default_dir)
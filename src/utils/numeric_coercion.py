@@ -0,0 +1,209 @@
+"""
+Numeric coercion engine for string columns that hold numbers.
+
+This module provides:
+- Per-column number format detection from a sample
+  ('8.311,42' European, '8,311.42' US, or plain '8311.42')
+- Single vectorized conversion pass per column (Arrow string kernels when
+  pyarrow is installed)
+- No full-frame copy: unchanged columns are shared with the input frame
+- Memoized per-column decisions keyed on (column name, dtype, leading values)
+- Memoized result per source frame: coercing the same frame again returns the
+  same converted frame, so its column profile is computed once, not per call
+
+Example:
+    >>> coercer = NumericCoercer()
+    >>> df = coercer.coerce(pd.DataFrame({'ROI': ['5,43', '2,27'], 'Spend': ['8.311,42', '776,14']}))
+    >>> df.dtypes.tolist()
+    [dtype('float64'), dtype('float64')]
+"""
+
+import re
+import threading
+import weakref
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+
+from utils.column_profile import frame_signature
+
+try:
+    import pyarrow  # noqa: F401
+    _STRING_DTYPE = 'string[pyarrow]'
+except ImportError:
+    _STRING_DTYPE = 'string'
+
+# Same acceptance rule as the original converter: digits, separators, whitespace, minus
+NUMERIC_PATTERN = r'^[\d.,\s-]+$'
+
+FORMAT_PLAIN = 'plain'   # 8311.42
+FORMAT_EU = 'eu'         # 8.311,42 / 5,43  (comma = decimal)
+FORMAT_US = 'us'         # 8,311.42 / 1,234,567 (comma = thousands)
+
+_MULTI_COMMA = re.compile(r',.*,')
+_MULTI_DOT = re.compile(r'\..*\.')
+
+
+def detect_number_format(sample: pd.Series, threshold: float = 0.5) -> Optional[str]:
+    """
+    Detect whether a sample of strings is numeric and which separators it uses.
+
+    Args:
+        sample: Non-null values (any dtype; converted to str)
+        threshold: Minimum share of values that must look numeric
+
+    Returns:
+        FORMAT_PLAIN, FORMAT_EU, FORMAT_US, or None if not numeric
+    """
+    if len(sample) == 0:
+        return None
+
+    values = sample.astype(str)
+    looks_numeric = values.str.match(NUMERIC_PATTERN)
+    if looks_numeric.sum() / len(values) <= threshold:
+        return None
+
+    eu_votes = 0
+    us_votes = 0
+    for value in values[looks_numeric]:
+        has_comma = ',' in value
+        has_dot = '.' in value
+        if has_comma and has_dot:
+            # Whichever separator comes last is the decimal separator
+            if value.rfind(',') > value.rfind('.'):
+                eu_votes += 1
+            else:
+                us_votes += 1
+        elif has_comma:
+            # '1,234,567' → thousands; '5,43' → decimal comma
+            if _MULTI_COMMA.search(value):
+                us_votes += 1
+            else:
+                eu_votes += 1
+        elif has_dot and _MULTI_DOT.search(value):
+            # '8.311.420' → dot thousands
+            eu_votes += 1
+
+    if eu_votes == 0 and us_votes == 0:
+        return FORMAT_PLAIN
+    return FORMAT_EU if eu_votes >= us_votes else FORMAT_US
+
+
+def convert_numeric_strings(series: pd.Series, number_format: str) -> pd.Series:
+    """
+    Convert a string column to numbers in one vectorized pass.
+
+    Unparseable values become NaN (same as pd.to_numeric(errors='coerce')).
+    """
+    strings = series.astype(_STRING_DTYPE)
+
+    if number_format == FORMAT_EU:
+        strings = strings.str.replace('.', '', regex=False).str.replace(',', '.', regex=False)
+    elif number_format == FORMAT_US:
+        strings = strings.str.replace(',', '', regex=False)
+
+    # Remove all whitespace (incl. thousands spaces like '1 234')
+    strings = strings.str.replace(r'\s+', '', regex=True)
+
+    converted = pd.to_numeric(strings, errors='coerce')
+    # Arrow-backed input yields nullable dtypes; keep the classic numpy dtype for downstream code
+    return converted.astype('float64')
+
+
+class NumericCoercer:
+    """
+    Converts numeric-looking string columns, memoizing per-column decisions.
+
+    Decisions are keyed on (column name, dtype, first few values), so repeated
+    calls on frames from the same dataset (e.g. raw + cleaned in one pipeline
+    run) only sample each column once, while a different upload that reuses a
+    column name gets a fresh decision.
+    """
+
+    def __init__(self, sample_size: int = 100):
+        """
+        Args:
+            sample_size: Non-null values sampled per column for format detection
+        """
+        self.sample_size = sample_size
+        self._decisions: Dict[Tuple[str, str], Optional[str]] = {}
+        # id(source frame) → (weakref to source, frame_signature, converted frame)
+        self._frames: Dict[int, Tuple[weakref.ref, Tuple, pd.DataFrame]] = {}
+        self._lock = threading.RLock()  # Re-entrant: weakref callbacks may fire during GC while held
+
+    def decide(self, series: pd.Series) -> Optional[str]:
+        """Return the (memoized) number format for a column, or None to skip."""
+        key = (str(series.name), str(series.dtype), tuple(series.iloc[:5].astype(str)))
+        with self._lock:
+            if key in self._decisions:
+                return self._decisions[key]
+
+        sample = series.dropna().head(self.sample_size)
+        decision = detect_number_format(sample)
+
+        if decision == FORMAT_PLAIN:
+            # Separators may only appear past the sample (e.g. '999' ... '1.234,5')
+            with_comma = series[series.astype(str).str.contains(',', regex=False)]
+            if len(with_comma) > 0:
+                decision = detect_number_format(with_comma.head(self.sample_size)) or FORMAT_EU
+
+        with self._lock:
+            self._decisions[key] = decision
+        return decision
+
+    def coerce(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Convert string columns that represent numbers to float64.
+
+        Returns:
+            The input frame itself if nothing changed, otherwise a shallow copy
+            with only the converted columns replaced. The copy is memoized per
+            source frame (recomputed when its shape, columns or dtypes change):
+            treat it as read-only.
+        """
+        key = id(df)
+        signature = frame_signature(df)
+        with self._lock:
+            entry = self._frames.get(key)
+            if entry is not None and entry[0]() is df and entry[1] == signature:
+                return entry[2]
+
+        converted = {}
+        for col in df.columns:
+            series = df[col]
+            if pd.api.types.is_numeric_dtype(series):
+                continue
+            if not (pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)):
+                continue
+
+            number_format = self.decide(series)
+            if number_format is None:
+                continue
+
+            try:
+                converted[col] = convert_numeric_strings(series, number_format)
+            except Exception:
+                continue  # Keep original column if conversion fails
+
+        if not converted:
+            return df
+
+        df_converted = df.copy(deep=False)
+        for col, values in converted.items():
+            df_converted[col] = values
+
+        def _forget(_ref, key=key):
+            with self._lock:
+                current = self._frames.get(key)
+                if current is not None and current[0] is _ref:
+                    del self._frames[key]
+
+        with self._lock:
+            self._frames[key] = (weakref.ref(df, _forget), signature, df_converted)
+        return df_converted
+
+    def clear(self):
+        """Forget all memoized decisions and converted frames."""
+        with self._lock:
+            self._decisions.clear()
+            self._frames.clear()
@@ -0,0 +1,432 @@
+"""
+Persistent, content-addressed cache for complete pipeline results.
+
+This module provides:
+- DataFrame, prompt-template and source-file fingerprinting
+- On-disk result storage that survives Streamlit reruns and process restarts
+- Size-bounded LRU eviction
+- Explicit invalidation API
+- ensure_private_dir(): cache directories only the current user can write
+
+A cache key is derived from the DataFrame contents, the dataset description,
+the UI language, the pipeline version and the source of the code that computes
+results (plus its data files, e.g. benchmark CSVs). Any change to one of these
+produces a new key, so stale results are never returned.
+
+Entries are pickles, and unpickling runs code: the cache directory must be
+private (created 0700, owned by the current user), otherwise another local
+user could plant an entry in the shared temp dir.
+"""
+
+import os
+import hashlib
+import logging
+import pickle
+import stat
+import tempfile
+import threading
+import importlib
+import inspect
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Default location: temp dir (writable on Streamlit Cloud), private to the user (see ensure_private_dir)
+DEFAULT_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'dataanalytics_vn', 'pipeline_results')
+DEFAULT_MAX_SIZE_MB = 500
+
+_ENTRY_SUFFIX = '.pkl'
+
+
+def ensure_private_dir(path: str) -> str:
+    """
+    Create a directory only the current user can access, or verify an existing one.
+
+    Missing directories (and missing parents) are created with mode 0700. An
+    existing directory must be owned by the current user (group/other access
+    is then removed); each parent must be owned by the user or root and not be
+    writable by others unless sticky (like /tmp), so no other user can swap it.
+
+    Args:
+        path: Directory for pickled cache entries
+
+    Returns:
+        The path
+
+    Raises:
+        PermissionError: The directory or a parent is controlled by another user
+    """
+    path = os.path.abspath(path)
+    missing = []
+    current = path
+    while not os.path.isdir(current):
+        missing.append(current)
+        parent = os.path.dirname(current)
+        if parent == current:
+            break
+        current = parent
+    for directory in reversed(missing):
+        try:
+            os.mkdir(directory, 0o700)
+        except FileExistsError:
+            pass  # Created concurrently: verified below
+
+    if not hasattr(os, 'getuid'):
+        return path  # Windows: the temp dir is already per-user
+    uid = os.getuid()
+    info = os.stat(path)
+    if info.st_uid != uid:
+        raise PermissionError(f"Cache directory {path} is owned by uid {info.st_uid}, not {uid}")
+    if info.st_mode & 0o077:
+        os.chmod(path, 0o700)
+    parent = os.path.dirname(path)
+    while parent != os.path.dirname(parent):
+        info = os.stat(parent)
+        if info.st_uid not in (0, uid) or (info.st_mode & 0o022 and not info.st_mode & stat.S_ISVTX):
+            raise PermissionError(f"Cache directory parent {parent} is writable by other users")
+        parent = os.path.dirname(parent)
+    return path
+
+
+def fingerprint_dataframe(df: pd.DataFrame) -> str:
+    """
+    Compute a content hash of a DataFrame (values, index, column names, dtypes).
+
+    Args:
+        df: DataFrame to fingerprint
+
+    Returns:
+        Hex SHA-256 digest
+
+    Example:
+        >>> fingerprint_dataframe(pd.DataFrame({'a': [1, 2]}))
+        '5f1c...'
+    """
+    hasher = hashlib.sha256()
+    hasher.update(repr(df.shape).encode('utf-8'))
+    hasher.update('\x1f'.join(f"{col}:{dtype}" for col, dtype in df.dtypes.items()).encode('utf-8'))
+    try:
+        row_hashes = pd.util.hash_pandas_object(df, index=True)
+        hasher.update(row_hashes.values.tobytes())
+    except TypeError:
+        # Unhashable cell values (lists, dicts) - fall back to CSV serialization
+        hasher.update(df.to_csv(index=True).encode('utf-8'))
+    return hasher.hexdigest()
+
+
+def _collect_code_constants(code, out: list):
+    """Collect literal constants of a code object (recursing into nested code)."""
+    for const in code.co_consts:
+        if hasattr(const, 'co_consts'):
+            _collect_code_constants(const, out)
+        elif isinstance(const, (str, bytes, int, float, bool)) or const is None:
+            out.append(repr(const))
+
+
+def fingerprint_callables(funcs: Iterable[Callable]) -> str:
+    """
+    Hash the prompt templates embedded in a set of functions.
+
+    Prompts are built from f-string literals inside the step methods, so the
+    literal constants of each function's code object capture the template text.
+    Decorators are unwrapped first.
+
+    Args:
+        funcs: Functions (or bound methods) whose prompt literals should be hashed
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    hasher = hashlib.sha256()
+    for func in funcs:
+        func = inspect.unwrap(getattr(func, '__func__', func))
+        code = getattr(func, '__code__', None)
+        if code is None:
+            continue
+        constants: list = []
+        _collect_code_constants(code, constants)
+        hasher.update(func.__qualname__.encode('utf-8'))
+        hasher.update('\x1e'.join(constants).encode('utf-8'))
+    return hasher.hexdigest()
+
+
+_file_digests: Dict[Tuple[str, int, int], bytes] = {}
+_file_digests_lock = threading.Lock()
+
+
+def _file_digest(path: str) -> bytes:
+    """SHA-256 of a file, memoized by (path, mtime, size)."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return b'missing:' + path.encode('utf-8')
+    key = (path, st.st_mtime_ns, st.st_size)
+    with _file_digests_lock:
+        digest = _file_digests.get(key)
+    if digest is None:
+        with open(path, 'rb') as f:
+            digest = hashlib.sha256(f.read()).digest()
+        with _file_digests_lock:
+            _file_digests[key] = digest
+    return digest
+
+
+def fingerprint_modules(module_names: Iterable[str], extra_paths: Iterable[str] = ()) -> str:
+    """
+    Hash the source files of the modules that compute cached results.
+
+    Any edit to those modules (KPI rules, benchmark lookups, chart building,
+    prompts) changes the digest, so cached results never outlive the code that
+    produced them. Data files they read (e.g. benchmark CSVs) go in extra_paths.
+
+    Args:
+        module_names: Importable module names (e.g. 'kpi_registry', 'utils.column_roles')
+        extra_paths: Additional files to hash
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    hasher = hashlib.sha256()
+    for name in module_names:
+        path = getattr(importlib.import_module(name), '__file__', None)
+        hasher.update(name.encode('utf-8'))
+        if path:
+            hasher.update(_file_digest(path))
+    for path in sorted(str(p) for p in extra_paths):
+        hasher.update(os.path.basename(path).encode('utf-8'))
+        hasher.update(_file_digest(path))
+    return hasher.hexdigest()
+
+
+class PipelineResultCache:
+    """
+    On-disk cache of pipeline result dicts with size-bounded LRU eviction.
+
+    Each entry is a pickle file named after its key. Access time is tracked
+    via the file mtime, so LRU order is preserved across process restarts.
+
+    Example:
+        >>> cache = PipelineResultCache(max_size_mb=200)
+        >>> key = cache.make_key(df, "Marketing Q3", 'vi', '2.0', prompt_hash)
+        >>> result = cache.get(key)
+        >>> if result is None:
+        >>>     result = pipeline.run_pipeline(df, "Marketing Q3")
+        >>>     cache.set(key, result)
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_size_mb: float = DEFAULT_MAX_SIZE_MB):
+        """
+        Initialize result cache.
+
+        Args:
+            cache_dir: Directory for cache entries (default: system temp dir)
+            max_size_mb: Maximum total size of all entries before LRU eviction
+        """
+        self.cache_dir = cache_dir or os.getenv('PIPELINE_RESULT_CACHE_DIR', DEFAULT_CACHE_DIR)
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        ensure_private_dir(self.cache_dir)
+
+    @staticmethod
+    def make_key(
+        df: pd.DataFrame,
+        dataset_description: str,
+        lang: str,
+        pipeline_version: str,
+        prompt_fingerprint: str
+    ) -> str:
+        """
+        Build the content-addressed cache key for a pipeline run.
+
+        Args:
+            df: Input DataFrame (before cleaning)
+            dataset_description: User-provided description
+            lang: Output language ('vi' or 'en')
+            pipeline_version: Pipeline version string
+            prompt_fingerprint: Hash of prompt templates or result-computing code
+                (see fingerprint_callables, fingerprint_modules)
+
+        Returns:
+            Hex SHA-256 cache key
+        """
+        hasher = hashlib.sha256()
+        for part in (
+            fingerprint_dataframe(df),
+            dataset_description or '',
+            lang,
+            pipeline_version,
+            prompt_fingerprint
+        ):
+            hasher.update(part.encode('utf-8'))
+            hasher.update(b'\x00')
+        return hasher.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}{_ENTRY_SUFFIX}")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the cached result for key, or None on miss.
+
+        Corrupt entries are removed and treated as misses.
+        """
+        path = self._path(key)
+        with self._lock:
+            try:
+                with open(path, 'rb') as f:
+                    result = pickle.load(f)
+            except FileNotFoundError:
+                self.misses += 1
+                return None
+            except Exception as e:
+                logger.warning(f"⚠️ Corrupt result cache entry {key[:12]}: {e} - removing")
+                self._remove(path)
+                self.misses += 1
+                return None
+
+            # Touch for LRU ordering
+            try:
+                os.utime(path, None)
+            except OSError:
+                pass
+            self.hits += 1
+
+        logger.info(f"✅ Result cache hit: {key[:12]}")
+        return result
+
+    def set(self, key: str, result: Dict[str, Any]) -> bool:
+        """
+        Store a result under key, then evict least-recently-used entries.
+
+        Returns:
+            True if stored, False if the result could not be serialized
+        """
+        try:
+            payload = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            logger.warning(f"⚠️ Result not cacheable: {type(e).__name__}: {str(e)[:100]}")
+            return False
+
+        if len(payload) > self.max_size_bytes:
+            logger.warning(f"⚠️ Result too large to cache ({len(payload) / 1024 / 1024:.1f}MB)")
+            return False
+
+        path = self._path(key)
+        with self._lock:
+            # Atomic write: temp file + rename (safe with concurrent sessions)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(payload)
+                os.replace(tmp_path, path)
+            except Exception:
+                self._remove(tmp_path)
+                raise
+            self._evict()
+        return True
+
+    def invalidate(self, key: str) -> bool:
+        """
+        Remove a single entry.
+
+        Returns:
+            True if an entry was removed
+        """
+        with self._lock:
+            return self._remove(self._path(key))
+
+    def clear(self) -> int:
+        """
+        Remove all entries.
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            removed = 0
+            for path, _, _ in self._entries():
+                if self._remove(path):
+                    removed += 1
+            return removed
+
+    def stats(self) -> Dict[str, Any]:
+        """Return entry count, total size and hit/miss counters."""
+        with self._lock:
+            entries = self._entries()
+        return {
+            'entries': len(entries),
+            'size_mb': sum(size for _, size, _ in entries) / (1024 * 1024),
+            'max_size_mb': self.max_size_bytes / (1024 * 1024),
+            'hits': self.hits,
+            'misses': self.misses
+        }
+
+    def _entries(self):
+        """List (path, size, mtime) of all entries."""
+        entries = []
+        try:
+            names = os.listdir(self.cache_dir)
+        except FileNotFoundError:
+            return entries
+        for name in names:
+            if not name.endswith(_ENTRY_SUFFIX):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                st_info = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((path, st_info.st_size, st_info.st_mtime))
+        return entries
+
+    def _evict(self):
+        """Delete least-recently-used entries until under the size limit."""
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_size_bytes:
+            return
+        for path, size, _ in sorted(entries, key=lambda e: e[2]):
+            if total <= self.max_size_bytes:
+                break
+            if self._remove(path):
+                total -= size
+                logger.info(f"🗑️ Evicted result cache entry {os.path.basename(path)[:12]}")
+
+    @staticmethod
+    def _remove(path: str) -> bool:
+        try:
+            os.remove(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+
+_result_cache_instance: Optional[PipelineResultCache] = None
+_result_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> Optional[PipelineResultCache]:
+    """
+    Get the process-wide result cache.
+
+    Returns None when disabled via PIPELINE_RESULT_CACHE=0 or when the cache
+    directory is not writable.
+    """
+    global _result_cache_instance
+
+    if os.getenv('PIPELINE_RESULT_CACHE', '1') == '0':
+        return None
+
+    with _result_cache_lock:
+        if _result_cache_instance is None:
+            try:
+                max_size_mb = float(os.getenv('PIPELINE_RESULT_CACHE_MAX_MB', DEFAULT_MAX_SIZE_MB))
+                _result_cache_instance = PipelineResultCache(max_size_mb=max_size_mb)
+            except OSError as e:
+                logger.warning(f"⚠️ Result cache disabled: {e}")
+                return None
+        return _result_cache_instance
@@ -0,0 +1,354 @@
+"""
+Approximate mode for very large frames: stratified sampling + exact totals.
+
+This module provides:
+- detect_strata_columns(): pick low-cardinality dimension columns
+  (channel / campaign / rep / stage) to stratify by
+- stratified_reservoir_sample(): stratified simple random sample (a reservoir
+  per stratum, drawn vectorized) with proportional allocation and a
+  per-stratum minimum
+- ApproximateSample: the sample plus design weights, with group totals and
+  group means estimated under the stratified design (95% confidence intervals)
+- StreamingAggregator / exact_totals(): exact sum/count/mean/min/max computed
+  chunk by chunk, so headline KPIs never depend on the sample
+
+Charts and dimension breakdowns are built from the sample; headline KPIs stay
+exact. Approximate mode is switched on automatically for frames with at least
+APPROX_MODE_MIN_ROWS rows.
+
+Example:
+    >>> sample = stratified_reservoir_sample(df, ['Channel'], sample_size=100_000)
+    >>> sample.estimate_totals('Channel', 'Revenue')
+         Channel      estimate     std_error        ci_low       ci_high  sample_rows
+    0   Facebook  1.52e+09      2.1e+06       1.51e+09      1.52e+09        41230
+    >>> exact_totals(df, ['Revenue'])['Revenue']['sum']
+    1520331874.0
+"""
+
+import logging
+import os
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+APPROX_MODE_MIN_ROWS = int(os.getenv('APPROX_MODE_MIN_ROWS', 1_000_000))
+APPROX_SAMPLE_SIZE = int(os.getenv('APPROX_SAMPLE_SIZE', 100_000))
+
+Z_95 = 1.959964
+MIN_PER_STRATUM = 30
+MAX_STRATUM_LEVELS = 50    # Per column - higher-cardinality dimensions are not stratified on
+MAX_STRATA = 500           # Across all strata columns combined
+DIMENSION_KEYWORDS = (
+    ('channel',),
+    ('campaign',),
+    ('rep', 'sales'),
+    ('stage', 'status'),
+)
+
+
+def detect_strata_columns(df: pd.DataFrame, max_levels: int = MAX_STRATUM_LEVELS,
+                          max_strata: int = MAX_STRATA) -> List[str]:
+    """
+    Pick dimension columns to stratify by.
+
+    Uses the same keywords as the dimension analysis (channel, campaign,
+    rep/sales, stage/status), restricted to non-numeric columns with at most
+    max_levels distinct values. Columns are added in keyword order while the
+    combined number of strata stays within max_strata.
+
+    Args:
+        df: Frame to sample
+        max_levels: Maximum distinct values for a column to be used
+        max_strata: Maximum product of distinct counts across chosen columns
+
+    Returns:
+        List of column names (may be empty - plain random sample)
+    """
+    chosen, strata = [], 1
+    for keywords in DIMENSION_KEYWORDS:
+        for col in df.columns:
+            name = str(col).lower()
+            if col in chosen or not any(keyword in name for keyword in keywords):
+                continue
+            if pd.api.types.is_numeric_dtype(df[col]) or pd.api.types.is_datetime64_any_dtype(df[col]):
+                continue
+            levels = df[col].nunique(dropna=False)
+            if levels <= max_levels and strata * levels <= max_strata:
+                chosen.append(col)
+                strata *= levels
+            break
+    return chosen
+
+
+def _stratified_variance(sums: np.ndarray, squares: np.ndarray,
+                         n_h: np.ndarray, N_h: np.ndarray) -> np.ndarray:
+    """
+    Variance of the stratified total estimator, per group.
+
+    sums / squares are (groups x strata) per-stratum sums of y and y² over the
+    sampled rows (y = 0 outside the group). Var = Σ_h N_h² (1 - n_h/N_h) s_h² / n_h.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        s2 = (squares - sums ** 2 / n_h) / (n_h - 1)
+    s2 = np.where(n_h > 1, np.maximum(s2, 0.0), 0.0)
+    return (N_h ** 2 * (1 - n_h / N_h) * s2 / n_h).sum(axis=1)
+
+
+class ApproximateSample:
+    """
+    A stratified sample of a frame with its design weights.
+
+    Attributes:
+        frame: Sampled rows (original index preserved)
+        weights: Design weight per sampled row (N_h / n_h)
+        strata_cols: Columns the sample is stratified by
+        population_rows: Rows in the full frame
+        stratum_sizes: N_h per stratum
+        stratum_samples: n_h per stratum
+    """
+
+    def __init__(self, frame: pd.DataFrame, strata_codes: np.ndarray, stratum_sizes: np.ndarray,
+                 stratum_samples: np.ndarray, strata_cols: List[str], population_rows: int):
+        self.frame = frame
+        self.strata_cols = strata_cols
+        self.population_rows = population_rows
+        self.stratum_sizes = stratum_sizes
+        self.stratum_samples = stratum_samples
+        self._codes = strata_codes
+        self.weights = stratum_sizes[strata_codes] / stratum_samples[strata_codes]
+
+    @property
+    def sample_rows(self) -> int:
+        return len(self.frame)
+
+    @property
+    def is_exact(self) -> bool:
+        """True when every row was sampled (estimates equal exact values)."""
+        return self.sample_rows == self.population_rows
+
+    def _group_moments(self, group_col: str, values: np.ndarray):
+        """Per (group, stratum) sums of values and values², as (groups x strata) arrays."""
+        moments = pd.DataFrame({
+            'group': self.frame[group_col].to_numpy(),
+            'stratum': self._codes,
+            'y': values,
+            'y2': values ** 2,
+        }).groupby(['group', 'stratum'], observed=True, sort=False)[['y', 'y2']].sum()
+        sums = moments['y'].unstack(fill_value=0.0)
+        squares = moments['y2'].unstack(fill_value=0.0)
+        strata = sums.columns.to_numpy()
+        full = np.zeros((len(sums), len(self.stratum_sizes)))
+        full_sq = np.zeros_like(full)
+        full[:, strata] = sums.to_numpy()
+        full_sq[:, strata] = squares.to_numpy()
+        return sums.index, full, full_sq
+
+    def estimate_totals(self, group_col: str, value_col: Optional[str] = None,
+                        z: float = Z_95) -> pd.DataFrame:
+        """
+        Estimate the total of value_col per group (row counts if value_col is None).
+
+        Args:
+            group_col: Column to group by
+            value_col: Numeric column to total, or None to count rows
+            z: Normal quantile for the confidence interval (1.96 → 95%)
+
+        Returns:
+            DataFrame [group_col, estimate, std_error, ci_low, ci_high, sample_rows],
+            largest estimate first
+        """
+        if value_col is None:
+            values = np.ones(self.sample_rows)
+        else:
+            values = pd.to_numeric(self.frame[value_col], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+        valid = ~np.isnan(values)
+        y = np.where(valid, values, 0.0)
+
+        groups, sums, squares = self._group_moments(group_col, y)
+        estimate = (sums * (self.stratum_sizes / self.stratum_samples)).sum(axis=1)
+        std_error = np.sqrt(_stratified_variance(sums, squares, self.stratum_samples, self.stratum_sizes))
+        sample_rows = pd.Series(valid).groupby(self.frame[group_col].to_numpy(), observed=True).sum()
+
+        result = pd.DataFrame({
+            group_col: groups,
+            'estimate': estimate,
+            'std_error': std_error,
+            'ci_low': estimate - z * std_error,
+            'ci_high': estimate + z * std_error,
+            'sample_rows': sample_rows.reindex(groups).to_numpy(dtype=int),
+        })
+        return result.sort_values('estimate', ascending=False, ignore_index=True)
+
+    def estimate_means(self, group_col: str, value_col: str, z: float = Z_95) -> pd.DataFrame:
+        """
+        Estimate the mean of value_col per group (ratio estimator, linearized variance).
+
+        Args:
+            group_col: Column to group by
+            value_col: Numeric column to average
+            z: Normal quantile for the confidence interval
+
+        Returns:
+            DataFrame [group_col, estimate, std_error, ci_low, ci_high, sample_rows]
+        """
+        values = pd.to_numeric(self.frame[value_col], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+        valid = ~np.isnan(values)
+        y = np.where(valid, values, 0.0)
+        ones = valid.astype(float)
+        scale = self.stratum_sizes / self.stratum_samples
+
+        groups, y_sums, _ = self._group_moments(group_col, y)
+        _, n_sums, _ = self._group_moments(group_col, ones)
+        total_y = (y_sums * scale).sum(axis=1)
+        total_n = (n_sums * scale).sum(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = total_y / total_n
+
+        # Linearized residuals z = (y - R) inside the group, per group's own R
+        row_ratio = pd.Series(ratio, index=groups).reindex(self.frame[group_col].to_numpy()).to_numpy()
+        residual = np.where(valid, y - row_ratio, 0.0)
+        _, r_sums, r_squares = self._group_moments(group_col, residual)
+        variance = _stratified_variance(r_sums, r_squares, self.stratum_samples, self.stratum_sizes)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            std_error = np.sqrt(variance) / total_n
+
+        return pd.DataFrame({
+            group_col: groups,
+            'estimate': ratio,
+            'std_error': std_error,
+            'ci_low': ratio - z * std_error,
+            'ci_high': ratio + z * std_error,
+            'sample_rows': n_sums.sum(axis=1).astype(int),
+        })
+
+
+def stratified_reservoir_sample(df: pd.DataFrame, strata_cols: Optional[List[str]] = None,
+                                sample_size: int = APPROX_SAMPLE_SIZE, seed: int = 42,
+                                min_per_stratum: int = MIN_PER_STRATUM) -> ApproximateSample:
+    """
+    Draw a stratified simple random sample in one pass.
+
+    Rows are bucketed by stratum with one integer sort, then each stratum draws
+    n_h rows without replacement (the same distribution a per-stratum reservoir
+    produces). n_h is proportional to stratum size, with at least
+    min_per_stratum rows so small channels still get intervals.
+
+    Args:
+        df: Frame to sample
+        strata_cols: Columns to stratify by (None → detect_strata_columns)
+        sample_size: Target total sample rows
+        seed: Random seed (same frame + seed → same sample)
+        min_per_stratum: Minimum rows kept per stratum (capped at its size)
+
+    Returns:
+        ApproximateSample
+    """
+    if strata_cols is None:
+        strata_cols = detect_strata_columns(df)
+    n_rows = len(df)
+
+    if strata_cols:
+        codes = df.groupby(strata_cols, observed=True, dropna=False, sort=False).ngroup().to_numpy()
+    else:
+        codes = np.zeros(n_rows, dtype=np.int64)
+    stratum_sizes = np.bincount(codes, minlength=1).astype(float) if n_rows else np.zeros(1)
+
+    fraction = min(1.0, sample_size / n_rows) if n_rows else 1.0
+    allocation = np.minimum(
+        stratum_sizes,
+        np.maximum(np.round(stratum_sizes * fraction), min_per_stratum)
+    )
+
+    if allocation.sum() >= n_rows:
+        selected = np.arange(n_rows)
+    else:
+        rng = np.random.default_rng(seed)
+        order = np.argsort(codes, kind='stable')       # Rows grouped by stratum (radix sort)
+        starts = np.concatenate(([0], np.cumsum(stratum_sizes)[:-1])).astype(np.int64)
+        picks = [
+            order[start + rng.choice(int(size), int(take), replace=False)]
+            for start, size, take in zip(starts, stratum_sizes, allocation)
+        ]
+        selected = np.sort(np.concatenate(picks))
+
+    stratum_samples = np.maximum(allocation, 1)
+    logger.debug(f"Stratified sample: {len(selected):,}/{n_rows:,} rows, "
+                 f"{len(stratum_sizes)} strata on {strata_cols}")
+    return ApproximateSample(
+        frame=df.iloc[selected],
+        strata_codes=codes[selected],
+        stratum_sizes=stratum_sizes,
+        stratum_samples=stratum_samples,
+        strata_cols=list(strata_cols),
+        population_rows=n_rows,
+    )
+
+
+class StreamingAggregator:
+    """
+    Exact running sum / count / min / max per numeric column.
+
+    Feed it chunks (e.g. from read_csv_streaming or slices of a large frame);
+    memory stays constant in the number of rows.
+    """
+
+    def __init__(self, columns: Iterable[str]):
+        self.columns = list(columns)
+        self.sum = dict.fromkeys(self.columns, 0.0)
+        self.count = dict.fromkeys(self.columns, 0)
+        self.min = dict.fromkeys(self.columns, np.inf)
+        self.max = dict.fromkeys(self.columns, -np.inf)
+        self.rows = 0
+
+    def update(self, chunk: pd.DataFrame):
+        """Add one chunk."""
+        self.rows += len(chunk)
+        block = chunk[self.columns].apply(pd.to_numeric, errors='coerce')
+        for col, value in block.sum().items():
+            self.sum[col] += float(value)
+        for col, value in block.count().items():
+            self.count[col] += int(value)
+        for col, value in block.min().items():
+            if pd.notna(value):
+                self.min[col] = min(self.min[col], float(value))
+        for col, value in block.max().items():
+            if pd.notna(value):
+                self.max[col] = max(self.max[col], float(value))
+
+    def result(self) -> Dict[str, Dict[str, Optional[float]]]:
+        """{column: {'sum','count','mean','min','max'}} - None where a column had no values."""
+        totals = {}
+        for col in self.columns:
+            count = self.count[col]
+            totals[col] = {
+                'sum': self.sum[col],
+                'count': count,
+                'mean': self.sum[col] / count if count else None,
+                'min': self.min[col] if count else None,
+                'max': self.max[col] if count else None,
+            }
+        return totals
+
+
+def exact_totals(df: pd.DataFrame, columns: Optional[List[str]] = None,
+                 chunk_rows: int = 1_000_000) -> Dict[str, Dict[str, Optional[float]]]:
+    """
+    Exact headline aggregates over the full frame, chunk by chunk.
+
+    Args:
+        df: Full frame
+        columns: Numeric columns (None → all numeric columns)
+        chunk_rows: Rows per chunk
+
+    Returns:
+        {column: {'sum','count','mean','min','max'}}
+    """
+    if columns is None:
+        columns = df.select_dtypes(include=['number']).columns.tolist()
+    aggregator = StreamingAggregator(columns)
+    for start in range(0, len(df), chunk_rows):
+        aggregator.update(df.iloc[start:start + chunk_rows])
+    return aggregator.result()
@@ -0,0 +1,140 @@
+"""
+Dependency-aware stage scheduler for running pipeline steps concurrently.
+
+This module provides:
+- A small DAG of named stages with explicit dependencies
+- Parallel execution of independent stages on a thread pool
+- Per-stage wall-clock timings
+- Streamlit script-context propagation so st.* calls work in worker threads
+
+Pipeline stages are I/O bound (Gemini calls), so threads are sufficient.
+"""
+
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _get_script_run_ctx():
+    """Return the current Streamlit ScriptRunContext (None outside Streamlit)."""
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        return get_script_run_ctx()
+    except Exception:
+        return None
+
+
+def _attach_script_run_ctx(ctx):
+    """Attach a Streamlit ScriptRunContext to the current worker thread."""
+    if ctx is None:
+        return
+    try:
+        from streamlit.runtime.scriptrunner import add_script_run_ctx
+        add_script_run_ctx(threading.current_thread(), ctx)
+    except Exception:
+        pass
+
+
+class StageScheduler:
+    """
+    Run named stages respecting dependencies, independent stages in parallel.
+
+    Each stage function receives a dict of its dependencies' results.
+    If a stage raises, its dependents are skipped and the error is recorded.
+
+    Example:
+        >>> scheduler = StageScheduler(max_workers=3)
+        >>> scheduler.add_stage('prep', lambda deps: prepare(df))
+        >>> scheduler.add_stage('clean', lambda deps: call_llm_cleaning(df))
+        >>> scheduler.add_stage('plan', lambda deps: call_llm_blueprint(deps['prep']), depends_on=['prep'])
+        >>> results = scheduler.run()
+        >>> scheduler.timings
+        {'prep': 0.02, 'clean': 9.8, 'plan': 11.3}
+    """
+
+    def __init__(self, max_workers: int = 4):
+        """
+        Initialize scheduler.
+
+        Args:
+            max_workers: Maximum stages executing at the same time
+        """
+        self.max_workers = max_workers
+        self._stages: Dict[str, Dict[str, Any]] = {}
+        self.results: Dict[str, Any] = {}
+        self.errors: Dict[str, BaseException] = {}
+        self.timings: Dict[str, float] = {}
+        self.skipped: List[str] = []
+
+    def add_stage(self, name: str, func: Callable[[Dict[str, Any]], Any], depends_on: Optional[List[str]] = None):
+        """
+        Register a stage.
+
+        Args:
+            name: Unique stage name
+            func: Callable taking {dep_name: dep_result} and returning the stage result
+            depends_on: Names of stages that must finish successfully first
+        """
+        if name in self._stages:
+            raise ValueError(f"Duplicate stage name: {name}")
+        deps = list(depends_on or [])
+        for dep in deps:
+            if dep not in self._stages:
+                raise ValueError(f"Stage '{name}' depends on unknown stage '{dep}'")
+        self._stages[name] = {'func': func, 'deps': deps}
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Execute all stages.
+
+        Returns:
+            Dict of stage name → result for stages that completed successfully
+        """
+        ctx = _get_script_run_ctx()
+        pending = dict(self._stages)
+        running = {}
+
+        def execute(name: str, func: Callable, deps: Dict[str, Any]):
+            _attach_script_run_ctx(ctx)
+            start = time.time()
+            try:
+                return func(deps)
+            finally:
+                self.timings[name] = time.time() - start
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while pending or running:
+                # Skip stages whose dependencies failed or were skipped
+                for name in list(pending):
+                    deps = pending[name]['deps']
+                    if any(dep in self.errors or dep in self.skipped for dep in deps):
+                        self.skipped.append(name)
+                        del pending[name]
+                        logger.warning(f"⏭️ Stage '{name}' skipped (dependency failed)")
+
+                # Submit every stage whose dependencies are all satisfied
+                for name in list(pending):
+                    deps = pending[name]['deps']
+                    if all(dep in self.results for dep in deps):
+                        dep_results = {dep: self.results[dep] for dep in deps}
+                        future = executor.submit(execute, name, pending[name]['func'], dep_results)
+                        running[future] = name
+                        del pending[name]
+
+                if not running:
+                    break
+
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        self.results[name] = future.result()
+                    except Exception as e:
+                        self.errors[name] = e
+                        logger.error(f"❌ Stage '{name}' failed: {type(e).__name__}: {str(e)[:100]}")
+
+        return self.results
@@ -0,0 +1,155 @@
+"""
+Background warm-up of process-wide caches at server start.
+
+This module provides:
+- start_warmup(): run the warm-up tasks once per process in a daemon thread
+- Default tasks: PDF font registration, all MDL schemas, Vietnam benchmark
+  CSVs, translations and the heavy lazy imports (pipeline, export libraries)
+- get_warmup_status(): per-task timings ({'seconds', 'ok', 'error'})
+- wait_for_warmup(): block until warm-up finished (tests, CLI)
+
+Every task fills a cache that already exists (register_pdf_fonts() memo,
+MDLCache, get_benchmark_loader() singleton, sys.modules), so the first user
+request finds them hot instead of paying for them. Failures are recorded and
+never raised - a failed task is simply done again on first use.
+
+Configuration (env):
+- WARMUP_ON_START: 0 = disabled (default 1)
+
+Example:
+    >>> start_warmup()
+    >>> wait_for_warmup(timeout=30)
+    >>> get_warmup_status()['mdl_schemas']
+    {'seconds': 0.42, 'ok': True, 'error': None}
+"""
+
+import importlib
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _warm_pdf_fonts():
+    from utils.export_utils import register_pdf_fonts
+    register_pdf_fonts()
+
+
+def _warm_mdl_schemas():
+    from mdl_loader import DOMAIN_TO_MDL, load_mdl_for_domain
+    failed = [domain for domain in DOMAIN_TO_MDL if load_mdl_for_domain(domain) is None]
+    if failed:
+        raise RuntimeError(f"MDL not loaded for: {', '.join(failed)}")
+
+
+def _warm_benchmarks():
+    from benchmark_loader import get_benchmark_loader
+    loader = get_benchmark_loader()
+    if not loader.loaded:
+        raise RuntimeError('; '.join(loader.load_errors) or 'no benchmark files loaded')
+
+
+def _warm_translations():
+    from utils.i18n import get_text, TRANSLATIONS
+    for lang in TRANSLATIONS:
+        get_text('app_title', lang)
+
+
+def _warm_pipeline_import():
+    for module in ('plotly.express', 'premium_lean_pipeline'):
+        importlib.import_module(module)
+
+
+def _warm_export_import():
+    for module in ('reportlab.platypus', 'pptx', 'utils.export_utils'):
+        importlib.import_module(module)
+
+
+# (name, task) - run in order; cheap, most-used caches first
+DEFAULT_TASKS: List[Tuple[str, Callable[[], None]]] = [
+    ('translations', _warm_translations),
+    ('mdl_schemas', _warm_mdl_schemas),
+    ('benchmarks', _warm_benchmarks),
+    ('pipeline_import', _warm_pipeline_import),
+    ('export_import', _warm_export_import),
+    ('pdf_fonts', _warm_pdf_fonts),
+]
+
+_status: Dict[str, Dict] = {}
+_thread: Optional[threading.Thread] = None
+_done = threading.Event()
+_lock = threading.Lock()
+
+
+def run_warmup(tasks: Optional[List[Tuple[str, Callable[[], None]]]] = None) -> Dict[str, Dict]:
+    """
+    Run warm-up tasks in the calling thread.
+
+    Args:
+        tasks: (name, callable) pairs (default: DEFAULT_TASKS)
+
+    Returns:
+        {name: {'seconds': float, 'ok': bool, 'error': str or None}}
+    """
+    for name, task in tasks if tasks is not None else DEFAULT_TASKS:
+        start = time.perf_counter()
+        error = None
+        try:
+            task()
+        except Exception as e:  # ImportError included: optional export stack
+            error = f"{type(e).__name__}: {e}"
+            logger.warning(f"Warm-up '{name}' failed: {error[:200]}")
+        _status[name] = {'seconds': time.perf_counter() - start, 'ok': error is None, 'error': error}
+
+    total = sum(entry['seconds'] for entry in _status.values())
+    logger.info(f"⚡ Warm-up finished in {total:.2f}s: " +
+                ", ".join(f"{name} {entry['seconds']:.2f}s" for name, entry in _status.items()))
+    return get_warmup_status()
+
+
+def _run(tasks):
+    try:
+        run_warmup(tasks)
+    finally:
+        _done.set()
+
+
+def start_warmup(tasks: Optional[List[Tuple[str, Callable[[], None]]]] = None) -> bool:
+    """
+    Start warm-up in a daemon thread (once per process).
+
+    Args:
+        tasks: (name, callable) pairs (default: DEFAULT_TASKS)
+
+    Returns:
+        True if this call started the thread, False if already started or disabled
+    """
+    global _thread
+    if os.getenv('WARMUP_ON_START', '1') == '0':
+        return False
+    with _lock:
+        if _thread is not None:
+            return False
+        _thread = threading.Thread(target=_run, args=(tasks,), name='warmup', daemon=True)
+        _thread.start()
+    return True
+
+
+def wait_for_warmup(timeout: Optional[float] = None) -> bool:
+    """
+    Block until the warm-up thread has finished.
+
+    Returns:
+        True if finished, False on timeout or if warm-up was never started
+    """
+    if _thread is None:
+        return False
+    return _done.wait(timeout)
+
+
+def get_warmup_status() -> Dict[str, Dict]:
+    """Per-task warm-up timings so far: {name: {'seconds', 'ok', 'error'}}."""
+    return {name: dict(entry) for name, entry in _status.items()}
@@ -72,6 +72,16 @@ log_perf("CONFIG: Path setup")
 load_dotenv()
 log_perf("CONFIG: Environment loaded")
 
+# ⚡ Warm-up: fonts, MDL schemas, benchmarks, translations and heavy imports load
+# in a background thread at server start, so the first analysis is not a cold one
+@st.cache_resource
+def start_background_warmup():
+    from utils.warmup import start_warmup
+    return start_warmup()
+
+start_background_warmup()
+log_perf("CONFIG: Background warm-up started")
+
 # ============================================
 # VISUAL HIERARCHY CSS (Week 1, Day 1 - WrenAI Pattern)
 # ============================================
@@ -305,8 +315,8 @@ def get_branding():
 def get_export_utils():
     """Lazy load export utilities (only when user clicks export)"""
     try:
-        from utils.export_utils import export_to_pdf, export_to_powerpoint
-        return export_to_pdf, export_to_powerpoint, True
+        from utils.export_utils import export_to_pdf_file, export_to_powerpoint
+        return export_to_pdf_file, export_to_powerpoint, True
     except ImportError:
         print("⚠️ Export libraries not installed. PDF/PPT export disabled.")
         return None, None, False
@@ -1148,7 +1158,7 @@ def main():
         # Impact: BLOCKS core feature for blind users (5% of Vietnamese users)
         uploaded_file = st.file_uploader(
             get_text('choose_file', lang),
-            type=['csv', 'xlsx', 'xls'],
+            type=['csv', 'xlsx', 'xls', 'parquet', 'feather', 'arrow'],
             help=get_text('file_help', lang),
             key='data_file_upload'  # Unique key for accessibility
         )
@@ -1212,6 +1222,17 @@ def main():
 """
         st.markdown(file_upload_aria, unsafe_allow_html=True)
 
+        # Excel sheet picker - lists sheet names only, no sheet is parsed here
+        selected_sheet = None
+        if uploaded_file is not None and uploaded_file.name.lower().endswith(('.xlsx', '.xls')):
+            from utils.ingestion import list_excel_sheets
+            try:
+                sheet_names = list_excel_sheets(uploaded_file, uploaded_file.name)
+            except Exception:
+                sheet_names = []
+            if len(sheet_names) > 1:
+                selected_sheet = st.selectbox(get_text('excel_sheet_select', lang), sheet_names, key='excel_sheet')
+
         # Sample Data Section (PMF Strategy #2 - Quick Win!)
         st.markdown("---")
         if lang == 'vi':
@@ -1327,7 +1348,7 @@ def main():
                 # Using uploaded file (LAZY LOAD validator)
                 with st.spinner(get_text('loading_file', lang)):
                     safe_file_upload = get_validators()  # Lazy load now
-                    success, df, message = safe_file_upload(uploaded_file, max_size_mb=200, lang=lang)
+                    success, df, message = safe_file_upload(uploaded_file, max_size_mb=200, lang=lang, sheet_name=selected_sheet)
 
                 if not success:
                     st.error(message)
@@ -1991,21 +2012,23 @@ def main():
         with col1:
             if st.button(get_text('export_pdf', lang), use_container_width=True):
                 # Lazy load export utilities when user clicks
-                export_to_pdf, _, export_available = get_export_utils()
+                export_to_pdf_file, _, export_available = get_export_utils()
                 
                 if export_available:
                     try:
                         with st.spinner("🔄 Generating PDF..."):
-                            pdf_bytes = export_to_pdf(result, st.session_state['df'], lang)
+                            pdf_file = export_to_pdf_file(result, st.session_state['df'], lang)
                         
-                        # Offer download
-                        st.download_button(
-                            label="⬇️ Download PDF",
-                            data=pdf_bytes,
-                            file_name=f"DataAnalytics_Report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf",
-                            mime="application/pdf",
-                            use_container_width=True
-                        )
+                        # Offer download: the report is spooled (memory up to 16 MB, then disk);
+                        # the only full in-memory copy is the one Streamlit serves
+                        with pdf_file:
+                            st.download_button(
+                                label="⬇️ Download PDF",
+                                data=pdf_file.read(),
+                                file_name=f"DataAnalytics_Report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf",
+                                mime="application/pdf",
+                                use_container_width=True
+                            )
                         st.success("✅ PDF ready for download!")
                     except Exception as e:
                         st.error(f"❌ PDF generation failed: {str(e)}")
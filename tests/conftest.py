@@ -0,0 +1,13 @@
+"""
+Shared pytest configuration.
+
+Disables the process-wide disk caches so mocked AI responses from one test
+never leak into another (tests that exercise the caches create their own
+instances in tmp_path).
+"""
+
+import os
+
+os.environ['PIPELINE_RESULT_CACHE'] = '0'
+os.environ['LLM_CACHE'] = '0'
+os.environ['MDL_SNAPSHOTS'] = '0'
@@ -0,0 +1,210 @@
+"""
+Unit tests for the indexed Vietnam benchmark loader.
+
+Tests cover:
+- Index lookups match a linear scan of the CSVs
+- Metric filters work for marketing / e-commerce / sales (``metric`` column)
+- Scalar comparison output and status thresholds
+- Vectorized percentile scoring equals the scalar path
+- Lower-is-better metrics (CPA, ...) invert percentile and status
+- Shared loader: one instance per process, atomic hot reload on CSV change
+"""
+
+import pytest
+import os
+import sys
+
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from benchmark_loader import VietnamBenchmarkLoader, is_lower_better, score_percentiles, percentile_status
+
+
+@pytest.fixture(scope='module')
+def loader():
+    loader = VietnamBenchmarkLoader()
+    assert all(loader.load_all_benchmarks().values())
+    return loader
+
+
+def scalar_percentile(value, q1, median, q3):
+    """Reference piecewise formula (pre-vectorization implementation)."""
+    if value <= q1:
+        return 25 * (value / q1)
+    if value <= median:
+        return 25 + 25 * ((value - q1) / (median - q1))
+    if value <= q3:
+        return 50 + 25 * ((value - median) / (q3 - median))
+    return 75 + 25 * min((value - q3) / (q3 - median), 1)
+
+
+class TestLookups:
+    """Test index lookups against a linear scan."""
+
+    def test_hr_filters_match_scan(self, loader):
+        df = loader.hr_benchmarks
+        for role, city in [('HR Manager', 'Ho Chi Minh'), ('engineer', None), ('Developer', 'Hanoi')]:
+            mask = df['role'].str.contains(role, case=False, na=False)
+            if city:
+                mask &= df['city'].str.contains(city, case=False, na=False)
+            result = loader.get_hr_salary_benchmark(role=role, city=city)
+            if mask.any():
+                assert list(result.index) == list(df.index[mask])
+            else:
+                assert result is None
+
+    def test_marketing_metric_filter(self, loader):
+        result = loader.get_marketing_benchmark(metric_name='CPA', channel='Facebook Ads')
+        assert result is not None
+        assert result['metric'].str.contains('CPA', case=False).all()
+        assert result['channel'].str.contains('Facebook', case=False).all()
+
+    def test_sales_type_is_exact(self, loader):
+        b2b = loader.get_sales_benchmark(sales_type='B2B')
+        assert b2b is not None and (b2b['sales_type'].str.lower() == 'b2b').all()
+
+    def test_unknown_filter_raises(self, loader):
+        with pytest.raises(TypeError):
+            loader.compare_value_to_benchmark('marketing', 'CPA', 1.0, {'role': 'x'})
+
+    def test_unknown_domain(self, loader):
+        assert loader.compare_value_to_benchmark('finance', 'ROE', 1.0) is None
+
+
+class TestComparison:
+    """Test scalar and batch comparisons."""
+
+    def test_hr_comparison(self, loader):
+        result = loader.compare_value_to_benchmark('hr', 'salary', 30_000_000, {'role': 'HR Manager'})
+        q1, median, q3 = result['benchmark_q1'], result['benchmark_median'], result['benchmark_q3']
+        assert result['percentile'] == pytest.approx(scalar_percentile(30_000_000, q1, median, q3))
+        assert result['message']
+        assert result['benchmark_source']
+
+    def test_metric_domains_find_benchmarks(self, loader):
+        assert loader.compare_value_to_benchmark('marketing', 'CPA', 80_000, {'channel': 'Facebook Ads'})
+        assert loader.compare_value_to_benchmark('ecommerce', 'Conversion Rate', 2.5, {})
+
+    def test_lower_is_better_metric(self, loader):
+        filters = {'channel': 'Facebook Ads'}
+        baseline = loader.compare_value_to_benchmark('marketing', 'CPA', 1.0, filters)
+        median, q1, q3 = baseline['benchmark_median'], baseline['benchmark_q1'], baseline['benchmark_q3']
+
+        high = loader.compare_value_to_benchmark('marketing', 'CPA', q3 + (q3 - median), filters)
+        assert high['lower_is_better']
+        assert high['percentile'] == pytest.approx(100 - scalar_percentile(q3 + (q3 - median), q1, median, q3))
+        assert high['status'] == 'below_average'
+        assert not high['message'].startswith(('Tốt', 'Xuất sắc'))
+
+        low = loader.compare_value_to_benchmark('marketing', 'CPA', q1 * 0.5, filters)
+        assert low['status'] == 'excellent' and low['message'].startswith('Xuất sắc! Thấp hơn')
+
+        batch = loader.compare_values_to_benchmark('marketing', 'CPA', [q1 * 0.5, q3 + (q3 - median)], filters)
+        assert list(batch['status']) == ['excellent', 'below_average']
+        many = loader.compare_many('marketing', [('CPA', q1 * 0.5, filters)])
+        assert many['percentile'][0] == pytest.approx(low['percentile'])
+
+    def test_lower_is_better_flags(self):
+        assert is_lower_better('Cost Per Acquisition (CPA)')
+        assert is_lower_better('Cart Abandonment Rate') and is_lower_better('Sales Cycle Length')
+        assert not is_lower_better('Return on Ad Spend (ROAS)') and not is_lower_better('Win Rate')
+
+    def test_batch_equals_scalar(self, loader):
+        values = [5e6, 2e7, 3e7, 3.5e7, 9e7]
+        batch = loader.compare_values_to_benchmark('hr', 'salary', values, {'role': 'HR Manager'})
+        for value, row in zip(values, batch.itertuples()):
+            single = loader.compare_value_to_benchmark('hr', 'salary', value, {'role': 'HR Manager'})
+            assert row.percentile == pytest.approx(single['percentile'])
+            assert row.status == single['status']
+
+    def test_compare_many(self, loader):
+        result = loader.compare_many('marketing', [('CPA', 80_000, {'channel': 'Facebook Ads'}),
+                                                   ('no such metric', 1.0, None)])
+        assert len(result) == 2
+        single = loader.compare_value_to_benchmark('marketing', 'CPA', 80_000, {'channel': 'Facebook Ads'})
+        assert result['percentile'][0] == pytest.approx(single['percentile'])
+        assert np.isnan(result['benchmark_median'][1]) and result['status'][1] is None
+
+
+def test_score_percentiles_matches_scalar():
+    rng = np.random.default_rng(0)
+    values = rng.uniform(0, 200, 500)
+    q1, median, q3 = 40.0, 60.0, 90.0
+    expected = [scalar_percentile(v, q1, median, q3) for v in values]
+    assert np.allclose(score_percentiles(values, q1, median, q3), expected)
+
+
+def test_percentile_status_thresholds():
+    assert list(percentile_status([10, 25, 49.9, 50, 75, 100])) == [
+        'below_average', 'average', 'average', 'above_average', 'excellent', 'excellent']
+
+
+class TestSharedLoader:
+    """Test the process-wide, hot-reloading loader."""
+
+    @pytest.fixture
+    def data_dir(self, tmp_path, monkeypatch):
+        import shutil
+        import benchmark_loader
+
+        for path in benchmark_loader.DEFAULT_SAMPLE_DATA_PATH.glob(benchmark_loader.BENCHMARK_FILE_PATTERN):
+            shutil.copy(path, tmp_path / path.name)
+        monkeypatch.setattr(benchmark_loader, 'DEFAULT_SAMPLE_DATA_PATH', tmp_path)
+        monkeypatch.setattr(benchmark_loader, '_benchmark_loader', None)
+        monkeypatch.setattr(benchmark_loader, '_rejected_signature', None)
+        monkeypatch.setenv('BENCHMARK_RELOAD_CHECK_SECONDS', '0')
+        return tmp_path
+
+    @staticmethod
+    def rewrite(path, text):
+        path.write_text(text, encoding='utf-8')
+        os.utime(path, ns=(path.stat().st_atime_ns, path.stat().st_mtime_ns + 10**9))
+
+    def test_shared_until_files_change(self, data_dir):
+        from benchmark_loader import get_benchmark_loader
+
+        first = get_benchmark_loader()
+        assert get_benchmark_loader() is first
+
+        hr_path = data_dir / 'vietnam_hr_salary_benchmarks_2024.csv'
+        original = hr_path.read_text(encoding='utf-8')
+        self.rewrite(hr_path, original.replace('HR Manager', 'People Director'))
+
+        second = get_benchmark_loader()
+        assert second is not first
+        assert second.get_hr_salary_benchmark(role='People Director') is not None
+        # The previous version is untouched for sessions still holding it
+        assert first.get_hr_salary_benchmark(role='People Director') is None
+        assert first.get_hr_salary_benchmark(role='HR Manager') is not None
+
+    def test_broken_reload_keeps_previous(self, data_dir):
+        from benchmark_loader import get_benchmark_loader
+
+        first = get_benchmark_loader()
+        self.rewrite(data_dir / 'vietnam_sales_benchmarks_2024.csv', '')
+        assert get_benchmark_loader() is first
+
+    def test_hot_reload_disabled(self, data_dir, monkeypatch):
+        from benchmark_loader import get_benchmark_loader
+
+        monkeypatch.setenv('BENCHMARK_HOT_RELOAD', '0')
+        first = get_benchmark_loader()
+        self.rewrite(data_dir / 'vietnam_hr_salary_benchmarks_2024.csv', 'role\nX\n')
+        assert get_benchmark_loader() is first
+
+    def test_concurrent_first_load(self, data_dir):
+        from concurrent.futures import ThreadPoolExecutor
+        from benchmark_loader import get_benchmark_loader
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            loaders = list(pool.map(lambda _: get_benchmark_loader(), range(16)))
+        assert all(loader is loaders[0] for loader in loaders)
+
+    def test_shared_arrays_are_read_only(self, data_dir):
+        from benchmark_loader import get_benchmark_loader
+
+        table = get_benchmark_loader().tables['hr']
+        with pytest.raises(ValueError):
+            table.median[0] = 0
@@ -0,0 +1,76 @@
+"""
+Unit tests for columnar breakdowns.
+
+Tests cover:
+- One named-aggregation groupby equals separate (filtered) groupbys
+- Stable descending order with NaN last
+- Serialization to the list-of-dicts output format
+"""
+
+import pytest
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.breakdown import Breakdown, group_breakdown, order_by
+
+
+@pytest.fixture
+def deals():
+    rng = np.random.default_rng(3)
+    n = 500
+    frame = pd.DataFrame({
+        'rep': rng.choice([f"Rep {i}" for i in range(40)], n),
+        'stage': rng.choice(['Closed Won', 'Closed Lost', 'Proposal', 'Discovery'], n),
+        'deal_value': rng.uniform(1e6, 1e8, n),
+    })
+    frame.loc[::31, 'rep'] = None
+    return frame
+
+
+def test_conditional_sums_match_separate_groupbys(deals):
+    won = deals['stage'].str.contains('won', case=False, na=False)
+    lost = deals['stage'].str.contains('lost', case=False, na=False)
+    result = group_breakdown(deals, 'rep', 'rep', {
+        'pipeline_value': ('deal_value', 'sum'),
+        'wins': (won, 'sum'),
+        'losses': (lost, 'sum'),
+        'won_revenue': (deals['deal_value'].where(won), 'sum'),
+    })
+
+    expected = deals.groupby('rep')['deal_value'].sum()
+    assert list(result['rep']) == list(expected.index)
+    assert np.allclose(result['pipeline_value'], expected.values)
+    wins = deals[won].groupby('rep').size().reindex(expected.index, fill_value=0)
+    losses = deals[lost].groupby('rep').size().reindex(expected.index, fill_value=0)
+    won_revenue = deals[won].groupby('rep')['deal_value'].sum().reindex(expected.index, fill_value=0)
+    assert np.array_equal(result['wins'], wins.values)
+    assert np.array_equal(result['losses'], losses.values)
+    assert np.allclose(result['won_revenue'], won_revenue.values)
+
+
+def test_order_by_is_stable_with_nan_last():
+    values = np.array([2.0, np.nan, 5.0, 2.0, 5.0])
+    assert list(order_by(values)) == [2, 4, 0, 3, 1]
+    assert list(order_by(values, ascending=True)) == [0, 3, 2, 4, 1]
+
+
+def test_sort_and_records():
+    breakdown = Breakdown('stage', {
+        'stage': np.array(['Lead', 'Proposal'], dtype=object),
+        'deal_count': np.array([3.0, 7.0]),
+        'total_value': np.array([10, 40]),
+    })
+    breakdown['avg_deal_size'] = breakdown['total_value'] / breakdown['deal_count']
+    records = breakdown.sort_by('total_value').to_records(int_fields=['deal_count'])
+
+    assert records[0] == {'stage': 'Proposal', 'deal_count': 7, 'total_value': 40.0,
+                          'avg_deal_size': pytest.approx(40 / 7)}
+    assert type(records[0]['deal_count']) is int and type(records[0]['total_value']) is float
+    assert list(records[1]) == ['stage', 'deal_count', 'total_value', 'avg_deal_size']
+    assert breakdown.to_records(fields=['stage'])[0] == {'stage': 'Lead'}
@@ -0,0 +1,158 @@
+"""
+Unit tests for chart data planning.
+
+Tests cover:
+- Categorical groupby with folding of the long tail
+- Folding of estimated group totals with combined CI margins
+- Adaptive time buckets for date axes
+- LTTB and min/max decimation bounds
+- Step 3 figures stay bounded and carry reduction metadata
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+import os
+import sys
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.chart_aggregation import (
+    plan_chart_data, plan_estimate_data, time_grain, lttb_indices, minmax_indices,
+    MAX_CATEGORIES, MAX_POINTS, MAX_TIME_BUCKETS
+)
+
+
+@pytest.fixture
+def big_df():
+    rng = np.random.default_rng(1)
+    rows = 50_000
+    return pd.DataFrame({
+        'Channel': rng.choice(['Facebook', 'Google', 'TikTok'], rows),
+        'Customer': [f'C{i % 3000}' for i in range(rows)],
+        'Date': pd.Timestamp('2023-01-01') + pd.to_timedelta(rng.integers(0, 2 * 365 * 24, rows), unit='h'),
+        'Clicks': rng.integers(0, 10_000, rows),
+        'Revenue': rng.gamma(2.0, 50.0, rows),
+        'Conversion_Rate': rng.random(rows),
+    })
+
+
+class TestCategorical:
+    """Test groupby reduction of categorical axes."""
+
+    def test_bar_sums_per_category(self, big_df):
+        plot_df, reduction = plan_chart_data(big_df, 'bar', 'Channel', 'Revenue')
+        expected = big_df.groupby('Channel')['Revenue'].sum()
+
+        assert reduction['method'] == 'groupby' and reduction['agg'] == 'sum'
+        assert reduction['output_rows'] == 3
+        assert plot_df.set_index('Channel')['Revenue'].to_dict() == pytest.approx(expected.to_dict())
+
+    def test_rates_are_averaged(self, big_df):
+        _, reduction = plan_chart_data(big_df, 'bar', 'Channel', 'Conversion_Rate')
+        assert reduction['agg'] == 'mean'
+
+    def test_long_tail_folded(self, big_df):
+        plot_df, reduction = plan_chart_data(big_df, 'bar', 'Customer', 'Revenue', other_label='Khác')
+
+        assert reduction['folded'] is True
+        assert len(plot_df) == MAX_CATEGORIES
+        assert plot_df['Customer'].iloc[-1] == 'Khác'
+        assert plot_df['Revenue'].sum() == pytest.approx(big_df['Revenue'].sum())
+
+
+    def test_estimates_folded_with_margins(self):
+        groups = [f'G{i}' for i in range(80)]
+        estimate = np.arange(80, 0, -1, dtype=float) * 10
+        std_error = np.full(80, 2.0)
+        totals = pd.DataFrame({'Group': groups, 'estimate': estimate, 'std_error': std_error,
+                               'ci_low': estimate - 1.96 * std_error, 'ci_high': estimate + 1.96 * std_error})
+
+        plot_df, reduction = plan_estimate_data(totals, 'bar', 'Group', 'Revenue', other_label='Khác')
+
+        assert reduction['folded'] is True and reduction['method'] == 'stratified_estimate'
+        assert len(plot_df) == MAX_CATEGORIES
+        assert plot_df['Group'].iloc[-1] == 'Khác'
+        assert plot_df['Revenue'].sum() == pytest.approx(estimate.sum())
+        assert plot_df['ci_margin'].iloc[0] == pytest.approx(1.96 * 2.0)
+        folded = 80 - (MAX_CATEGORIES - 1)
+        assert plot_df['ci_margin'].iloc[-1] == pytest.approx(1.96 * 2.0 * np.sqrt(folded))
+
+
+class TestTimeBuckets:
+    """Test adaptive date grain."""
+
+    def test_grain_selection(self):
+        start = pd.Timestamp('2024-01-01')
+        assert time_grain(start, start + pd.Timedelta(days=5))[0] == 'hour'
+        assert time_grain(start, start + pd.Timedelta(days=200))[0] == 'day'
+        assert time_grain(start, start + pd.Timedelta(days=2 * 365))[0] == 'week'
+        assert time_grain(start, start + pd.Timedelta(days=20 * 365))[0] == 'month'
+
+    def test_line_over_dates(self, big_df):
+        plot_df, reduction = plan_chart_data(big_df, 'line', 'Date', 'Revenue')
+
+        assert reduction['method'] == 'time_bucket'
+        assert reduction['grain'] == 'week'
+        assert len(plot_df) <= MAX_TIME_BUCKETS
+        assert plot_df['Revenue'].sum() == pytest.approx(big_df['Revenue'].sum())
+
+    def test_iso_date_strings(self, big_df):
+        df = big_df.assign(Date=big_df['Date'].dt.strftime('%Y-%m-%d'))
+        _, reduction = plan_chart_data(df, 'line', 'Date', 'Revenue')
+        assert reduction['method'] == 'time_bucket'
+
+
+class TestDecimation:
+    """Test point-count bounds for line and scatter."""
+
+    def test_lttb_keeps_extremes(self):
+        x = np.arange(10_000, dtype=float)
+        y = np.sin(x / 500)
+        y[4321] = 25.0  # Spike must survive downsampling
+
+        keep = lttb_indices(x, y, 500)
+
+        assert len(keep) == 500
+        assert keep[0] == 0 and keep[-1] == 9_999
+        assert 4321 in keep
+
+    def test_minmax_per_bin(self):
+        keep = minmax_indices(np.array([0, 0, 0, 1, 1]), np.array([5.0, 1.0, 9.0, 2.0, 3.0]))
+        assert keep.tolist() == [1, 2, 3, 4]
+
+    @pytest.mark.parametrize('chart_type, method', [('line', 'lttb'), ('scatter', 'minmax')])
+    def test_numeric_x_bounded(self, big_df, chart_type, method):
+        plot_df, reduction = plan_chart_data(big_df, chart_type, 'Clicks', 'Revenue')
+
+        assert reduction['method'] == method
+        assert len(plot_df) <= MAX_POINTS
+
+    def test_small_input_untouched(self, big_df):
+        df = big_df.head(100)
+        plot_df, reduction = plan_chart_data(df, 'scatter', 'Clicks', 'Revenue')
+
+        assert reduction['method'] == 'none'
+        assert plot_df is df
+
+
+class TestDashboardReduction:
+    """Test Step 3 figures are built from reduced data."""
+
+    def test_figures_bounded(self, big_df):
+        from premium_lean_pipeline import PremiumLeanPipeline
+        pipeline = PremiumLeanPipeline(None, lang='en', result_cache=None, llm_cache=None)
+        blueprint = {'charts': [
+            {'id': 'c1', 'title': 'Revenue by channel', 'type': 'bar', 'x_axis': 'Channel', 'y_axis': 'Revenue'},
+            {'id': 'c2', 'title': 'Revenue trend', 'type': 'line', 'x_axis': 'Date', 'y_axis': 'Revenue'},
+            {'id': 'c3', 'title': 'Clicks vs revenue', 'type': 'scatter', 'x_axis': 'Clicks', 'y_axis': 'Revenue'},
+        ]}
+
+        charts = pipeline.step3_dashboard_build(big_df, blueprint)['charts']
+
+        assert [chart['reduction']['method'] for chart in charts] == ['groupby', 'time_bucket', 'minmax']
+        assert len(charts[0]['figure'].data[0].x) == 3
+        for chart in charts:
+            assert chart['reduction']['input_rows'] == len(big_df)
+            assert len(chart['figure'].data[0].x) <= MAX_POINTS
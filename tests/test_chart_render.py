@@ -0,0 +1,102 @@
+"""
+Unit tests for shared chart rasterization.
+
+Tests cover:
+- PNG output (kaleido or matplotlib fallback)
+- Cache hits by figure content and size
+- Process-pool rendering matches in-process rendering
+- PDF and PowerPoint exports share rendered images
+"""
+
+import pytest
+import pandas as pd
+import plotly.graph_objects as go
+import os
+import sys
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.chart_render import ChartRasterizer
+
+PNG_MAGIC = b'\x89PNG'
+
+
+def make_figures(n: int = 3):
+    return [
+        go.Figure(go.Bar(x=['A', 'B', 'C'], y=[i + 1, i + 2, i + 3], name=f'series {i}'))
+        for i in range(n)
+    ]
+
+
+class TestChartRasterizer:
+    """Test rendering, caching and timings."""
+
+    def test_renders_png_with_timings(self):
+        rasterizer = ChartRasterizer(max_workers=0)
+        rendered = rasterizer.render(make_figures(2))
+
+        for result in rendered:
+            assert result['png'].startswith(PNG_MAGIC)
+            assert result['engine'] in ('kaleido', 'matplotlib')
+            assert result['cached'] is False
+        assert [timing['seconds'] > 0 for timing in rasterizer.last_timings] == [True, True]
+        assert 'png' not in rasterizer.last_timings[0]
+
+    def test_cache_hit_by_content_and_size(self):
+        rasterizer = ChartRasterizer(max_workers=0)
+        first = rasterizer.render(make_figures(1))
+        again = rasterizer.render(make_figures(1))  # Equal figure, new object
+        resized = rasterizer.render(make_figures(1), width=400, height=300)
+
+        assert again[0]['cached'] is True
+        assert again[0]['png'] == first[0]['png']
+        assert resized[0]['cached'] is False
+
+    def test_duplicate_figures_rendered_once(self):
+        rasterizer = ChartRasterizer(max_workers=0)
+        figure = make_figures(1)[0]
+        rendered = rasterizer.render([figure, figure, None])
+
+        assert rendered[0]['png'] == rendered[1]['png']
+        assert rendered[2]['png'] is None
+
+    def test_lru_bound(self):
+        rasterizer = ChartRasterizer(max_workers=0, cache_entries=2)
+        rasterizer.render(make_figures(3))
+        assert len(rasterizer._cache) == 2
+
+    def test_process_pool(self):
+        pool_rasterizer = ChartRasterizer(max_workers=2)
+        try:
+            rendered = pool_rasterizer.render(make_figures(3))
+        finally:
+            pool_rasterizer.shutdown()
+
+        assert all(result['png'].startswith(PNG_MAGIC) for result in rendered)
+
+
+def test_pdf_and_pptx_share_images(monkeypatch):
+    pytest.importorskip('reportlab')
+    pytest.importorskip('pptx')
+    import utils.chart_render as chart_render
+    from utils.export_utils import export_to_pdf, export_to_powerpoint
+
+    rasterizer = ChartRasterizer(max_workers=0)
+    monkeypatch.setattr(chart_render, '_rasterizer', rasterizer)
+    result = {
+        'dashboard': {'charts': [{'title': f'Chart {i}', 'figure': fig} for i, fig in enumerate(make_figures(2))],
+                      'kpis': {}},
+        'insights': {'key_insights': [], 'recommendations': []},
+        'domain_info': {'domain_name': 'Marketing', 'domain': 'marketing', 'expert_role': 'Marketing Analyst'},
+        'quality_scores': {'overall': 90},
+        'performance': {'total': 12.0},
+    }
+
+    df = pd.DataFrame({'channel': ['A', 'B'], 'revenue': [1.0, 2.0]})
+
+    export_to_pdf(result, df, lang='en')
+    assert [timing['cached'] for timing in rasterizer.last_timings] == [False, False]
+
+    export_to_powerpoint(result, df, lang='en')
+    assert [timing['cached'] for timing in rasterizer.last_timings] == [True, True]
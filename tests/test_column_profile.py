@@ -0,0 +1,122 @@
+"""
+Unit tests for the shared column profile.
+
+Tests cover:
+- Statistics match the pandas calls they replace
+- Profiles are memoized per frame and invalidated on change
+- Pipeline cleaning uses the profile for imputation
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+import os
+import sys
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.column_profile import ColumnProfile, get_column_profile, invalidate_column_profile
+
+
+@pytest.fixture
+def sample_df():
+    return pd.DataFrame({
+        'channel': ['A', 'B', 'A', None, 'B', 'A', 'A'],
+        'spend': [100.0, 200.0, 100.0, np.nan, 250.0, 100.0, 100.0],
+        'clicks': [10, 20, 10, 30, 25, 10, 10],
+        'date': pd.date_range('2024-01-01', periods=7),
+    })
+
+
+class TestColumnProfile:
+    """Test statistics against pandas."""
+
+    def test_nulls_and_duplicates(self, sample_df):
+        profile = ColumnProfile(sample_df)
+
+        assert profile.null_counts == sample_df.isnull().sum().to_dict()
+        assert profile.total_missing == sample_df.isnull().sum().sum()
+        assert profile.missing_rate == pytest.approx(2 / sample_df.size)
+
+    def test_duplicate_rows_match_pandas(self, sample_df):
+        df = sample_df.drop(columns='date')
+        assert ColumnProfile(df).duplicate_rows == df.duplicated().sum() == 3
+
+    def test_column_kinds(self, sample_df):
+        profile = ColumnProfile(sample_df)
+
+        assert profile.numeric_columns == ['spend', 'clicks']
+        assert profile.object_columns == ['channel']
+        assert profile.datetime_columns == ['date']
+
+    def test_median_mode_distinct(self, sample_df):
+        profile = ColumnProfile(sample_df)
+
+        assert profile.median('spend') == sample_df['spend'].median()
+        assert profile.median('channel') is None
+        assert profile.mode('channel') == sample_df['channel'].mode()[0]
+        assert profile.distinct_counts['channel'] == sample_df['channel'].nunique()
+        assert profile.top_values['channel'][0] == ('A', 4)
+
+    def test_mode_tie_matches_pandas(self):
+        series = pd.Series(['b', 'a', 'b', 'a'])
+        profile = ColumnProfile(series.to_frame('x'))
+        assert profile.mode('x') == series.mode()[0] == 'a'
+
+    def test_all_null_column(self):
+        profile = ColumnProfile(pd.DataFrame({'x': [None, None]}))
+        assert profile.mode('x') is None
+        assert profile.missing('x') == 2
+
+    def test_describe_matches_pandas(self, sample_df):
+        expected = sample_df[['spend', 'clicks']].describe()
+        pd.testing.assert_frame_equal(ColumnProfile(sample_df).describe().loc[expected.index], expected)
+
+
+class TestProfileMemoization:
+    """Test profile reuse and invalidation."""
+
+    def test_same_frame_reuses_profile(self, sample_df):
+        assert get_column_profile(sample_df) is get_column_profile(sample_df)
+
+    def test_structure_change_recomputes(self, sample_df):
+        first = get_column_profile(sample_df)
+        sample_df['extra'] = 1
+        second = get_column_profile(sample_df)
+
+        assert second is not first
+        assert 'extra' in second.numeric_columns
+
+    def test_explicit_invalidation(self, sample_df):
+        first = get_column_profile(sample_df)
+        sample_df['spend'] = sample_df['spend'].fillna(0.0)
+        invalidate_column_profile(sample_df)
+
+        assert get_column_profile(sample_df) is not first
+        assert get_column_profile(sample_df).missing('spend') == 0
+
+
+class TestPipelineUsesProfile:
+    """Test cleaning and quality gates read the profile."""
+
+    def test_fast_cleaning_imputes_from_profile(self, sample_df):
+        from premium_lean_pipeline import PremiumLeanPipeline
+        pipeline = PremiumLeanPipeline(None, lang='en', result_cache=None, llm_cache=None)
+        df = sample_df.rename(columns={'channel': 'segment', 'spend': 'score'})
+        plan = {'cleaning_summary': {'missing_handled': {'segment': 'mode', 'score': 'median'}}}
+
+        cleaned = pipeline._apply_fast_cleaning(df, plan, {'domain': 'general'})
+
+        assert cleaned['segment'].iloc[3] == 'A'
+        assert cleaned['score'].iloc[3] == df['score'].median()
+        assert df['segment'].isnull().sum() == 1  # input untouched
+
+    def test_quality_gates(self, sample_df):
+        from premium_lean_pipeline import PremiumLeanPipeline
+        pipeline = PremiumLeanPipeline(None, lang='en', result_cache=None, llm_cache=None)
+        df = sample_df.drop(columns='date')
+        clean = df.dropna().drop_duplicates()
+
+        assert pipeline._validate_quality_gates(clean, {})['passed']
+        assert not pipeline._validate_quality_gates(df, {})['checks']['duplicates_ok']
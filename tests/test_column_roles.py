@@ -0,0 +1,83 @@
+"""
+Unit tests for precompiled column-role matching.
+
+Tests cover:
+- Folded matching (case, separators, Vietnamese diacritics)
+- Vietnamese aliases and exclusions of the KPI tables
+- Overlapping keywords found in one scan
+- Role index memoized per schema
+- NEVER_IMPUTE protection on folded names
+"""
+
+import pytest
+import os
+import sys
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.column_roles import Role, RoleMatcher, fold_name, folded_names
+from kpi_registry import ECOMMERCE, SALARY
+
+
+class TestFolding:
+    """Test name folding."""
+
+    def test_fold_name(self):
+        assert fold_name('Doanh_Thu (VNĐ)') == 'doanh thu vnd'
+        assert fold_name('Lương-Tháng') == 'luong thang'
+        # camelCase is kept whole so substrings such as 'tiktok' still match
+        assert fold_name('TikTok_Spend') == 'tiktok spend'
+
+    def test_folded_names_memoized(self):
+        columns = ['Kênh', 'Chi_Phí']
+        assert folded_names(columns) == ('kenh', 'chi phi')
+        assert folded_names(columns) is folded_names(tuple(columns))
+
+
+class TestRoleMatcher:
+    """Test role resolution."""
+
+    def test_vietnamese_aliases(self):
+        roles = SALARY.matcher.index(['Lương', 'Số_Lượng', 'Chức vụ', 'Thành phố'])
+        assert roles.get('salary') == ('Lương',)
+        assert roles.first('role') == 'Chức vụ'
+        assert roles.first('city') == 'Thành phố'
+
+        roles = ECOMMERCE.matcher.index(['doanh_thu', 'Số đơn', 'Tỷ lệ số đơn'])
+        assert roles.first('revenue') == 'doanh_thu'
+        assert roles.get('transaction') == ('Số đơn',)
+
+    def test_overlapping_keywords(self):
+        matcher = RoleMatcher({
+            'prob': Role('prob'),
+            'probability': Role('probability'),
+            'ability': Role('ability'),
+            'both': Role(('win', 'probability')),
+        })
+        assert set(matcher.roles_of('win_probability')) == {'prob', 'probability', 'ability', 'both'}
+        assert matcher.roles_of('Problem') == ('prob',)
+        assert matcher.roles_of('other') == ()
+
+    def test_exclusions(self):
+        matcher = RoleMatcher({'transaction': Role('transaction', exclude=('rate',))})
+        assert matcher.matches('Transactions', 'transaction')
+        assert not matcher.matches('Transaction_Rate', 'transaction')
+
+    def test_index_memoized_per_schema(self):
+        matcher = RoleMatcher({'revenue': Role('revenue')})
+        roles = matcher.index(['Revenue', 'Cost'])
+        assert matcher.index(['Revenue', 'Cost']) is roles
+        assert matcher.index(['Cost', 'Revenue']) is not roles
+        assert 'revenue' in roles and 'cost' not in roles
+        assert roles.get('missing') == ()
+
+
+class TestNeverImpute:
+    """Test protected-field detection on folded names."""
+
+    def test_diacritic_names_protected(self):
+        from premium_lean_pipeline import is_never_impute_field
+        assert is_never_impute_field('Lương Tháng')
+        assert is_never_impute_field('Doanh-Thu')
+        assert not is_never_impute_field('customer_age')
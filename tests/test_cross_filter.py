@@ -0,0 +1,163 @@
+"""
+Unit tests for the bitmap-indexed cross-filter.
+
+Tests cover:
+- Selections equal the pandas isin / range boolean masks
+- Bitmap and lookup-table paths for categorical columns
+- Aggregates over a selection equal pandas groupby results
+- Cube breakdowns equal pandas groupby (and the row-scan fallback)
+- Index reuse across reruns
+"""
+
+import pytest
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.cross_filter import CrossFilterIndex, build_filter_index
+
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(1)
+    n = 1003  # Not a multiple of 8: exercises the bitmap padding
+    frame = pd.DataFrame({
+        'channel': rng.choice(['Email', 'SEO', 'Facebook', 'Zalo'], n),
+        'region': rng.choice([f"R{i}" for i in range(30)], n),
+        'revenue': rng.normal(100, 30, n),
+        'cost': rng.normal(40, 10, n),
+    })
+    frame.loc[::17, 'channel'] = None
+    frame.loc[::23, 'revenue'] = np.nan
+    return frame
+
+
+def pandas_mask(df, categories, ranges):
+    mask = pd.Series(True, index=df.index)
+    for col, values in categories.items():
+        column_mask = df[col].isin(values)
+        if pd.isna(pd.Index(values)).any():  # Any selected null keeps all missing rows
+            column_mask |= df[col].isna()
+        mask &= column_mask
+    for col, (low, high) in ranges.items():
+        mask &= (df[col] >= low) & (df[col] <= high)
+    return mask.to_numpy()
+
+
+class TestSelect:
+    """Test filter resolution."""
+
+    @pytest.mark.parametrize('max_bitmap_values', [256, 0])
+    @pytest.mark.parametrize('categories,ranges', [
+        ({'channel': ['Email']}, {}),
+        ({'channel': ['Email', 'SEO', 'Facebook']}, {}),  # Inverted path
+        ({'channel': ['Email'], 'region': ['R1', 'R2', 'R3']}, {'revenue': (80, 120)}),
+        ({}, {'revenue': (90, 90.5), 'cost': (0, 50)}),
+        ({'channel': ['Nope']}, {}),
+        ({'channel': ['Email', None]}, {}),  # Null selected: missing rows kept, like isin
+        ({'channel': ['Email', 'SEO', 'Facebook', 'Zalo', np.nan]}, {}),  # Multiselect default
+    ])
+    def test_matches_pandas(self, df, categories, ranges, max_bitmap_values):
+        index = CrossFilterIndex(df, ['channel', 'region'], ['revenue', 'cost'], max_bitmap_values=max_bitmap_values)
+        selection = index.select(categories, ranges)
+        expected = pandas_mask(df, categories, ranges)
+
+        assert np.array_equal(selection.mask, expected)
+        assert selection.count == expected.sum()
+        assert selection.n_filters == len(categories) + len(ranges)
+        pd.testing.assert_frame_equal(index.take(selection), df[expected])
+
+    def test_no_filters_returns_frame_itself(self, df):
+        index = CrossFilterIndex(df, ['channel'], ['revenue'])
+        selection = index.select({'channel': []}, {})
+        assert selection.is_all and selection.n_filters == 0
+        assert index.take(selection) is df
+
+    def test_default_selection_keeps_missing_rows(self, df):
+        # The filter panel preselects df[col].unique(), which includes NaN
+        index = CrossFilterIndex(df, ['channel'], ['revenue'])
+        selection = index.select({'channel': df['channel'].unique().tolist()})
+        assert selection.is_all
+        assert index.select({'channel': ['Email', 'SEO', 'Facebook', 'Zalo']}).count == df['channel'].notna().sum()
+
+    def test_filter_bitmaps_are_memoized(self, df):
+        index = CrossFilterIndex(df, ['channel'], ['revenue'])
+        first = index.category_bits('channel', ['Email', 'SEO'])
+        assert index.category_bits('channel', ['SEO', 'Email']) is first
+
+
+class TestAggregate:
+    """Test aggregates over a selection."""
+
+    @pytest.mark.parametrize('agg', ['sum', 'mean', 'count', 'min', 'max'])
+    def test_grouped_matches_pandas(self, df, agg):
+        index = CrossFilterIndex(df, ['channel', 'region'], ['revenue'])
+        selection = index.select({'region': ['R1', 'R5', 'R9']}, {'revenue': (60, 140)})
+        expected = df[selection.mask].groupby('channel', sort=False)['revenue'].agg(agg)
+        result = index.aggregate(selection, 'revenue', by='channel', agg=agg)
+        pd.testing.assert_series_equal(result.sort_index(), expected.sort_index(),
+                                       check_dtype=False, check_names=False)
+
+    def test_scalar_and_describe(self, df):
+        index = CrossFilterIndex(df, ['channel'], ['revenue', 'cost'])
+        selection = index.select({'channel': ['Zalo']})
+        subset = df[selection.mask]
+        assert index.aggregate(selection, 'revenue') == pytest.approx(subset['revenue'].sum())
+        stats = index.describe(selection, ['cost'])['cost']
+        assert stats['mean'] == pytest.approx(subset['cost'].mean())
+        assert stats['std'] == pytest.approx(subset['cost'].std())
+
+    def test_unknown_aggregation(self, df):
+        index = CrossFilterIndex(df, ['channel'], ['revenue'])
+        with pytest.raises(ValueError):
+            index.aggregate(index.select(), 'revenue', agg='median')
+
+
+class TestBreakdown:
+    """Test cube-backed group-bys."""
+
+    @pytest.mark.parametrize('agg', ['sum', 'count', 'mean', 'min', 'max', 'median'])
+    @pytest.mark.parametrize('categories', [{}, {'region': ['R1', 'R2', 'R7']},
+                                            {'region': ['R3'], 'channel': ['Email', 'Zalo']},
+                                            {'region': ['R3'], 'channel': ['Email', None]}])
+    def test_matches_pandas(self, df, agg, categories):
+        index = CrossFilterIndex(df, ['channel', 'region'], ['revenue', 'cost'])
+        expected = df[pandas_mask(df, categories, {})].groupby('channel', observed=True)['revenue'].agg(agg)
+        result = index.breakdown('channel', 'revenue', agg, categories=categories)
+        pd.testing.assert_series_equal(result, expected, check_dtype=False, check_names=False)
+
+    def test_range_filter_scans_rows(self, df):
+        index = CrossFilterIndex(df, ['channel', 'region'], ['revenue', 'cost'])
+        ranges = {'cost': (30, 45)}
+        expected = df[pandas_mask(df, {}, ranges)].groupby('channel')['revenue'].sum()
+        result = index.breakdown('channel', 'revenue', 'sum', ranges=ranges)
+        pd.testing.assert_series_equal(result, expected, check_names=False)
+        assert not index._cubes
+
+    def test_cube_reused_across_filter_values(self, df):
+        index = CrossFilterIndex(df, ['channel', 'region'], ['revenue'])
+        index.breakdown('channel', 'revenue', categories={'region': ['R1']})
+        cube = index.cube(['channel', 'region'])
+        index.breakdown('channel', 'revenue', categories={'region': ['R2', 'R4']})
+        assert index.cube(['region', 'channel']) is cube
+        assert cube.n_cells <= 4 * 30 + 30
+
+    def test_high_cardinality_skips_cube(self, df, monkeypatch):
+        monkeypatch.setenv('CROSS_FILTER_MAX_CUBE_CELLS', '0.01')
+        frame = df.assign(row_id=np.arange(len(df)).astype(str))
+        index = CrossFilterIndex(frame, ['row_id'], ['revenue'])
+        assert index.cube(['row_id']) is None
+        result = index.breakdown('row_id', 'revenue', 'sum')
+        assert len(result) == len(frame)
+
+
+def test_build_filter_index_reuse(df):
+    index = build_filter_index(df, ['channel'], ['revenue'])
+    assert build_filter_index(df, ['channel'], ['revenue'], previous=index) is index
+    assert build_filter_index(df, ['channel', 'region'], ['revenue'], previous=index) is not index
+    assert build_filter_index(df.copy(), ['channel'], ['revenue'], previous=index) is not index
@@ -0,0 +1,149 @@
+"""
+Unit tests for the DuckDB semantic-layer backend.
+
+Tests cover:
+- MDL model views expose data under MDL column names
+- DuckDB metric results equal the pandas MetricPlan results, including NULLs
+  in filter and flag columns
+- Fallback to pandas when DuckDB is not selected
+- File scans without loading into pandas
+- load_file() builds model views over a CSV/Parquet file
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from mdl_loader import create_query_engine, load_mdl_for_domain
+
+duckdb = pytest.importorskip('duckdb')
+
+from utils.duckdb_engine import DuckDBEngine, SemanticQueryEngine
+
+
+@pytest.fixture
+def campaigns():
+    rng = np.random.default_rng(5)
+    rows = 2_000
+    return pd.DataFrame({
+        'Channel': rng.choice(['Email', 'Social', 'PPC'], rows),
+        'Campaign Name': rng.choice(['Tết', 'Summer', 'Back to school'], rows),
+        'Spend': rng.gamma(2.0, 1000.0, rows),
+        'Revenue': rng.gamma(2.0, 4000.0, rows),
+        'Impressions': rng.integers(100, 10_000, rows),
+        'Clicks': rng.integers(0, 100, rows),
+        'Conversions': rng.integers(0, 10, rows),
+    })
+
+
+class TestSemanticQueryEngine:
+    """Test SQL metric queries."""
+
+    def test_views_use_mdl_names(self, campaigns):
+        engine = create_query_engine('marketing', campaigns, backend='duckdb')
+
+        assert 'spend' in engine.views['campaigns']
+        total = engine._duckdb.sql('SELECT SUM(spend) AS s FROM campaigns')['s'].iloc[0]
+        assert total == pytest.approx(campaigns['Spend'].sum())
+
+    def test_matches_pandas(self, campaigns):
+        on_duckdb = create_query_engine('marketing', campaigns, backend='duckdb')
+        on_pandas = create_query_engine('marketing', campaigns, backend='pandas')
+
+        for dimensions in (None, ['channel'], []):
+            expected = on_pandas.metric('marketing_roi_kpis', dimensions=dimensions)
+            result = on_duckdb.metric('marketing_roi_kpis', dimensions=dimensions)
+
+            assert result.attrs['backend'] == 'duckdb'
+            assert expected.attrs['backend'] == 'pandas'
+            assert result.attrs['skipped'] == expected.attrs['skipped']
+            pd.testing.assert_frame_equal(result, expected[result.columns], check_dtype=False)
+
+    def test_skips_missing_columns(self, campaigns):
+        engine = create_query_engine('marketing', campaigns, backend='duckdb')
+        result = engine.metric('marketing_roi_kpis', dimensions=[])
+
+        assert 'cac' not in result.columns
+        assert result.attrs['skipped']['cac'] == ['customers']
+
+
+@pytest.fixture
+def ledger():
+    rng = np.random.default_rng(11)
+    rows = 1_000
+    return pd.DataFrame({
+        'account_type': rng.choice(np.array(['Revenue', 'Expense', 'Asset', None], dtype=object), rows),
+        'category': rng.choice(np.array(['Cost of Goods Sold', 'Rent', 'Sales', None], dtype=object), rows),
+        'department': rng.choice(['Ops', 'Sales'], rows),
+        'debit': np.where(rng.random(rows) < 0.1, np.nan, rng.gamma(2.0, 100.0, rows)),
+        'credit': np.where(rng.random(rows) < 0.1, np.nan, rng.gamma(2.0, 100.0, rows)),
+    })
+
+
+@pytest.fixture
+def orders():
+    rng = np.random.default_rng(12)
+    rows = 1_000
+    return pd.DataFrame({
+        'channel': rng.choice(['Web', 'App'], rows),
+        'order_value': rng.gamma(2.0, 50.0, rows),
+        'quantity': rng.integers(1, 5, rows),
+        'is_first_purchase': rng.choice(np.array([True, False, None], dtype=object), rows),
+        'cart_abandonment': rng.choice(np.array([True, False, None], dtype=object), rows),
+    })
+
+
+@pytest.mark.parametrize('domain, fixture, metric', [
+    ('finance', 'ledger', 'financial_performance_kpis'),
+    ('ecommerce', 'orders', 'ecommerce_performance_kpis'),
+])
+def test_backends_agree_with_nulls(domain, fixture, metric, request):
+    df = request.getfixturevalue(fixture)
+    on_duckdb = create_query_engine(domain, df, backend='duckdb')
+    on_pandas = create_query_engine(domain, df, backend='pandas')
+
+    for dimensions in ([], None):
+        expected = on_pandas.metric(metric, dimensions=dimensions)
+        result = on_duckdb.metric(metric, dimensions=dimensions)
+
+        assert result.attrs['backend'] == 'duckdb'
+        assert len(result.columns) > 0
+        pd.testing.assert_frame_equal(result, expected[result.columns], check_dtype=False,
+                                      check_index_type=False)
+
+
+def test_register_file(tmp_path, campaigns):
+    path = tmp_path / 'campaigns.csv'
+    campaigns.to_csv(path, index=False)
+    engine = DuckDBEngine(memory_limit='256MB', threads=1, temp_directory=str(tmp_path / 'spill'))
+
+    engine.register_file('raw', str(path))
+
+    assert 'Spend' in engine.columns['raw']
+    assert engine.sql('SELECT COUNT(*) AS n FROM raw')['n'].iloc[0] == len(campaigns)
+    engine.close()
+
+
+@pytest.mark.parametrize('backend', ['duckdb', 'pandas'])
+def test_load_file(tmp_path, campaigns, backend):
+    path = tmp_path / 'campaigns.csv'
+    campaigns.to_csv(path, index=False)
+    expected = create_query_engine('marketing', campaigns, backend='pandas').metric(
+        'marketing_roi_kpis', dimensions=['channel'])
+
+    engine = SemanticQueryEngine(load_mdl_for_domain('marketing'), backend=backend)
+    engine.load_file(str(path))
+    result = engine.metric('marketing_roi_kpis', dimensions=['channel'])
+
+    assert result.attrs['backend'] == backend
+    if backend == 'duckdb':
+        assert engine.df is None
+        assert 'spend' in engine.views['campaigns']
+    pd.testing.assert_frame_equal(result, expected[result.columns], check_dtype=False)
+    engine.close()
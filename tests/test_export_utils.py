@@ -0,0 +1,73 @@
+"""
+Unit tests for PDF export output handling.
+
+Tests cover:
+- Fonts are registered once per process
+- Reports are written straight into caller-provided or spooled files
+- Bytes API is unchanged
+"""
+
+import io
+import pytest
+import pandas as pd
+import plotly.graph_objects as go
+import os
+import sys
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+pytest.importorskip('reportlab')
+
+import utils.export_utils as export_utils
+from utils.export_utils import export_to_pdf, export_to_pdf_file, write_pdf_report, register_pdf_fonts
+
+
+@pytest.fixture
+def report():
+    result = {
+        'dashboard': {'charts': [{'title': 'Revenue', 'figure': go.Figure(go.Bar(x=['A', 'B'], y=[1, 2]))}],
+                      'kpis': {}},
+        'insights': {'key_insights': [], 'recommendations': []},
+        'domain_info': {'domain_name': 'Marketing', 'domain': 'marketing', 'expert_role': 'Marketing Analyst'},
+        'quality_scores': {'overall': 90},
+        'performance': {'total': 12.0},
+    }
+    df = pd.DataFrame({'order_date': ['2024-01-01', '2024-03-31'], 'revenue': [1.0, 2.0]})
+    return result, df
+
+
+def test_fonts_registered_once(monkeypatch):
+    from reportlab.pdfbase import pdfmetrics
+    calls = []
+    original = pdfmetrics.registerFont
+    monkeypatch.setattr(pdfmetrics, 'registerFont', lambda font: calls.append(font) or original(font))
+    monkeypatch.setattr(export_utils, '_pdf_fonts', None)
+
+    first = register_pdf_fonts()
+    registered = len(calls)
+    assert register_pdf_fonts() == first
+    assert len(calls) == registered
+
+
+class TestPdfOutput:
+    """Test output targets."""
+
+    def test_write_to_file_object(self, report, tmp_path):
+        path = tmp_path / 'report.pdf'
+        with open(path, 'wb') as output:
+            assert write_pdf_report(*report, output, lang='en') is output
+
+        assert path.read_bytes().startswith(b'%PDF')
+
+    def test_spooled_file(self, report):
+        with export_to_pdf_file(*report, lang='en', spool_max_bytes=1024) as output:
+            content = output.read()
+
+        assert content.startswith(b'%PDF')
+        assert content.rstrip().endswith(b'%%EOF')
+
+    def test_bytes_api(self, report):
+        pdf_bytes = export_to_pdf(*report, lang='en')
+        assert isinstance(pdf_bytes, bytes)
+        assert pdf_bytes.startswith(b'%PDF')
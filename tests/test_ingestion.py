@@ -0,0 +1,291 @@
+"""
+Unit tests for streaming CSV ingestion.
+
+Tests cover:
+- Encoding detection from a prefix (UTF-8, BOM, legacy encodings)
+- Chunked parsing matches pd.read_csv
+- Dtype compaction (category for labels, int32 where values fit)
+- Per-chunk progress reporting
+- Parquet / Feather / Arrow IPC reading with column projection
+- Arrow-backed string conversion
+- Excel sheet listing and single-sheet fast reading
+"""
+
+import io
+import pytest
+import pandas as pd
+import numpy as np
+import os
+import sys
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.ingestion import (
+    detect_encoding_from_prefix, read_csv_streaming, downcast_numeric,
+    read_arrow_file, arrow_format_for, to_arrow_backed,
+    read_excel_fast, list_excel_sheets
+)
+
+
+def make_csv(rows: int = 1000) -> bytes:
+    df = pd.DataFrame({
+        'Channel': ['Facebook', 'Google', 'TikTok', 'Email'] * (rows // 4),
+        'Campaign': [f'Campaign_{i}' for i in range(rows)],
+        'Clicks': np.arange(rows) * 3,
+        'Spend': np.arange(rows) * 1.25,
+        'ROI': ['5,43', '2,27', '4,35', '1,10'] * (rows // 4),
+        'Date': pd.date_range('2024-01-01', periods=rows, freq='h').strftime('%Y-%m-%d'),
+        'Big': np.arange(rows, dtype=np.int64) * 10_000_000_000,
+    })
+    return df.to_csv(index=False).encode('utf-8')
+
+
+class TestEncodingDetection:
+    """Test prefix-based encoding detection."""
+
+    def test_utf8(self):
+        assert detect_encoding_from_prefix('Tên,Thành phố\nA,Hà Nội'.encode('utf-8')) == ('utf-8', False)
+
+    def test_utf8_truncated_mid_character(self):
+        prefix = 'Hà Nội'.encode('utf-8')[:-1]
+        assert detect_encoding_from_prefix(prefix) == ('utf-8', False)
+
+    def test_bom(self):
+        assert detect_encoding_from_prefix(b'\xef\xbb\xbfA,B\n1,2')[0] == 'utf-8-sig'
+
+    def test_legacy_encoding_falls_back(self):
+        prefix = 'Café,Crème\nà,é'.encode('latin1')
+        encoding, is_fallback = detect_encoding_from_prefix(prefix)
+
+        assert is_fallback is True
+        prefix.decode(encoding)  # Chosen encoding decodes the prefix
+
+
+class TestStreamingRead:
+    """Test chunked parsing and compaction."""
+
+    def test_matches_read_csv(self):
+        content = make_csv()
+        df, encoding, is_fallback = read_csv_streaming(io.BytesIO(content), chunk_rows=128)
+        expected = pd.read_csv(io.BytesIO(content))
+
+        assert encoding == 'utf-8' and not is_fallback
+        assert list(df.columns) == list(expected.columns)
+        pd.testing.assert_frame_equal(df.astype(object), expected.astype(object), check_dtype=False)
+
+    def test_compact_dtypes(self):
+        df, _, _ = read_csv_streaming(io.BytesIO(make_csv()), chunk_rows=128)
+
+        assert isinstance(df['Channel'].dtype, pd.CategoricalDtype)
+        assert df['Campaign'].dtype == object      # High cardinality
+        assert df['ROI'].dtype == object           # Numeric strings left for coercion
+        assert df['Date'].dtype == object          # Date strings left for parsing
+        assert df['Clicks'].dtype == np.int32
+        assert df['Big'].dtype == np.int64         # Does not fit in int32
+        assert df['Spend'].dtype == np.float64
+
+    def test_compact_uses_less_memory(self):
+        content = make_csv(4000)
+        compact, _, _ = read_csv_streaming(io.BytesIO(content))
+        plain, _, _ = read_csv_streaming(io.BytesIO(content), compact=False)
+
+        assert compact.memory_usage(deep=True).sum() < plain.memory_usage(deep=True).sum()
+
+    def test_progress_per_chunk(self):
+        content = make_csv()
+        fractions = []
+        read_csv_streaming(io.BytesIO(content), total_bytes=len(content), chunk_rows=100,
+                           progress_callback=fractions.append)
+
+        assert len(fractions) >= 10
+        assert fractions == sorted(fractions)
+        assert fractions[-1] == 1.0
+
+    def test_non_utf8_after_prefix_restarts(self, monkeypatch):
+        import utils.ingestion as ingestion
+        monkeypatch.setattr(ingestion, 'ENCODING_PREFIX_BYTES', 16)
+        content = ('A,B\n' + 'x,1\n' * 20 + 'Café,2\n').encode('latin1')
+
+        df, encoding, is_fallback = read_csv_streaming(io.BytesIO(content), chunk_rows=5)
+
+        assert is_fallback is True
+        assert df['A'].astype(str).iloc[-1] == 'Café'
+
+    def test_header_only(self):
+        df, _, _ = read_csv_streaming(io.BytesIO(b'Name,Age,City'))
+        assert df.empty
+        assert list(df.columns) == ['Name', 'Age', 'City']
+
+    def test_empty_raises(self):
+        with pytest.raises(pd.errors.EmptyDataError):
+            read_csv_streaming(io.BytesIO(b''))
+
+
+def test_downcast_numeric():
+    assert downcast_numeric(pd.Series([1, 2, 3])).dtype == np.int32
+    assert downcast_numeric(pd.Series([2**40])).dtype == np.int64
+    assert downcast_numeric(pd.Series([1.5, np.nan])).dtype == np.float64
+
+
+@pytest.fixture
+def typed_df():
+    return pd.DataFrame({
+        'channel': ['Facebook', 'Google', None, 'TikTok'],
+        'spend': [100.5, 200.0, 300.25, np.nan],
+        'clicks': [10, 20, 30, 40],
+        'date': pd.date_range('2024-01-01', periods=4),
+    })
+
+
+class TestArrowFormats:
+    """Test native columnar ingestion."""
+
+    def _write(self, df, file_format):
+        import pyarrow as pa
+        import pyarrow.ipc as ipc
+        buffer = io.BytesIO()
+        if file_format == 'parquet':
+            df.to_parquet(buffer, index=False)
+        elif file_format == 'feather':
+            df.to_feather(buffer)
+        else:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            with ipc.new_stream(buffer, table.schema) as writer:
+                writer.write_table(table)
+        buffer.seek(0)
+        return buffer
+
+    @pytest.mark.parametrize('file_format', ['parquet', 'feather', 'ipc'])
+    def test_round_trip_preserves_types(self, typed_df, file_format):
+        df = read_arrow_file(self._write(typed_df, file_format), file_format)
+
+        assert df['clicks'].dtype == np.int64
+        assert df['spend'].dtype == np.float64
+        assert pd.api.types.is_datetime64_any_dtype(df['date'])
+        assert isinstance(df['channel'].dtype, pd.StringDtype)
+        assert df['channel'].dtype.storage == 'pyarrow'
+        assert df['channel'].isna().sum() == 1
+
+    @pytest.mark.parametrize('file_format', ['parquet', 'feather', 'ipc'])
+    def test_column_projection(self, typed_df, file_format):
+        df = read_arrow_file(self._write(typed_df, file_format), file_format, columns=['spend', 'channel'])
+        assert list(df.columns) == ['spend', 'channel']
+
+    def test_format_from_extension(self):
+        assert arrow_format_for('Sales.PARQUET') == 'parquet'
+        assert arrow_format_for('x.feather') == 'feather'
+        assert arrow_format_for('x.arrow') == 'ipc'
+        assert arrow_format_for('x.csv') is None
+
+    def test_safe_file_upload_parquet(self, typed_df):
+        from utils.validators import safe_file_upload
+        upload = self._write(typed_df, 'parquet')
+        upload.name = 'export.parquet'
+        upload.size = len(upload.getvalue())
+
+        success, df, msg = safe_file_upload(upload, show_progress=False, columns=['channel', 'clicks'])
+
+        assert success is True
+        assert list(df.columns) == ['channel', 'clicks']
+        assert len(df) == 4
+
+
+class TestArrowBacked:
+    """Test Arrow-backed string conversion of the working frame."""
+
+    def test_converts_only_pure_string_columns(self, typed_df):
+        df = typed_df.assign(mixed=['a', 1, 'b', 2.0])
+        result = to_arrow_backed(df)
+
+        assert isinstance(result['channel'].dtype, pd.StringDtype)
+        assert result['mixed'].dtype == object
+        assert result['clicks'].dtype == np.int64
+        assert df['channel'].dtype == object  # Input untouched
+
+    def test_no_text_returns_same_frame(self):
+        df = pd.DataFrame({'a': [1, 2]})
+        assert to_arrow_backed(df) is df
+
+    def test_uses_less_memory(self):
+        df = pd.DataFrame({'name': [f'customer_{i}' for i in range(10_000)]})
+        assert to_arrow_backed(df).memory_usage(deep=True).sum() < df.memory_usage(deep=True).sum()
+
+
+@pytest.fixture
+def workbook(typed_df):
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
+        typed_df.to_excel(writer, sheet_name='Data', index=False)
+        pd.DataFrame({'note': ['x', 'y', 'z'], 'value': [1.5, 2.5, 3.0]}).to_excel(writer, sheet_name='Notes', index=False)
+    buffer.seek(0)
+    return buffer
+
+
+class TestExcelFast:
+    """Test the fast Excel path against pd.read_excel."""
+
+    def test_list_sheets(self, workbook):
+        assert list_excel_sheets(workbook, 'book.xlsx') == ['Data', 'Notes']
+
+    def test_streaming_matches_read_excel(self, workbook):
+        expected = pd.read_excel(io.BytesIO(workbook.getvalue()), sheet_name='Data', engine='openpyxl')
+        df, info = read_excel_fast(workbook, 'book.xlsx', engine='openpyxl-stream')
+
+        pd.testing.assert_frame_equal(df, expected)
+        assert info['engine'] == 'openpyxl-stream'
+        assert info['sheet'] == 'Data'
+        assert info['estimated_saved'] >= 0
+
+    def test_sheet_selection_and_projection(self, workbook):
+        df, info = read_excel_fast(workbook, 'book.xlsx', sheet_name='Notes', columns=['value'],
+                                   engine='openpyxl-stream')
+
+        assert info['sheet'] == 'Notes'
+        assert list(df.columns) == ['value']
+        assert df['value'].tolist() == [1.5, 2.5, 3.0]
+
+    def test_type_change_past_sniffed_rows(self, monkeypatch):
+        import utils.ingestion as ingestion
+        monkeypatch.setattr(ingestion, 'EXCEL_SNIFF_ROWS', 2)
+        buffer = io.BytesIO()
+        pd.DataFrame({'code': [1, 2, 3, 'X9']}).to_excel(buffer, index=False)
+
+        df, _ = read_excel_fast(buffer, 'codes.xlsx', engine='openpyxl-stream')
+
+        assert df['code'].tolist() == [1, 2, 3, 'X9']
+
+    def test_decimals_and_mixed_bools_past_sniffed_rows(self):
+        buffer = io.BytesIO()
+        pd.DataFrame({
+            'price': [100] * 250 + [99.5] * 50,
+            'active': [True] * 250 + ['No', 2] * 25,
+        }).to_excel(buffer, index=False)
+        expected = pd.read_excel(io.BytesIO(buffer.getvalue()), engine='openpyxl')
+
+        df, _ = read_excel_fast(buffer, 'prices.xlsx', engine='openpyxl-stream')
+
+        assert df['price'].dtype == np.float64
+        assert df['price'].sum() == pytest.approx(29975.0)
+        assert df['active'].dtype == object
+        assert df['active'].tolist() == expected['active'].tolist()
+        pd.testing.assert_frame_equal(df, expected)
+
+    def test_calamine_matches_read_excel(self, workbook):
+        pytest.importorskip('python_calamine')
+        expected = pd.read_excel(io.BytesIO(workbook.getvalue()), sheet_name='Notes', engine='openpyxl')
+        df, info = read_excel_fast(workbook, 'book.xlsx', sheet_name='Notes', engine='calamine')
+
+        pd.testing.assert_frame_equal(df, expected)
+        assert info['engine'] == 'calamine'
+
+    def test_safe_file_upload_reports_time_saved(self, workbook):
+        from utils.validators import safe_file_upload
+        workbook.name = 'book.xlsx'
+        workbook.size = len(workbook.getvalue())
+
+        success, df, msg = safe_file_upload(workbook, show_progress=False, lang='en', sheet_name='Notes')
+
+        assert success is True
+        assert list(df.columns) == ['note', 'value']
+        assert "Sheet 'Notes' loaded" in msg
@@ -0,0 +1,143 @@
+"""
+Unit tests for incremental JSON parsing of streamed AI responses.
+
+Tests cover:
+- Array elements emitted as soon as they close
+- Scalars, nested objects and escaped strings
+- Arbitrary chunk boundaries
+- Streaming mode of PremiumLeanPipeline._generate_ai_insight
+- Cache-hit replay survives a failing stream callback
+"""
+
+import pytest
+import json
+import os
+import random
+import sys
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.json_stream import IncrementalJSONParser
+
+
+INSIGHTS = {
+    "executive_summary": "Doanh thu tăng \"mạnh\" {Q4} [VND]",
+    "key_insights": [
+        {"title": "Kênh A", "description": "A dẫn đầu", "data_evidence": "rows: 1-120", "impact": "high"},
+        {"title": "Kênh B", "description": "B giảm", "nested": {"values": [1, 2, {"x": "}"}]}, "impact": "low"}
+    ],
+    "recommendations": [
+        {"action": "Tăng ngân sách A", "priority": "high", "expected_impact": "+10%", "timeline": "short"}
+    ],
+    "risk_alerts": [],
+    "tags": ["a", 2, None],
+    "score": 9.5
+}
+
+
+def rebuild(events):
+    """Reassemble a document from parser events."""
+    doc = {}
+    for key, value, is_element in events:
+        if is_element:
+            doc.setdefault(key, []).append(value)
+        else:
+            doc[key] = value
+    return doc
+
+
+class TestIncrementalJSONParser:
+    """Test the streaming parser."""
+
+    def test_element_emitted_before_document_ends(self):
+        parser = IncrementalJSONParser()
+        events = parser.feed('{"summary": "ok", "items": [{"a": 1}, {"a"')
+        assert events == [('summary', 'ok', False), ('items', {'a': 1}, True)]
+        assert parser.feed(': 2}]}') == [('items', {'a': 2}, True)]
+
+    def test_full_document_single_chunk(self):
+        events = IncrementalJSONParser().feed(json.dumps(INSIGHTS, ensure_ascii=False))
+        expected = {k: v for k, v in INSIGHTS.items() if v != []}
+        assert rebuild(events) == expected
+
+    @pytest.mark.parametrize('seed', range(20))
+    def test_random_chunk_boundaries(self, seed):
+        rng = random.Random(seed)
+        text = '```json\n' + json.dumps(INSIGHTS, ensure_ascii=False, indent=2) + '\n```'
+        parser = IncrementalJSONParser()
+        events, i = [], 0
+        while i < len(text):
+            j = i + rng.randint(1, 9)
+            events += parser.feed(text[i:j])
+            i = j
+        expected = {k: v for k, v in INSIGHTS.items() if v != []}
+        assert rebuild(events) == expected
+
+
+class TestStreamingGeneration:
+    """Test _generate_ai_insight streaming mode."""
+
+    class StreamingClient:
+        """Mock google.generativeai module that streams the response in small chunks."""
+
+        def __init__(self, text):
+            client = self
+            self.stream_calls = 0
+
+            class Chunk:
+                def __init__(self, chunk_text):
+                    self.text = chunk_text
+
+            class Model:
+                def generate_content(self, prompt, stream=False, **kwargs):
+                    if stream:
+                        client.stream_calls += 1
+                        return iter([Chunk(text[i:i + 7]) for i in range(0, len(text), 7)])
+                    return Chunk(text)
+
+            self._model = Model()
+
+        def GenerativeModel(self, *args, **kwargs):
+            return self._model
+
+        def GenerationConfig(self, **kwargs):
+            return kwargs
+
+    def test_stream_matches_non_stream(self):
+        from premium_lean_pipeline import PremiumLeanPipeline
+
+        text = json.dumps(INSIGHTS, ensure_ascii=False)
+        client = self.StreamingClient(text)
+        pipeline = PremiumLeanPipeline(client, result_cache=None, llm_cache=None)
+
+        events = []
+        streamed = pipeline._generate_ai_insight("prompt", stream_callback=lambda *e: events.append(e))
+        plain = pipeline._generate_ai_insight("prompt")
+
+        assert client.stream_calls == 1
+        assert streamed == plain
+        assert [e[1]['title'] for e in events if e[0] == 'key_insights'] == ['Kênh A', 'Kênh B']
+        assert events[0] == ('executive_summary', INSIGHTS['executive_summary'], False)
+
+    def test_cached_replay_survives_callback_error(self, tmp_path):
+        from premium_lean_pipeline import PremiumLeanPipeline
+        from utils.llm_cache import LLMResponseCache
+
+        text = json.dumps(INSIGHTS, ensure_ascii=False)
+        client = self.StreamingClient(text)
+        cache = LLMResponseCache(db_path=str(tmp_path / 'llm.sqlite'))
+        pipeline = PremiumLeanPipeline(client, result_cache=None, llm_cache=cache)
+        pipeline._generate_ai_insight("prompt")
+
+        calls = []
+
+        def broken_ui(*event):
+            calls.append(event)
+            raise RuntimeError("widget gone")
+
+        success, cached = pipeline._generate_ai_insight("prompt", stream_callback=broken_ui)
+
+        assert success is True and cached == text
+        assert len(calls) == len(list(IncrementalJSONParser().feed(text)))
+        assert client.stream_calls == 0
@@ -0,0 +1,148 @@
+"""
+Unit tests for the rule-table KPI engine.
+
+Tests cover:
+- Column roles resolved in one pass (patterns, all-of keywords, exclusions)
+- Domain selection precedence (salary columns win over the domain name)
+- Planning: only KPIs whose input roles resolve are computed
+- Shared aggregates computed once per run
+- KPI values for the domain tables and the universal fallback
+"""
+
+import pytest
+import os
+import sys
+
+import pandas as pd
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.column_profile import get_column_profile
+from utils.column_roles import Role, RoleMatcher
+from utils.kpi_engine import KPI, KPIDomain, KPIRegistry
+from kpi_registry import KPI_REGISTRY, MARKETING, SALARY
+
+
+@pytest.fixture
+def marketing_df():
+    return pd.DataFrame({
+        'Campaign': ['A', 'B', 'C', 'D'],
+        'Spend': [100.0, 200.0, 300.0, 400.0],
+        'Clicks': [50, 100, 150, 200],
+        'Impressions': [1000, 2000, 3000, 4000],
+        'Conversions': [5, 10, 15, 20],
+        'Revenue': [300.0, 500.0, 900.0, 1300.0],
+    })
+
+
+def evaluate(df, domain, **kwargs):
+    return KPI_REGISTRY.evaluate(df, domain, profile=get_column_profile(df), **kwargs)
+
+
+class TestColumnRoles:
+    """Test role resolution."""
+
+    def test_patterns_and_exclusions(self):
+        roles = RoleMatcher({
+            'deal_value': Role(('deal', 'value'), 'amount'),
+            'transaction': Role('transaction', exclude=('rate',)),
+            'owner': Role('owner'),
+        }).index(['Deal_Value', 'Amount_USD', 'Transaction_Rate', 'Transactions', 'Stage'])
+        assert roles.get('deal_value') == ('Deal_Value', 'Amount_USD')
+        assert roles.first('transaction') == 'Transactions'
+        assert 'owner' not in roles and roles.first('owner') is None
+        assert 'stage' in roles.text
+
+    def test_salary_column_selects_salary_table(self):
+        df = pd.DataFrame({'Salary': [1.0], 'Spend': [2.0]})
+        assert KPI_REGISTRY.select('marketing', df.columns) is SALARY
+        assert KPI_REGISTRY.select('Marketing / Quảng Cáo', ['Spend']) is MARKETING
+        assert KPI_REGISTRY.select('unknown', ['Spend']) is KPI_REGISTRY.fallback
+
+
+class TestPlanning:
+    """Test that only resolvable KPIs run and aggregates are shared."""
+
+    def test_unresolved_kpis_are_not_computed(self):
+        calls = []
+        domain = KPIDomain('demo', keywords=('demo',), roles={'a': Role('a'), 'b': Role('b')}, kpis=[
+            KPI('A', lambda ctx: calls.append('A') or {'value': 1}, requires=('a',)),
+            KPI('B', lambda ctx: calls.append('B') or {'value': 2}, requires=('b',)),
+            KPI('Not B', lambda ctx: calls.append('Not B') or {'value': 3}, absent=('b',)),
+        ])
+        result = KPIRegistry([domain]).evaluate(pd.DataFrame({'a_col': [1]}), 'demo')
+        assert list(result) == ['A', 'Not B']
+        assert calls == ['A', 'Not B']
+
+    def test_domain_requirements(self):
+        df = pd.DataFrame({'Revenue': [1.0, 2.0]})
+        assert evaluate(df, 'finance') == {}
+
+    def test_aggregates_computed_once(self, marketing_df, monkeypatch):
+        profile = get_column_profile(marketing_df)
+        sums = []
+        original = pd.Series.sum
+
+        def counting_sum(self, *args, **kwargs):
+            sums.append(self.name)
+            return original(self, *args, **kwargs)
+
+        monkeypatch.setattr(pd.Series, 'sum', counting_sum)
+        KPI_REGISTRY.evaluate(marketing_df, 'marketing', profile=profile)
+        # Spend feeds ROAS, CPC, CPA and Total Spend but is summed once
+        assert sums.count('Spend') == 1
+        assert sums.count('Clicks') == 1
+
+    def test_timings_per_kpi(self, marketing_df):
+        timings = {}
+        result = evaluate(marketing_df, 'marketing', timings=timings)
+        assert set(result) <= set(timings)
+        assert all(seconds >= 0 for seconds in timings.values())
+
+
+class TestDomainKPIs:
+    """Test KPI values of the rule tables."""
+
+    def test_marketing(self, marketing_df):
+        kpis = evaluate(marketing_df, 'marketing', sources={'marketing_roas': {'name': 'WordStream'}})
+        assert list(kpis) == ['ROAS', 'CTR (%)', 'CPC', 'Conversion Rate (%)',
+                              'Cost Per Acquisition (CPA)', 'Total Spend']
+        assert kpis['ROAS']['value'] == pytest.approx(3000 / 1000)
+        assert kpis['ROAS']['benchmark_source'] == 'WordStream'
+        assert kpis['CTR (%)']['value'] == pytest.approx(5.0)
+        assert kpis['Cost Per Acquisition (CPA)']['value'] == pytest.approx(20.0)
+        assert kpis['Cost Per Acquisition (CPA)']['vietnam_context'] == ''
+
+    def test_sales_shares_deal_masks(self):
+        df = pd.DataFrame({
+            'deal_value': [100.0, 200.0, 300.0, 400.0],
+            'stage': ['Closed Won', 'Closed Lost', 'Proposal', 'Closed Won'],
+            'probability': [100, 0, 50, 100],
+        })
+        kpis = evaluate(df, 'sales')
+        assert kpis['Win Rate (%)']['value'] == pytest.approx(200 / 3)
+        assert kpis['Total Pipeline Value']['value'] == 300.0
+        assert kpis['Weighted Pipeline']['value'] == 150.0
+        assert kpis['Average Deal Size']['value'] == 250.0
+        assert kpis['Closed Won Revenue']['insight'].startswith('2 deals closed')
+
+    def test_customer_service_flags(self):
+        df = pd.DataFrame({
+            'reopened': ['No', 'Yes', 'no', 'No'],
+            'sla_met': [True, True, False, True],
+        })
+        kpis = evaluate(df, 'customer service')
+        assert kpis['First Contact Resolution (%)']['value'] == 75.0
+        assert kpis['Reopen Rate (%)']['value'] == 25.0
+        assert kpis['SLA Met (%)']['value'] == 75.0
+
+    def test_fallback_names_use_primary_metric(self):
+        df = pd.DataFrame({'units': [1.0, 2.0, 3.0], 'price': [10.0, 20.0, 60.0]})
+        kpis = evaluate(df, 'general')
+        assert list(kpis) == ['Average price', 'Median price', 'Total price']
+        assert kpis['Total price']['value'] == 90.0
+        assert kpis['Median price']['value'] == 20.0
+
+    def test_no_numeric_columns(self):
+        assert evaluate(pd.DataFrame({'name': ['a', 'b']}), 'general') == {}
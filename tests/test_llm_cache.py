@@ -0,0 +1,185 @@
+"""
+Unit tests for the LLM response cache.
+
+Tests cover:
+- Key composition (model, prompt, temperature, max_tokens, mime type)
+- SQLite persistence across instances
+- TTL expiry and LRU eviction
+- Bypass flag and hit/miss counters
+- Integration with PremiumLeanPipeline._generate_ai_insight and
+  smart_oqmlb_pipeline.generate_ai_insight (JSON-only caching, cache errors)
+"""
+
+import pytest
+import os
+import sqlite3
+import sys
+import time
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.llm_cache import LLMResponseCache
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'llm_cache.sqlite3')
+
+
+class TestLLMResponseCache:
+    """Test cache storage behaviour."""
+
+    def test_key_depends_on_all_parameters(self):
+        base = LLMResponseCache.make_key('m', 'prompt', 0.3, 100, 'application/json')
+        assert base == LLMResponseCache.make_key('m', 'prompt', 0.3, 100, 'application/json')
+        assert base != LLMResponseCache.make_key('m2', 'prompt', 0.3, 100, 'application/json')
+        assert base != LLMResponseCache.make_key('m', 'prompt!', 0.3, 100, 'application/json')
+        assert base != LLMResponseCache.make_key('m', 'prompt', 0.5, 100, 'application/json')
+        assert base != LLMResponseCache.make_key('m', 'prompt', 0.3, 200, 'application/json')
+        assert base != LLMResponseCache.make_key('m', 'prompt', 0.3, 100, 'text/plain')
+
+    def test_hit_miss_counters(self, db_path):
+        cache = LLMResponseCache(db_path=db_path)
+        assert cache.get('k') is None
+        cache.set('k', '{"a": 1}')
+        assert cache.get('k') == '{"a": 1}'
+        stats = cache.stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+        assert stats['entries'] == 1
+
+    def test_persists_across_instances(self, db_path):
+        LLMResponseCache(db_path=db_path).set('k', 'v')
+        assert LLMResponseCache(db_path=db_path).get('k') == 'v'
+
+    def test_ttl_expiry(self, db_path):
+        cache = LLMResponseCache(db_path=db_path, ttl_seconds=0.05)
+        cache.set('k', 'v')
+        time.sleep(0.1)
+        assert cache.get('k') is None
+
+    def test_lru_eviction(self, db_path):
+        cache = LLMResponseCache(db_path=db_path, max_entries=2)
+        cache.set('a', '1')
+        time.sleep(0.01)
+        cache.set('b', '2')
+        time.sleep(0.01)
+        cache.get('a')  # 'a' becomes most recently used
+        time.sleep(0.01)
+        cache.set('c', '3')
+
+        assert cache.get('b') is None
+        assert cache.get('a') == '1'
+        assert cache.get('c') == '3'
+
+    def test_bypass(self, db_path):
+        cache = LLMResponseCache(db_path=db_path, bypass=True)
+        cache.set('k', 'v')
+        assert cache.get('k') is None
+        assert cache.stats()['entries'] == 0
+
+    def test_invalidate_and_clear(self, db_path):
+        cache = LLMResponseCache(db_path=db_path)
+        cache.set('a', '1')
+        cache.set('b', '2')
+        assert cache.invalidate('a') is True
+        assert cache.invalidate('a') is False
+        assert cache.clear() == 1
+
+
+class TestPipelineIntegration:
+    """Test _generate_ai_insight uses the cache."""
+
+    class CountingClient:
+        """Mock google.generativeai module that counts API calls."""
+
+        def __init__(self):
+            self.calls = 0
+            client = self
+
+            class Model:
+                def generate_content(self, *args, **kwargs):
+                    client.calls += 1
+                    return type('obj', (object,), {'text': '{"answer": 42}'})
+
+            self._model = Model()
+
+        def GenerativeModel(self, *args, **kwargs):
+            return self._model
+
+        def GenerationConfig(self, **kwargs):
+            return kwargs
+
+    def test_second_call_served_from_cache(self, db_path):
+        from premium_lean_pipeline import PremiumLeanPipeline
+
+        client = self.CountingClient()
+        pipeline = PremiumLeanPipeline(client, result_cache=None, llm_cache=LLMResponseCache(db_path=db_path))
+
+        first = pipeline._generate_ai_insight("Same prompt", temperature=0.2, max_tokens=100)
+        second = pipeline._generate_ai_insight("Same prompt", temperature=0.2, max_tokens=100)
+
+        assert first == second == (True, '{"answer": 42}')
+        assert client.calls == 1
+
+        pipeline._generate_ai_insight("Same prompt", temperature=0.2, max_tokens=100, bypass_cache=True)
+        assert client.calls == 2
+
+    def test_cache_errors_do_not_fail_the_call(self, db_path):
+        from premium_lean_pipeline import PremiumLeanPipeline
+
+        class BrokenCache(LLMResponseCache):
+            def get(self, key):
+                raise sqlite3.OperationalError("database is locked")
+
+            def set(self, *args, **kwargs):
+                raise sqlite3.OperationalError("database is locked")
+
+        client = self.CountingClient()
+        pipeline = PremiumLeanPipeline(client, result_cache=None, llm_cache=BrokenCache(db_path=db_path))
+
+        assert pipeline._generate_ai_insight("Prompt") == (True, '{"answer": 42}')
+        assert client.calls == 1
+
+
+class TestSmartPipelineInsight:
+    """Test the smart pipeline's generate_ai_insight caching."""
+
+    class Client:
+        def __init__(self, text):
+            self.calls = 0
+            client = self
+
+            class Models:
+                def generate_content(self, **kwargs):
+                    client.calls += 1
+                    return type('obj', (object,), {'text': text})
+
+            self.models = Models()
+
+    def test_only_valid_json_is_cached(self, db_path, monkeypatch):
+        import smart_oqmlb_pipeline
+        cache = LLMResponseCache(db_path=db_path)
+        monkeypatch.setattr(smart_oqmlb_pipeline, 'get_llm_cache', lambda: cache)
+
+        truncated = self.Client('{"answer": ')
+        for _ in range(2):
+            assert smart_oqmlb_pipeline.generate_ai_insight(truncated, "Prompt") == (True, '{"answer": ')
+        assert truncated.calls == 2
+
+        valid = self.Client('{"answer": 42}')
+        for _ in range(2):
+            smart_oqmlb_pipeline.generate_ai_insight(valid, "Prompt")
+        assert valid.calls == 1
+
+    def test_cache_error_falls_back_to_api(self, db_path, monkeypatch):
+        import smart_oqmlb_pipeline
+
+        class BrokenCache(LLMResponseCache):
+            def get(self, key):
+                raise sqlite3.OperationalError("disk I/O error")
+
+        monkeypatch.setattr(smart_oqmlb_pipeline, 'get_llm_cache', lambda: BrokenCache(db_path=db_path))
+        client = self.Client('{"answer": 42}')
+        assert smart_oqmlb_pipeline.generate_ai_insight(client, "Prompt") == (True, '{"answer": 42}')
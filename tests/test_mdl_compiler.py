@@ -0,0 +1,181 @@
+"""
+Unit tests for the MDL measure compiler.
+
+Tests cover:
+- Parsing of the SQL subset used by mdl_schemas (CASE, NULLIF, COUNT(*), ...)
+- Results match hand-written pandas for grouped and total evaluation
+- Shared aggregates are computed once
+- SQL NULL semantics in comparisons, NOT / AND / OR and CASE
+- Column resolution and skipped measures
+- Every measure in the shipped schemas compiles
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.mdl_compiler import MetricPlan, ExpressionError, parse_expression, resolve_columns
+
+MDL_DIR = Path(__file__).parent.parent / 'mdl_schemas'
+
+MARKETING = [
+    ('total_spend', 'SUM(spend)'),
+    ('roas', 'SUM(revenue) / NULLIF(SUM(spend), 0)'),
+    ('cac', 'SUM(spend) / NULLIF(SUM(customers), 0)'),
+    ('ctr', 'SUM(clicks) * 100.0 / NULLIF(SUM(impressions), 0)'),
+]
+
+
+@pytest.fixture
+def campaigns():
+    rng = np.random.default_rng(3)
+    rows = 5_000
+    return pd.DataFrame({
+        'Channel': rng.choice(['Email', 'Social', 'PPC'], rows),
+        'spend': rng.gamma(2.0, 1000.0, rows),
+        'revenue': rng.gamma(2.0, 4000.0, rows),
+        'customers': rng.integers(0, 5, rows),
+        'clicks': rng.integers(0, 100, rows),
+        'impressions': rng.integers(100, 10_000, rows),
+        'stage': rng.choice(['Closed Won', 'Open', 'Closed Lost'], rows),
+        'is_won': rng.choice(['True', 'False'], rows),
+    })
+
+
+class TestParser:
+    """Test the expression grammar."""
+
+    def test_case_when(self):
+        ast = parse_expression("SUM(CASE WHEN stage = 'Closed Won' THEN 1 ELSE 0 END) * 100.0 / COUNT(*)")
+        assert ast[0] == 'bin' and ast[1] == '/'
+        assert ast[3] == ('agg', 'COUNT', None)
+
+    def test_rejects_unsupported(self):
+        with pytest.raises(ExpressionError):
+            parse_expression('SUM(spend) OVER (PARTITION BY channel)')
+        with pytest.raises(ExpressionError):
+            MetricPlan([('bad', 'spend / 2')])
+
+
+class TestEvaluation:
+    """Test results against hand-written pandas."""
+
+    def test_grouped_matches_pandas(self, campaigns):
+        result = MetricPlan(MARKETING, dimensions=['channel']).evaluate(campaigns)
+        sums = campaigns.groupby('Channel')[['spend', 'revenue', 'customers', 'clicks', 'impressions']].sum()
+
+        assert list(result.index) == ['Email', 'PPC', 'Social']
+        assert result.index.name == 'channel'
+        np.testing.assert_allclose(result['roas'], sums['revenue'] / sums['spend'])
+        np.testing.assert_allclose(result['cac'], sums['spend'] / sums['customers'])
+        np.testing.assert_allclose(result['ctr'], sums['clicks'] * 100.0 / sums['impressions'])
+
+    def test_totals(self, campaigns):
+        result = MetricPlan(MARKETING, dimensions=['channel']).evaluate(campaigns, dimensions=[])
+        assert result.loc['total', 'total_spend'] == pytest.approx(campaigns['spend'].sum())
+
+    def test_case_and_boolean_strings(self, campaigns):
+        plan = MetricPlan([
+            ('win_rate', "SUM(CASE WHEN stage = 'Closed Won' THEN 1 ELSE 0 END) * 100.0 / COUNT(*)"),
+            ('won_flag_rate', 'SUM(CASE WHEN is_won THEN 1 ELSE 0 END) * 100.0 / COUNT(*)'),
+        ])
+        result = plan.evaluate(campaigns, dimensions=[])
+
+        assert result.loc['total', 'win_rate'] == pytest.approx((campaigns['stage'] == 'Closed Won').mean() * 100)
+        assert result.loc['total', 'won_flag_rate'] == pytest.approx((campaigns['is_won'] == 'True').mean() * 100)
+
+    def test_nullif_zero_denominator(self):
+        df = pd.DataFrame({'channel': ['A', 'B'], 'spend': [10.0, 5.0], 'customers': [0, 5]})
+        result = MetricPlan([('cac', 'SUM(spend) / NULLIF(SUM(customers), 0)')], ['channel']).evaluate(df)
+
+        assert np.isnan(result.loc['A', 'cac'])
+        assert result.loc['B', 'cac'] == 1.0
+
+    def test_shared_aggregates_deduplicated(self):
+        plan = MetricPlan(MARKETING)
+        spend = ('agg', 'SUM', ('col', 'spend'))
+
+        assert sum(measure.aggregates.count(spend) for measure in plan.measures) == 3
+        assert plan.aggregates.count(spend) == 1
+        assert len(plan.aggregates) == 5  # spend, revenue, customers, clicks, impressions
+
+    def test_missing_columns_skipped(self, campaigns):
+        plan = MetricPlan(MARKETING + [('cpl', 'SUM(spend) / NULLIF(SUM(leads), 0)')])
+        result = plan.evaluate(campaigns, dimensions=[])
+
+        assert 'cpl' not in result.columns
+        assert result.attrs['skipped'] == {'cpl': ['leads']}
+        assert plan.missing_columns(campaigns) == {'cpl': ['leads']}
+
+
+class TestNullSemantics:
+    """Test that NULL operands propagate like SQL."""
+
+    def test_not_equal_skips_null(self):
+        df = pd.DataFrame({'account_type': ['Expense', 'Expense', 'Revenue'],
+                           'category': [None, 'x', None], 'debit': [5.0, 2.0, 9.0]})
+        plan = MetricPlan([('operating_expenses',
+                            "SUM(CASE WHEN account_type = 'Expense' AND category != 'Cost of Goods Sold' "
+                            "THEN debit ELSE 0 END)")])
+
+        assert plan.evaluate(df, dimensions=[]).loc['total', 'operating_expenses'] == 2.0
+
+    @pytest.mark.parametrize('flag', [
+        [True, False, None, None],
+        [1.0, 0.0, np.nan, np.nan],
+        ['yes', 'no', None, None],
+    ])
+    def test_not_null_flag_is_not_true(self, flag):
+        df = pd.DataFrame({'is_first_purchase': flag})
+        plan = MetricPlan([
+            ('new', 'SUM(CASE WHEN is_first_purchase THEN 1 ELSE 0 END)'),
+            ('returning', 'SUM(CASE WHEN NOT is_first_purchase THEN 1 ELSE 0 END)'),
+            ('either', 'SUM(CASE WHEN is_first_purchase OR NOT is_first_purchase THEN 1 ELSE 0 END)'),
+        ])
+        result = plan.evaluate(df, dimensions=[])
+
+        assert result.loc['total', 'new'] == 1
+        assert result.loc['total', 'returning'] == 1
+        assert result.loc['total', 'either'] == 2
+
+    def test_or_with_true_operand_is_true(self):
+        df = pd.DataFrame({'stage': ['Won', None, None], 'amount': [None, 10.0, None]})
+        plan = MetricPlan([('matched', "SUM(CASE WHEN stage = 'Won' OR amount > 5 THEN 1 ELSE 0 END)")])
+
+        assert plan.evaluate(df, dimensions=[]).loc['total', 'matched'] == 2
+
+    def test_case_keeps_string_values(self):
+        df = pd.DataFrame({'account_type': ['Revenue', 'Revenue', 'Revenue', 'Expense', 'Revenue'],
+                           'category': ['Sales', 'Services', 'Sales', 'Rent', None],
+                           'debit': ['1', '2', None, '4', '5']})
+        plan = MetricPlan([
+            ('revenue_categories', "COUNT(DISTINCT CASE WHEN account_type = 'Revenue' THEN category END)"),
+            ('revenue_debit', "SUM(CASE WHEN account_type = 'Revenue' THEN debit END)"),
+        ])
+        result = plan.evaluate(df, dimensions=[])
+
+        assert result.loc['total', 'revenue_categories'] == 2
+        assert result.loc['total', 'revenue_debit'] == 8.0
+
+
+def test_resolve_columns():
+    resolved = resolve_columns(['campaign_name', 'spend', 'revenue'], ['Campaign Name', 'Chi phí', 'spend'],
+                               column_map={'revenue': 'Chi phí'})
+    assert resolved == {'campaign_name': 'Campaign Name', 'spend': 'spend', 'revenue': 'Chi phí'}
+
+
+def test_all_schema_measures_compile():
+    from semantic_layer import SemanticLayerParser
+
+    for mdl_path in MDL_DIR.glob('*.mdl.yaml'):
+        parser = SemanticLayerParser(str(mdl_path), use_snapshot=False)
+        for metric in parser.load().metrics:
+            plan = MetricPlan.from_metric(metric)
+            assert len(plan.measures) == len(metric.measure)
@@ -0,0 +1,108 @@
+"""
+Unit tests for compiled MDL snapshots.
+
+Tests cover:
+- First load parses YAML and writes a snapshot, second load uses it
+- Snapshot layer and indexes equal the YAML-built ones
+- Edited YAML makes the snapshot stale; touched-but-unchanged YAML does not
+- Corrupt snapshots fall back to YAML
+- Snapshot directory is private; one owned by another user is ignored
+- Build step writes one snapshot per schema
+"""
+
+import os
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from semantic_layer import SemanticLayerParser
+from utils.mdl_snapshot import build_snapshots, snapshot_path
+
+MDL_DIR = Path(__file__).parent.parent / 'mdl_schemas'
+
+
+@pytest.fixture
+def mdl_file(tmp_path):
+    target = tmp_path / 'marketing.mdl.yaml'
+    shutil.copy(MDL_DIR / 'marketing.mdl.yaml', target)
+    return target
+
+
+@pytest.fixture
+def snapshot_dir(tmp_path):
+    return str(tmp_path / 'snapshots')
+
+
+def load(mdl_file, snapshot_dir):
+    parser = SemanticLayerParser(str(mdl_file), snapshot_dir=snapshot_dir, use_snapshot=True)
+    parser.load()
+    return parser
+
+
+class TestSnapshotLoad:
+    """Test snapshot round-trip and freshness."""
+
+    def test_second_load_uses_snapshot(self, mdl_file, snapshot_dir):
+        first = load(mdl_file, snapshot_dir)
+        second = load(mdl_file, snapshot_dir)
+
+        assert first.loaded_from == 'yaml'
+        assert second.loaded_from == 'snapshot'
+        assert second.semantic_layer == first.semantic_layer
+        for attr in SemanticLayerParser.INDEX_ATTRS:
+            assert getattr(second, attr).keys() == getattr(first, attr).keys()
+        assert second.generate_context('revenue by channel') == first.generate_context('revenue by channel')
+
+    def test_edited_yaml_is_stale(self, mdl_file, snapshot_dir):
+        load(mdl_file, snapshot_dir)
+        mdl_file.write_text(mdl_file.read_text(encoding='utf-8').replace(
+            'catalog: ', 'catalog: edited_', 1), encoding='utf-8')
+
+        parser = load(mdl_file, snapshot_dir)
+
+        assert parser.loaded_from == 'yaml'
+        assert parser.semantic_layer.catalog.startswith('edited_')
+        assert load(mdl_file, snapshot_dir).loaded_from == 'snapshot'
+
+    def test_touched_yaml_still_fresh(self, mdl_file, snapshot_dir):
+        load(mdl_file, snapshot_dir)
+        stat = mdl_file.stat()
+        os.utime(mdl_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 5_000_000_000))
+
+        assert load(mdl_file, snapshot_dir).loaded_from == 'snapshot'
+
+    def test_corrupt_snapshot_falls_back(self, mdl_file, snapshot_dir):
+        load(mdl_file, snapshot_dir)
+        snapshot_path(mdl_file, snapshot_dir).write_bytes(b'not a pickle')
+
+        assert load(mdl_file, snapshot_dir).loaded_from == 'yaml'
+
+    def test_snapshot_dir_is_private(self, mdl_file, snapshot_dir):
+        load(mdl_file, snapshot_dir)
+        assert os.stat(snapshot_dir).st_mode & 0o777 == 0o700
+
+    @pytest.mark.skipif(not hasattr(os, 'getuid'), reason="POSIX ownership")
+    def test_foreign_snapshot_dir_ignored(self, mdl_file, snapshot_dir, monkeypatch):
+        load(mdl_file, snapshot_dir)
+        monkeypatch.setattr(os, 'getuid', lambda: os.stat(snapshot_dir).st_uid + 1)
+
+        assert load(mdl_file, snapshot_dir).loaded_from == 'yaml'
+
+    def test_disabled(self, mdl_file, snapshot_dir):
+        parser = SemanticLayerParser(str(mdl_file), snapshot_dir=snapshot_dir, use_snapshot=False)
+        parser.load()
+
+        assert parser.loaded_from == 'yaml'
+        assert not snapshot_path(mdl_file, snapshot_dir).exists()
+
+
+def test_build_snapshots(snapshot_dir):
+    written = build_snapshots(MDL_DIR, snapshot_dir=snapshot_dir)
+
+    assert len(written) == len(list(MDL_DIR.glob('*.mdl.yaml')))
+    assert load(MDL_DIR / 'sales.mdl.yaml', snapshot_dir).loaded_from == 'snapshot'
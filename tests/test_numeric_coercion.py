@@ -0,0 +1,130 @@
+"""
+Unit tests for numeric string coercion.
+
+Tests cover:
+- European, US and plain number formats
+- Non-numeric columns are left alone
+- Input frame is not mutated or copied when nothing converts
+- Per-column decisions are memoized
+- Converted frames are memoized per source frame (profiled once)
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+import os
+import sys
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.numeric_coercion import (
+    NumericCoercer, detect_number_format, FORMAT_EU, FORMAT_US, FORMAT_PLAIN
+)
+
+
+class TestDetectNumberFormat:
+    """Test separator detection."""
+
+    def test_decimal_comma(self):
+        assert detect_number_format(pd.Series(['5,43', '2,27', '4,35'])) == FORMAT_EU
+
+    def test_eu_thousands(self):
+        assert detect_number_format(pd.Series(['8.311,42', '776,14'])) == FORMAT_EU
+
+    def test_us_thousands(self):
+        assert detect_number_format(pd.Series(['8,311.42', '1,234,567'])) == FORMAT_US
+
+    def test_plain(self):
+        assert detect_number_format(pd.Series(['5.43', '12', '-3.1'])) == FORMAT_PLAIN
+
+    def test_text_is_not_numeric(self):
+        assert detect_number_format(pd.Series(['Facebook', 'Google', '12'])) is None
+
+    def test_empty(self):
+        assert detect_number_format(pd.Series([], dtype=object)) is None
+
+
+class TestNumericCoercer:
+    """Test whole-frame conversion."""
+
+    def test_converts_mixed_formats(self):
+        df = pd.DataFrame({
+            'ROI': ['5,43', '2,27', '4,35'],
+            'Spend': ['8.311,42', '776,14', '1.000,00'],
+            'Revenue': ['8,311.42', '776.14', '1,000.00'],
+            'Channel': ['Facebook', 'Google', 'TikTok'],
+        })
+        result = NumericCoercer().coerce(df)
+
+        assert result['ROI'].tolist() == [5.43, 2.27, 4.35]
+        assert result['Spend'].tolist() == [8311.42, 776.14, 1000.0]
+        assert result['Revenue'].tolist() == [8311.42, 776.14, 1000.0]
+        assert result['Channel'].dtype == object
+        for col in ('ROI', 'Spend', 'Revenue'):
+            assert pd.api.types.is_numeric_dtype(result[col])
+
+    def test_invalid_values_become_nan(self):
+        df = pd.DataFrame({'x': ['1,5', '2,5', '3,5', 'n/a']})
+        result = NumericCoercer().coerce(df)
+
+        assert result['x'].iloc[:3].tolist() == [1.5, 2.5, 3.5]
+        assert np.isnan(result['x'].iloc[3])
+
+    def test_comma_outside_sample(self):
+        values = ['100'] * 20 + ['1.234,5']
+        result = NumericCoercer(sample_size=10).coerce(pd.DataFrame({'x': values}))
+
+        assert result['x'].iloc[-1] == 1234.5
+
+    def test_input_not_mutated(self):
+        df = pd.DataFrame({'ROI': ['5,43', '2,27'], 'n': [1, 2]})
+        result = NumericCoercer().coerce(df)
+
+        assert df['ROI'].tolist() == ['5,43', '2,27']
+        assert result is not df
+
+    def test_no_conversion_returns_same_frame(self):
+        df = pd.DataFrame({'Channel': ['A', 'B'], 'n': [1, 2]})
+        assert NumericCoercer().coerce(df) is df
+
+    def test_decisions_memoized(self, monkeypatch):
+        import utils.numeric_coercion as module
+        calls = []
+        original = module.detect_number_format
+
+        def counting(sample, *args, **kwargs):
+            calls.append(sample.name)
+            return original(sample, *args, **kwargs)
+
+        monkeypatch.setattr(module, 'detect_number_format', counting)
+        coercer = NumericCoercer()
+        df = pd.DataFrame({'ROI': ['5,43', '2,27'], 'Channel': ['A', 'B']})
+
+        coercer.coerce(df)
+        coercer.coerce(df.copy())
+
+        assert calls == ['ROI', 'Channel']
+
+    def test_converted_frame_memoized_per_source(self):
+        from utils.column_profile import get_column_profile
+        coercer = NumericCoercer()
+        df = pd.DataFrame({'ROI': ['5,43', '2,27'], 'Channel': ['A', 'B']})
+
+        first = coercer.coerce(df)
+        assert coercer.coerce(df) is first
+        assert get_column_profile(coercer.coerce(df)) is get_column_profile(first)
+
+        df['Extra'] = ['1', '2']  # Structural change → recomputed
+        assert coercer.coerce(df) is not first
+        assert coercer.coerce(df.copy()) is not coercer.coerce(df)
+
+    def test_pipeline_delegates(self):
+        from premium_lean_pipeline import PremiumLeanPipeline
+        pipeline = PremiumLeanPipeline(None, lang='en', result_cache=None, llm_cache=None)
+        df = pd.DataFrame({'ROI': ['5,43', '2,27'], 'Spend': ['8311,42', '776,14']})
+
+        result = pipeline._convert_string_to_numeric(df)
+
+        assert result['ROI'].tolist() == [5.43, 2.27]
+        assert result['Spend'].tolist() == [8311.42, 776.14]
@@ -0,0 +1,219 @@
+"""
+Unit tests for the pipeline result cache.
+
+Tests cover:
+- DataFrame / prompt / source-module fingerprinting
+- Disk persistence across cache instances
+- LRU eviction by size
+- Invalidation API
+- Cache hit short-circuit in PremiumLeanPipeline.run_pipeline
+- Failed AI steps are never cached
+- Result-computing modules and benchmark files are part of the key
+- Private cache directories (0700, owner checked)
+"""
+
+import pytest
+import pandas as pd
+import os
+import sys
+import time
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.result_cache import (
+    PipelineResultCache,
+    ensure_private_dir,
+    fingerprint_dataframe,
+    fingerprint_callables,
+    fingerprint_modules
+)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return PipelineResultCache(cache_dir=str(tmp_path), max_size_mb=1)
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({'channel': ['A', 'B', 'C'], 'revenue': [100.0, 200.0, 300.0]})
+
+
+class TestFingerprints:
+    """Test content fingerprints."""
+
+    def test_same_content_same_fingerprint(self, df):
+        assert fingerprint_dataframe(df) == fingerprint_dataframe(df.copy())
+
+    def test_value_change_changes_fingerprint(self, df):
+        changed = df.copy()
+        changed.loc[0, 'revenue'] = 101.0
+        assert fingerprint_dataframe(df) != fingerprint_dataframe(changed)
+
+    def test_column_rename_changes_fingerprint(self, df):
+        renamed = df.rename(columns={'revenue': 'sales'})
+        assert fingerprint_dataframe(df) != fingerprint_dataframe(renamed)
+
+    def test_prompt_literal_changes_fingerprint(self):
+        def step_a():
+            return "Prompt version one"
+
+        def step_b():
+            return "Prompt version two"
+
+        assert fingerprint_callables([step_a]) == fingerprint_callables([step_a])
+        assert fingerprint_callables([step_a]) != fingerprint_callables([step_b])
+
+    def test_module_source_changes_fingerprint(self, tmp_path, monkeypatch):
+        module = tmp_path / 'kpi_rules_tmp.py'
+        module.write_text("THRESHOLD = 1\n")
+        data = tmp_path / 'benchmarks.csv'
+        data.write_text("metric,p50\ncpa,10\n")
+        monkeypatch.syspath_prepend(str(tmp_path))
+
+        before = fingerprint_modules(['kpi_rules_tmp'], [str(data)])
+        assert fingerprint_modules(['kpi_rules_tmp'], [str(data)]) == before
+
+        module.write_text("THRESHOLD = 2  # changed rule\n")
+        after_code = fingerprint_modules(['kpi_rules_tmp'], [str(data)])
+        data.write_text("metric,p50\ncpa,12\n")
+        after_data = fingerprint_modules(['kpi_rules_tmp'], [str(data)])
+
+        assert len({before, after_code, after_data}) == 3
+
+    def test_key_depends_on_lang_and_description(self, df):
+        base = PipelineResultCache.make_key(df, 'desc', 'vi', '1', 'p')
+        assert base != PipelineResultCache.make_key(df, 'desc', 'en', '1', 'p')
+        assert base != PipelineResultCache.make_key(df, 'other', 'vi', '1', 'p')
+        assert base != PipelineResultCache.make_key(df, 'desc', 'vi', '2', 'p')
+
+
+class TestPipelineResultCache:
+    """Test disk-backed storage."""
+
+    def test_miss_then_hit(self, cache):
+        assert cache.get('k1') is None
+        cache.set('k1', {'success': True, 'value': 42})
+        assert cache.get('k1') == {'success': True, 'value': 42}
+        assert cache.stats()['hits'] == 1
+        assert cache.stats()['misses'] == 1
+
+    def test_persists_across_instances(self, tmp_path):
+        PipelineResultCache(cache_dir=str(tmp_path)).set('k1', {'a': 1})
+        assert PipelineResultCache(cache_dir=str(tmp_path)).get('k1') == {'a': 1}
+
+    def test_invalidate_and_clear(self, cache):
+        cache.set('k1', {'a': 1})
+        cache.set('k2', {'b': 2})
+        assert cache.invalidate('k1') is True
+        assert cache.invalidate('k1') is False
+        assert cache.get('k1') is None
+        assert cache.clear() == 1
+        assert cache.stats()['entries'] == 0
+
+    def test_lru_eviction(self, tmp_path):
+        cache = PipelineResultCache(cache_dir=str(tmp_path), max_size_mb=0.5)
+        blob = 'x' * (200 * 1024)  # ~200KB per entry
+        cache.set('old', {'blob': blob})
+        time.sleep(0.01)
+        cache.set('recent', {'blob': blob})
+        time.sleep(0.01)
+        cache.get('old')  # 'old' becomes most recently used
+        time.sleep(0.01)
+        cache.set('new', {'blob': blob})
+
+        assert cache.get('recent') is None
+        assert cache.get('old') is not None
+        assert cache.get('new') is not None
+
+    def test_corrupt_entry_is_miss(self, cache):
+        with open(os.path.join(cache.cache_dir, 'bad.pkl'), 'wb') as f:
+            f.write(b'not a pickle')
+        assert cache.get('bad') is None
+        assert not os.path.exists(os.path.join(cache.cache_dir, 'bad.pkl'))
+
+
+class TestPrivateDirectory:
+    """Test the cache directory is private to the current user."""
+
+    def test_created_with_mode_0700(self, tmp_path):
+        cache = PipelineResultCache(cache_dir=str(tmp_path / 'shared' / 'results'))
+        assert os.stat(cache.cache_dir).st_mode & 0o777 == 0o700
+        assert os.stat(tmp_path / 'shared').st_mode & 0o777 == 0o700
+
+    def test_existing_directory_is_tightened(self, tmp_path):
+        directory = tmp_path / 'loose'
+        directory.mkdir(mode=0o755)
+        os.chmod(directory, 0o777)
+        ensure_private_dir(str(directory))
+        assert os.stat(directory).st_mode & 0o777 == 0o700
+
+    @pytest.mark.skipif(not hasattr(os, 'getuid'), reason="POSIX ownership")
+    def test_foreign_owner_rejected(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(os, 'getuid', lambda: os.stat(tmp_path).st_uid + 1)
+        with pytest.raises(PermissionError):
+            ensure_private_dir(str(tmp_path))
+
+
+class TestPipelineIntegration:
+    """Test run_pipeline short-circuits on a cache hit."""
+
+    def test_cache_hit_skips_ai_calls(self, cache, df):
+        from premium_lean_pipeline import PremiumLeanPipeline
+
+        class FailingClient:
+            def GenerativeModel(self, *args, **kwargs):
+                raise AssertionError("AI must not be called on cache hit")
+
+        pipeline = PremiumLeanPipeline(FailingClient(), lang='en', result_cache=cache)
+        key = pipeline._result_cache_key(df, 'desc')
+        cache.set(key, {
+            'success': True,
+            'dashboard': {'charts': []},
+            'insights': {'key_insights': []},
+            'quality_scores': {'overall': 90.0},
+            'audit_trail': [],
+            'performance': {'total': 42.0}
+        })
+
+        result = pipeline.run_pipeline(df, 'desc')
+
+        assert result['success'] is True
+        assert result['quality_scores']['overall'] == 90.0
+        assert result['performance']['cache_hit'] is True
+        assert result['performance']['original_total'] == 42.0
+
+    def test_failed_insights_not_cached(self, cache, df):
+        from premium_lean_pipeline import PremiumLeanPipeline
+
+        pipeline = PremiumLeanPipeline(object(), lang='en', result_cache=cache)
+        pipeline.parallel_stages = False
+        pipeline.step0_domain_detection = lambda frame, description: {
+            'domain': 'marketing', 'domain_name': 'Marketing', 'expert_role': 'Analyst'}
+        pipeline.step1_data_cleaning = lambda frame, info: {
+            'success': True, 'df_cleaned': frame, 'cleaning_report': {}, 'quality_score': 90}
+        pipeline.step2_smart_blueprint = lambda frame, info: {
+            'success': True, 'smart_blueprint': {}, 'quality_score': 90}
+        pipeline.step3_dashboard_build = lambda frame, blueprint, sample=None: {'kpis': {}, 'charts': []}
+        insights = {'success': False, 'error': 'quota', 'insights': {}}
+        pipeline.step4_domain_insights = lambda dashboard, blueprint, info: insights
+
+        assert pipeline.run_pipeline(df, 'desc')['success'] is True
+        assert cache.stats()['entries'] == 0
+
+        insights.update(success=True, insights={'key_insights': ['ok']})
+        pipeline.run_pipeline(df, 'desc')
+        assert cache.stats()['entries'] == 1
+
+    def test_key_covers_result_modules(self, cache, df, monkeypatch):
+        import premium_lean_pipeline
+        from premium_lean_pipeline import PremiumLeanPipeline, RESULT_MODULES
+
+        assert {'kpi_registry', 'benchmark_loader', 'utils.column_roles',
+                premium_lean_pipeline.__name__} <= set(RESULT_MODULES)
+        pipeline = PremiumLeanPipeline(object(), lang='en', result_cache=cache)
+        key = pipeline._result_cache_key(df, 'desc')
+        monkeypatch.setattr(premium_lean_pipeline, 'RESULT_MODULES', RESULT_MODULES[:-1])
+
+        assert pipeline._result_cache_key(df, 'desc') != key
@@ -0,0 +1,182 @@
+"""
+Unit tests for approximate mode.
+
+Tests cover:
+- Strata column detection
+- Stratified sample allocation and reproducibility
+- Group total / mean estimates and their confidence intervals
+- Exact streaming totals
+- Step 3 charts built from the sample
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+import os
+import sys
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.sampling import (
+    detect_strata_columns, stratified_reservoir_sample, exact_totals, StreamingAggregator
+)
+
+
+@pytest.fixture
+def large_df():
+    rng = np.random.default_rng(0)
+    rows = 200_000
+    return pd.DataFrame({
+        'Channel': rng.choice(['Facebook', 'Google', 'TikTok', 'Email'], rows, p=[0.5, 0.3, 0.19, 0.01]),
+        'Stage': rng.choice(['Won', 'Lost'], rows),
+        'Customer': [f'C{i}' for i in range(rows)],
+        'Revenue': rng.gamma(2.0, 50.0, rows),
+        'Sales_Amount': rng.integers(1, 100, rows),
+    })
+
+
+class TestStrataDetection:
+    """Test dimension column selection."""
+
+    def test_dimension_columns(self, large_df):
+        # Sales_Amount is numeric, Customer is not a dimension keyword
+        assert detect_strata_columns(large_df) == ['Channel', 'Stage']
+
+    def test_high_cardinality_skipped(self):
+        df = pd.DataFrame({'campaign_id': [f'X{i}' for i in range(100)]})
+        assert detect_strata_columns(df) == []
+
+
+class TestStratifiedSample:
+    """Test sample allocation."""
+
+    def test_size_and_minimum_per_stratum(self, large_df):
+        sample = stratified_reservoir_sample(large_df, sample_size=2_000)
+
+        assert sample.population_rows == len(large_df)
+        assert 2_000 <= sample.sample_rows <= 2_100
+        assert sample.stratum_samples.min() >= 30
+        assert sample.weights.sum() == pytest.approx(len(large_df))
+
+    def test_reproducible(self, large_df):
+        first = stratified_reservoir_sample(large_df, sample_size=1_000, seed=7)
+        second = stratified_reservoir_sample(large_df, sample_size=1_000, seed=7)
+        assert first.frame.index.equals(second.frame.index)
+
+    def test_small_frame_is_exact(self):
+        df = pd.DataFrame({'channel': ['A', 'B', 'A'], 'revenue': [1.0, 2.0, 3.0]})
+        sample = stratified_reservoir_sample(df, sample_size=100)
+
+        assert sample.is_exact
+        totals = sample.estimate_totals('channel', 'revenue').set_index('channel')
+        assert totals.loc['A', 'estimate'] == 4.0
+        assert totals.loc['A', 'std_error'] == 0.0
+
+
+class TestEstimates:
+    """Test estimates against exact values."""
+
+    def test_totals_within_interval(self, large_df):
+        sample = stratified_reservoir_sample(large_df, sample_size=5_000)
+        estimates = sample.estimate_totals('Channel', 'Revenue').set_index('Channel')
+        exact = large_df.groupby('Channel')['Revenue'].sum()
+
+        for channel, total in exact.items():
+            row = estimates.loc[channel]
+            assert row['ci_low'] <= total <= row['ci_high']
+            assert abs(row['estimate'] - total) / total < 0.1
+
+    def test_counts_exact_for_strata(self, large_df):
+        sample = stratified_reservoir_sample(large_df, sample_size=5_000)
+        counts = sample.estimate_totals('Channel').set_index('Channel')['estimate']
+        expected = large_df['Channel'].value_counts()
+
+        for channel, n in expected.items():
+            assert counts[channel] == pytest.approx(n)
+
+    def test_means_within_interval(self, large_df):
+        sample = stratified_reservoir_sample(large_df, sample_size=5_000)
+        means = sample.estimate_means('Stage', 'Revenue').set_index('Stage')
+        exact = large_df.groupby('Stage')['Revenue'].mean()
+
+        for stage, mean in exact.items():
+            row = means.loc[stage]
+            assert 0 < row['std_error'] < mean * 0.05
+            assert abs(row['estimate'] - mean) <= 3 * row['std_error']
+
+
+class TestExactTotals:
+    """Test chunked aggregates."""
+
+    def test_matches_pandas(self, large_df):
+        totals = exact_totals(large_df, chunk_rows=30_000)
+
+        assert set(totals) == {'Revenue', 'Sales_Amount'}
+        assert totals['Revenue']['sum'] == pytest.approx(large_df['Revenue'].sum())
+        assert totals['Sales_Amount']['max'] == large_df['Sales_Amount'].max()
+        assert totals['Revenue']['count'] == len(large_df)
+
+    def test_all_null_column(self):
+        aggregator = StreamingAggregator(['x'])
+        aggregator.update(pd.DataFrame({'x': [np.nan, np.nan]}))
+        assert aggregator.result()['x'] == {'sum': 0.0, 'count': 0, 'mean': None, 'min': None, 'max': None}
+
+
+class TestApproximateDashboard:
+    """Test Step 3 in approximate mode."""
+
+    def test_bar_chart_uses_estimates(self, large_df):
+        from premium_lean_pipeline import PremiumLeanPipeline
+        pipeline = PremiumLeanPipeline(None, lang='en', result_cache=None, llm_cache=None, approximate=True)
+        sample = stratified_reservoir_sample(large_df, sample_size=2_000)
+        blueprint = {'charts': [
+            {'id': 'c1', 'title': 'Revenue by channel', 'type': 'bar', 'x_axis': 'Channel', 'y_axis': 'Revenue'},
+            {'id': 'c2', 'title': 'Revenue vs amount', 'type': 'scatter', 'x_axis': 'Sales_Amount', 'y_axis': 'Revenue'},
+        ]}
+
+        charts = pipeline.step3_dashboard_build(large_df, blueprint, sample=sample)['charts']
+
+        bar, scatter = charts
+        assert len(bar['figure'].data[0].x) == 4
+        assert bar['figure'].data[0].error_y.array is not None
+        assert bar['approximate']['confidence'] == 0.95
+        assert bar['reduction']['method'] == 'stratified_estimate'
+        assert scatter['reduction']['input_rows'] == sample.sample_rows
+
+    def test_estimates_fold_into_other(self, large_df):
+        from premium_lean_pipeline import PremiumLeanPipeline
+        from utils.chart_aggregation import MAX_PIE_SLICES
+        pipeline = PremiumLeanPipeline(None, lang='en', result_cache=None, llm_cache=None, approximate=True)
+        sample = stratified_reservoir_sample(large_df, sample_size=2_000)
+        blueprint = {'charts': [
+            {'id': 'c1', 'title': 'Revenue by customer', 'type': 'pie', 'x_axis': 'Customer', 'y_axis': 'Revenue'},
+        ]}
+
+        chart = pipeline.step3_dashboard_build(large_df, blueprint, sample=sample)['charts'][0]
+        totals = sample.estimate_totals('Customer', 'Revenue')
+
+        assert chart['reduction']['folded'] is True
+        assert len(chart['figure'].data[0].labels) == MAX_PIE_SLICES
+        assert chart['figure'].data[0].labels[-1] == 'Other'
+        assert sum(chart['figure'].data[0].values) == pytest.approx(totals['estimate'].sum())
+
+    def test_mode_selection(self, large_df):
+        from premium_lean_pipeline import PremiumLeanPipeline
+        auto = PremiumLeanPipeline(None, lang='en', result_cache=None, llm_cache=None)
+        forced = PremiumLeanPipeline(None, lang='en', result_cache=None, llm_cache=None, approximate=True)
+
+        assert not auto._use_approximate(large_df)
+        assert forced._use_approximate(large_df.head(10))
+        assert auto._approximate_summary(large_df, None) is None
+
+    def test_summary(self, large_df):
+        from premium_lean_pipeline import PremiumLeanPipeline
+        pipeline = PremiumLeanPipeline(None, lang='en', result_cache=None, llm_cache=None, approximate=True)
+        sample = stratified_reservoir_sample(large_df, sample_size=2_000)
+
+        summary = pipeline._approximate_summary(large_df, sample)
+
+        assert summary['strata'] == ['Channel', 'Stage']
+        assert summary['exact_totals']['Revenue']['sum'] == pytest.approx(large_df['Revenue'].sum())
+        assert len(summary['dimension_estimates']['Channel']['Revenue']) == 4
@@ -0,0 +1,177 @@
+"""
+Unit tests for the stage scheduler and the concurrent Step 1 / Step 2 path.
+
+Tests cover:
+- Independent stages run in parallel
+- Dependencies are respected
+- Failed stages skip their dependents
+- run_pipeline produces the same result in parallel and sequential mode
+"""
+
+import pytest
+import pandas as pd
+import json
+import os
+import sys
+import time
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.stage_scheduler import StageScheduler
+
+
+class TestStageScheduler:
+    """Test DAG execution."""
+
+    def test_independent_stages_run_concurrently(self):
+        spans = {}
+
+        def stage(name):
+            def run(deps):
+                start = time.time()
+                time.sleep(0.2)
+                spans[name] = (start, time.time())
+                return 1
+            return run
+
+        scheduler = StageScheduler(max_workers=3)
+        for name in ('a', 'b', 'c'):
+            scheduler.add_stage(name, stage(name))
+        results = scheduler.run()
+
+        assert results == {'a': 1, 'b': 1, 'c': 1}
+        # All three stages overlap in time
+        assert max(s for s, _ in spans.values()) < min(e for _, e in spans.values())
+        assert set(scheduler.timings) == {'a', 'b', 'c'}
+
+    def test_dependencies_receive_results(self):
+        scheduler = StageScheduler()
+        scheduler.add_stage('base', lambda deps: 10)
+        scheduler.add_stage('double', lambda deps: deps['base'] * 2, depends_on=['base'])
+        scheduler.add_stage('total', lambda deps: deps['base'] + deps['double'], depends_on=['base', 'double'])
+
+        assert scheduler.run()['total'] == 30
+
+    def test_failure_skips_dependents(self):
+        def boom(deps):
+            raise RuntimeError("boom")
+
+        scheduler = StageScheduler()
+        scheduler.add_stage('bad', boom)
+        scheduler.add_stage('child', lambda deps: 1, depends_on=['bad'])
+        scheduler.add_stage('independent', lambda deps: 2)
+        results = scheduler.run()
+
+        assert results == {'independent': 2}
+        assert isinstance(scheduler.errors['bad'], RuntimeError)
+        assert scheduler.skipped == ['child']
+
+    def test_unknown_dependency_rejected(self):
+        scheduler = StageScheduler()
+        with pytest.raises(ValueError):
+            scheduler.add_stage('child', lambda deps: 1, depends_on=['missing'])
+
+
+class MockGenAI:
+    """Mock google.generativeai module answering each pipeline prompt."""
+
+    CLEANING = {
+        "cleaning_summary": {"rows_before": 6, "rows_after": 6, "missing_handled": {}, "duplicates_removed": 0},
+        "quality_metrics": {"completeness": 99.0, "accuracy": 96.0, "consistency": 98.0},
+        "transformations": []
+    }
+    BLUEPRINT = {
+        "objectives": [{"id": "obj1", "title": "Grow revenue", "priority": "high"}],
+        "charts": [
+            {"id": f"c{i}", "title": f"Chart {i}", "type": "bar", "x_axis": "channel", "y_axis": "revenue"}
+            for i in range(1, 6)
+        ],
+        "quality_scores": {"informative": 90, "clarity": 90, "design": 90, "interactivity": 90, "actionable": 90}
+    }
+    INSIGHTS = {
+        "executive_summary": "Revenue is concentrated in channel A.",
+        "key_insights": [{"title": "A leads", "description": "A is largest", "data_evidence": "x", "impact": "high"}],
+        "recommendations": [{"action": "Invest in A", "priority": "high", "expected_impact": "+10%", "timeline": "short"}],
+        "risk_alerts": []
+    }
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        genai = self
+
+        class Model:
+            def generate_content(self, prompt, **kwargs):
+                time.sleep(genai.delay)
+                if 'Fast Professional Data Cleaning' in prompt:
+                    payload = MockGenAI.CLEANING
+                elif 'Smart Dashboard Blueprint' in prompt:
+                    payload = MockGenAI.BLUEPRINT
+                else:
+                    payload = MockGenAI.INSIGHTS
+                return type('obj', (object,), {'text': json.dumps(payload)})
+
+        self._model = Model()
+
+    def GenerativeModel(self, *args, **kwargs):
+        return self._model
+
+    def GenerationConfig(self, **kwargs):
+        return kwargs
+
+
+@pytest.fixture
+def marketing_df():
+    return pd.DataFrame({
+        'channel': ['A', 'B', 'C', 'A', 'B', 'C'],
+        'spend': [100.0, 200.0, 300.0, 150.0, 250.0, 350.0],
+        'revenue': [400.0, 500.0, 600.0, 450.0, 550.0, 650.0]
+    })
+
+
+class TestParallelPipeline:
+    """Test concurrent Step 1 / Step 2 against the sequential path."""
+
+    def _run(self, df, parallel, delay=0.0):
+        from premium_lean_pipeline import PremiumLeanPipeline
+        pipeline = PremiumLeanPipeline(
+            MockGenAI(delay), lang='en', result_cache=None, llm_cache=None, parallel_stages=parallel
+        )
+        return pipeline.run_pipeline(df, 'marketing campaigns')
+
+    def test_parallel_matches_sequential(self, marketing_df):
+        parallel = self._run(marketing_df, parallel=True)
+        sequential = self._run(marketing_df, parallel=False)
+
+        assert parallel['success'] and sequential['success']
+        assert parallel['dashboard']['kpis'] == sequential['dashboard']['kpis']
+        assert parallel['quality_scores'] == sequential['quality_scores']
+        assert [c['id'] for c in parallel['dashboard']['charts']] == [c['id'] for c in sequential['dashboard']['charts']]
+        assert [a['step'] for a in parallel['audit_trail']] == [a['step'] for a in sequential['audit_trail']]
+
+    def test_parallel_records_stage_timings(self, marketing_df):
+        result = self._run(marketing_df, parallel=True)
+        perf = result['performance']
+
+        for stage in ('data_cleaning', 'smart_blueprint', 'speculative_prep', 'cleaning_blueprint_parallel'):
+            assert stage in perf
+        assert perf['blueprint_reconciliation'] == 'speculation_exact'
+
+    def test_parallel_overlaps_ai_calls(self, marketing_df):
+        result = self._run(marketing_df, parallel=True, delay=0.3)
+        perf = result['performance']
+
+        # Both 0.3s AI calls overlap → phase well under their sum
+        assert perf['cleaning_blueprint_parallel'] < perf['data_cleaning'] + perf['smart_blueprint'] - 0.2
+
+    def test_imputation_triggers_kpi_recalculation(self, marketing_df, monkeypatch):
+        df = marketing_df.assign(visits=[10.0, None, 30.0, 40.0, 50.0, 60.0])
+        cleaning = json.loads(json.dumps(MockGenAI.CLEANING))
+        cleaning['cleaning_summary']['missing_handled'] = {'visits': 'median'}
+        monkeypatch.setattr(MockGenAI, 'CLEANING', cleaning)
+
+        parallel = self._run(df, parallel=True)
+        sequential = self._run(df, parallel=False)
+
+        assert parallel['performance']['blueprint_reconciliation'] == 'kpis_recalculated'
+        assert parallel['dashboard']['kpis'] == sequential['dashboard']['kpis']
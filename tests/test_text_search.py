@@ -0,0 +1,92 @@
+"""
+Unit tests for BM25 semantic-layer search.
+
+Tests cover:
+- Vietnamese diacritic folding and identifier splitting
+- BM25 ranking, field weights and fuzzy (trigram) matches
+- SemanticLayerParser.find_columns/find_metrics/find_models use the index
+- Search indexes survive the compiled snapshot round-trip
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.text_search import BM25Index, normalize_text, tokenize
+from semantic_layer import SemanticLayerParser
+
+MDL_DIR = Path(__file__).parent.parent / 'mdl_schemas'
+
+
+class TestNormalization:
+    """Test text folding."""
+
+    def test_vietnamese_diacritics(self):
+        assert normalize_text('Doanh Thu Thuần - Đơn hàng') == 'doanh thu thuan don hang'
+
+    def test_identifiers_split(self):
+        assert normalize_text('conversionRate') == 'conversion rate'
+        assert normalize_text('cost_per_click') == 'cost per click'
+
+    def test_stopwords_removed(self):
+        assert tokenize('What is the revenue của kênh') == ['revenue', 'kenh']
+
+
+class TestBM25Index:
+    """Test ranking."""
+
+    @pytest.fixture
+    def index(self):
+        index = BM25Index()
+        index.add('revenue', [('total_revenue', 3), ('Tổng doanh thu bán hàng', 1)])
+        index.add('cost', [('marketing_cost', 3), ('Chi phí quảng cáo', 1)])
+        index.add('orders', [('order_count', 3), ('Number of orders, excluding revenue adjustments', 1)])
+        return index
+
+    def test_name_outranks_description(self, index):
+        assert [doc_id for doc_id, _ in index.search('revenue')] == ['revenue', 'orders']
+
+    def test_without_diacritics(self, index):
+        assert index.search('chi phi quang cao')[0][0] == 'cost'
+
+    def test_fuzzy_plural(self, index):
+        assert index.search('revenues')[0][0] == 'revenue'
+
+    def test_no_match_and_limit(self, index):
+        assert index.search('inventory') == []
+        assert len(index.search('revenue', limit=1)) == 1
+
+
+class TestParserSearch:
+    """Test SemanticLayerParser search over real MDL schemas."""
+
+    @pytest.fixture
+    def parser(self):
+        parser = SemanticLayerParser(str(MDL_DIR / 'marketing.mdl.yaml'), use_snapshot=False)
+        parser.load()
+        return parser
+
+    def test_find_columns_ranked(self, parser):
+        matches = parser.find_columns('campaign spend', limit=3)
+        assert matches[0][0] == 'campaigns'
+        assert matches[0][1].name == 'spend'
+
+    def test_find_metrics_by_measure(self, parser):
+        assert parser.find_metrics('conversions')
+
+    def test_context_lists_matching_model(self, parser):
+        assert '**Model: campaigns**' in parser.generate_context('spend by channel')
+
+    def test_indexes_in_snapshot(self, tmp_path):
+        for _ in range(2):
+            parser = SemanticLayerParser(str(MDL_DIR / 'marketing.mdl.yaml'),
+                                         snapshot_dir=str(tmp_path), use_snapshot=True)
+            parser.load()
+
+        assert parser.loaded_from == 'snapshot'
+        assert parser.find_columns('spend', limit=1)[0][1].name == 'spend'
@@ -0,0 +1,84 @@
+"""
+Unit tests for the start-up warm-up.
+
+Tests cover:
+- Per-task timings and error capture
+- Default tasks fill the process-wide caches
+- Background thread starts once per process
+- Benchmark CSVs are read once per loader
+"""
+
+import pytest
+import os
+import sys
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import utils.warmup as warmup
+from utils.warmup import run_warmup, get_warmup_status
+
+
+@pytest.fixture(autouse=True)
+def fresh_state(monkeypatch):
+    monkeypatch.setattr(warmup, '_status', {})
+    monkeypatch.setattr(warmup, '_thread', None)
+    monkeypatch.setattr(warmup, '_done', warmup.threading.Event())
+
+
+class TestRunWarmup:
+    """Test task execution and timings."""
+
+    def test_records_timings_and_errors(self):
+        def broken():
+            raise ValueError('boom')
+
+        status = run_warmup([('ok', lambda: None), ('broken', broken)])
+
+        assert status['ok']['ok'] is True and status['ok']['error'] is None
+        assert status['ok']['seconds'] >= 0
+        assert status['broken']['ok'] is False
+        assert 'boom' in status['broken']['error']
+
+    def test_default_tasks_fill_caches(self):
+        import mdl_loader
+        from mdl_loader import DOMAIN_TO_MDL
+
+        status = run_warmup([(name, task) for name, task in warmup.DEFAULT_TASKS
+                             if name in ('translations', 'mdl_schemas', 'benchmarks')])
+
+        assert all(entry['ok'] for entry in status.values()), status
+        for domain in DOMAIN_TO_MDL:
+            assert mdl_loader._mdl_cache.get(domain) is not None
+
+
+class TestBackgroundThread:
+    """Test the once-per-process thread."""
+
+    def test_starts_once(self):
+        calls = []
+        tasks = [('count', lambda: calls.append(1))]
+
+        assert warmup.start_warmup(tasks) is True
+        assert warmup.start_warmup(tasks) is False
+        assert warmup.wait_for_warmup(timeout=10) is True
+
+        assert calls == [1]
+        assert list(get_warmup_status()) == ['count']
+
+    def test_disabled_by_env(self, monkeypatch):
+        monkeypatch.setenv('WARMUP_ON_START', '0')
+        assert warmup.start_warmup([('noop', lambda: None)]) is False
+        assert warmup.wait_for_warmup(timeout=0) is False
+
+
+def test_benchmarks_read_once(monkeypatch):
+    import benchmark_loader
+
+    loader = benchmark_loader.VietnamBenchmarkLoader()
+    status = loader.load_all_benchmarks()
+    reads = []
+    monkeypatch.setattr(benchmark_loader.pd, 'read_csv', lambda *a, **k: reads.append(a))
+
+    assert loader.load_all_benchmarks() == status
+    assert reads == []